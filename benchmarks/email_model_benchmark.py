@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark the learned email model against the keyword rules.
+
+Trains on labelled emails (a file with a "category" column, or a synthetic
+hotel inbox), then reports held-out accuracy and emails/sec for both, the
+cost of incremental partial_fit updates and of loading a saved model
+memory-mapped.
+
+    python benchmarks/email_model_benchmark.py [--data FILE] [--size N]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.email_classifier import EmailCategory
+from core.hotel.email_model import EmailModel, compare_with_rules, load_examples, split_examples
+
+# Per category: subjects and body sentences. Many use wording the keyword
+# rules don't list, as real guests and suppliers do.
+TEMPLATES = {
+    EmailCategory.BOOKING: (
+        ["Reservation for {name}", "Room for two nights in May", "Can we extend our stay?",
+         "Group booking enquiry", "Change of dates for {name}"],
+        ["We would like to reserve a double room from the 12th to the 15th.",
+         "Please confirm our arrival on Friday, departure Monday.",
+         "Could you hold two rooms for a wedding party?",
+         "We are a family of four arriving late in the evening.",
+         "Is the sea view room free for the first week of June?"]),
+    EmailCategory.INVOICE: (
+        ["Invoice {ref}", "Statement of account", "Remittance advice", "Payment reminder {ref}",
+         "Your bill from City Laundry"],
+        ["Please find attached our invoice for last month.",
+         "The balance of {amount} EUR remains outstanding.",
+         "Kindly settle the amount by bank transfer within 30 days.",
+         "Our records show the payment is now overdue.",
+         "This remittance covers invoices for March and April."]),
+    EmailCategory.COMPLAINT: (
+        ["Very disappointed with our stay", "Noise all night", "Room was not clean",
+         "Unacceptable service", "Refund request after our visit"],
+        ["The room smelled of smoke and the sheets were stained.",
+         "Nobody answered at reception for an hour.",
+         "We were kept awake by the party next door until 3am.",
+         "The shower was cold every morning despite reporting it.",
+         "I expect a partial refund for this experience."]),
+    EmailCategory.SUPPLIER: (
+        ["Delivery schedule update", "New linen order", "Boiler maintenance visit",
+         "Price list for next quarter", "Wine delivery confirmation"],
+        ["Our driver will deliver the towels and sheets on Tuesday morning.",
+         "The engineer will service the boiler next week.",
+         "Attached is our updated price list for coffee and tea.",
+         "Please confirm the order quantity for breakfast supplies.",
+         "The cleaning products you ordered are back in stock."]),
+    EmailCategory.MARKETING: (
+        ["Spring newsletter", "Exclusive partner offer", "Boost your direct bookings",
+         "New features in our booking engine", "Webinar invitation"],
+        ["Unsubscribe at any time using the link below.",
+         "Hoteliers who switched saw 20% more revenue.",
+         "Join our free webinar on revenue management.",
+         "Get a discount on your first year of subscription.",
+         "Read our latest tips for independent hotels."]),
+    EmailCategory.SPAM: (
+        ["You have won", "Claim your prize now", "Cheap meds online", "Crypto opportunity",
+         "Your account is suspended"],
+        ["Click here to claim your reward before midnight.",
+         "Make money fast working from home.",
+         "Verify your password to keep your account.",
+         "Congratulations, you were selected as a lucky winner.",
+         "Send your bank details to receive the transfer."]),
+    EmailCategory.INQUIRY: (
+        ["Question about parking", "Do you allow dogs?", "Airport shuttle",
+         "Breakfast times", "Wheelchair access"],
+        ["Is there parking near the hotel, and what does it cost?",
+         "Can we bring our small dog with us?",
+         "How far is the hotel from the train station?",
+         "What time is breakfast served at the weekend?",
+         "Do you have a lift to the upper floors?"]),
+    EmailCategory.OTHER: (
+        ["Lost property", "Thank you", "Tourist board survey", "Photo from our trip",
+         "Local council notice"],
+        ["I think I left my phone charger in the room.",
+         "Thank you again for the lovely welcome.",
+         "Please fill in the annual visitor survey.",
+         "Here is a photo of the garden we took.",
+         "Road works will close the street next Thursday."]),
+}
+
+NEUTRAL = ["Kind regards, {name}.", "Best wishes.", "Thanks in advance.", "Hope you are well.",
+           "Sent from my phone."]
+
+NAMES = ["John Smith", "Anna Rossi", "Peter Novak", "Sofia Garcia", "James Brown", "Laura Jensen"]
+
+
+def synthetic_examples(count, seed=7, noise=0.2):
+    """Labelled email dicts; `noise` is the share of sentences borrowed from other categories"""
+    rng = random.Random(seed)
+    categories = list(TEMPLATES)
+    emails, labels = [], []
+    for i in range(count):
+        category = rng.choice(categories)
+        subjects, sentences = TEMPLATES[category]
+        fields = {"name": rng.choice(NAMES), "ref": f"INV-{rng.randrange(10 ** 5):05d}",
+                  "amount": rng.randint(50, 5000)}
+        body = []
+        for _ in range(rng.randint(2, 5)):
+            pool = sentences if rng.random() >= noise else TEMPLATES[rng.choice(categories)][1]
+            body.append(rng.choice(pool))
+        body.append(rng.choice(NEUTRAL))
+        emails.append({"subject": rng.choice(subjects).format(**fields),
+                       "content": " ".join(body).format(**fields),
+                       "sender": f"contact{i}@example.com"})
+        labels.append(category)
+    return emails, labels
+
+
+def run(emails, labels):
+    train_emails, train_labels, test_emails, test_labels = split_examples(emails, labels, 0.2)
+    print(f"{len(train_emails):,} training / {len(test_emails):,} test emails, "
+          f"{len(set(labels))} categories")
+
+    model = EmailModel()
+    start = time.perf_counter()
+    model.fit(train_emails, train_labels)
+    seconds = time.perf_counter() - start
+    print(f"Trained in {seconds:.2f}s ({len(train_emails) / seconds:,.0f} emails/s)")
+
+    start = time.perf_counter()
+    for email_data, label in zip(test_emails[:200], test_labels[:200]):
+        model.partial_fit([email_data], [label])
+    seconds = time.perf_counter() - start
+    print(f"partial_fit one email at a time: {seconds / min(200, len(test_emails)) * 1000:.2f} ms each")
+    model.fit(train_emails, train_labels)
+
+    metrics = compare_with_rules(model, test_emails, test_labels)
+    print(f"Accuracy: model {metrics['model_accuracy']:.1%}, keyword rules {metrics['rules_accuracy']:.1%}")
+    print(f"Throughput: model {metrics['model_emails_per_second']:,.0f} emails/s (one batch), "
+          f"keyword rules {metrics['rules_emails_per_second']:,.0f} emails/s")
+
+    predicted = model.predict(test_emails)
+    totals, correct = Counter(), Counter()
+    for expected, got in zip(test_labels, predicted):
+        totals[expected] += 1
+        correct[expected] += expected == got
+    for category in sorted(totals, key=lambda c: c.value):
+        print(f"  {category.value:10s} {correct[category] / totals[category]:6.1%} of {totals[category]}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model.save(tmp_dir)
+        start = time.perf_counter()
+        loaded = EmailModel.load(tmp_dir)
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        assert loaded.predict(test_emails) == predicted
+        predict_seconds = time.perf_counter() - start
+        print(f"Memory-mapped load {load_seconds * 1000:.1f} ms, first batch "
+              f"{len(test_emails) / predict_seconds:,.0f} emails/s")
+        del loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the learned email model against the keyword rules")
+    parser.add_argument("--data", help="Labelled emails (JSON, JSONL or CSV with a category column)")
+    parser.add_argument("--size", type=int, default=20000, help="Synthetic emails when no --data is given")
+    args = parser.parse_args()
+    if args.data:
+        emails, labels, skipped = load_examples(args.data)
+        if skipped:
+            print(f"Skipped {skipped} rows without a known category")
+    else:
+        emails, labels = synthetic_examples(args.size)
+    run(emails, labels)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark HotelManager mutations per second by storage mode.
+
+    legacy rewrite    json.dump(indent=2) of every room on each change (the old save)
+    atomic rewrite    full snapshot via temp file + fsync + rename (journal=False)
+    journal           one fsync'd journal line per change, compacted every N
+    journal, no fsync same without waiting for the disk (reference only)
+    sqlite            SQLiteHotelStore, one transaction per change
+
+then status, guest and date queries on a large hotel, JSON scans against SQLite indexes.
+
+    python benchmarks/hotel_storage_benchmark.py [--rooms 8 200] [--mutations 2000] [--query-rooms 20000]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.hotel_manager import HotelManager, RoomStatus
+from core.hotel.rooms import default_rooms
+from core.hotel.storage import JsonHotelStore, SQLiteHotelStore, snapshot_data
+
+
+class LegacyJsonStore(JsonHotelStore):
+    """save() as it was: rewrite the whole file in place on every change"""
+
+    def save(self):
+        data = snapshot_data(self.settings, self.rooms.values())
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _manager(store, rooms):
+    return HotelManager(total_rooms=rooms, store=store)
+
+
+def measure(label, manager, mutations):
+    """Cycle rooms through check-in, check-out and back to available"""
+    numbers = list(manager.rooms)
+    start = time.perf_counter()
+    for i in range(mutations):
+        number = numbers[(i // 3) % len(numbers)]
+        if i % 3 == 0:
+            manager.check_in_guest(number, f"Guest {i}", "2024-12-31")
+        elif i % 3 == 1:
+            manager.check_out_guest(number)
+        else:
+            manager.update_room_status(number, RoomStatus.AVAILABLE)
+    seconds = time.perf_counter() - start
+    print(f"  {label:20s} {mutations / seconds:10,.0f} mutations/s  ({seconds * 1e6 / mutations:8.1f} us each)")
+    return mutations / seconds
+
+
+def run(room_counts, mutations, compact_every):
+    for rooms in room_counts:
+        print(f"{rooms} rooms, {mutations:,} mutations")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp = Path(tmp_dir)
+            legacy = measure("legacy rewrite", _manager(LegacyJsonStore(tmp / "legacy.json", journal=False), rooms),
+                             mutations)
+            measure("atomic rewrite", _manager(JsonHotelStore(tmp / "atomic.json", journal=False), rooms), mutations)
+            manager = _manager(JsonHotelStore(tmp / "journal.json", compact_every=compact_every), rooms)
+            journal = measure("journal", manager, mutations)
+            manager.close()
+            manager = _manager(JsonHotelStore(tmp / "nofsync.json", compact_every=compact_every), rooms)
+            manager.journal.fsync = False
+            measure("journal, no fsync", manager, mutations)
+            manager.close()
+            manager = _manager(SQLiteHotelStore(tmp / "hotel.db"), rooms)
+            measure("sqlite", manager, mutations)
+            manager.close()
+
+            # Replay cost: reopen with a full journal
+            manager = _manager(JsonHotelStore(tmp / "replay.json", compact_every=mutations + 1), rooms)
+            manager.journal.fsync = False
+            measure("(fill journal)", manager, mutations)
+            manager.journal.close()
+            start = time.perf_counter()
+            reopened = HotelManager(data_file=str(tmp / "replay.json"))
+            print(f"  replay {reopened.journal.pending:,} entries on load: "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms")
+            reopened.journal.close()
+        print(f"  journal vs legacy rewrite: {journal / legacy:.1f}x")
+
+
+def query_benchmark(rooms, repeat=200):
+    """Lookups on a large hotel: in-memory scans (JSON) against SQLite indexes"""
+    print(f"Queries over {rooms:,} rooms ({rooms // 10:,} occupied, {rooms // 1000} in maintenance), per call")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        for label, store in [("json (scan)", JsonHotelStore(tmp / "query.json", journal=False)),
+                             ("sqlite (index)", SQLiteHotelStore(tmp / "query.db"))]:
+            hotel = default_rooms(rooms)
+            for i, room in enumerate(hotel[::10]):
+                room.status, room.guest_name = RoomStatus.OCCUPIED, f"Guest {i}"
+                room.check_in_date, room.check_out_date = "2024-01-01", f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}"
+            for room in hotel[5::1000]:
+                room.status = RoomStatus.MAINTENANCE
+            manager = _manager(store, 0)
+            manager.add_rooms(hotel)
+            timings = []
+            for call in (manager.get_occupied_rooms,
+                         lambda: manager.get_rooms_by_status(RoomStatus.MAINTENANCE),
+                         lambda: manager.find_guest(f"Guest {rooms // 20}"),
+                         lambda: manager.get_stays_between("2024-12-27", "2024-12-30")):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    call()
+                timings.append((time.perf_counter() - start) * 1e6 / repeat)
+            print(f"  {label:16s} occupied {timings[0]:8.1f} us  maintenance {timings[1]:7.1f} us  "
+                  f"guest {timings[2]:7.1f} us  dates {timings[3]:7.1f} us")
+            manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hotel storage modes")
+    parser.add_argument("--rooms", type=int, nargs="+", default=[8, 200], help="Room counts to test")
+    parser.add_argument("--mutations", type=int, default=2000, help="Changes per mode")
+    parser.add_argument("--compact-every", type=int, default=1000, help="Journal entries per snapshot")
+    parser.add_argument("--query-rooms", type=int, default=20000, help="Hotel size for the query timings")
+    args = parser.parse_args()
+    run(args.rooms, args.mutations, args.compact_every)
+    query_benchmark(args.query_rooms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark reading the hotel summary from running counters against
+rebuilding it from the rooms, as a dashboard polling it would.
+
+    python benchmarks/hotel_summary_benchmark.py [--rooms 200 2000 20000] [--reads 1000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.hotel_manager import HotelManager, RoomStatus
+from core.hotel.storage import SQLiteHotelStore
+
+
+def scanned_summary(manager):
+    """How get_hotel_summary used to work: query the rooms on every call"""
+    available = manager.get_available_rooms()
+    occupied = manager.get_occupied_rooms()
+    counts = manager.store.status_counts()
+    return {
+        'hotel_name': manager.hotel_name,
+        'total_rooms': manager.total_rooms,
+        'available_rooms': len(available),
+        'occupied_rooms': len(occupied),
+        'occupancy_rate': round(len(occupied) / manager.total_rooms * 100, 1) if manager.total_rooms else 0.0,
+        'rooms_cleaning': counts.get(RoomStatus.CLEANING, 0),
+        'rooms_maintenance': counts.get(RoomStatus.MAINTENANCE, 0),
+        'daily_revenue': sum(room.rate_per_night for room in occupied),
+        'available_room_list': [r.room_number for r in available],
+        'occupied_room_list': [(r.room_number, r.guest_name) for r in occupied]
+    }
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+
+def run(room_counts, reads):
+    rng = random.Random(0)
+    check_out = str(date.today() + timedelta(days=3))
+    for count in room_counts:
+        manager = HotelManager(total_rooms=count, store=SQLiteHotelStore(":memory:"))
+        numbers = list(manager.rooms)
+        for i, number in enumerate(rng.sample(numbers, count * 6 // 10)):
+            manager.check_in_guest(number, f"Guest {i}", check_out)
+        for number in rng.sample(numbers, count // 10):
+            manager.update_room_status(number, RoomStatus.CLEANING)
+
+        scan_reads = max(1, reads // max(1, count // 200))
+        scan_us = timed(lambda: scanned_summary(manager), scan_reads)
+        counter_us = timed(manager.get_hotel_summary, reads)
+        assert manager.get_hotel_summary() == scanned_summary(manager)
+
+        def change_and_read():
+            number = rng.choice(numbers)
+            manager.update_room_status(number, RoomStatus.MAINTENANCE)
+            manager.get_hotel_summary()
+            manager.update_room_status(number, RoomStatus.AVAILABLE)
+            manager.get_hotel_summary()
+        mixed_us = timed(change_and_read, max(1, reads // 20)) / 2
+
+        print(f"{count:,} rooms")
+        print(f"  summary by scanning      {scan_us:12,.1f} us")
+        print(f"  summary from counters    {counter_us:12,.2f} us  ({scan_us / counter_us:,.0f}x faster)")
+        print(f"  status change + read     {mixed_us:12,.1f} us  (lists rebuilt after each change)")
+        manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the incrementally maintained hotel summary")
+    parser.add_argument("--rooms", type=int, nargs="+", default=[200, 2000, 20000], help="Hotel sizes")
+    parser.add_argument("--reads", type=int, default=1000, help="Summary reads to time")
+    args = parser.parse_args()
+    run(args.rooms, args.reads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled intent matcher over a corpus of utterances.
+
+Reports match time per command, how many commands matched more than one
+intent (and which pairs), and accuracy when the corpus is labelled.
+
+Corpus format: one utterance per line, optionally "intent<TAB>utterance"
+with "-" for commands that should fall through to the LLM.
+
+    python benchmarks/intent_matcher_benchmark.py [--corpus FILE] [--repeat N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.agent.intent_matcher import IntentMatcher
+
+DEFAULT_CORPUS = Path(__file__).parent / "intent_corpus.tsv"
+
+
+def load_corpus(path):
+    """List of (expected intent or None if unlabelled, utterance)"""
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if "\t" in line:
+                label, text = line.split("\t", 1)
+                corpus.append(("" if label == "-" else label, text))
+            else:
+                corpus.append((None, line))
+    return corpus
+
+
+def run(corpus, repeat=200):
+    compile_start = time.perf_counter()
+    matcher = IntentMatcher()
+    compile_seconds = time.perf_counter() - compile_start
+
+    timings = []
+    for _ in range(repeat):
+        for _, text in corpus:
+            start = time.perf_counter()
+            matcher.match(text.lower())
+            timings.append(time.perf_counter() - start)
+
+    ambiguous = Counter()
+    errors = []
+    labelled = correct = 0
+    for expected, text in corpus:
+        match = matcher.match(text.lower())
+        intent = match.intent if match else ""
+        if match and match.ambiguous:
+            ambiguous[(match.intent,) + tuple(match.alternatives)] += 1
+        if expected is not None:
+            labelled += 1
+            if intent == expected:
+                correct += 1
+            else:
+                errors.append((text, expected or "-", intent or "-"))
+
+    timings.sort()
+    micros = [t * 1e6 for t in timings]
+    print(f"Intent table compiled in {compile_seconds * 1000:.2f} ms")
+    print(f"{len(corpus)} utterances x {repeat} runs")
+    print(f"Match time: mean {statistics.mean(micros):.1f} us, median {statistics.median(micros):.1f} us, "
+          f"p95 {micros[int(len(micros) * 0.95) - 1]:.1f} us, max {micros[-1]:.1f} us")
+    print(f"Ambiguous commands: {sum(ambiguous.values())}")
+    for intents, count in ambiguous.most_common():
+        print(f"  {count:4d}  {intents[0]} (also {', '.join(intents[1:])})")
+    if labelled:
+        print(f"Accuracy: {correct}/{labelled} ({correct / labelled:.1%})")
+        for text, expected, got in errors:
+            print(f"  '{text}': expected {expected}, got {got}")
+    return correct, labelled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Gaia intent matcher")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Utterance file")
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the corpus for timing")
+    args = parser.parse_args()
+    run(load_corpus(args.corpus), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
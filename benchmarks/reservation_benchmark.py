@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark the reservation index against scanning every reservation.
+
+Fills a hotel with random stays over two years, then times bookings,
+"which rooms are free from D1 to D2" and a 90-night occupancy forecast.
+
+    python benchmarks/reservation_benchmark.py [--rooms 200] [--sizes 10000 25000] [--queries 500]
+    python benchmarks/reservation_benchmark.py --rooms 1000 --sizes 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.reservations import ReservationBook, ReservationConflict
+
+HORIZON_DAYS = 730
+
+
+def fill(rooms, reservations, seed=0):
+    """A book with about `reservations` non-overlapping stays; returns it and the booking time"""
+    rng = random.Random(seed)
+    start = date.today()
+    book = ReservationBook()
+    attempts = 0
+    began = time.perf_counter()
+    while len(book) < reservations:
+        attempts += 1
+        check_in = start + timedelta(days=rng.randrange(HORIZON_DAYS))
+        try:
+            book.book(rooms[rng.randrange(len(rooms))], f"Guest {attempts}", check_in,
+                      check_in + timedelta(days=rng.randint(1, 7)))
+        except ReservationConflict:
+            pass
+    return book, time.perf_counter() - began, attempts
+
+
+def scan_free_rooms(reservations, rooms, start, end):
+    """The obvious way: look at every reservation"""
+    busy = {r.room_number for r in reservations if r.check_in < end and start < r.check_out}
+    return [room for room in rooms if room not in busy]
+
+
+def run(room_count, sizes, queries):
+    rooms = [str(100 + i) for i in range(1, room_count + 1)]
+    rng = random.Random(1)
+    today = date.today()
+    windows = []
+    for _ in range(queries):
+        check_in = today + timedelta(days=rng.randrange(HORIZON_DAYS))
+        windows.append((check_in, check_in + timedelta(days=rng.randint(1, 5))))
+
+    for size in sizes:
+        if size > room_count * HORIZON_DAYS // 5:
+            print(f"{size:,} reservations don't fit {room_count} rooms over {HORIZON_DAYS} days; skipped")
+            continue
+        book, seconds, attempts = fill(rooms, size)
+        print(f"{room_count} rooms, {len(book):,} reservations")
+        print(f"  book (with overlap check)  {attempts / seconds:12,.0f} attempts/s "
+              f"({len(book) / attempts:.0%} accepted)")
+
+        start = time.perf_counter()
+        indexed = [book.free_rooms(rooms, check_in, check_out) for check_in, check_out in windows]
+        index_us = (time.perf_counter() - start) * 1e6 / len(windows)
+
+        everything = list(book.by_id.values())
+        scanned_windows = windows[:max(1, len(windows) // 10)]
+        start = time.perf_counter()
+        scanned = [scan_free_rooms(everything, rooms, check_in, check_out)
+                   for check_in, check_out in scanned_windows]
+        scan_us = (time.perf_counter() - start) * 1e6 / len(scanned_windows)
+        assert scanned == indexed[:len(scanned)]
+        print(f"  free rooms D1..D2  index   {index_us:12,.1f} us")
+        print(f"  free rooms D1..D2  scan    {scan_us:12,.1f} us  ({scan_us / index_us:.0f}x slower)")
+
+        room = rooms[0]
+        start = time.perf_counter()
+        for check_in, check_out in windows:
+            book.conflicts(room, check_in, check_out)
+        print(f"  one room's conflicts       {(time.perf_counter() - start) * 1e6 / len(windows):12,.2f} us")
+
+        rates = {room: 100.0 for room in rooms}
+        start = time.perf_counter()
+        forecast = book.forecast(today + timedelta(days=180), 90, rates)
+        print(f"  90-night forecast          {(time.perf_counter() - start) * 1000:12,.2f} ms  "
+              f"(peak {max(night['booked_rooms'] for night in forecast)} rooms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hotel reservation index")
+    parser.add_argument("--rooms", type=int, default=200, help="Rooms in the hotel")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 25000], help="Reservations to load")
+    parser.add_argument("--queries", type=int, default=500, help="Date windows to look up")
+    args = parser.parse_args()
+    run(args.rooms, args.sizes, args.queries)
+
+
+if __name__ == "__main__":
+    main()
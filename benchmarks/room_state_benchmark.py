@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar room state table against HotelRoom objects and
+per-property reservation books for a multi-property deployment.
+
+Times tonight's occupancy and revenue per property and a 90-night
+forecast across all properties, and measures memory held per room.
+
+    python benchmarks/room_state_benchmark.py [--properties 10] [--rooms 2000] [--reservations 5000]
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.reservations import ReservationBook, ReservationConflict
+from core.hotel.room_state import RoomStateTable
+from core.hotel.rooms import RoomStatus, default_rooms
+
+HORIZON_DAYS = 365
+
+
+def build_properties(properties, rooms, reservations, seed=0):
+    """Room objects and a reservation book per property, about half the rooms occupied tonight"""
+    rng = random.Random(seed)
+    today = date.today()
+    hotels = {}
+    for p in range(properties):
+        hotel_rooms = default_rooms(rooms)
+        book = ReservationBook()
+        for room in rng.sample(hotel_rooms, rooms // 2):
+            room.status = RoomStatus.OCCUPIED
+            room.guest_name = f"Guest {room.room_number}"
+            room.check_in_date = today.isoformat()
+            room.check_out_date = (today + timedelta(days=rng.randint(1, 4))).isoformat()
+            book.book(room.room_number, room.guest_name, today, room.check_out_date)
+        while len(book) < reservations:
+            start = today + timedelta(days=rng.randrange(5, HORIZON_DAYS))
+            try:
+                book.book(rng.choice(hotel_rooms).room_number, "Booking", start,
+                          start + timedelta(days=rng.randint(1, 7)))
+            except ReservationConflict:
+                pass
+        hotels[f"property-{p}"] = (hotel_rooms, book)
+    return hotels
+
+
+def object_summary(hotels):
+    """Occupancy and revenue per property, looping over HotelRoom objects"""
+    summary = {}
+    for name, (rooms, _) in hotels.items():
+        occupied = [room for room in rooms if room.status == RoomStatus.OCCUPIED]
+        summary[name] = (len(occupied), sum(room.rate_per_night for room in occupied))
+    return summary
+
+
+def object_forecast(hotels, start, days):
+    """Each property's ReservationBook.forecast, added up night by night"""
+    totals = [0] * days
+    for rooms, book in hotels.values():
+        rates = {room.room_number: room.rate_per_night for room in rooms}
+        for i, night in enumerate(book.forecast(start, days, rates)):
+            totals[i] += night['booked_rooms']
+    return totals
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def run(properties, rooms, reservations):
+    hotels = build_properties(properties, rooms, reservations)
+    room_count = properties * rooms
+    print(f"{properties} properties x {rooms:,} rooms, {properties * reservations:,} reservations")
+
+    start = time.perf_counter()
+    table = RoomStateTable()
+    for name, (hotel_rooms, book) in hotels.items():
+        table.add_property(name, hotel_rooms, book.by_id.values())
+    print(f"  load table                    {(time.perf_counter() - start) * 1000:10,.1f} ms")
+
+    objects_ms, expected = timed(lambda: object_summary(hotels), 5)
+    table_ms, summary = timed(table.property_summary, 5)
+    assert all(summary[name]['occupied_rooms'] == count for name, (count, _) in expected.items())
+    print(f"  tonight per property  objects {objects_ms:10,.2f} ms")
+    print(f"  tonight per property  table   {table_ms:10,.2f} ms  ({objects_ms / table_ms:.0f}x faster)")
+
+    today = date.today()
+    objects_ms, expected = timed(lambda: object_forecast(hotels, today, 90), 3)
+    table_ms, nights = timed(lambda: table.nightly(today, 90), 3)
+    assert list(nights[0].sum(axis=0)) == expected
+    print(f"  90-night forecast     objects {objects_ms:10,.2f} ms")
+    print(f"  90-night forecast     table   {table_ms:10,.2f} ms  ({objects_ms / table_ms:.0f}x faster)")
+
+    # Memory per room: slotted HotelRoom objects against the table's columns and lists
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copies = [default_rooms(rooms) for _ in range(properties)]
+    objects_bytes = tracemalloc.get_traced_memory()[0] - before
+    del copies
+    before = tracemalloc.get_traced_memory()[0]
+    fresh = RoomStateTable()
+    for name, (hotel_rooms, _) in hotels.items():
+        fresh.add_property(name, hotel_rooms)
+    table_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"  memory per room       objects {objects_bytes / room_count:10,.0f} bytes")
+    print(f"  memory per room       table   {table_bytes / room_count:10,.0f} bytes  "
+          f"(room numbers and names shared with the objects)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar room state table")
+    parser.add_argument("--properties", type=int, default=10, help="Properties to load")
+    parser.add_argument("--rooms", type=int, default=2000, help="Rooms per property")
+    parser.add_argument("--reservations", type=int, default=5000, help="Reservations per property")
+    args = parser.parse_args()
+    run(args.properties, args.rooms, args.reservations)
+
+
+if __name__ == "__main__":
+    main()
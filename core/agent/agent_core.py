@@ -0,0 +1,468 @@
+"""
+Asynchronous Agent Core for Gaia
+Runs capture, speech recognition, intent handling, LLM generation and TTS as
+concurrent asyncio stages connected by queues:
+
+    capture -> audio queue -> ASR -> utterance queue -> intent
+        -> generation queue -> generation -> speech queue -> TTS
+
+Blocking work (Whisper, actions, Ollama, TTS engines) runs on one dedicated
+worker thread per stage, so the event loop keeps reading the microphone while
+Gaia is thinking or speaking. That is what makes barge-in possible: if the
+user starts talking over Gaia, speech is stopped, queued sentences and the
+running generation are dropped, and the new utterance is recognised.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Deque, Iterable, List, Optional
+
+import numpy as np
+
+from core.ai.sentence_segmenter import SentenceSegmenter
+from core.audio.vad import VoiceActivityDetector
+
+
+class AgentState(Enum):
+    WAKE = "wake"              # Waiting for the wake word
+    LISTENING = "listening"    # Conversation mode: recognising a command
+    RESPONDING = "responding"  # Handling a command and speaking the answer
+    SLEEPING = "sleeping"      # Only "wake up, Gaia" is accepted
+
+
+@dataclass
+class Response:
+    """
+    What the intent handler wants done with an utterance.
+    `speech` is spoken first, then the `tokens` stream (if any) sentence by
+    sentence. `on_complete(text)` receives the generated text once the
+    stream ends, even if it was cut short by barge-in.
+    """
+    speech: List[str] = field(default_factory=list)
+    tokens: Optional[Iterable[str]] = None
+    on_complete: Optional[Callable[[str], None]] = None
+    next_state: AgentState = AgentState.LISTENING
+
+
+@dataclass
+class _Utterance:
+    turn: int
+    text: str
+    wake: bool = False
+
+
+@dataclass
+class _Sentence:
+    turn: int
+    text: str
+    announcement: bool = False  # Spoken outside a turn, e.g. "Gaia is paused."
+
+
+@dataclass
+class _EndOfTurn:
+    turn: int
+    next_state: AgentState
+
+
+class BargeInDetector:
+    """
+    Spots the user talking over Gaia.
+
+    Without echo cancellation the microphone hears Gaia too, so the noise
+    floor is learned while Gaia speaks and speech has to stand out from it
+    for `min_speech_ms` before it counts.
+    """
+
+    def __init__(self, sample_rate: int = 16000, min_speech_ms: int = 300, energy_margin_db: float = 12):
+        self.vad = VoiceActivityDetector(sample_rate=sample_rate, energy_margin_db=energy_margin_db,
+                                         max_noise_db=-15)
+        self.min_frames = max(1, min_speech_ms // self.vad.frame_ms)
+        self._run = 0
+
+    def reset(self):
+        self.vad.reset()
+        self._run = 0
+
+    def process(self, chunk: np.ndarray) -> bool:
+        for is_speech in self.vad.process(chunk):
+            self._run = self._run + 1 if is_speech else 0
+            if self._run >= self.min_frames:
+                return True
+        return False
+
+
+class AsyncAgentCore:
+    """
+    Event-driven voice loop.
+
+    `voice` is a VoiceManager (capture, transcription, streaming recognizer).
+    `on_wake(text)` and `respond(text)` decide what to do with the wake word
+    and with commands; both run on the intent worker thread and return a
+    Response. `speak(text)` plays one sentence and `stop_speaking()` must
+    interrupt it from another thread.
+    """
+
+    def __init__(self, voice, wake_word, on_wake: Callable[[str], Response],
+                 respond: Callable[[str], Response], speak: Callable[[str], object],
+                 stop_speaking: Optional[Callable[[], None]] = None,
+                 log: Callable[[str], None] = print,
+                 conversation_callback: Optional[Callable[[str, str], None]] = None,
+                 wake_phrase: str = "gaia", sleep_wake_phrase: str = "wake up",
+                 user_label: str = "Luke", conversation_timeout: float = 30.0,
+                 max_command_seconds: float = 10.0, silence_duration: float = 0.8,
+                 barge_in: bool = True,
+                 stop_when_factory: Optional[Callable[[], Callable[[str], bool]]] = None,
+                 on_partial: Optional[Callable[[str], None]] = None,
+                 chunk_size: int = 1024, segmenter_factory: Callable[[], SentenceSegmenter] = SentenceSegmenter):
+        self.voice = voice
+        self.wake_word = wake_word
+        self.on_wake = on_wake
+        self.respond = respond
+        self.speak = speak
+        self.stop_speaking = stop_speaking
+        self.log = log
+        self.conversation_callback = conversation_callback or (lambda speaker, msg: None)
+        self.wake_phrase = wake_phrase
+        self.sleep_wake_phrase = sleep_wake_phrase
+        self.user_label = user_label
+        self.conversation_timeout = conversation_timeout
+        self.max_command_seconds = max_command_seconds
+        self.silence_duration = silence_duration
+        self.barge_in_enabled = barge_in
+        # Builds a fresh early-stop predicate for each command (they may keep state)
+        self.stop_when_factory = stop_when_factory
+        self.on_partial = on_partial
+        self.chunk_size = chunk_size
+        self.segmenter_factory = segmenter_factory
+
+        self.state = AgentState.WAKE
+        self.turn = 0
+        self.speaking = False
+        self.barge_ins = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._active: Optional[asyncio.Event] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._quiet: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._stop_requested = threading.Event()
+        self._recognizer = None
+        self._command_samples = 0
+        self._listening_since = 0.0
+        self._recent: Deque[np.ndarray] = deque(maxlen=8)
+        self._barge_in = None
+        self._executors = {}
+
+    # ----- thread-safe controls -------------------------------------------
+
+    def _call_soon(self, callback, *args):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def pause(self):
+        """Stop listening until resume(); speech already queued still plays"""
+        self._call_soon(self._set_active, False)
+
+    def resume(self):
+        self._call_soon(self._set_active, True)
+
+    def stop(self):
+        # Also covers stop() arriving while run() is setting up the loop
+        self._stop_requested.set()
+        self._call_soon(lambda: self._stopped.set())
+
+    def say(self, text: str):
+        """Queue an announcement outside the normal turn flow"""
+        self._call_soon(lambda: self._speech.put_nowait(_Sentence(self.turn, text, announcement=True)))
+
+    def wait_until_running(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _set_active(self, active: bool):
+        if active:
+            # Nothing said while paused should be acted on
+            self.voice.skip_to_live()
+            self._enter(AgentState.WAKE)
+            self._active.set()
+        else:
+            self._active.clear()
+
+    # ----- state ----------------------------------------------------------
+
+    def _enter(self, state: AgentState):
+        self.state = state
+        self._recognizer = None
+        if state == AgentState.LISTENING:
+            self._listening_since = time.monotonic()
+        elif state == AgentState.RESPONDING and self._barge_in is not None:
+            self._barge_in.reset()
+            if self._recent:
+                # The utterance just ended in silence, so this is mostly background
+                self._barge_in.vad.prime(np.concatenate(self._recent))
+        elif state in (AgentState.WAKE, AgentState.SLEEPING):
+            self.wake_word.reset()
+
+    def _new_turn(self) -> int:
+        """Invalidate everything queued for the previous turn"""
+        self.turn += 1
+        return self.turn
+
+    async def _run_blocking(self, stage: str, func, *args):
+        return await self._loop.run_in_executor(self._executors[stage], func, *args)
+
+    # ----- stages ---------------------------------------------------------
+
+    async def _capture_stage(self):
+        capture = self.voice.start_capture()
+        while not self._stopped.is_set():
+            await self._active.wait()
+            chunk = await self._run_blocking("capture", capture.read_samples, self.chunk_size)
+            if chunk.size == 0:
+                self.log("Audio capture ended")
+                self._stopped.set()
+                return
+            if not self._active.is_set():
+                continue
+
+            self._recent.append(chunk)
+            if self.state == AgentState.RESPONDING and self._barge_in is not None:
+                # Track the floor for the whole turn, so it already knows Gaia's voice
+                # when the user cuts in at the start of a sentence
+                if self._barge_in.process(chunk) and self.speaking:
+                    await self._interrupt()
+                    continue
+            if self.speaking and self.state != AgentState.RESPONDING:
+                continue  # An announcement; don't recognise Gaia's own voice
+            await self._audio.put(chunk)
+
+    async def _interrupt(self):
+        """The user spoke over Gaia: stop talking and listen to them"""
+        self.barge_ins += 1
+        self.log("Barge-in: stopping speech to listen")
+        self._new_turn()
+        while not self._speech.empty():
+            self._speech.get_nowait()
+        if self.stop_speaking:
+            await self._loop.run_in_executor(None, self.stop_speaking)
+        self._enter(AgentState.LISTENING)
+        # Don't lose the start of what they said
+        while not self._audio.empty():
+            self._audio.get_nowait()
+        for chunk in self._recent:
+            await self._audio.put(chunk)
+
+    async def _asr_stage(self):
+        sample_rate = self.voice.capture.sample_rate
+        while True:
+            chunk = await self._audio.get()
+            if self.state == AgentState.RESPONDING:
+                continue
+
+            if self.state in (AgentState.WAKE, AgentState.SLEEPING):
+                await self._spot_wake_word(chunk)
+                continue
+
+            if self._recognizer is None:
+                # May load the Whisper model, so not on the loop thread
+                self._recognizer = await self._run_blocking(
+                    "asr", self.voice.create_streaming_recognizer,
+                    self._partial_callback(), self.silence_duration,
+                    self.stop_when_factory() if self.stop_when_factory else None)
+                self._command_samples = 0
+            recognizer = self._recognizer
+            done = await self._run_blocking("asr", recognizer.feed, chunk)
+            self._command_samples += chunk.size
+            if recognizer is not self._recognizer:
+                continue  # State changed while decoding
+
+            if not recognizer.vad.speech_detected:
+                if time.monotonic() - self._listening_since > self.conversation_timeout:
+                    self.log("Conversation timeout - returning to wake word detection")
+                    self._enter(AgentState.WAKE)
+                continue
+
+            if done or self._command_samples >= self.max_command_seconds * sample_rate:
+                text = (await self._run_blocking("asr", recognizer.finalize)).strip().lower()
+                if not text:
+                    self._enter(AgentState.LISTENING)
+                    continue
+                self._enter(AgentState.RESPONDING)
+                await self._utterances.put(_Utterance(self._new_turn(), text))
+
+    def _partial_callback(self):
+        if self.on_partial is None:
+            return None
+        # Called on the ASR worker thread; report from the loop
+        return lambda text: self._call_soon(self.on_partial, text)
+
+    async def _spot_wake_word(self, chunk: np.ndarray):
+        audio = self.voice.to_float32(chunk)
+        if not await self._run_blocking("asr", self.wake_word.process, audio):
+            return
+        candidate = self.wake_word.candidate_audio()
+        text = (await self._run_blocking("asr", self.voice.transcribe, candidate)).lower().strip()
+        if not text:
+            return
+        self.log(f"{self.user_label}: {text}")
+        self.conversation_callback(self.user_label, text)
+
+        if self.wake_phrase not in text:
+            return
+        if self.state == AgentState.SLEEPING and self.sleep_wake_phrase not in text:
+            return
+        self._enter(AgentState.RESPONDING)
+        await self._utterances.put(_Utterance(self._new_turn(), text, wake=True))
+
+    async def _intent_stage(self):
+        while True:
+            utterance = await self._utterances.get()
+            if not utterance.wake:
+                self.log(f"{self.user_label}: {utterance.text}")
+                self.conversation_callback(self.user_label, utterance.text)
+                self.log("Processing command...")
+            handler = self.on_wake if utterance.wake else self.respond
+            try:
+                response = await self._run_blocking("intent", handler, utterance.text)
+            except Exception as e:
+                self.log(f"Error processing command: {e}")
+                response = Response(speech=["Sorry, I encountered an error processing your request."])
+            if utterance.turn != self.turn:
+                continue
+
+            for text in response.speech:
+                await self._speech.put(_Sentence(utterance.turn, text))
+            if response.tokens is not None:
+                await self._generations.put((utterance.turn, response))
+            else:
+                await self._speech.put(_EndOfTurn(utterance.turn, response.next_state))
+
+    def _generate(self, turn: int, response: Response):
+        """Runs on the generation thread; hands sentences to the loop as they complete"""
+        segmenter = self.segmenter_factory()
+        parts = []
+        tokens = iter(response.tokens)
+        try:
+            for token in tokens:
+                if turn != self.turn:
+                    break
+                parts.append(token)
+                for sentence in segmenter.feed(token):
+                    self._call_soon(self._speech.put_nowait, _Sentence(turn, sentence))
+            else:
+                remainder = segmenter.flush()
+                if remainder:
+                    self._call_soon(self._speech.put_nowait, _Sentence(turn, remainder))
+        except Exception as e:
+            self.log(f"Error generating response: {e}")
+        finally:
+            close = getattr(tokens, "close", None)
+            if close:
+                # Abandon the HTTP stream if we stopped early
+                close()
+        text = "".join(parts)
+        if response.on_complete and text:
+            try:
+                response.on_complete(text)
+            except Exception as e:
+                self.log(f"Error completing response: {e}")
+        self._call_soon(self._speech.put_nowait, _EndOfTurn(turn, response.next_state))
+
+    async def _generation_stage(self):
+        while True:
+            turn, response = await self._generations.get()
+            if turn != self.turn:
+                continue
+            await self._run_blocking("generation", self._generate, turn, response)
+
+    async def _tts_stage(self):
+        spoken: List[str] = []
+        spoken_turn = None
+        while True:
+            item = await self._speech.get()
+            announcement = isinstance(item, _Sentence) and item.announcement
+            if item.turn != self.turn and not announcement:
+                continue  # Dropped by barge-in
+
+            if isinstance(item, _EndOfTurn):
+                if spoken and spoken_turn == item.turn:
+                    self.conversation_callback("Gaia", " ".join(spoken))
+                spoken = []
+                # Start afresh so Gaia's own voice isn't transcribed
+                self.voice.skip_to_live()
+                self._enter(item.next_state)
+                continue
+
+            self.log(f"Gaia: {item.text}")
+            if announcement:
+                self.conversation_callback("Gaia", item.text)
+            self.speaking = True
+            self._quiet.clear()
+            try:
+                await self._run_blocking("tts", self.speak, item.text)
+            except Exception as e:
+                self.log(f"TTS Error: {e}")
+            finally:
+                self.speaking = False
+                self._quiet.set()
+            if announcement and self.state != AgentState.RESPONDING:
+                # Start listening afresh after the interruption
+                self.voice.skip_to_live()
+                self._enter(self.state)
+            if not announcement and item.turn == self.turn:
+                if spoken_turn != item.turn:
+                    spoken, spoken_turn = [], item.turn
+                spoken.append(item.text)
+
+    # ----- lifecycle --------------------------------------------------------
+
+    async def run(self):
+        """
+        Run all stages until stop() is called or capture ends.
+        Can be called again after it returns, e.g. Stop then Start in the GUI.
+        """
+        self._loop = asyncio.get_running_loop()
+        # A stop() from the previous run must not end this one
+        self._stop_requested.clear()
+        self._active = asyncio.Event()
+        self._active.set()
+        self._stopped = asyncio.Event()
+        self._quiet = asyncio.Event()
+        self._quiet.set()
+        if self._stop_requested.is_set():
+            self._stopped.set()
+        self._audio: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self._utterances: asyncio.Queue = asyncio.Queue()
+        self._generations: asyncio.Queue = asyncio.Queue()
+        self._speech: asyncio.Queue = asyncio.Queue()
+        self._executors = {
+            stage: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"Gaia-{stage}")
+            for stage in ("capture", "asr", "intent", "generation", "tts")
+        }
+        if self.barge_in_enabled:
+            self._barge_in = BargeInDetector(self.voice.capture.sample_rate)
+        self._enter(self.state)
+
+        stages = [
+            asyncio.ensure_future(stage())
+            for stage in (self._capture_stage, self._asr_stage, self._intent_stage,
+                          self._generation_stage, self._tts_stage)
+        ]
+        self._ready.set()
+        try:
+            await self._stopped.wait()
+            # Let the current sentence finish
+            await self._quiet.wait()
+        finally:
+            for task in stages:
+                task.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            # Unblocks the capture worker if it's waiting for audio
+            self.voice.capture.stop()
+            for executor in self._executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._ready.clear()
@@ -2,113 +2,68 @@
 Command Parser for Gaia Agent
 Handles parsing and execution of voice commands
 """
-import re
-from datetime import datetime
-from core.automation import app_control
+from datetime import date, datetime, timedelta
+from core.agent.intent_matcher import IntentMatcher
+from core.automation.action_executor import ActionExecutor
+
+NO_HOTEL = "The hotel system isn't connected, so I can't check rooms."
 
 
 class CommandParser:
     """Parses voice commands and executes appropriate actions"""
     
-    def __init__(self):
-        """Initialize command parser - no setup needed currently"""
-        pass
+    def __init__(self, matcher: IntentMatcher = None, executor: ActionExecutor = None, hotel=None):
+        """
+        Compile the intent table once; matching is then a single pass per command.
+        Automation intents run on `executor` so slow COM and file actions don't block.
+        Room questions go to `hotel`, the caller's HotelManager; the parser never
+        opens or closes one itself.
+        """
+        self.matcher = matcher or IntentMatcher()
+        self.executor = executor or ActionExecutor()
+        self.hotel = hotel
         
     def parse_and_execute(self, command: str):
-        """Parse command and execute appropriate action"""
+        """
+        Parse command and execute appropriate action.
+        Returns the response text (or list of lines), a PendingAction for
+        automation actions that finish in the background, or None.
+        """
         command = command.lower()
+        match = self.matcher.match(command)
+        if match is None:
+            # Return None if no specific command matched
+            return None
+        return self.execute_intent(match.intent, command, match.slots)
         
-        # Time-related commands
-        time_result = self._handle_time_commands(command)
-        if time_result:
-            return time_result
-            
-        # Email/Outlook commands
-        email_result = self._handle_email_commands(command)
-        if email_result:
-            return email_result
-            
-        # Application control commands
-        app_result = self._handle_app_commands(command)
-        if app_result:
-            return app_result
-            
-        # Return None if no specific command matched
-        return None
+    def match_intent(self, command: str):
+        """
+        Work out which action a command asks for without running it.
+        Safe to call on partial transcriptions.
+        """
+        match = self.matcher.match(command.lower())
+        return match.intent if match else None
         
-    def _handle_time_commands(self, command: str):
-        """Handle time and date related commands"""
-        if "time" in command or "what time" in command or "current time" in command:
+    def execute_intent(self, intent: str, command: str, slots=None):
+        """Run the action for an intent returned by match_intent"""
+        if slots is None:
+            match = self.matcher.match(command.lower())
+            slots = match.slots if match and match.intent == intent else {}
+        if intent == "time":
             return self.get_current_time()
-        elif "date" in command or "what date" in command or "today" in command:
+        if intent == "date":
             return self.get_current_date()
-        return None
-        
-    def _handle_email_commands(self, command: str):
-        """Handle email and Outlook related commands"""
-        email_keywords = ["email", "outlook", "mail", "show me emails", "check emails"]
-        if not any(phrase in command for phrase in email_keywords):
-            return None
-            
-        if "open" in command:
-            # User wants to open Outlook application AND check emails
-            app_result = app_control.open_app("outlook.exe")
-            email_result = app_control.check_outlook_inbox()
-            if isinstance(email_result, list) and email_result:
-                return [app_result, "Here are your recent emails:"] + email_result
-            else:
-                return [app_result, "Outlook opened, but couldn't retrieve emails at this time."]
-        else:
-            # User just wants to check emails
-            return app_control.check_outlook_inbox()
-            
-    def _handle_app_commands(self, command: str):
-        """Handle general application commands"""
-        # Handle questions about available programs
-        if self._is_program_list_query(command):
+        if intent == "list_programs":
             return self._list_available_programs()
-        elif "excel" in command:
-            return app_control.create_excel("ai_created.xlsx")
-        elif "word" in command or "document" in command:
-            return app_control.create_word_doc("ai_created.docx")
-        elif "open" in command:
-            return self._handle_open_command(command)
+        if intent == "room_availability":
+            return self.check_room_availability(command)
+        if intent == "hotel_summary":
+            return self.hotel_summary()
+        if intent == "open_app":
+            return self.executor.submit(intent, slots.get("app") or "notepad.exe")
+        if intent in self.executor.registry:
+            return self.executor.submit(intent)
         return None
-    
-    def _is_program_list_query(self, command: str):
-        """Check if command is asking for list of available programs"""
-        program_queries = [
-            ("what programs" in command and "open" in command),
-            ("which programs" in command and "open" in command),
-            ("list programs" in command),
-            ("available programs" in command)
-        ]
-        return any(program_queries)
-    
-    def _handle_open_command(self, command: str):
-        """Handle 'open' commands with robust parsing"""
-        # More robust parsing - avoid questions about opening
-        if self._is_question_about_opening(command):
-            return None  # Let LLM handle questions about opening
-            
-        app_match = re.search(r"open (.+)", command)
-        if app_match:
-            app_name = app_match.group(1).strip()
-            # Filter out common question words that aren't program names
-            if self._contains_question_words(app_name):
-                return None
-            return app_control.open_app(app_name)
-        return app_control.open_app("notepad.exe")
-    
-    def _is_question_about_opening(self, command: str):
-        """Check if command is a question about opening rather than a command to open"""
-        question_indicators = ["can you", "which", "what", "?"]
-        return any(indicator in command for indicator in question_indicators)
-    
-    def _contains_question_words(self, app_name: str):
-        """Check if app name contains question words that indicate it's not a real app name"""
-        question_words = ["can", "you", "which", "what", "how", "verbally", "?"]
-        return any(word in app_name.lower() for word in question_words)
         
     def get_current_time(self):
         """Get current time in a friendly format."""
@@ -122,6 +77,32 @@ class CommandParser:
         date_str = now.strftime("%A, %B %d, %Y")
         return f"Today is {date_str}"
 
+    def hotel_summary(self):
+        """Today's occupancy, revenue and housekeeping, from the hotel's running counters"""
+        if self.hotel is None:
+            return NO_HOTEL
+        summary = self.hotel.get_hotel_summary()
+        return [f"{summary['hotel_name']}: {summary['occupied_rooms']} of {summary['total_rooms']} rooms "
+                f"occupied ({summary['occupancy_rate']}%), {summary['available_rooms']} available.",
+                f"Tonight's room revenue is ${summary['daily_revenue']:,.2f}.",
+                f"{summary['rooms_cleaning']} being cleaned, {summary['rooms_maintenance']} in maintenance."]
+
+    def check_room_availability(self, command: str, max_rooms: int = 5):
+        """Free rooms tonight (or tomorrow night), from the hotel's reservation index"""
+        if self.hotel is None:
+            return NO_HOTEL
+        tomorrow = "tomorrow" in command.lower()
+        when = "tomorrow night" if tomorrow else "tonight"
+        rooms = self.hotel.find_free_rooms(date.today() + timedelta(days=1 if tomorrow else 0))
+        if not rooms:
+            return f"Sorry, we're fully booked {when}."
+        lines = [f"We have {len(rooms)} room{'s' if len(rooms) != 1 else ''} available {when}:"]
+        lines += [f"Room {room.room_number}, {room.room_type}, ${room.rate_per_night:.0f} a night"
+                  for room in rooms[:max_rooms]]
+        if len(rooms) > max_rooms:
+            lines.append(f"and {len(rooms) - max_rooms} more.")
+        return lines
+
     def _list_available_programs(self):
         """List programs that can be opened verbally"""
         programs = [
@@ -1,17 +1,27 @@
+import asyncio
 import re
 import threading
-import time
 from datetime import datetime
-from core.ai.llm_interface import LocalLLM
+from core.ai.llm_interface import DEFAULT_KEEP_ALIVE, LocalLLM
+from core.ai.conversation import ConversationHistory, TurnStats, estimate_message_tokens, llm_summarizer
+from core.ai.response_cache import DEFAULT_CACHE_PATH as DEFAULT_RESPONSE_CACHE_PATH, ResponseCache
 from core.audio.voice_manager import VoiceManager
 from core.audio.azure_tts import AzureTTS
 from core.audio.tts_manager import TTSManager
+from core.audio.speech_pipeline import SpeechPipeline
+from core.audio.vad import VoiceActivityDetector
+from core.audio.wake_word import WakeWordDetector
 from core.utils.config_manager import ConfigManager
 from core.memory.user_memory import UserMemory
-from core.automation import app_control
+from core.automation.action_executor import ActionExecutor, ActionResult, PendingAction, default_registry
+from core.mail.index import DEFAULT_INDEX_PATH as DEFAULT_MAIL_INDEX_PATH, Inbox, MailIndex
+from core.mail.sources import create_source
+from core.hotel.hotel_manager import HotelManager
+from core.agent.agent_core import AgentState, AsyncAgentCore, Response
 from core.agent.command_parser import CommandParser
 
 WAKE_WORD = "gaia"  # Wake word
+QUICK_INTENTS = ("time", "date")  # Answered instantly, so a stable partial is enough to act on
 
 class GaiaAgent:
     """Main Gaia AI Agent with modular architecture"""
@@ -42,14 +52,72 @@ class GaiaAgent:
             # Audio components
             self.azure_tts = AzureTTS(key=azure_key, region=azure_region, voice=voice)
             self.local_tts = TTSManager()
-            self.voice = VoiceManager()
+            self.voice = VoiceManager(
+                model_size=config.get("whisper_model", "base"),
+                debug_audio_dir=config.get("debug_audio_dir")
+            )
+            self.wake_word = WakeWordDetector(
+                templates_dir=config.get("wake_word_templates", "wake_word_templates"),
+                score_threshold=config.get("wake_word_threshold", 0.5),
+                vad=VoiceActivityDetector()
+            )
+            if not self.wake_word.templates:
+                self.log("Wake word: no templates enrolled, so every voiced window goes to Whisper. "
+                         "Record some with 'python -m core.audio.wake_word --enroll 5'")
             
             # AI components
-            self.llm = LocalLLM()
+            context_tokens = config.get("llm_context_tokens", 4096)
+            self.llm = LocalLLM(
+                model=config.get("ollama_model", "llama3"),
+                num_ctx=context_tokens,
+                host=config.get("ollama_host") or None,
+                keep_alive=config.get("ollama_keep_alive", DEFAULT_KEEP_ALIVE),
+                embedding_model=config.get("llm_cache_embedding_model") or "nomic-embed-text"
+            )
+            if config.get("llm_cache_enabled", True):
+                self.llm.cache = ResponseCache(
+                    path=config.get("llm_cache_path") or DEFAULT_RESPONSE_CACHE_PATH,
+                    ttl=config.get("llm_cache_ttl", 24 * 60 * 60),
+                    max_entries=config.get("llm_cache_max_entries", 256),
+                    # The semantic tier costs an embedding call per miss, so it's opt-in
+                    embedder=self.llm.embed if config.get("llm_cache_embedding_model") else None
+                )
+            
+            # Multi-turn context sized to the model's context window
+            self.conversation = ConversationHistory(
+                max_context_tokens=context_tokens,
+                summarizer=llm_summarizer(self.llm)
+            )
             
             # Memory and parsing
             self.user_memory = UserMemory()
-            self.command_parser = CommandParser()
+            self.inbox = Inbox(
+                create_source(config.get("mail_source", "outlook"), config.get("mail_source_path") or None),
+                MailIndex(config.get("mail_index_path") or DEFAULT_MAIL_INDEX_PATH),
+                max_age=config.get("mail_sync_max_age", 60)
+            )
+            # One manager for the hotel data file; a second one would compact away this one's journal
+            self.hotel = HotelManager(data_file=config.get("hotel_data_file") or "hotel_data.json")
+            self.command_parser = CommandParser(executor=ActionExecutor(default_registry(self.inbox)),
+                                                hotel=self.hotel)
+            
+            # Event-driven voice loop
+            self._tts_interrupted = threading.Event()
+            self.core = AsyncAgentCore(
+                self.voice,
+                self.wake_word,
+                on_wake=self.on_wake,
+                respond=self.respond,
+                speak=self._say,
+                stop_speaking=self._stop_speaking,
+                log=self.log,
+                conversation_callback=lambda speaker, msg: self.conversation_callback(speaker, msg),
+                wake_phrase=WAKE_WORD,
+                conversation_timeout=config.get("conversation_timeout", 30),
+                barge_in=config.get("barge_in", True),
+                stop_when_factory=self._quick_intent_matcher,
+                on_partial=self._on_partial_transcript
+            )
             
             self.log("Components initialized successfully")
             
@@ -60,87 +128,189 @@ class GaiaAgent:
     def log(self, message):
         self.log_callback(message)
 
-    def speak(self, text):
-        """Robust TTS with Azure → Local fallback"""
+    def _say(self, text):
+        """Speak text with Azure → Local fallback; returns True if it was spoken"""
+        self._tts_interrupted.clear()
         try:
-            success = self.azure_tts.speak(text)
-            if success:
-                self.log(f"Gaia: {text}")
-                self.conversation_callback("Gaia", text)
-            else:
-                # Azure failed, try local
-                self.local_tts.speak(text)
-                self.log(f"Gaia: {text}")
-                self.conversation_callback("Gaia", text)
+            if self.azure_tts.speak(text):
+                return True
+            if self._tts_interrupted.is_set():
+                # Stopped on purpose, don't repeat it on the local voice
+                return False
+            # Azure failed, try local
+            self.local_tts.speak(text)
+            return True
         except Exception as e:
             self.log(f"Azure TTS Error: {e}")
             try:
                 self.local_tts.speak(text)
-                self.log(f"Gaia: {text}")
-                self.conversation_callback("Gaia", text)
+                return True
             except Exception as e2:
                 self.log(f"TTS Error: {e2}")
+                return False
+
+    def speak(self, text):
+        """Robust TTS with Azure → Local fallback"""
+        try:
+            if self._say(text):
+                self.log(f"Gaia: {text}")
+                self.conversation_callback("Gaia", text)
+        finally:
+            # Don't transcribe Gaia's own voice from the capture buffer
+            self.voice.skip_to_live()
+
+    def speak_stream(self, tokens):
+        """
+        Speak a streamed LLM response sentence by sentence, starting as soon
+        as the first sentence is complete. Returns the full response text.
+        """
+        pipeline = SpeechPipeline(self._say, on_sentence=lambda sentence: self.log(f"Gaia: {sentence}"))
+        try:
+            response = pipeline.speak_stream(tokens)
+        finally:
+            self.voice.skip_to_live()
+        stats = pipeline.stats
+        if stats.first_sentence is not None:
+            self.log(f"First sentence after {stats.first_sentence:.2f}s, "
+                     f"generation done after {stats.generation_done:.2f}s")
+        if response:
+            self.conversation_callback("Gaia", response)
+        return response
 
     def process_command(self, command: str):
-        """Process a voice command"""
+        """Process a command and speak the response (for text input outside the voice loop)"""
+        response = self.respond(command)
+        for text in response.speech:
+            self.speak(text)
+        if response.tokens is not None:
+            text = self.speak_stream(response.tokens)
+            if response.on_complete and text:
+                response.on_complete(text)
+
+    def respond(self, command: str) -> Response:
+        """Decide how to answer a command; runs on the agent core's intent stage"""
         try:
             self.log(f"Processing command: {command}")
             
             # Handle name input during introduction
             if self.awaiting_name:
-                self._handle_name_input(command)
-                return
+                return self._handle_name_input(command)
+            
+            if "sleep" in command:
+                self.sleep_mode = True
+                return Response(speech=["Going to sleep. Say 'Wake up, Gaia' to wake me."],
+                                next_state=AgentState.SLEEPING)
             
             # Parse and execute command
-            self._execute_parsed_command(command)
+            return self._execute_parsed_command(command)
                 
         except Exception as e:
             self.log(f"Error processing command: {e}")
-            self.speak("Sorry, I encountered an error processing your request.")
+            return Response(speech=["Sorry, I encountered an error processing your request."])
     
-    def _handle_name_input(self, command: str):
+    def on_wake(self, transcription: str) -> Response:
+        """Greet the user once the wake word is confirmed"""
+        if self.sleep_mode:
+            self.sleep_mode = False
+            return Response(speech=["I'm awake."], next_state=AgentState.WAKE)
+        
+        # Handle first-time user introduction
+        if not self.user_memory.is_user_known():
+            self.awaiting_name = True
+            return Response(speech=["Hello! Who are you?"])
+        return Response(speech=["Yes, I'm listening."])
+    
+    def _handle_name_input(self, command: str) -> Response:
         """Handle name input during user introduction"""
         name = self._extract_name(command)
         if name:
             self.user_memory.set_user_name(name)
-            self.speak(f"Nice to meet you, {name}! I'll remember you. What can I help you with?")
             self.awaiting_name = False
-        else:
-            self.speak("Sorry, I didn't catch your name. Could you tell me again?")
+            return Response(speech=[f"Nice to meet you, {name}! I'll remember you. What can I help you with?"])
+        return Response(speech=["Sorry, I didn't catch your name. Could you tell me again?"])
     
-    def _execute_parsed_command(self, command: str):
+    def _execute_parsed_command(self, command: str) -> Response:
         """Execute command using parser or LLM"""
         self.log("Parsing command with command parser...")
         result = self.command_parser.parse_and_execute(command)
         
         if result:
-            self._handle_parser_result(result)
-        else:
-            self._handle_llm_conversation(command)
+            return self._handle_parser_result(result)
+        return self._handle_llm_conversation(command)
     
-    def _handle_parser_result(self, result):
+    def _handle_parser_result(self, result) -> Response:
         """Handle result from command parser"""
         self.log(f"Command parser returned: {type(result)} - {result}")
+        if isinstance(result, PendingAction):
+            return self._handle_pending_action(result)
         if isinstance(result, list):
-            for item in result:
-                self.speak(item)
-        else:
-            self.speak(result)
+            return Response(speech=[str(item) for item in result])
+        return Response(speech=[str(result)])
     
-    def _handle_llm_conversation(self, command: str):
+    def _handle_pending_action(self, action: PendingAction) -> Response:
+        """Acknowledge a background action now and report its result when it finishes"""
+        def finished(result: ActionResult):
+            self.log(f"Action {result.name} finished in {result.seconds:.2f}s"
+                     + (" (timed out)" if result.timed_out else ""))
+            if result.error is not None:
+                self.log(f"Action {result.name} failed: {result.error}")
+            for line in result.speech():
+                self._announce(line)
+
+        action.add_done_callback(finished)
+        if action.done() or not action.acknowledgement:
+            # Quick enough that the result itself is the acknowledgement
+            return Response()
+        return Response(speech=[action.acknowledgement])
+
+    def _system_prompt(self, user_name):
+        """Persona for the LLM, personalised when we know who we're talking to"""
+        prompt = "You are Gaia, a helpful and friendly voice assistant. Keep answers brief; they are spoken aloud."
+        if user_name and user_name != "there":
+            # Encourage using the user's name
+            prompt += f" Your user is {user_name}. You can address them by name when appropriate."
+        return prompt
+
+    def _handle_llm_conversation(self, command: str) -> Response:
         """Handle general conversation using LLM"""
         self.log("No command match, using LLM for response...")
         user_name = self.user_memory.get_user_name() or "there"
         self.log(f"Debug: user_name retrieved = '{user_name}', is_user_known = {self.user_memory.is_user_known()}")
         
-        # Make the prompt more personal to encourage using the user's name
-        if user_name and user_name != "there":
-            response = self.llm.ask(f"Your user {user_name} asked: '{command}'. Please provide a helpful and friendly response. You can address them by name when appropriate.")
-        else:
-            response = self.llm.ask(f"The user asked: '{command}'. Please provide a helpful and friendly response.")
+        # Send earlier turns too so follow-up questions make sense
+        self.conversation.set_system_prompt(self._system_prompt(user_name))
+        self.conversation.add_user(command)
+        messages = self.conversation.messages()
         
+        # Sentences are spoken while the rest of the response is generated
+        return Response(tokens=self.llm.chat_stream(messages),
+                        on_complete=lambda response: self._finish_llm_turn(messages, response))
+    
+    def _finish_llm_turn(self, messages, response):
+        """Record the reply and what it cost once generation has finished"""
         self.log(f"LLM response: {response}")
-        self.speak(response)
+        
+        stats = self.llm.last_stats
+        self.conversation.record(TurnStats(
+            estimated_prompt_tokens=estimate_message_tokens(messages),
+            prompt_tokens=stats.prompt_tokens,
+            completion_tokens=stats.completion_tokens,
+            time_to_first_token=stats.time_to_first_token,
+            total_seconds=stats.total_seconds,
+            history_turns=len(messages) - 1
+        ))
+        if stats.time_to_first_token is not None:
+            self.log(f"Prompt: {stats.prompt_tokens} tokens ({len(messages)} messages), "
+                     f"first token after {stats.time_to_first_token:.2f}s")
+        
+        if response and not response.startswith("[Local LLM Error]"):
+            self.conversation.add_assistant(response)
+            if self.conversation.needs_compaction():
+                # Summarize old turns off the critical path, while we listen again
+                threading.Thread(target=self.conversation.compact, name="ConversationCompact", daemon=True).start()
+        else:
+            # Keep the history alternating: the failed question isn't part of it
+            self.conversation.discard_unanswered()
             
     def _extract_name(self, text):
         """Extract name from user input"""
@@ -162,99 +332,34 @@ class GaiaAgent:
                     return name.capitalize()
         return None
         
-    def listen_for_wake_word(self):
-        """Listen for the wake word"""
-        while self.running and not self.sleep_mode:
-            if self.paused:
-                time.sleep(0.5)
-                continue
-                
-            try:
-                # Use shorter duration for wake word to be more responsive
-                audio_file = self.voice.record_audio(duration=2)
-                transcription = self.voice.transcribe(audio_file).lower().strip()
-                
-                # Only log if something was actually heard
-                if transcription:
-                    self.log(f"Luke: {transcription}")
-                    self.conversation_callback("Luke", transcription)
-                    if WAKE_WORD in transcription:
-                        return True
-            except Exception as e:
-                self.log(f"Error in wake word detection: {e}")
-                time.sleep(1)
-                
-        return False
-        
-    def handle_sleep_mode(self):
-        """Handle sleep mode"""
-        while self.sleep_mode and self.running:
-            if self.paused:
-                time.sleep(0.5)
-                continue
-                
-            try:
-                audio_file = self.voice.record_audio(duration=3)
-                transcription = self.voice.transcribe(audio_file).lower().strip()
-                if transcription and "wake up" in transcription and WAKE_WORD in transcription:
-                    self.log(f"Luke: {transcription}")
-                    self.conversation_callback("Luke", transcription)
-                    self.speak("I'm awake.")
-                    self.sleep_mode = False
-            except Exception as e:
-                self.log(f"Error in sleep mode: {e}")
-                time.sleep(1)
-                
-    def _handle_first_time_user(self):
-        """Handle first-time user introduction"""
-        self.speak("Hello! Who are you?")
-        self.awaiting_name = True
-        
-        # Get name response
-        try:
-            # Longer duration for name input
-            audio_file = self.voice.record_audio(duration=8)
-            command = self.voice.transcribe(audio_file).strip().lower()
-            if command:
-                self.log(f"Luke: {command}")
-                self.process_command(command)
-        except Exception as e:
-            self.log(f"Error getting user name: {e}")
-            
-    def _handle_normal_command(self):
-        """Handle normal command processing"""
-        try:
-            self.log("Listening for command...")
-            # Use smart recording to capture complete sentences
-            audio_file = self.voice.record_audio_smart(max_duration=10, silence_duration=2)
-            if not audio_file:
-                self.log("Smart recording failed, falling back to regular recording")
-                audio_file = self.voice.record_audio(duration=8)
-                
-            command = self.voice.transcribe(audio_file).strip().lower()
+    def _on_partial_transcript(self, text):
+        """Show interim transcriptions while the user is still speaking"""
+        self.log(f"Luke (partial): {text}")
 
-            if not command:
-                self.log("No command received, returning to wake word detection")
-                return False
+    def _quick_intent_matcher(self):
+        """
+        Stop condition for streaming recognition: finish early once the same
+        instant-answer intent (time/date) has matched two partials in a row.
+        """
+        last_intent = []
 
-            self.log(f"Luke: {command}")
-            self.conversation_callback("Luke", command)
+        def stop_when(text):
+            intent = self.command_parser.match_intent(text)
+            matched = intent in QUICK_INTENTS and last_intent[-1:] == [intent]
+            last_intent[:] = [intent]
+            return matched
+
+        return stop_when
+
+    def _stop_speaking(self):
+        """Cut TTS off mid-sentence (barge-in); called from the agent core"""
+        self._tts_interrupted.set()
+        for tts in (self.azure_tts, self.local_tts):
+            try:
+                tts.stop()
+            except Exception as e:
+                self.log(f"Error stopping TTS: {e}")
 
-            if "sleep" in command:
-                self.speak("Going to sleep. Say 'Wake up, Gaia' to wake me.")
-                self.sleep_mode = True
-                return True
-            else:
-                self.log("Processing command...")
-                self.process_command(command)
-                self.log("Command processing complete")
-                return True
-                
-        except Exception as e:
-            self.log(f"Error handling command: {e}")
-            self.speak("Sorry, I had trouble processing that. Please try again.")
-            return False
-            
     def _greet_user(self):
         """Provide personalized greeting"""
         if self.user_memory.is_user_known():
@@ -270,126 +375,89 @@ class GaiaAgent:
             # Personalized greeting
             self._greet_user()
             
-            # Main loop
-            self._main_execution_loop()
+            # Capture, recognition, intent, generation and TTS run as concurrent stages
+            if self.running:  # stop() may have come during the greeting
+                asyncio.run(self.core.run())
                         
         except Exception as e:
             self.log(f"Error in main loop: {e}")
-    
-    def _main_execution_loop(self):
-        """Main execution loop handling different states"""
-        while self.running:
-            try:
-                if self._should_pause_or_sleep():
-                    continue
-                    
-                if self.listen_for_wake_word():
-                    self._handle_wake_word_activation()
-                    
-            except Exception as e:
-                self.log(f"Error in main loop iteration: {e}")
-                time.sleep(1)  # Brief pause before retrying
-    
-    def _should_pause_or_sleep(self):
-        """Check if agent should pause or enter sleep mode"""
-        if self.paused:
-            time.sleep(0.5)
-            return True
-            
-        if self.sleep_mode:
-            self.handle_sleep_mode()
-            return True
-            
-        return False
-    
-    def _handle_wake_word_activation(self):
-        """Handle actions after wake word is detected"""
-        # Handle first-time user introduction
-        if not self.user_memory.is_user_known():
-            self._handle_first_time_user()
-            return
-        else:
-            self.speak("Yes, I'm listening.")
-            
-        # Enter conversation mode
-        self._enter_conversation_mode()
-    
-    def _enter_conversation_mode(self):
-        """Enter conversation mode with timeout management"""
-        conversation_timeout = 30  # seconds
-        start_time = time.time()
-        
-        while self._should_continue_conversation(start_time, conversation_timeout):
-            command_received = self._handle_normal_command()
-            
-            if command_received:
-                # Reset timeout if command was received
-                start_time = time.time()
-            else:
-                # No command received, brief pause
-                time.sleep(1)
-        
-        # If we exit conversation mode due to timeout, let user know
-        if (time.time() - start_time) >= conversation_timeout:
-            self.log("Conversation timeout - returning to wake word detection")
-    
-    def _should_continue_conversation(self, start_time, timeout):
-        """Check if conversation mode should continue"""
-        return (self.running and not self.paused and not self.sleep_mode and 
-                (time.time() - start_time) < timeout)
+        finally:
+            self.running = False
 
     def start(self):
         """Start the agent"""
         self.running = True
         self.paused = False
+        # No-op if the GUI already preloaded the shared model
+        self.voice.preload()
+        if self.llm.available:
+            self.llm.warm_up()
+        # Bring the mail index up to date so "check emails" is answered locally
+        self.command_parser.executor.submit("sync_email").add_done_callback(
+            lambda result: self.log(f"Mail sync: {result.value} new messages" if result.ok
+                                    else f"Mail sync failed: {result.error or 'timed out'}"))
         self.agent_thread = threading.Thread(target=self.run, daemon=False)
         self.agent_thread.start()
 
     def stop(self):
-        """Stop the agent"""
+        """Stop the agent; start() can run it again until close()"""
         self.running = False
+        self.core.stop()
+        
+        # Wait for the agent thread to finish
+        if hasattr(self, 'agent_thread') and self.agent_thread and self.agent_thread.is_alive():
+            self.log("Waiting for agent thread to stop...")
+            self.agent_thread.join(timeout=5.0)  # Wait up to 5 seconds
+            if self.agent_thread.is_alive():
+                self.log("Warning: Agent thread did not stop gracefully")
+        
         user_name = self.user_memory.get_user_name()
         if user_name:
             self.speak(f"Goodbye, {user_name}!")
         else:
             self.speak("Shutting down. Goodbye.")
         self.log("System: Gaia stopped.")
+        if getattr(self, 'llm', None) and self.llm.cache is not None:
+            stats = self.llm.cache.get_stats()
+            self.log(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses, "
+                     f"{stats['saved_seconds']:.1f}s of generation saved")
         
-        # Clean up audio components
+        # Release the microphone; start() opens it again
         try:
             if hasattr(self, 'voice') and self.voice:
                 self.voice.cleanup()
+        except Exception as e:
+            self.log(f"Error during audio cleanup: {e}")
+
+    def close(self):
+        """Stop the agent and release everything it holds; call once, on exit"""
+        if self.running or (self.agent_thread and self.agent_thread.is_alive()):
+            self.stop()
+        self.command_parser.executor.shutdown()
+        self.inbox.index.close()
+        self.hotel.close()
+        try:
             if hasattr(self, 'local_tts') and self.local_tts:
                 self.local_tts.cleanup()
-            if hasattr(self, 'azure_tts') and self.azure_tts:
-                # Azure TTS might need cleanup too
-                pass
             self.log("Audio components cleaned up")
         except Exception as e:
             self.log(f"Error during audio cleanup: {e}")
-        
-        # Wait for the agent thread to finish
-        if hasattr(self, 'agent_thread') and self.agent_thread and self.agent_thread.is_alive():
-            self.log("Waiting for agent thread to stop...")
-            self.agent_thread.join(timeout=5.0)  # Wait up to 5 seconds
-            if self.agent_thread.is_alive():
-                self.log("Warning: Agent thread did not stop gracefully")
-        
-        time.sleep(0.5)
+
+    def _announce(self, text):
+        """Speak through the agent core when it's running so TTS isn't used from two threads"""
+        if self.running and self.core.wait_until_running(timeout=0):
+            self.core.say(text)
+        else:
+            self.speak(text)
 
     def pause(self):
         self.paused = True
+        self.core.pause()
         self.log("System: Gaia paused.")
-        self.speak("Gaia is paused.")
+        self._announce("Gaia is paused.")
 
     def resume(self):
         self.paused = False
+        self.core.resume()
         self.log("System: Gaia resumed.")
-        self.speak("Gaia is active again.")
-
-
-
-
-
-
-
+        self._announce("Gaia is active again.")
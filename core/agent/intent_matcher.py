@@ -0,0 +1,124 @@
+"""
+Intent Matcher for Gaia Agent
+Declarative intent table compiled once into a single keyword automaton.
+
+Each rule lists trigger phrases, optional phrases that must also (or must
+not) appear, a priority and an optional slot. One pass over the command
+finds every phrase from every rule; rules are then resolved from those
+matches without rescanning the text.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.utils.aho_corasick import AhoCorasick
+
+EMAIL_PHRASES = ("email", "emails", "e-mail", "mail", "mails", "outlook", "inbox")
+QUESTION_PHRASES = ("can you", "could you", "which", "what", "how", "verbally", "?")
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    """
+    One row of the intent table.
+
+    `requires`/`excludes` are extra phrases that must all / must not appear
+    anywhere in the command. `slot` names the text following the trigger
+    phrase, e.g. the program in "open notepad".
+    """
+    intent: str
+    phrases: Tuple[str, ...]
+    priority: int = 0
+    requires: Tuple[str, ...] = ()
+    excludes: Tuple[str, ...] = ()
+    slot: Optional[str] = None
+
+
+@dataclass
+class IntentMatch:
+    intent: str
+    priority: int
+    phrase: str
+    start: int
+    end: int
+    slots: Dict[str, str] = field(default_factory=dict)
+    # Other intents the command also matched, best first
+    alternatives: List[str] = field(default_factory=list)
+
+    @property
+    def ambiguous(self) -> bool:
+        return bool(self.alternatives)
+
+
+# Higher priority wins; on a tie, the longer phrase, then the earlier one.
+INTENT_TABLE: Tuple[IntentRule, ...] = (
+    IntentRule("time", ("what time", "the time", "current time", "time is it", "time now"), priority=90),
+    IntentRule("date", ("what date", "the date", "today's date", "todays date", "what day is it",
+                        "what day is today", "which day is it"), priority=90),
+    IntentRule("open_outlook", EMAIL_PHRASES, priority=80, requires=("open",)),
+    IntentRule("check_email", EMAIL_PHRASES + ("check emails", "show me emails"), priority=70),
+    IntentRule("list_programs", ("what programs", "which programs"), priority=60, requires=("open",)),
+    IntentRule("list_programs", ("list programs", "available programs", "list of programs"), priority=60),
+    IntentRule("room_availability", ("room availability", "rooms available", "available rooms",
+                                     "rooms are available", "free rooms", "rooms free", "rooms are free",
+                                     "vacancy", "vacancies"), priority=65),
+    IntentRule("hotel_summary", ("hotel summary", "daily summary", "daily hotel summary", "hotel status",
+                                 "occupancy", "how full", "today's revenue", "todays revenue"), priority=65),
+    IntentRule("create_excel", ("excel", "spreadsheet"), priority=50),
+    IntentRule("create_word", ("word document", "word doc", "word file", "open word", "new word", "document"),
+               priority=40),
+    IntentRule("open_app", ("open",), priority=10, excludes=QUESTION_PHRASES, slot="app"),
+)
+
+
+class IntentMatcher:
+    """Matches commands against an intent table in a single pass"""
+
+    def __init__(self, table: Sequence[IntentRule] = INTENT_TABLE):
+        self.table = tuple(table)
+        self._automaton: AhoCorasick = AhoCorasick(word_boundaries=True)
+        phrases = set()
+        for rule in self.table:
+            phrases.update(rule.phrases)
+            phrases.update(rule.requires)
+            phrases.update(rule.excludes)
+        for phrase in phrases:
+            self._automaton.add(phrase, phrase)
+        self._automaton.build()
+
+    def candidates(self, command: str) -> List[IntentMatch]:
+        """Every rule the command satisfies, best first (one per intent)"""
+        hits: Dict[str, List[Tuple[int, int]]] = {}
+        for match in self._automaton.iter_matches(command):
+            hits.setdefault(match.phrase, []).append((match.start, match.end))
+
+        best: Dict[str, IntentMatch] = {}
+        for rule in self.table:
+            if any(phrase not in hits for phrase in rule.requires):
+                continue
+            if any(phrase in hits for phrase in rule.excludes):
+                continue
+            found = [(phrase, span) for phrase in rule.phrases for span in hits.get(phrase, ())]
+            if not found:
+                continue
+            phrase, (start, end) = min(found, key=lambda item: (-len(item[0]), item[1][0]))
+            slots = {rule.slot: command[end:].strip(" .,!?")} if rule.slot else {}
+            candidate = IntentMatch(rule.intent, rule.priority, phrase, start, end, slots)
+            current = best.get(rule.intent)
+            if current is None or self._rank(candidate) < self._rank(current):
+                best[rule.intent] = candidate
+
+        return sorted(best.values(), key=self._rank)
+
+    @staticmethod
+    def _rank(match: IntentMatch):
+        return -match.priority, -len(match.phrase), match.start
+
+    def match(self, command: str) -> Optional[IntentMatch]:
+        """Best intent for a command, or None to leave it to the LLM"""
+        candidates = self.candidates(command)
+        if not candidates:
+            return None
+        top = candidates[0]
+        top.alternatives = [candidate.intent for candidate in candidates[1:]]
+        return top
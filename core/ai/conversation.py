@@ -0,0 +1,250 @@
+"""
+Conversation History for Gaia
+Keeps multi-turn context for the LLM within a token budget.
+
+Recent turns are sent verbatim. Once the prompt grows past a high-water mark,
+the oldest turns are folded into a running summary (or dropped if no
+summarizer is configured) until it is back under a low-water mark, so the
+summarizer runs occasionally rather than on every turn.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+# Rough English average for Llama-family tokenizers
+CHARS_PER_TOKEN = 4.0
+# Chat template overhead per message (role header and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate without loading a tokenizer"""
+    return int(len(text) / CHARS_PER_TOKEN) + 1 if text else 0
+
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimated prompt size of a chat message list"""
+    return sum(estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+@dataclass
+class Turn:
+    role: str
+    content: str
+    tokens: int = 0
+    timestamp: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.content) + MESSAGE_OVERHEAD_TOKENS
+
+    def to_message(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+
+@dataclass
+class TurnStats:
+    """What one LLM call cost"""
+    estimated_prompt_tokens: int
+    prompt_tokens: Optional[int] = None      # As reported by Ollama
+    completion_tokens: Optional[int] = None
+    time_to_first_token: Optional[float] = None
+    total_seconds: Optional[float] = None
+    history_turns: int = 0
+
+
+# summarizer(previous_summary, turns_to_fold) -> new summary
+Summarizer = Callable[[str, List[Turn]], str]
+
+
+class ConversationHistory:
+    """
+    Bounded chat history.
+
+    `max_context_tokens` should match the model's num_ctx; `reserve_tokens`
+    is left free for the response.
+    """
+
+    def __init__(self, system_prompt: str = "", max_context_tokens: int = 4096,
+                 reserve_tokens: int = 768, summarizer: Optional[Summarizer] = None,
+                 high_water: float = 0.75, low_water: float = 0.5, keep_recent: int = 4,
+                 max_summary_tokens: int = 200, idle_reset_seconds: Optional[float] = 15 * 60,
+                 stats_history: int = 100):
+        self.system_prompt = system_prompt
+        self.max_context_tokens = max_context_tokens
+        self.reserve_tokens = reserve_tokens
+        self.summarizer = summarizer
+        self.high_water = high_water
+        self.low_water = low_water
+        self.keep_recent = keep_recent
+        self.max_summary_tokens = max_summary_tokens
+        self.idle_reset_seconds = idle_reset_seconds
+
+        self.summary = ""
+        self.turns: List[Turn] = []
+        self.turn_stats: Deque[TurnStats] = deque(maxlen=stats_history)
+        self._lock = threading.RLock()
+
+    @property
+    def prompt_budget(self) -> int:
+        return self.max_context_tokens - self.reserve_tokens
+
+    def _system_tokens(self) -> int:
+        return estimate_tokens(self.system_prompt) + MESSAGE_OVERHEAD_TOKENS if self.system_prompt else 0
+
+    def _fixed_tokens(self) -> int:
+        tokens = self._system_tokens()
+        if self.summary:
+            tokens += estimate_tokens(self.summary) + 2 * MESSAGE_OVERHEAD_TOKENS
+        return tokens
+
+    def prompt_tokens(self) -> int:
+        """Estimated size of the prompt messages() would build"""
+        with self._lock:
+            return self._fixed_tokens() + sum(turn.tokens for turn in self.turns)
+
+    def set_system_prompt(self, system_prompt: str):
+        with self._lock:
+            self.system_prompt = system_prompt
+
+    def add_user(self, content: str):
+        with self._lock:
+            if (self.idle_reset_seconds and self.turns
+                    and time.time() - self.turns[-1].timestamp > self.idle_reset_seconds):
+                # A new conversation: don't drag in context from an hour ago
+                self.clear()
+            # A question that never got an answer (error, or cut off before the
+            # first word) would otherwise be sent again alongside this one
+            self.discard_unanswered()
+            self.turns.append(Turn("user", content))
+
+    def add_assistant(self, content: str):
+        with self._lock:
+            self.turns.append(Turn("assistant", content))
+
+    def discard_unanswered(self):
+        """Roll back the last question if no reply was recorded for it"""
+        with self._lock:
+            if self.turns and self.turns[-1].role == "user":
+                self.turns.pop()
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self.turns.clear()
+
+    def messages(self) -> List[Dict[str, str]]:
+        """
+        Chat messages for the next call, guaranteed to fit the prompt budget.
+        If compact() hasn't caught up, the oldest turns are left out.
+        """
+        with self._lock:
+            messages = []
+            if self.system_prompt:
+                messages.append({"role": "system", "content": self.system_prompt})
+            if self.summary:
+                messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+
+            budget = self.prompt_budget - self._fixed_tokens()
+            recent: List[Turn] = []
+            for turn in reversed(self.turns):
+                if turn.tokens > budget and recent:
+                    break
+                recent.append(turn)
+                budget -= turn.tokens
+            # Never start the history with a dangling assistant reply
+            while len(recent) > 1 and recent[-1].role == "assistant":
+                recent.pop()
+            messages.extend(turn.to_message() for turn in reversed(recent))
+            return messages
+
+    def needs_compaction(self) -> bool:
+        return self.prompt_tokens() > self.prompt_budget * self.high_water
+
+    def compact(self) -> bool:
+        """
+        Fold the oldest turns into the summary until the prompt is below the
+        low-water mark. Returns True if anything was folded or dropped.
+        Safe to run on a background thread after the response was spoken.
+        """
+        with self._lock:
+            if not self.needs_compaction():
+                return False
+            target = self.prompt_budget * self.low_water
+            folded: List[Turn] = []
+            # The new summary replaces the old one and may use its full allowance
+            total = self.prompt_tokens() - (self._fixed_tokens() - self._system_tokens())
+            if self.summarizer is not None:
+                total += self.max_summary_tokens + 2 * MESSAGE_OVERHEAD_TOKENS
+            # Fold whole exchanges, keeping the most recent ones verbatim
+            while len(self.turns) > self.keep_recent and total > target:
+                turn = self.turns.pop(0)
+                folded.append(turn)
+                total -= turn.tokens
+                if self.turns and self.turns[0].role == "assistant":
+                    reply = self.turns.pop(0)
+                    folded.append(reply)
+                    total -= reply.tokens
+            previous_summary = self.summary
+
+        if not folded:
+            return False
+        if self.summarizer is None:
+            return True
+
+        try:
+            summary = self.summarizer(previous_summary, folded).strip()
+        except Exception as e:
+            print(f"[Conversation] Summarizing failed, dropping old turns: {e}")
+            return True
+
+        max_chars = int(self.max_summary_tokens * CHARS_PER_TOKEN)
+        if len(summary) > max_chars:
+            summary = summary[-max_chars:]
+        with self._lock:
+            self.summary = summary
+        return True
+
+    def record(self, stats: TurnStats):
+        self.turn_stats.append(stats)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Averages over the recorded turns"""
+        with self._lock:
+            stats = list(self.turn_stats)
+            data = {
+                "turns": len(self.turns),
+                "prompt_tokens_estimate": self.prompt_tokens(),
+                "summary_tokens": estimate_tokens(self.summary),
+                "calls": len(stats),
+            }
+
+        def average(values):
+            values = [value for value in values if value is not None]
+            return round(sum(values) / len(values), 3) if values else None
+
+        data["avg_prompt_tokens"] = average(s.prompt_tokens for s in stats)
+        data["avg_time_to_first_token"] = average(s.time_to_first_token for s in stats)
+        data["max_prompt_tokens"] = max((s.prompt_tokens or s.estimated_prompt_tokens for s in stats), default=0)
+        return data
+
+
+def llm_summarizer(llm, max_words: int = 80) -> Summarizer:
+    """Summarizer that asks the LLM to fold old turns into the running summary"""
+    def summarize(previous_summary: str, turns: List[Turn]) -> str:
+        transcript = "\n".join(f"{turn.role}: {turn.content}" for turn in turns)
+        prompt = (
+            f"Update the summary of a conversation between a user and the assistant Gaia.\n"
+            f"Current summary: {previous_summary or '(none)'}\n"
+            f"New exchanges:\n{transcript}\n"
+            f"Reply with only the updated summary, under {max_words} words, "
+            f"keeping names, requests and facts that later questions may refer to."
+        )
+        summary = llm.chat([{"role": "user", "content": prompt}], use_cache=False)
+        if summary.startswith("[Local LLM Error]"):
+            raise RuntimeError(summary)
+        return summary
+    return summarize
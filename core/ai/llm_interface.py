@@ -1,39 +1,185 @@
-import subprocess
-import shutil
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
 import ollama
 
+from core.ai.response_cache import is_standalone
+
+# How long Ollama keeps the model loaded after a request. Voice turns are
+# often minutes apart, and the server's 5 minute default means a cold reload.
+DEFAULT_KEEP_ALIVE = "30m"
+
+
+@dataclass
+class GenerationStats:
+    """Token counts (as reported by Ollama) and timing of the last call"""
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    time_to_first_token: Optional[float] = None
+    total_seconds: Optional[float] = None
+
+
 class LocalLLM:
-    def __init__(self, model="llama3"):
+    def __init__(self, model="llama3", host=None, keep_alive=DEFAULT_KEEP_ALIVE,
+                 connect_timeout=3.0, keepalive_expiry=600.0, cache=None,
+                 embedding_model="nomic-embed-text", num_ctx=None):
         self.model = model
-        self.ollama_path = shutil.which("ollama") or r"C:\Users\infob\AppData\Local\Programs\Ollama\ollama.exe"
-        self._check_ollama()
+        # Every call must send the same options, or Ollama reloads the model
+        self.options = {"num_ctx": num_ctx} if num_ctx else None
+        self.embedding_model = embedding_model
+        self.keep_alive = keep_alive
+        # Optional ResponseCache consulted before every generation
+        self.cache = cache
+        self.last_stats = GenerationStats()
+        # One pooled HTTP session for every request. Idle connections are
+        # kept for `keepalive_expiry` seconds so the next turn skips the TCP handshake.
+        self.client = ollama.Client(
+            host=host,
+            timeout=httpx.Timeout(None, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2,
+                                keepalive_expiry=keepalive_expiry)
+        )
+        self.available = self.check_health()
 
-    def _check_ollama(self):
-        """Check if Ollama CLI is available."""
+    def check_health(self) -> bool:
+        """Check the Ollama HTTP API is reachable and the model is pulled."""
         try:
-            if not self.ollama_path or not shutil.which("ollama"):
-                # Try running with full path if not in PATH
-                result = subprocess.run([self.ollama_path, "--version"], capture_output=True, text=True)
-            else:
-                result = subprocess.run(["ollama", "--version"], capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                raise FileNotFoundError
-        except Exception:
-            print("[ERROR] Ollama is not installed or not accessible in PATH.")
-            print("Please install it from: https://ollama.ai/download")
-            print("Or add the following to your PATH:")
-            print(r"C:\Users\infob\AppData\Local\Programs\Ollama")
-            raise SystemExit
+            response = self.client.list()
+        except Exception as e:
+            print(f"[LocalLLM] Ollama server is not reachable: {e}")
+            print("Please install and start it from: https://ollama.ai/download")
+            return False
 
-    def ask(self, prompt: str) -> str:
-        """Send a query to the local LLaMA model."""
+        names = {entry.get('model') or entry.get('name') for entry in response.get('models') or []}
+        if self.model not in names and f"{self.model}:latest" not in names:
+            print(f"[LocalLLM] Model '{self.model}' is not pulled. Run: ollama pull {self.model}")
+            return False
+        return True
+
+    def warm_up(self, callback=None) -> threading.Thread:
+        """
+        Load the model into memory in the background so the first question
+        isn't a cold start. `callback(error)` is called when done.
+        """
+        def _worker():
+            try:
+                # An empty prompt loads the model without generating anything
+                self.client.generate(model=self.model, prompt="", keep_alive=self.keep_alive,
+                                     options=self.options)
+            except Exception as e:
+                print(f"[LocalLLM] Warm-up failed: {e}")
+                if callback:
+                    callback(e)
+                return
+            if callback:
+                callback(None)
+
+        thread = threading.Thread(target=_worker, name="LLMWarmUp", daemon=True)
+        thread.start()
+        return thread
+
+    def _cache_key(self, messages, use_cache):
+        """
+        (question, persona) to cache the reply under, or None.
+        The first question of a conversation is always cacheable; later ones
+        only if they stand on their own (see response_cache.is_standalone).
+        """
+        if not use_cache or self.cache is None or not messages or messages[-1]['role'] != 'user':
+            return None
+        question = messages[-1]['content']
+        follow_up = any(message['role'] == 'assistant' for message in messages)
+        if follow_up and not is_standalone(question):
+            return None
+        # The persona changes the answer; a conversation summary doesn't matter to a standalone question
+        persona = messages[0]['content'] if messages[0]['role'] == 'system' else ""
+        return question, persona
+
+    def _record_stats(self, started, first_token_at, final_chunk):
+        self.last_stats = GenerationStats(
+            prompt_tokens=final_chunk.get('prompt_eval_count') if final_chunk else None,
+            completion_tokens=final_chunk.get('eval_count') if final_chunk else None,
+            time_to_first_token=first_token_at - started if first_token_at else None,
+            total_seconds=time.perf_counter() - started
+        )
+
+    def chat(self, messages, use_cache=True) -> str:
+        """Send a list of chat messages and return the reply."""
+        self.last_stats = GenerationStats()
+        key = self._cache_key(messages, use_cache)
+        if key is not None:
+            cached = self.cache.get(key[0], context=key[1])
+            if cached is not None:
+                return cached
         try:
-            response = ollama.chat(
+            started = time.perf_counter()
+            response = self.client.chat(
                 model=self.model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=messages,
+                options=self.options,
+                keep_alive=self.keep_alive
             )
-            return response['message']['content']
+            content = response['message']['content']
         except Exception as e:
             return f"[Local LLM Error] {e}"
+        self._record_stats(started, None, response)
+        if key is not None:
+            self.cache.put(key[0], content, self.last_stats.total_seconds, context=key[1])
+        return content
+
+    def chat_stream(self, messages, use_cache=True):
+        """Send a list of chat messages and yield the reply as it is generated."""
+        self.last_stats = GenerationStats()
+        key = self._cache_key(messages, use_cache)
+        if key is not None:
+            cached = self.cache.get(key[0], context=key[1])
+            if cached is not None:
+                yield cached
+                return
+        parts = []
+        first_token_at = None
+        final_chunk = None
+        try:
+            started = time.perf_counter()
+            stream = self.client.chat(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                options=self.options,
+                keep_alive=self.keep_alive
+            )
+            for chunk in stream:
+                content = chunk['message']['content']
+                if chunk.get('done'):
+                    final_chunk = chunk
+                if content:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(content)
+                    yield content
+        except Exception as e:
+            yield f"[Local LLM Error] {e}"
+            return
+        self._record_stats(started, first_token_at, final_chunk)
+        # Only complete responses are cached; an abandoned stream never gets here
+        if key is not None:
+            self.cache.put(key[0], "".join(parts), self.last_stats.total_seconds, context=key[1])
+
+    def ask(self, prompt: str) -> str:
+        """Send a query to the local LLaMA model."""
+        return self.chat([{"role": "user", "content": prompt}])
+
+    def ask_stream(self, prompt: str):
+        """Send a query and yield the response text as it is generated."""
+        return self.chat_stream([{"role": "user", "content": prompt}])
+
+    def embed(self, text: str):
+        """Embedding vector for `text` (needs an embedding model, e.g. nomic-embed-text)."""
+        response = self.client.embed(model=self.embedding_model, input=text, keep_alive=self.keep_alive)
+        return response['embeddings'][0]
 
+    def close(self):
+        """Close the pooled HTTP connections."""
+        self.client.close()
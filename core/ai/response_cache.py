@@ -0,0 +1,327 @@
+"""
+LLM Response Cache for Gaia
+Answers repeated questions without running the model again.
+
+Lookups try three tiers in order:
+  1. exact      - the same prompt text
+  2. normalized - same words ignoring case, punctuation and filler
+  3. semantic   - optional; embedding cosine similarity above a threshold
+
+Entries are keyed on the user's question. An optional `context` string,
+e.g. the system prompt, is hashed into a separate key dimension, so the
+same question asked of a different persona is a different entry and the
+shared prefix never dilutes the semantic match.
+
+Entries expire after a TTL, the least recently used are evicted beyond the
+entry/byte bounds, and the cache is persisted to disk across restarts.
+Prompts about the current time, date or live status are never cached.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "gaia" / "llm_responses.json"
+
+# Answers to these change from one minute to the next
+TIME_SENSITIVE_PATTERNS = [
+    r"\b(time|date|day|today|tonight|tomorrow|yesterday|now|currently|current|right now)\b",
+    r"\b(this|next|last) (week|weekend|month|year|morning|afternoon|evening)\b",
+    r"\b(latest|recent|news|weather|forecast)\b",
+    r"\b(available|availability|vacant|occupied|checked in|checked out|arrivals?|departures?)\b",
+    r"\b(inbox|unread|new emails?)\b",
+]
+
+FILLER_WORDS = {"please", "hey", "hi", "hello", "gaia", "um", "uh", "er"}
+
+# Questions that lean on what was said before ("what about the pool?",
+# "why is that?") can't be answered from the cache mid-conversation
+FOLLOW_UP_PATTERNS = [
+    r"\b(it|its|it's|that|this|these|those|they|them|their|he|him|his|she|her|one|ones)\b",
+    r"\b(more|else|again|also|too|another|other|same|instead|then|why)\b",
+    r"\b(earlier|before|previous|above|you said|what about|how about)\b",
+    r"^(and|but|so|or|ok|okay)\b",
+]
+_FOLLOW_UP = re.compile("|".join(FOLLOW_UP_PATTERNS), re.IGNORECASE)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, drop punctuation and filler words, collapse whitespace"""
+    words = re.findall(r"[a-z0-9']+", prompt.lower())
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+def is_standalone(question: str) -> bool:
+    """
+    True if a question means the same without the conversation before it,
+    so a cached answer is safe mid-conversation. Deliberately conservative:
+    a missed hit costs one generation, a wrong hit answers the wrong question.
+    """
+    return len(normalize_prompt(question).split()) >= 3 and not _FOLLOW_UP.search(question)
+
+
+def context_id(context: str) -> str:
+    """Short stable hash of a context string ('' for none)"""
+    return hashlib.sha1(context.encode('utf-8')).hexdigest()[:12] if context else ""
+
+
+def _key(prompt: str, context: str) -> str:
+    normalized = normalize_prompt(prompt)
+    return f"{context}\n{normalized}" if context else normalized
+
+
+@dataclass
+class CacheEntry:
+    prompt: str
+    response: str
+    created_at: float = field(default_factory=time.time)
+    expires_at: Optional[float] = None
+    generation_seconds: float = 0.0
+    hits: int = 0
+    embedding: Optional[List[float]] = None
+    context: str = ""  # context_id() of the system prompt it was answered under
+
+    @property
+    def key(self) -> str:
+        return _key(self.prompt, self.context)
+
+    @property
+    def size(self) -> int:
+        return len(self.prompt.encode('utf-8')) + len(self.response.encode('utf-8'))
+
+    def expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+
+@dataclass
+class CacheStats:
+    hits_exact: int = 0
+    hits_normalized: int = 0
+    hits_semantic: int = 0
+    misses: int = 0
+    uncacheable: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hits(self) -> int:
+        return self.hits_exact + self.hits_normalized + self.hits_semantic
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self):
+        data = asdict(self)
+        data.update(hits=self.hits, hit_rate=round(self.hit_rate, 3),
+                    saved_seconds=round(self.saved_seconds, 3))
+        return data
+
+
+class ResponseCache:
+    """
+    Thread-safe prompt -> response cache.
+
+    `embedder(text) -> vector` enables the semantic tier; leave it None to
+    match on exact and normalized text only.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: Optional[float] = 24 * 60 * 60,
+                 max_entries: int = 256, max_bytes: int = 2 * 1024 * 1024,
+                 embedder: Optional[Callable[[str], Iterable[float]]] = None,
+                 similarity_threshold: float = 0.92,
+                 time_sensitive_patterns: Optional[List[str]] = None):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        patterns = TIME_SENSITIVE_PATTERNS if time_sensitive_patterns is None else time_sensitive_patterns
+        self._time_sensitive = re.compile("|".join(patterns), re.IGNORECASE) if patterns else None
+
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._pending_embedding = None
+        self._lock = threading.RLock()
+        if self.path:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_cacheable(self, prompt: str) -> bool:
+        """False for prompts whose answer depends on when they are asked"""
+        return not (self._time_sensitive and self._time_sensitive.search(prompt))
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self.embedder is None:
+            return None
+        try:
+            vector = np.asarray(self.embedder(text), dtype=np.float32)
+        except Exception as e:
+            print(f"[ResponseCache] Embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _semantic_match(self, vector: np.ndarray, context: str) -> Optional[str]:
+        keys = [key for key, entry in self._entries.items()
+                if entry.embedding is not None and entry.context == context]
+        if not keys:
+            return None
+        matrix = np.array([self._entries[key].embedding for key in keys], dtype=np.float32)
+        if matrix.shape[1] != vector.shape[0]:
+            return None
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        return keys[best] if similarities[best] >= self.similarity_threshold else None
+
+    def get(self, prompt: str, context: str = "") -> Optional[str]:
+        """Cached response for `prompt` asked under `context`, or None on a miss"""
+        if not self.is_cacheable(prompt):
+            self.stats.uncacheable += 1
+            return None
+
+        started = time.perf_counter()
+        context = context_id(context)
+        key = _key(prompt, context)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expired(now):
+                self._remove(key)
+                self.stats.expirations += 1
+                entry = None
+
+            tier = None
+            if entry is not None:
+                tier = "exact" if entry.prompt == prompt else "normalized"
+            else:
+                vector = self._embed(prompt)
+                # Keep it so the put() after this miss doesn't embed again
+                self._pending_embedding = (prompt, vector)
+                match = self._semantic_match(vector, context) if vector is not None else None
+                if match is not None:
+                    if self._entries[match].expired(now):
+                        self._remove(match)
+                        self.stats.expirations += 1
+                    else:
+                        key, entry, tier = match, self._entries[match], "semantic"
+
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            setattr(self.stats, f"hits_{tier}", getattr(self.stats, f"hits_{tier}") + 1)
+            self.stats.saved_seconds += max(0.0, entry.generation_seconds - (time.perf_counter() - started))
+            return entry.response
+
+    def put(self, prompt: str, response: str, generation_seconds: float = 0.0,
+            ttl: Optional[float] = None, context: str = ""):
+        """Store a response; `ttl` overrides the cache default for this entry"""
+        if not response or not self.is_cacheable(prompt):
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            vector = None
+            if self.embedder is not None:
+                pending = self._pending_embedding
+                vector = pending[1] if pending and pending[0] == prompt else self._embed(prompt)
+            self._pending_embedding = None
+
+            entry = CacheEntry(
+                prompt=prompt,
+                response=response,
+                expires_at=time.time() + ttl if ttl else None,
+                generation_seconds=generation_seconds,
+                embedding=vector.tolist() if vector is not None else None,
+                context=context_id(context)
+            )
+            key = entry.key
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+        self.save()
+
+    def _evict(self):
+        now = time.time()
+        for key in [key for key, entry in self._entries.items() if entry.expired(now)]:
+            self._remove(key)
+            self.stats.expirations += 1
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self.save()
+
+    def load(self):
+        """Read persisted entries, skipping any that expired while we were off"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[ResponseCache] Ignoring unreadable cache {self.path}: {e}")
+            return
+
+        with self._lock:
+            for item in data.get("entries", []):
+                try:
+                    entry = CacheEntry(**item)
+                except TypeError:
+                    continue
+                key = entry.key
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = entry
+                self._bytes += entry.size
+            self._evict()
+
+    def save(self):
+        """Write entries in LRU order with an atomic replace"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {"entries": [asdict(entry) for entry in self._entries.values()]}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[ResponseCache] Could not write cache: {e}")
+
+    def get_stats(self) -> Dict[str, float]:
+        """Hit/miss counters, saved latency and current size"""
+        with self._lock:
+            data = self.stats.to_dict()
+            data.update(entries=len(self._entries), bytes=self._bytes)
+        return data
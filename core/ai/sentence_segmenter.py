@@ -0,0 +1,82 @@
+"""
+Sentence Segmenter for Gaia
+Groups streamed LLM tokens into sentences that can be spoken one at a time
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+# Words whose trailing period doesn't end a sentence
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc",
+    "e.g", "i.e", "a.m", "p.m", "approx", "no", "fig", "inc", "ltd", "co",
+}
+
+# Sentence end: terminal punctuation plus any closing quotes/brackets, then whitespace
+_BOUNDARY = re.compile(r'[.!?…]+["\'”’)\]]*(?=\s)|\n\s*\n|\n(?=\s*(?:[-*•]|\d+[.)])\s)')
+_MARKDOWN = re.compile(r'(\*\*|__|`+|^#+\s*|^\s*[-*•]\s+)', re.MULTILINE)
+
+
+def clean_for_speech(text: str) -> str:
+    """Strip markdown the LLM likes to emit so TTS doesn't read it out"""
+    text = _MARKDOWN.sub("", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence splitter.
+
+    `feed` takes text as it streams in and returns any sentences it completed;
+    `flush` returns whatever is left once the stream ends. Sentences shorter
+    than `min_chars` are held back and joined with the next one so TTS isn't
+    started for fragments like "Sure."
+    """
+
+    def __init__(self, min_chars: int = 12):
+        self.min_chars = min_chars
+        self._buffer = ""
+        self._scan_from = 0
+
+    def _is_abbreviation(self, end: int) -> bool:
+        match = re.search(r"([\w.]+)\.$", self._buffer[:end])
+        if not match:
+            return False
+        word = match.group(1).lower()
+        # Single capital letters are initials ("J. R. R. Tolkien")
+        return word in ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the sentences it completed"""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer, self._scan_from):
+            end = match.end()
+            if match.group().startswith(".") and self._is_abbreviation(match.start() + 1):
+                continue
+            sentence = clean_for_speech(self._buffer[start:end])
+            if len(sentence) < self.min_chars:
+                continue
+            sentences.append(sentence)
+            start = end
+
+        self._buffer = self._buffer[start:]
+        # The boundary pattern needs the following whitespace, so re-check the tail next time
+        self._scan_from = max(0, len(self._buffer) - 4)
+        return sentences
+
+    def flush(self) -> str:
+        """Return the unfinished remainder and reset"""
+        remainder = clean_for_speech(self._buffer)
+        self._buffer = ""
+        self._scan_from = 0
+        return remainder
+
+    def segment(self, tokens: Iterable[str]) -> Iterator[str]:
+        """Turn a token stream into a sentence stream"""
+        for token in tokens:
+            yield from self.feed(token)
+        remainder = self.flush()
+        if remainder:
+            yield remainder
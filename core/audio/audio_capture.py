@@ -0,0 +1,319 @@
+"""
+Audio Capture for Gaia
+Long-lived microphone capture feeding a fixed-size ring buffer of int16 samples
+"""
+
+import threading
+import time
+import wave
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring buffer of int16 samples.
+
+    Positions are absolute sample counts since the buffer was created, so a
+    reader can keep a cursor and pick up exactly where it left off.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self._written = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def position(self) -> int:
+        """Absolute position just past the newest sample"""
+        with self._condition:
+            return self._written
+
+    @property
+    def oldest_position(self) -> int:
+        """Absolute position of the oldest sample still held"""
+        with self._condition:
+            return max(0, self._written - self.capacity)
+
+    @property
+    def closed(self) -> bool:
+        with self._condition:
+            return self._closed
+
+    def write(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest ones when full"""
+        samples = np.asarray(samples, dtype=np.int16).ravel()
+        if samples.size == 0:
+            return
+        skipped = max(0, samples.size - self.capacity)
+        if skipped:
+            samples = samples[skipped:]
+
+        with self._condition:
+            self._written += skipped
+            start = self._written % self.capacity
+            end = start + samples.size
+            if end <= self.capacity:
+                self._buffer[start:end] = samples
+            else:
+                split = self.capacity - start
+                self._buffer[start:] = samples[:split]
+                self._buffer[:end - self.capacity] = samples[split:]
+            self._written += samples.size
+            self._condition.notify_all()
+
+    def read(self, start: int, count: int) -> np.ndarray:
+        """Copy `count` samples beginning at absolute position `start`"""
+        with self._condition:
+            return self._read_locked(start, count)
+
+    def _read_locked(self, start: int, count: int) -> np.ndarray:
+        oldest = max(0, self._written - self.capacity)
+        start = max(start, oldest)
+        count = max(0, min(count, self._written - start))
+        if count == 0:
+            return np.zeros(0, dtype=np.int16)
+
+        begin = start % self.capacity
+        end = begin + count
+        if end <= self.capacity:
+            return self._buffer[begin:end].copy()
+        return np.concatenate((self._buffer[begin:], self._buffer[:end - self.capacity]))
+
+    def latest(self, count: int) -> np.ndarray:
+        """Copy the newest `count` samples"""
+        with self._condition:
+            return self._read_locked(self._written - count, count)
+
+    def wait_for(self, position: int, timeout: Optional[float] = None) -> bool:
+        """Block until `position` samples have been written or the buffer is closed"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._written >= position or self._closed, timeout=timeout
+            ) and self._written >= position
+
+    def close(self):
+        """Wake up any waiting readers; no more samples will arrive"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class CaptureBackend:
+    """Source of raw int16 mono audio for AudioCapture"""
+
+    sample_rate = 16000
+
+    def open(self):
+        """Prepare the device or file for reading"""
+
+    def read(self, frames: int) -> Optional[np.ndarray]:
+        """Return up to `frames` int16 samples, or None when the source is exhausted"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the device or file"""
+
+
+class PyAudioCaptureBackend(CaptureBackend):
+    """Microphone capture through PyAudio, opened once and kept open"""
+
+    def __init__(self, sample_rate: int = 16000, chunk_size: int = 1024,
+                 input_device_index: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.input_device_index = input_device_index
+        self._pyaudio = None
+        self._stream = None
+
+    def open(self):
+        import pyaudio
+
+        self._pyaudio = pyaudio.PyAudio()
+        if self.input_device_index is None:
+            self.input_device_index = self._find_input_device()
+
+        self._stream = self._pyaudio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.input_device_index,
+            frames_per_buffer=self.chunk_size
+        )
+
+    def _find_input_device(self) -> Optional[int]:
+        """Find the first device with input channels"""
+        for i in range(self._pyaudio.get_device_count()):
+            info = self._pyaudio.get_device_info_by_index(i)
+            max_inputs = info.get('maxInputChannels', 0)
+            if isinstance(max_inputs, (int, float)) and max_inputs > 0:
+                return i
+        return None
+
+    def read(self, frames: int) -> Optional[np.ndarray]:
+        data = self._stream.read(frames, exception_on_overflow=False)
+        return np.frombuffer(data, dtype=np.int16)
+
+    def close(self):
+        try:
+            if self._stream:
+                self._stream.stop_stream()
+                self._stream.close()
+        finally:
+            self._stream = None
+            if self._pyaudio:
+                self._pyaudio.terminate()
+                self._pyaudio = None
+
+
+class WavFileCaptureBackend(CaptureBackend):
+    """
+    Feeds a 16-bit mono WAV file as if it were a microphone.
+    Used by tests and for replaying recorded sessions.
+    """
+
+    def __init__(self, path: str, realtime: bool = False, loop: bool = False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self._wave = None
+
+    def open(self):
+        self._wave = wave.open(self.path, 'rb')
+        if self._wave.getsampwidth() != 2 or self._wave.getnchannels() != 1:
+            self._wave.close()
+            self._wave = None
+            raise ValueError(f"{self.path}: expected 16-bit mono WAV")
+        self.sample_rate = self._wave.getframerate()
+
+    def read(self, frames: int) -> Optional[np.ndarray]:
+        data = self._wave.readframes(frames)
+        if not data and self.loop:
+            self._wave.rewind()
+            data = self._wave.readframes(frames)
+        if not data:
+            return None
+
+        samples = np.frombuffer(data, dtype=np.int16)
+        if self.realtime:
+            time.sleep(samples.size / self.sample_rate)
+        return samples
+
+    def close(self):
+        if self._wave:
+            self._wave.close()
+            self._wave = None
+
+
+class AudioCapture:
+    """
+    Long-lived capture thread that keeps a ring buffer filled.
+
+    Readers hold a cursor into the buffer, so consecutive reads are
+    contiguous and nothing is lost between them.
+    """
+
+    def __init__(self, backend: Optional[CaptureBackend] = None, chunk_size: int = 1024,
+                 buffer_seconds: float = 30.0):
+        self.backend = backend or PyAudioCaptureBackend(chunk_size=chunk_size)
+        self.chunk_size = chunk_size
+        self.buffer_seconds = buffer_seconds
+        self.ring: Optional[AudioRingBuffer] = None
+        self._cursor = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def sample_rate(self) -> int:
+        return self.backend.sample_rate
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Open the backend and start filling the ring buffer"""
+        with self._lock:
+            if self.is_running:
+                return
+            self.backend.open()
+            self.ring = AudioRingBuffer(int(self.sample_rate * self.buffer_seconds))
+            self._cursor = 0
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._capture_loop, name="AudioCapture", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop capturing and release the backend"""
+        with self._lock:
+            self._stop_event.set()
+            if self._thread and self._thread is not threading.current_thread():
+                self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _capture_loop(self):
+        try:
+            while not self._stop_event.is_set():
+                samples = self.backend.read(self.chunk_size)
+                if samples is None:
+                    break
+                self.ring.write(samples)
+        except Exception as e:
+            print(f"[AudioCapture] Capture error: {e}")
+        finally:
+            self.ring.close()
+            try:
+                self.backend.close()
+            except Exception as e:
+                print(f"[AudioCapture] Error closing backend: {e}")
+
+    def skip_to_live(self):
+        """Move the read cursor to the newest sample, discarding pending audio"""
+        if self.ring is not None:
+            self._cursor = self.ring.position
+
+    def preceding(self, duration: float) -> np.ndarray:
+        """Audio just before the read cursor, e.g. to estimate background noise"""
+        if self.ring is None:
+            return np.zeros(0, dtype=np.int16)
+        count = int(duration * self.sample_rate)
+        return self.ring.read(self._cursor - count, min(count, self._cursor))
+
+    def read(self, duration: float, timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Return the next `duration` seconds after the read cursor.
+        Blocks until that much audio has been captured or capture ends.
+        """
+        count = int(duration * self.sample_rate)
+        return self.read_samples(count, timeout=timeout)
+
+    def read_samples(self, count: int, timeout: Optional[float] = None) -> np.ndarray:
+        """Return the next `count` samples after the read cursor"""
+        if not self.is_running and self.ring is None:
+            self.start()
+
+        oldest = self.ring.oldest_position
+        if self._cursor < oldest:
+            print(f"[AudioCapture] Reader fell behind, skipped {oldest - self._cursor} samples")
+            self._cursor = oldest
+
+        self.ring.wait_for(self._cursor + count, timeout=timeout)
+        samples = self.ring.read(self._cursor, count)
+        self._cursor += samples.size
+        return samples
+
+    def chunks(self, chunk_size: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Yield consecutive chunks from the read cursor until capture ends"""
+        chunk_size = chunk_size or self.chunk_size
+        while True:
+            samples = self.read_samples(chunk_size)
+            if samples.size == 0:
+                return
+            yield samples
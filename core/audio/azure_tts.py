@@ -34,3 +34,9 @@ class AzureTTS:
             print(f"[AzureTTS] Exception during speech synthesis: {e}")
             return False
 
+    def stop(self):
+        """Interrupt speech in progress (safe to call from another thread)."""
+        try:
+            self.synthesizer.stop_speaking_async().get()
+        except Exception as e:
+            print(f"[AzureTTS] Error stopping speech: {e}")
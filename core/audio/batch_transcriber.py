@@ -0,0 +1,288 @@
+"""
+Batch Transcription for Gaia
+Transcribes archives of recorded audio offline with a pool of Whisper workers.
+
+Results are appended to a JSONL file as each recording finishes, so an
+interrupted run can be restarted with the same output file and carries on
+where it stopped.
+
+Usage:
+    python -m core.audio.batch_transcriber voice_notes/ -o transcripts.jsonl
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from core.audio.device_probe import get_device_capabilities
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm", ".aac", ".wma"}
+
+
+def _load_batch_model(model_size: str, device: str, compute_type: str, workers: int, cpu_threads: int):
+    """
+    One WhisperModel with `workers` decoding slots. CTranslate2 releases the
+    GIL while decoding, so a thread per slot keeps every slot busy.
+    """
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(model_size, device=device, compute_type=compute_type,
+                        num_workers=workers, cpu_threads=cpu_threads)
+
+
+def find_audio_files(sources: Iterable) -> List[Path]:
+    """Expand directories (recursively) and list files into audio file paths"""
+    files = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*")
+                                if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS))
+        elif path.is_file():
+            files.append(path)
+        else:
+            print(f"[BatchTranscriber] Skipping missing path: {path}")
+
+    unique, seen = [], set()
+    for path in files:
+        key = str(path.resolve())
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def _file_key(path: Path) -> Dict[str, Any]:
+    stat = path.stat()
+    return {"path": str(path.resolve()), "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def load_completed(output_path) -> Dict[str, Dict[str, Any]]:
+    """
+    Successful records already in the output file, keyed by resolved path.
+    A truncated last line from an interrupted run is ignored.
+    """
+    completed = {}
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and "error" not in record and "path" in record:
+                    completed[record["path"]] = record
+    except FileNotFoundError:
+        pass
+    return completed
+
+
+@dataclass
+class BatchReport:
+    """Totals for one batch run"""
+    files: int = 0
+    transcribed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    audio_seconds: float = 0.0
+    processing_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    interrupted: bool = False
+
+    @property
+    def rtf(self) -> float:
+        """Aggregate real-time factor: decode time per second of audio (lower is faster)"""
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    @property
+    def speedup(self) -> float:
+        """Seconds of audio transcribed per wall-clock second across all workers"""
+        return self.audio_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self):
+        return {
+            "files": self.files,
+            "transcribed": self.transcribed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "processing_seconds": round(self.processing_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "rtf": round(self.rtf, 4),
+            "speedup": round(self.speedup, 2),
+            "interrupted": self.interrupted,
+        }
+
+
+class BatchTranscriber:
+    """
+    Transcribes many recordings in parallel and writes one JSON line per file.
+
+    `workers` defaults to the number of CPU cores (one per GPU on CUDA);
+    each worker gets an equal share of the CPU threads.
+    """
+
+    def __init__(self, model_size: str = "base", workers: Optional[int] = None,
+                 device: Optional[str] = None, compute_type: Optional[str] = None,
+                 loader: Optional[Callable[..., Any]] = None, **transcribe_options):
+        if device is None:
+            capabilities = get_device_capabilities()
+            device = capabilities.device
+            compute_type = compute_type or capabilities.compute_type
+            gpu_count = capabilities.cuda_device_count
+        else:
+            gpu_count = 1
+        cores = os.cpu_count() or 1
+
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type or ("float16" if device == "cuda" else "int8")
+        self.workers = max(1, workers or (max(1, gpu_count) if device == "cuda" else cores))
+        self.cpu_threads = max(1, cores // self.workers)
+        self.transcribe_options = transcribe_options
+        self._loader = loader or _load_batch_model
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            print(f"[BatchTranscriber] Loading Whisper '{self.model_size}' on {self.device.upper()} "
+                  f"({self.compute_type}, {self.workers} workers x {self.cpu_threads} threads)...")
+            self._model = self._loader(self.model_size, self.device, self.compute_type,
+                                       self.workers, self.cpu_threads)
+        return self._model
+
+    def transcribe_file(self, path) -> Dict[str, Any]:
+        """Transcribe one recording into a result record"""
+        path = Path(path)
+        record = _file_key(path)
+        started = time.perf_counter()
+        try:
+            segments, info = self.model.transcribe(str(path), **self.transcribe_options)
+            # Segments are generated lazily; consuming them is where decoding happens
+            segments = [
+                {"start": round(segment.start, 3), "end": round(segment.end, 3), "text": segment.text.strip()}
+                for segment in segments
+            ]
+        except Exception as e:
+            record["error"] = str(e)
+            record["processing_seconds"] = round(time.perf_counter() - started, 3)
+            return record
+
+        processing = time.perf_counter() - started
+        duration = getattr(info, "duration", None) or (segments[-1]["end"] if segments else 0.0)
+        record.update({
+            "language": getattr(info, "language", None),
+            "duration": round(duration, 3),
+            "processing_seconds": round(processing, 3),
+            "rtf": round(processing / duration, 4) if duration else None,
+            "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+            "segments": segments,
+        })
+        return record
+
+    def run(self, sources: Iterable, output_path, resume: bool = True,
+            progress: Optional[Callable[[Dict[str, Any], BatchReport], None]] = None) -> BatchReport:
+        """
+        Transcribe every audio file under `sources` into `output_path` (JSONL).
+        With `resume`, files already transcribed in the output are skipped
+        unless they have changed since.
+        """
+        files = find_audio_files(sources)
+        completed = load_completed(output_path) if resume else {}
+        report = BatchReport(files=len(files))
+
+        pending = []
+        for path in files:
+            key = _file_key(path)
+            done = completed.get(key["path"])
+            if done and done.get("size") == key["size"] and done.get("mtime") == key["mtime"]:
+                report.skipped += 1
+            else:
+                pending.append(path)
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        if pending:
+            self.model  # Load once up front rather than racing in the workers
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Transcribe")
+        try:
+            with open(output_path, 'a' if resume else 'w', encoding='utf-8') as out:
+                futures = [executor.submit(self.transcribe_file, path) for path in pending]
+                for future in as_completed(futures):
+                    record = future.result()
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+
+                    if "error" in record:
+                        report.failed += 1
+                    else:
+                        report.transcribed += 1
+                        report.audio_seconds += record["duration"]
+                        report.processing_seconds += record["processing_seconds"]
+                    if progress:
+                        progress(record, report)
+        except KeyboardInterrupt:
+            report.interrupted = True
+            executor.shutdown(wait=False, cancel_futures=True)
+        finally:
+            executor.shutdown(wait=True)
+            report.wall_seconds = time.perf_counter() - started
+        return report
+
+
+def _print_progress(record, report):
+    done = report.transcribed + report.failed + report.skipped
+    name = Path(record["path"]).name
+    if "error" in record:
+        print(f"  [{done}/{report.files}] ❌ {name}: {record['error']}")
+    else:
+        rtf = f"{record['rtf']:.3f}" if record["rtf"] is not None else "n/a"
+        print(f"  [{done}/{report.files}] ✅ {name} ({record['duration']:.1f}s audio, RTF {rtf})")
+
+
+def main(argv=None):
+    """Transcribe a directory or list of recordings to JSONL"""
+    parser = argparse.ArgumentParser(description="Batch-transcribe recorded audio with Whisper")
+    parser.add_argument("sources", nargs="*", help="Audio files or directories (searched recursively)")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl", help="JSONL file to write results to")
+    parser.add_argument("--file-list", help="Text file with one audio path per line")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--workers", type=int, help="Parallel decoders (default: one per CPU core)")
+    parser.add_argument("--device", help="Force 'cpu' or 'cuda' instead of probing")
+    parser.add_argument("--compute-type", help="CTranslate2 compute type, e.g. int8 or float16")
+    parser.add_argument("--language", help="Skip language detection and use this language code")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming")
+    args = parser.parse_args(argv)
+
+    sources = list(args.sources)
+    if args.file_list:
+        with open(args.file_list, 'r', encoding='utf-8') as f:
+            sources.extend(line.strip() for line in f if line.strip())
+    if not sources:
+        parser.error("give at least one audio file, directory or --file-list")
+
+    options = {"language": args.language} if args.language else {}
+    transcriber = BatchTranscriber(args.model, workers=args.workers, device=args.device,
+                                   compute_type=args.compute_type, **options)
+    report = transcriber.run(sources, args.output, resume=not args.no_resume, progress=_print_progress)
+
+    print("\n📝 BATCH TRANSCRIPTION")
+    print("=" * 40)
+    for key, value in report.to_dict().items():
+        print(f"  {key}: {value}")
+    if report.interrupted:
+        print("⚠️ Interrupted - run the same command again to resume")
+        return 130
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+"""
+Device Capability Probe for Gaia
+Decides which device and compute type Whisper should use.
+
+Probing is done in-process (CTranslate2, then PyTorch) and only falls back
+to running nvidia-smi when neither library can answer. The result is cached
+on disk with a TTL so repeat launches skip probing entirely.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "gaia" / "device_probe.json"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# A probe returns (cuda_device_count, supported_cuda_compute_types) or None if it can't tell
+Probe = Callable[[], Optional[Tuple[int, List[str]]]]
+
+
+@dataclass
+class DeviceCapabilities:
+    """Result of the device probe"""
+    device: str
+    compute_type: str
+    cuda_device_count: int = 0
+    source: str = "none"
+    probed_at: float = field(default_factory=time.time)
+    cuda_visible_devices: Optional[str] = None
+    from_cache: bool = False
+
+    def to_dict(self):
+        data = asdict(self)
+        data.pop('from_cache')
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+
+def _probe_ctranslate2():
+    """CTranslate2 is what faster-whisper runs on, so ask it directly"""
+    try:
+        import ctranslate2
+    except ImportError:
+        return None
+    count = ctranslate2.get_cuda_device_count()
+    compute_types = list(ctranslate2.get_supported_compute_types("cuda")) if count else []
+    return count, compute_types
+
+
+def _probe_torch():
+    try:
+        import torch
+    except ImportError:
+        return None
+    count = torch.cuda.device_count() if torch.cuda.is_available() else 0
+    return count, ["float16", "float32"] if count else []
+
+
+def _probe_nvidia_smi():
+    """Last resort: ask the driver tool, with a timeout so a hung driver can't stall startup"""
+    try:
+        result = subprocess.run(["nvidia-smi", "-L"], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True, timeout=3)
+    except (OSError, subprocess.SubprocessError):
+        return 0, []
+    if result.returncode != 0:
+        return 0, []
+    count = sum(1 for line in result.stdout.splitlines() if line.startswith("GPU"))
+    return count, ["float16", "float32"] if count else []
+
+
+DEFAULT_PROBES: List[Tuple[str, Probe]] = [
+    ("ctranslate2", _probe_ctranslate2),
+    ("torch", _probe_torch),
+    ("nvidia-smi", _probe_nvidia_smi),
+]
+
+
+def _choose_compute_type(device: str, cuda_compute_types: List[str]) -> str:
+    if device == "cuda":
+        for compute_type in ("float16", "int8_float16", "float32"):
+            if compute_type in cuda_compute_types:
+                return compute_type
+        return "float32"
+    return "int8"
+
+
+def _read_cache(cache_path: Path, ttl: float, visible_devices: Optional[str]) -> Optional[DeviceCapabilities]:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            capabilities = DeviceCapabilities.from_dict(json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+    if time.time() - capabilities.probed_at > ttl:
+        return None
+    if capabilities.cuda_visible_devices != visible_devices:
+        return None
+    capabilities.from_cache = True
+    return capabilities
+
+
+def _write_cache(cache_path: Path, capabilities: DeviceCapabilities):
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(capabilities.to_dict(), f, indent=2)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"[DeviceProbe] Could not write cache: {e}")
+
+
+def probe_device(cache_path: Optional[Path] = None, ttl: float = DEFAULT_TTL_SECONDS,
+                 refresh: bool = False, probes: Optional[List[Tuple[str, Probe]]] = None) -> DeviceCapabilities:
+    """
+    Work out the Whisper device and compute type.
+    Uses the on-disk cache when it is younger than `ttl` seconds.
+    """
+    visible_devices = os.environ.get("CUDA_VISIBLE_DEVICES")
+    if visible_devices == "":
+        return DeviceCapabilities("cpu", "int8", source="env", cuda_visible_devices=visible_devices)
+
+    cache_path = Path(cache_path) if cache_path else DEFAULT_CACHE_PATH
+    if not refresh:
+        cached = _read_cache(cache_path, ttl, visible_devices)
+        if cached is not None:
+            return cached
+
+    count, compute_types, source = 0, [], "none"
+    for name, probe in probes if probes is not None else DEFAULT_PROBES:
+        try:
+            result = probe()
+        except Exception as e:
+            print(f"[DeviceProbe] {name} probe failed: {e}")
+            continue
+        if result is not None:
+            (count, compute_types), source = result, name
+            break
+
+    device = "cuda" if count > 0 else "cpu"
+    capabilities = DeviceCapabilities(
+        device=device,
+        compute_type=_choose_compute_type(device, compute_types),
+        cuda_device_count=count,
+        source=source,
+        cuda_visible_devices=visible_devices
+    )
+    _write_cache(cache_path, capabilities)
+    return capabilities
+
+
+_capabilities: Optional[DeviceCapabilities] = None
+_capabilities_lock = threading.Lock()
+
+
+def get_device_capabilities() -> DeviceCapabilities:
+    """Probe once per process (and at most once per TTL across launches)"""
+    global _capabilities
+    with _capabilities_lock:
+        if _capabilities is None:
+            _capabilities = probe_device()
+        return _capabilities
@@ -0,0 +1,117 @@
+"""
+Whisper Model Registry for Gaia
+Process-wide cache so every VoiceManager shares one loaded Whisper model
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.audio.device_probe import DeviceCapabilities, get_device_capabilities
+
+ModelKey = Tuple[str, str, str]
+
+
+def _load_whisper_model(model_size: str, device: str, compute_type: str):
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(model_size, device=device, compute_type=compute_type)
+
+
+class WhisperModelRegistry:
+    """
+    Lazily loads Whisper models keyed by (model_size, device, compute_type).
+
+    Each key is loaded at most once, even when several threads ask for it at
+    the same time; callers for other keys are not blocked meanwhile.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str, str, str], Any]] = None,
+                 capabilities: Optional[Callable[[], DeviceCapabilities]] = None):
+        self._loader = loader or _load_whisper_model
+        self._capabilities = capabilities or get_device_capabilities
+        self._models: Dict[ModelKey, Any] = {}
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def capabilities(self) -> DeviceCapabilities:
+        """Probed device and compute type used when callers don't specify one"""
+        return self._capabilities()
+
+    def resolve(self, model_size: str = "base", device: Optional[str] = None,
+                compute_type: Optional[str] = None) -> ModelKey:
+        """Fill in the device and compute type when not given"""
+        if device is None:
+            capabilities = self.capabilities
+            device = capabilities.device
+            if compute_type is None:
+                compute_type = capabilities.compute_type
+        if compute_type is None:
+            compute_type = "float16" if device == "cuda" else "int8"
+        return (model_size, device, compute_type)
+
+    def get(self, model_size: str = "base", device: Optional[str] = None,
+            compute_type: Optional[str] = None):
+        """Return the shared model, loading it on first use"""
+        key = self.resolve(model_size, device, compute_type)
+
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                print(f"[WhisperRegistry] Loading Whisper '{key[0]}' on {key[1].upper()} ({key[2]})...")
+                model = self._loader(*key)
+                self._models[key] = model
+        return model
+
+    def preload(self, model_size: str = "base", device: Optional[str] = None,
+                compute_type: Optional[str] = None,
+                callback: Optional[Callable[[Any, Optional[Exception]], None]] = None) -> threading.Thread:
+        """
+        Load a model on a background thread, e.g. while a window is opening.
+        `callback(model, error)` is called from that thread when done.
+        """
+        def _worker():
+            try:
+                model = self.get(model_size, device, compute_type)
+            except Exception as e:
+                print(f"[WhisperRegistry] Preload failed: {e}")
+                if callback:
+                    callback(None, e)
+                return
+            if callback:
+                callback(model, None)
+
+        thread = threading.Thread(target=_worker, name="WhisperPreload", daemon=True)
+        thread.start()
+        return thread
+
+    def is_loaded(self, model_size: str = "base", device: Optional[str] = None,
+                  compute_type: Optional[str] = None) -> bool:
+        return self.resolve(model_size, device, compute_type) in self._models
+
+    def clear(self):
+        """Drop all cached models (they are freed once no VoiceManager holds them)"""
+        with self._lock:
+            self._models.clear()
+
+
+whisper_models = WhisperModelRegistry()
+
+
+def get_whisper_model(model_size: str = "base", device: Optional[str] = None,
+                      compute_type: Optional[str] = None):
+    """Shared Whisper model from the process-wide registry"""
+    return whisper_models.get(model_size, device, compute_type)
+
+
+def preload_whisper_model(model_size: str = "base", device: Optional[str] = None,
+                          compute_type: Optional[str] = None, callback=None) -> threading.Thread:
+    """Start loading the shared Whisper model in the background"""
+    return whisper_models.preload(model_size, device, compute_type, callback)
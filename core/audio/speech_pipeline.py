@@ -0,0 +1,113 @@
+"""
+Speech Pipeline for Gaia
+Speaks an LLM response sentence by sentence while the rest is still generating
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+from core.ai.sentence_segmenter import SentenceSegmenter
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStats:
+    """Latency breakdown of one streamed response (seconds from the start)"""
+    first_token: Optional[float] = None
+    first_sentence: Optional[float] = None
+    generation_done: Optional[float] = None
+    speech_done: Optional[float] = None
+    sentences: int = 0
+
+
+class SpeechPipeline:
+    """
+    LLM tokens -> SentenceSegmenter -> speak().
+
+    Generation runs on a background thread and fills a sentence queue; the
+    calling thread speaks each sentence as soon as it is ready. TTS therefore
+    stays on the caller's thread, which pyttsx3 needs, and `speak` can be any
+    blocking callable - AzureTTS.speak, TTSManager.speak or GaiaAgent's
+    fallback wrapper.
+    """
+
+    def __init__(self, speak: Callable[[str], object],
+                 segmenter_factory: Callable[[], SentenceSegmenter] = SentenceSegmenter,
+                 on_sentence: Optional[Callable[[str], None]] = None):
+        self.speak = speak
+        self.segmenter_factory = segmenter_factory
+        self.on_sentence = on_sentence
+        self.stats = PipelineStats()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stop speaking after the current sentence (e.g. the user interrupted)"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _generate(self, tokens: Iterable[str], sentences: queue.Queue, started: float):
+        segmenter = self.segmenter_factory()
+        try:
+            for token in tokens:
+                if self._cancel.is_set():
+                    break
+                if self.stats.first_token is None:
+                    self.stats.first_token = time.perf_counter() - started
+                for sentence in segmenter.feed(token):
+                    if self.stats.first_sentence is None:
+                        self.stats.first_sentence = time.perf_counter() - started
+                    sentences.put(sentence)
+            remainder = segmenter.flush()
+            if remainder and not self._cancel.is_set():
+                if self.stats.first_sentence is None:
+                    self.stats.first_sentence = time.perf_counter() - started
+                sentences.put(remainder)
+        except Exception as e:
+            sentences.put(e)
+        finally:
+            self.stats.generation_done = time.perf_counter() - started
+            sentences.put(_DONE)
+
+    def speak_stream(self, tokens: Iterable[str]) -> str:
+        """
+        Speak a token stream as it is generated.
+        Returns the text that was spoken; errors from the token stream are
+        raised after any sentences before them have been spoken.
+        """
+        self._cancel.clear()
+        self.stats = PipelineStats()
+        started = time.perf_counter()
+        sentences: queue.Queue = queue.Queue()
+        producer = threading.Thread(target=self._generate, args=(tokens, sentences, started),
+                                    name="LLMStream", daemon=True)
+        producer.start()
+
+        spoken: List[str] = []
+        error = None
+        while True:
+            item = sentences.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                error = item
+                continue
+            if self._cancel.is_set():
+                continue
+            if self.on_sentence:
+                self.on_sentence(item)
+            self.speak(item)
+            spoken.append(item)
+            self.stats.sentences += 1
+
+        producer.join()
+        self.stats.speech_done = time.perf_counter() - started
+        if error is not None:
+            raise error
+        return " ".join(spoken)
@@ -0,0 +1,156 @@
+"""
+Streaming Speech Recognition for Gaia
+Decodes a growing utterance incrementally while the user is still speaking
+"""
+
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from core.audio.vad import VoiceActivityDetector
+
+WHISPER_SAMPLE_RATE = 16000
+
+# Cheap settings for partial hypotheses; the final pass uses Whisper defaults
+PARTIAL_DECODE_OPTIONS = {
+    'beam_size': 1,
+    'without_timestamps': True,
+    'condition_on_previous_text': False,
+}
+
+
+class StreamingRecognizer:
+    """
+    Feeds capture chunks through a VAD and re-decodes the utterance every
+    `partial_interval` seconds, reporting each hypothesis to `on_partial`.
+
+    As soon as the speaker pauses, the completed stretch is decoded while
+    the VAD waits to confirm end of speech. If nothing was said after that,
+    the final text is ready the moment end of speech is reported; otherwise
+    one more decode runs over the whole utterance.
+    """
+
+    def __init__(self, model, vad: Optional[VoiceActivityDetector] = None,
+                 sample_rate: int = 16000, partial_interval: float = 0.5,
+                 on_partial: Optional[Callable[[str], None]] = None,
+                 stop_when: Optional[Callable[[str], bool]] = None,
+                 padding_seconds: float = 0.15):
+        self.model = model
+        self.vad = vad or VoiceActivityDetector(sample_rate=sample_rate)
+        self.sample_rate = sample_rate
+        self.partial_interval = partial_interval
+        self.on_partial = on_partial
+        self.stop_when = stop_when
+        self.padding = int(padding_seconds * sample_rate)
+        self.reset()
+
+    def reset(self):
+        self.vad.reset()
+        self._chunks: List[np.ndarray] = []
+        self._length = 0
+        self._decoded_until = 0
+        self._last_decode_at = 0
+        self.partial_text = ""
+        self.partials: List[str] = []
+        self.stopped_early = False
+        self.decode_seconds = 0.0
+
+    @property
+    def audio(self) -> np.ndarray:
+        """Everything fed so far as int16"""
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        return self._chunks[0] if self._chunks else np.zeros(0, dtype=np.int16)
+
+    def _speech_bounds(self):
+        """
+        Padded sample range of the utterance so far. It starts at the VAD's
+        first onset, which pauses don't move, so every decode keeps the
+        words said before a pause.
+        """
+        start = max(0, int(self.vad.speech_start * self.sample_rate) - self.padding)
+        if self.vad.speech_end is not None and not self.vad.in_speech:
+            end = min(self._length, int(self.vad.speech_end * self.sample_rate) + self.padding)
+        else:
+            end = self._length
+        return start, end
+
+    def _decode(self, end: int, **options) -> str:
+        start, _ = self._speech_bounds()
+        audio = self.audio[start:end].astype(np.float32) / 32768.0
+        if self.sample_rate != WHISPER_SAMPLE_RATE and audio.size:
+            positions = np.linspace(0, audio.size - 1, int(audio.size * WHISPER_SAMPLE_RATE / self.sample_rate))
+            audio = np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+        started = time.perf_counter()
+        segments, _ = self.model.transcribe(audio, **options)
+        text = " ".join(segment.text for segment in segments).strip()
+        self.decode_seconds += time.perf_counter() - started
+        self._decoded_until = end
+        return text
+
+    def feed(self, chunk: np.ndarray) -> bool:
+        """
+        Add the next chunk of int16 audio.
+        Returns True when the utterance is over (end of speech or `stop_when`).
+        """
+        chunk = np.asarray(chunk, dtype=np.int16)
+        self._chunks.append(chunk)
+        self._length += chunk.size
+        self.vad.process(chunk)
+
+        if not self.vad.speech_detected:
+            return False
+        if self.vad.end_of_speech:
+            return True
+
+        if not self.vad.in_speech:
+            # Speaker paused: decode what they said while we wait to see if they're done
+            _, end = self._speech_bounds()
+            if self._decoded_until < end:
+                return self._emit_partial(self._decode(end, **PARTIAL_DECODE_OPTIONS))
+            return False
+
+        interval = int(self.partial_interval * self.sample_rate)
+        if self._length - self._last_decode_at >= interval:
+            self._last_decode_at = self._length
+            return self._emit_partial(self._decode(self._length, **PARTIAL_DECODE_OPTIONS))
+        return False
+
+    def _emit_partial(self, text: str) -> bool:
+        """Report a new hypothesis; returns True if `stop_when` accepts it"""
+        if not text:
+            return False
+        if text != self.partial_text:
+            self.partial_text = text
+            self.partials.append(text)
+            if self.on_partial:
+                self.on_partial(text)
+        if self.stop_when and self.stop_when(text):
+            self.stopped_early = True
+            return True
+        return False
+
+    def finalize(self) -> str:
+        """Final transcription of the utterance ('' if nobody spoke)"""
+        if not self.vad.speech_detected:
+            return ""
+        if self.stopped_early:
+            return self.partial_text
+
+        _, end = self._speech_bounds()
+        if self.partial_text and self._decoded_until >= end:
+            return self.partial_text
+        return self._decode(end)
+
+    def run(self, capture, max_duration: float = 10.0, chunk_size: int = 1024) -> str:
+        """Read from an AudioCapture until the utterance ends, then return the final text"""
+        self.reset()
+        self.vad.prime(capture.preceding(0.5))
+        max_samples = int(max_duration * self.sample_rate)
+
+        while self._length < max_samples:
+            chunk = capture.read_samples(chunk_size)
+            if chunk.size == 0 or self.feed(chunk):
+                break
+        return self.finalize()
@@ -14,6 +14,11 @@ class TTSManager:
         else:
             print("TTS engine not available")
 
+    def stop(self):
+        """Interrupt speech in progress (safe to call from another thread)."""
+        if hasattr(self, 'engine') and self.engine:
+            self.engine.stop()
+
     def cleanup(self):
         """Clean up TTS resources."""
         try:
@@ -0,0 +1,221 @@
+"""
+Voice Activity Detection for Gaia
+Frame-based VAD using vectorized energy and zero-crossing features with an
+adaptive noise floor and hangover smoothing.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+
+@dataclass
+class SpeechSegment:
+    """A stretch of detected speech, in seconds from the start of the audio"""
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def _to_float(audio: np.ndarray) -> np.ndarray:
+    """Convert int16 or float audio to float64 in [-1, 1] (no int16 overflow)"""
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:
+        return audio.astype(np.float64) / 32768.0
+    return audio.astype(np.float64, copy=False)
+
+
+class VoiceActivityDetector:
+    """
+    Frame-accurate VAD.
+
+    `detect()`/`trim()` work on a complete clip. `process()` works on a live
+    stream chunk by chunk and sets `end_of_speech` once the speaker has been
+    quiet for `end_silence_ms` after talking. `speech_start` marks where the
+    utterance began; shorter pauses inside it don't move it.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20,
+                 energy_margin_db: float = 10.0, min_speech_db: float = -55.0,
+                 zcr_threshold: float = 0.25, hangover_ms: int = 200,
+                 min_speech_ms: int = 60, end_silence_ms: int = 800,
+                 noise_adapt_rate: float = 0.05, initial_noise_db: float = -60.0,
+                 max_noise_db: float = -40.0):
+        if not 10 <= frame_ms <= 30:
+            raise ValueError("frame_ms must be between 10 and 30")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.energy_margin_db = energy_margin_db
+        self.min_speech_db = min_speech_db
+        self.zcr_threshold = zcr_threshold
+        self.hangover_frames = max(0, hangover_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.end_silence_frames = max(1, end_silence_ms // frame_ms)
+        self.noise_adapt_rate = noise_adapt_rate
+        self.initial_noise_db = initial_noise_db
+        # Ceiling on the floor estimate so continuous speech is never mistaken for noise
+        self.max_noise_db = max_noise_db
+        self.warmup_frames = max(1, 200 // frame_ms)
+        self.reset()
+
+    # ------------------------------------------------------------------
+    # Features
+    # ------------------------------------------------------------------
+
+    def frame_features(self, audio: np.ndarray):
+        """Return per-frame energy (dBFS) and zero-crossing rate"""
+        audio = _to_float(audio)
+        n_frames = audio.size // self.frame_length
+        frames = audio[:n_frames * self.frame_length].reshape(n_frames, self.frame_length)
+
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / max(1, self.frame_length - 1)
+        return energy_db, zcr
+
+    def _is_speech(self, energy_db: np.ndarray, zcr: np.ndarray, noise_floor_db) -> np.ndarray:
+        """Raw per-frame decision before smoothing"""
+        voiced = energy_db > noise_floor_db + self.energy_margin_db
+        # Unvoiced consonants are quiet but noisy; accept them a little closer to the floor
+        fricative = (energy_db > noise_floor_db + self.energy_margin_db / 2) & (zcr > self.zcr_threshold)
+        return (voiced | fricative) & (energy_db > self.min_speech_db)
+
+    # ------------------------------------------------------------------
+    # Whole-clip analysis
+    # ------------------------------------------------------------------
+
+    def speech_frames(self, audio: np.ndarray) -> np.ndarray:
+        """Smoothed boolean speech flag for each frame of a complete clip"""
+        energy_db, zcr = self.frame_features(audio)
+        if energy_db.size == 0:
+            return np.zeros(0, dtype=bool)
+
+        noise_floor_db = float(np.clip(np.percentile(energy_db, 10), self.initial_noise_db, self.max_noise_db))
+        raw = self._is_speech(energy_db, zcr, noise_floor_db)
+
+        # Drop bursts shorter than min_speech_frames (clicks, pops)
+        starts, ends = self._runs(raw)
+        for start, end in zip(starts, ends):
+            if end - start < self.min_speech_frames:
+                raw[start:end] = False
+
+        # Hangover: keep speech on for a few frames after it stops
+        if self.hangover_frames:
+            kernel = np.ones(self.hangover_frames + 1)
+            raw = np.convolve(raw.astype(np.float64), kernel)[:raw.size] > 0
+        return raw
+
+    @staticmethod
+    def _runs(flags: np.ndarray):
+        """Start/end frame indices of each run of True values"""
+        edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+        return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    def detect(self, audio: np.ndarray) -> List[SpeechSegment]:
+        """Speech start/end timestamps in seconds"""
+        frame_seconds = self.frame_length / self.sample_rate
+        starts, ends = self._runs(self.speech_frames(audio))
+        return [SpeechSegment(start * frame_seconds, end * frame_seconds)
+                for start, end in zip(starts, ends)]
+
+    def contains_speech(self, audio: np.ndarray) -> bool:
+        return bool(self.speech_frames(audio).any())
+
+    def trim(self, audio: np.ndarray, padding_ms: int = 100) -> np.ndarray:
+        """Cut leading and trailing silence, keeping a little padding"""
+        segments = self.detect(audio)
+        if not segments:
+            return audio[:0]
+        padding = padding_ms / 1000
+        start = max(0, int((segments[0].start - padding) * self.sample_rate))
+        end = min(len(audio), int((segments[-1].end + padding) * self.sample_rate))
+        return audio[start:end]
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    def reset(self):
+        """Clear streaming state"""
+        self.noise_floor_db = float(self.initial_noise_db)
+        self.in_speech = False
+        self.speech_detected = False
+        self.end_of_speech = False
+        self.speech_start: Optional[float] = None
+        self.speech_end: Optional[float] = None
+        self._leftover = np.zeros(0, dtype=np.float64)
+        self._frames_seen = 0
+        self._speech_run = 0
+        self._silence_run = 0
+        self._primed = False
+        self._warmup: List[float] = []
+
+    def prime(self, background: np.ndarray):
+        """Seed the noise floor from audio known to be background"""
+        energy_db, _ = self.frame_features(background)
+        if energy_db.size:
+            self._set_noise_floor(np.median(energy_db))
+
+    def _set_noise_floor(self, level_db):
+        self.noise_floor_db = float(np.clip(level_db, self.initial_noise_db, self.max_noise_db))
+        self._primed = True
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Feed the next chunk of a live stream.
+        Returns the smoothed speech flag for each complete frame in it.
+        """
+        audio = np.concatenate((self._leftover, _to_float(chunk)))
+        usable = (audio.size // self.frame_length) * self.frame_length
+        self._leftover = audio[usable:]
+        energy_db, zcr = self.frame_features(audio[:usable])
+
+        flags = np.zeros(energy_db.size, dtype=bool)
+        frame_seconds = self.frame_length / self.sample_rate
+        for i in range(energy_db.size):
+            if not self._primed:
+                # Without a primed floor, learn it from the first few frames
+                self._warmup.append(energy_db[i])
+                if len(self._warmup) >= self.warmup_frames:
+                    self._set_noise_floor(np.median(self._warmup))
+                continue
+
+            is_speech = bool(self._is_speech(energy_db[i], zcr[i], self.noise_floor_db))
+            time_s = (self._frames_seen + i) * frame_seconds
+
+            if is_speech:
+                self._speech_run += 1
+                self._silence_run = 0
+                if not self.in_speech and self._speech_run >= self.min_speech_frames:
+                    # A pause shorter than end_silence_ms is part of the same
+                    # utterance, so only its first onset sets the start
+                    if self.speech_start is None or self.end_of_speech:
+                        self.speech_start = time_s - (self._speech_run - 1) * frame_seconds
+                    self.in_speech = True
+                    self.speech_detected = True
+                    self.end_of_speech = False
+            else:
+                self._speech_run = 0
+                self._silence_run += 1
+                # Track the noise floor only outside speech; fall quickly, rise slowly
+                if energy_db[i] < self.noise_floor_db:
+                    self.noise_floor_db = max(float(energy_db[i]), self.initial_noise_db)
+                elif not self.in_speech:
+                    self.noise_floor_db += self.noise_adapt_rate * (energy_db[i] - self.noise_floor_db)
+                    self.noise_floor_db = min(self.noise_floor_db, self.max_noise_db)
+
+                if self.in_speech and self._silence_run > self.hangover_frames:
+                    self.in_speech = False
+                    self.speech_end = time_s - self.hangover_frames * frame_seconds
+                if self.speech_detected and self._silence_run >= self.end_silence_frames:
+                    self.end_of_speech = True
+
+            flags[i] = self.in_speech
+
+        self._frames_seen += energy_db.size
+        return flags
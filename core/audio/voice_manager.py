@@ -1,179 +1,255 @@
 import os
 import tempfile
-import pyaudio
 import wave
-from faster_whisper import WhisperModel
+import numpy as np
+from core.audio.audio_capture import AudioCapture
+from core.audio.batch_transcriber import BatchTranscriber
+from core.audio.model_registry import whisper_models
+from core.audio.streaming_recognizer import StreamingRecognizer
+from core.audio.vad import VoiceActivityDetector
+
+WHISPER_SAMPLE_RATE = 16000  # faster-whisper expects 16 kHz mono for array input
+SPEECH_PADDING_SECONDS = 0.15  # Audio kept around detected speech when trimming
 
 class VoiceManager:
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", capture_backend=None, debug_audio_dir=None, registry=None):
         """
-        Initialize Whisper model with automatic CUDA detection.
-        Falls back to CPU if GPU is not available.
+        Set up speech capture and transcription.
+
+        The Whisper model comes from a process-wide registry: it is loaded
+        once on first use or on `preload()`, and shared by every
+        VoiceManager. The device and compute type come from the cached
+        device probe and are inspectable via `capabilities`.
+
+        Audio comes from a long-lived capture stream; pass `capture_backend`
+        to feed it from somewhere other than the default microphone.
+        Recordings stay in memory unless `debug_audio_dir` is set, in which
+        case each one is also written there as a WAV file.
         """
-        self.device = "cuda" if self._cuda_available() else "cpu"
-        print(f"[VoiceManager] Initializing Whisper on {self.device.upper()}...")
-        self.model = WhisperModel(model_size, device=self.device, compute_type="float16" if self.device == "cuda" else "int8")
+        self.capture = AudioCapture(backend=capture_backend)
+        self.debug_audio_dir = debug_audio_dir
+        self.registry = registry or whisper_models
+        self.capabilities = self.registry.capabilities
+        self.model_size, self.device, self.compute_type = self.registry.resolve(model_size)
+        source = "cached probe" if self.capabilities.from_cache else self.capabilities.source
+        print(f"[VoiceManager] Whisper will run on {self.device.upper()} ({self.compute_type}, {source})")
+        self._model = None
+
+    @property
+    def model(self):
+        """Shared Whisper model, loaded from the registry on first access"""
+        if self._model is None:
+            self._model = self.registry.get(self.model_size, self.device, self.compute_type)
+        return self._model
+
+    def preload(self, callback=None):
+        """Load the Whisper model in the background so the first command isn't delayed"""
+        return self.registry.preload(self.model_size, self.device, self.compute_type, callback)
 
-    def _cuda_available(self):
-        """Check if CUDA is available via environment variables or nvidia-smi."""
+    def start_capture(self):
+        """Start the shared capture stream on first use"""
+        if not self.capture.is_running:
+            self.capture.start()
+        return self.capture
+
+    def skip_to_live(self):
+        """Discard audio captured so far (e.g. while Gaia was speaking)"""
+        if self.capture.is_running:
+            self.capture.skip_to_live()
+
+    def _save_wav(self, filename, samples):
+        """Write int16 samples to a mono WAV file"""
+        with wave.open(filename, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.capture.sample_rate)
+            wf.writeframes(samples.astype(np.int16).tobytes())
+
+    def to_float32(self, samples):
+        """Convert int16 capture samples to the 16 kHz float32 array Whisper expects"""
+        audio = samples.astype(np.float32) / 32768.0
+        rate = self.capture.sample_rate
+        if rate != WHISPER_SAMPLE_RATE and audio.size:
+            target_length = int(audio.size * WHISPER_SAMPLE_RATE / rate)
+            positions = np.linspace(0, audio.size - 1, target_length)
+            audio = np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+        return audio
+
+    def _save_debug_audio(self, name, samples):
+        """Write a recording to the debug directory when one is configured"""
+        if not self.debug_audio_dir:
+            return
         try:
-            # Check if CUDA_VISIBLE_DEVICES is set
-            if "CUDA_VISIBLE_DEVICES" in os.environ and os.environ["CUDA_VISIBLE_DEVICES"] == "":
-                return False
+            os.makedirs(self.debug_audio_dir, exist_ok=True)
+            self._save_wav(os.path.join(self.debug_audio_dir, name), samples)
+        except Exception as e:
+            print(f"Error saving debug audio: {e}")
+
+    def record_array(self, duration=5):
+        """Record the next `duration` seconds as a float32 array (no disk I/O)."""
+        try:
+            samples = self.start_capture().read(duration)
+        except Exception as e:
+            print(f"Error during recording: {e}")
+            return None
+
+        self._save_debug_audio("input.wav", samples)
+        return self.to_float32(samples)
+
+    def record_array_smart(self, max_duration=10, silence_threshold=None, silence_duration=2):
+        """Smart recording into a float32 array (no disk I/O)."""
+        samples = self._record_until_silence(max_duration, silence_threshold, silence_duration)
+        if samples is None:
+            return None
+
+        self._save_debug_audio("input_smart.wav", samples)
+        return self.to_float32(samples)
 
-            # Try to run nvidia-smi to see if a GPU is present
-            import subprocess
-            result = subprocess.run(["nvidia-smi"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            return result.returncode == 0
-        except Exception:
-            return False
+    def listen(self, duration=5, trim_silence=True):
+        """Record for `duration` seconds and return the transcription."""
+        audio = self.record_array(duration)
+        if audio is None:
+            return ""
+        if trim_silence:
+            audio = self._create_vad(WHISPER_SAMPLE_RATE).trim(audio, padding_ms=int(SPEECH_PADDING_SECONDS * 1000))
+        return self.transcribe(audio)
+
+    def listen_smart(self, max_duration=10, silence_threshold=None, silence_duration=2):
+        """
+        Smart-record until the user stops speaking and return the transcription.
+        Returns None if recording failed so callers can fall back.
+        """
+        audio = self.record_array_smart(max_duration, silence_threshold, silence_duration)
+        if audio is None:
+            return None
+        return self.transcribe(audio)
+
+    def create_streaming_recognizer(self, on_partial=None, silence_duration=0.8, stop_when=None):
+        """StreamingRecognizer for the capture stream, for callers that feed chunks themselves"""
+        rate = self.capture.sample_rate
+        return StreamingRecognizer(
+            self.model,
+            vad=self._create_vad(rate, None, silence_duration),
+            sample_rate=rate,
+            on_partial=on_partial,
+            stop_when=stop_when,
+            padding_seconds=SPEECH_PADDING_SECONDS
+        )
+
+    def listen_streaming(self, on_partial=None, max_duration=10, silence_duration=0.8, stop_when=None):
+        """
+        Transcribe while the user is speaking.
+        `on_partial(text)` receives each interim hypothesis; `stop_when(text)`
+        can end the utterance early once a partial is good enough.
+        Returns None if recording failed so callers can fall back.
+        """
+        try:
+            capture = self.start_capture()
+            recognizer = self.create_streaming_recognizer(on_partial, silence_duration, stop_when)
+            text = recognizer.run(capture, max_duration)
+        except Exception as e:
+            print(f"Error in streaming recognition: {e}")
+            return None
+        self._save_debug_audio("input_streaming.wav", recognizer.audio)
+        return text
 
     def record_audio(self, duration=5, filename=None):
-        """Record audio from microphone with improved sensitivity."""
+        """Record the next `duration` seconds from the capture stream."""
         if filename is None:
             filename = os.path.join(tempfile.gettempdir(), "input.wav")
 
-        chunk = 1024
-        audio_format = pyaudio.paInt16
-        channels = 1
-        rate = 16000
-
-        p = None
-        stream = None
-        frames = []
-        sample_width = 2  # Default for paInt16
-        
         try:
-            p = pyaudio.PyAudio()
-            sample_width = p.get_sample_size(audio_format)
-            
-            # Find the best input device
-            input_device_index = None
-            for i in range(p.get_device_count()):
-                info = p.get_device_info_by_index(i)
-                max_inputs = info.get('maxInputChannels', 0)
-                if isinstance(max_inputs, (int, float)) and max_inputs > 0:
-                    input_device_index = i
-                    break
-            
-            stream = p.open(
-                format=audio_format, 
-                channels=channels, 
-                rate=rate, 
-                input=True,
-                input_device_index=input_device_index,
-                frames_per_buffer=chunk
-            )
-
-            # Start recording with better timing
-            total_frames = int(rate / chunk * duration)
-            for i in range(total_frames):
-                data = stream.read(chunk, exception_on_overflow=False)
-                frames.append(data)
-            
+            samples = self.start_capture().read(duration)
         except Exception as e:
             print(f"Error during recording: {e}")
             return None
-        finally:
-            if stream:
-                stream.stop_stream()
-                stream.close()
-            if p:
-                p.terminate()
-                p.terminate()
 
         try:
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(channels)
-                wf.setsampwidth(sample_width)
-                wf.setframerate(rate)
-                wf.writeframes(b''.join(frames))
+            self._save_wav(filename, samples)
         except Exception as e:
             print(f"Error saving audio file: {e}")
             return None
 
         return filename
 
-    def transcribe(self, audio_file):
-        """Convert speech to text."""
+    def transcribe(self, audio):
+        """
+        Convert speech to text.
+        Accepts a WAV file path or a 16 kHz float32 NumPy array.
+        """
         try:
-            if not hasattr(self, 'model') or not self.model:
-                print("VoiceManager model not available")
+            if audio is None:
                 return ""
-                
-            if not os.path.exists(audio_file):
-                print(f"Audio file not found: {audio_file}")
+
+            if isinstance(audio, np.ndarray):
+                if audio.size == 0:
+                    return ""
+            elif not os.path.exists(audio):
+                print(f"Audio file not found: {audio}")
                 return ""
             
-            segments, _ = self.model.transcribe(audio_file)
+            segments, _ = self.model.transcribe(audio)
             text = " ".join([seg.text for seg in segments])
             return text.strip()
         except Exception as e:
             print(f"Error during transcription: {e}")
             return ""
 
-    def record_audio_smart(self, max_duration=10, silence_threshold=500, silence_duration=2):
+    def transcribe_batch(self, sources, output_path, workers=None, resume=True, progress=None):
+        """
+        Transcribe a directory or list of recordings to a JSONL file using a
+        pool of workers. Returns a BatchReport with real-time factors.
+        """
+        transcriber = BatchTranscriber(self.model_size, workers=workers,
+                                       device=self.device, compute_type=self.compute_type)
+        return transcriber.run(sources, output_path, resume=resume, progress=progress)
+
+    def record_audio_smart(self, max_duration=10, silence_threshold=None, silence_duration=2):
         """
         Record audio with voice activity detection.
         Stops recording when user stops speaking for specified duration.
         """
-        import numpy as np
-        
         filename = os.path.join(tempfile.gettempdir(), "input_smart.wav")
-        chunk = 1024
-        audio_format = pyaudio.paInt16
-        channels = 1
-        rate = 16000
+        samples = self._record_until_silence(max_duration, silence_threshold, silence_duration)
+        if samples is None:
+            return None
 
-        p = None
-        stream = None
+        try:
+            self._save_wav(filename, samples)
+        except Exception as e:
+            print(f"Error saving smart audio file: {e}")
+            return None
+
+        return filename
+
+    def _record_until_silence(self, max_duration, silence_threshold, silence_duration):
+        """
+        Read from the capture stream until the VAD reports end of speech.
+        Returns int16 samples with leading and trailing silence trimmed.
+
+        `silence_threshold` is an optional int16 RMS floor below which audio
+        is never treated as speech; by default the VAD adapts to the room.
+        """
+        chunk = 1024
         frames = []
         
         try:
-            p = pyaudio.PyAudio()
-            sample_width = p.get_sample_size(audio_format)
-            
-            # Find the best input device
-            input_device_index = None
-            for i in range(p.get_device_count()):
-                info = p.get_device_info_by_index(i)
-                max_inputs = info.get('maxInputChannels', 0)
-                if isinstance(max_inputs, (int, float)) and max_inputs > 0:
-                    input_device_index = i
-                    break
-            
-            stream = p.open(
-                format=audio_format, 
-                channels=channels, 
-                rate=rate, 
-                input=True,
-                input_device_index=input_device_index,
-                frames_per_buffer=chunk
-            )
-
+            capture = self.start_capture()
+            rate = capture.sample_rate
+            vad = self._create_vad(rate, silence_threshold, silence_duration)
+            vad.prime(capture.preceding(0.5))
             print("🎤 Recording... (speak now)")
             
-            silent_chunks = 0
-            audio_started = False
-            max_silent_chunks = int(silence_duration * rate / chunk)
             max_chunks = int(max_duration * rate / chunk)
-            
             for i in range(max_chunks):
-                data = stream.read(chunk, exception_on_overflow=False)
-                frames.append(data)
-                
-                # Convert to numpy array to check volume
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                volume = np.sqrt(np.mean(audio_data**2))
-                
-                if volume < silence_threshold:
-                    silent_chunks += 1
-                else:
-                    silent_chunks = 0
-                    audio_started = True
+                audio_data = capture.read_samples(chunk)
+                if audio_data.size == 0:
+                    break
+                frames.append(audio_data)
+                vad.process(audio_data)
                 
-                # Stop recording if we've had enough silence after audio started
-                if audio_started and silent_chunks > max_silent_chunks:
+                # Stop as soon as the speaker has finished
+                if vad.end_of_speech:
                     print("🔇 Silence detected, stopping recording")
                     break
             
@@ -182,33 +258,32 @@ class VoiceManager:
         except Exception as e:
             print(f"Error during smart recording: {e}")
             return None
-        finally:
-            if stream:
-                stream.stop_stream()
-                stream.close()
-            if p:
-                p.terminate()
 
-        try:
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(channels)
-                wf.setsampwidth(sample_width)
-                wf.setframerate(rate)
-                wf.writeframes(b''.join(frames))
-        except Exception as e:
-            print(f"Error saving smart audio file: {e}")
-            return None
+        samples = np.concatenate(frames) if frames else np.zeros(0, dtype=np.int16)
+        if not vad.speech_detected:
+            return samples[:0]
 
-        return filename
+        padding = int(SPEECH_PADDING_SECONDS * rate)
+        start = max(0, int(vad.speech_start * rate) - padding)
+        if vad.speech_end is not None and not vad.in_speech:
+            end = min(samples.size, int(vad.speech_end * rate) + padding)
+        else:
+            # Cut off by max_duration mid-utterance: speech_end is from an earlier pause
+            end = samples.size
+        return samples[start:end]
+
+    def _create_vad(self, rate, silence_threshold=None, silence_duration=0.8):
+        """VAD configured for the capture rate and end-of-speech timeout"""
+        options = {'sample_rate': rate, 'end_silence_ms': int(silence_duration * 1000)}
+        if silence_threshold:
+            options['min_speech_db'] = 20 * np.log10(silence_threshold / 32768.0)
+        return VoiceActivityDetector(**options)
 
     def cleanup(self):
         """Clean up resources."""
         try:
-            if hasattr(self, 'model') and self.model:
-                # Whisper model cleanup
-                del self.model
-                self.model = None
-                print("[VoiceManager] Whisper model cleaned up")
+            self.capture.stop()
         except Exception as e:
-            print(f"[VoiceManager] Cleanup error: {e}")
-
+            print(f"[VoiceManager] Capture stop error: {e}")
+        # The Whisper model is shared through the registry; only drop our reference
+        self._model = None
@@ -0,0 +1,468 @@
+"""
+Wake Word Detection for Gaia
+Cheap keyword spotting stage that runs before Whisper.
+
+Audio passes through an energy gate first; windows with speech energy are
+compared against enrolled recordings of the wake word using MFCC features
+and dynamic time warping. Only windows whose score passes the threshold are
+handed to Whisper for confirmation.
+
+Templates are recorded once with
+    python -m core.audio.wake_word --enroll 5 --templates wake_word_templates
+With none enrolled the spotter passes every voiced window on to Whisper.
+"""
+
+import argparse
+import os
+import time
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Recordings asked for by --enroll, and seconds given for each
+DEFAULT_ENROLL_SAMPLES = 5
+DEFAULT_ENROLL_SECONDS = 2.0
+
+
+def load_wav(path, target_rate: int = 16000) -> np.ndarray:
+    """Load a 16-bit WAV file as mono float32 at `target_rate`"""
+    with wave.open(str(path), 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit WAV")
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    audio = data.astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != target_rate and audio.size:
+        target_length = int(audio.size * target_rate / rate)
+        positions = np.linspace(0, audio.size - 1, target_length)
+        audio = np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+    return audio
+
+
+def save_wav(path, audio: np.ndarray, sample_rate: int = 16000):
+    """Write float32 audio as a 16-bit mono WAV file"""
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes((np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
+
+
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Triangular mel filterbank of shape (n_mels, n_fft // 2 + 1)"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    filters = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+
+class MFCCExtractor:
+    """Vectorized MFCC features with cepstral mean normalization"""
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: float = 25.0, hop_ms: float = 10.0,
+                 n_mels: int = 26, n_ceps: int = 13):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.hop_length = int(sample_rate * hop_ms / 1000)
+        self.n_fft = 1 << (self.frame_length - 1).bit_length()
+        self.window = np.hamming(self.frame_length).astype(np.float32)
+        self.filters = _mel_filterbank(sample_rate, self.n_fft, n_mels)
+
+        # DCT-II basis, dropping c0 (overall loudness)
+        n = np.arange(n_mels)
+        k = np.arange(1, n_ceps + 1)[:, None]
+        self.dct = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)).astype(np.float32)
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        """Return MFCCs of shape (frames, n_ceps)"""
+        audio = np.asarray(audio, dtype=np.float32)
+        if audio.size < self.frame_length:
+            audio = np.pad(audio, (0, self.frame_length - audio.size))
+
+        emphasized = np.append(audio[0], audio[1:] - 0.97 * audio[:-1])
+        n_frames = 1 + (emphasized.size - self.frame_length) // self.hop_length
+        frames = np.lib.stride_tricks.as_strided(
+            emphasized,
+            shape=(n_frames, self.frame_length),
+            strides=(emphasized.strides[0] * self.hop_length, emphasized.strides[0])
+        ) * self.window
+
+        power = np.abs(np.fft.rfft(frames, n=self.n_fft)) ** 2
+        log_mel = np.log(power @ self.filters.T + 1e-10)
+        ceps = log_mel @ self.dct.T
+        return ceps - ceps.mean(axis=0)
+
+
+def dtw_distance(a: np.ndarray, b: np.ndarray, subsequence: bool = False) -> float:
+    """
+    Length-normalized DTW distance between two feature sequences.
+
+    With `subsequence=True`, `a` may match any stretch of `b` (free start and
+    end), which is how a short template is located inside a longer window.
+
+    Each row of the cost matrix is solved with a cumulative minimum, so the
+    only Python-level loop is over the frames of `a`.
+    """
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+    previous = cost[0].copy() if subsequence else np.cumsum(cost[0])
+    for row in cost[1:]:
+        # Best predecessor from the row above: diagonal or vertical step
+        above = np.minimum(previous, np.concatenate(([np.inf], previous[:-1])))
+        running = np.cumsum(row)
+        # D[j] = S[j] + min_{k<=j}(above[k] - S[k-1]) handles horizontal steps
+        previous = running + np.minimum.accumulate(above - (running - row))
+
+    if subsequence:
+        return float(previous.min() / (2 * a.shape[0]))
+    return float(previous[-1] / (a.shape[0] + b.shape[0]))
+
+
+@dataclass
+class WakeWordStats:
+    """Counters for the wake word stage"""
+    windows: int = 0
+    gated_windows: int = 0
+    spotted_windows: int = 0
+    cpu_seconds: float = 0.0
+
+    @property
+    def cpu_ms_per_window(self) -> float:
+        return (self.cpu_seconds / self.windows * 1000) if self.windows else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'windows': self.windows,
+            'gated_windows': self.gated_windows,
+            'spotted_windows': self.spotted_windows,
+            'cpu_ms_per_window': round(self.cpu_ms_per_window, 3)
+        }
+
+
+class WakeWordDetector:
+    """
+    Energy/VAD gate plus template-matching keyword spotter on overlapping windows.
+
+    Feed audio with `process()`; it returns True when a window scores above
+    the threshold. `candidate_audio()` then returns the recent audio for a
+    Whisper confirmation pass.
+    """
+
+    def __init__(self, templates_dir: Optional[str] = None, sample_rate: int = 16000,
+                 window_seconds: float = 1.0, hop_seconds: float = 0.25,
+                 energy_threshold_db: float = -45.0, score_threshold: float = 0.5,
+                 distance_scale: float = 20.0, confirm_seconds: float = 3.0, vad=None):
+        self.sample_rate = sample_rate
+        self.window_length = int(window_seconds * sample_rate)
+        self.hop_length = int(hop_seconds * sample_rate)
+        self.energy_threshold_db = energy_threshold_db
+        self.score_threshold = score_threshold
+        self.distance_scale = distance_scale
+        self.confirm_length = int(confirm_seconds * sample_rate)
+        self.vad = vad
+
+        self.features = MFCCExtractor(sample_rate)
+        self.templates: List[np.ndarray] = []
+        self.stats = WakeWordStats()
+        self.last_score = 0.0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._pending_flags = np.zeros(0, dtype=bool)
+        self._history = np.zeros(0, dtype=np.float32)
+        # Stream positions since the VAD was last reset: the sample at the
+        # front of `_pending` and the VAD frame of the first pending flag
+        self._position = 0
+        self._first_frame = 0
+
+        if templates_dir:
+            self.load_templates(templates_dir)
+
+    def load_templates(self, templates_dir: str) -> int:
+        """Enroll every WAV file in `templates_dir` as a wake word example"""
+        directory = Path(templates_dir)
+        wav_paths = sorted(directory.glob("*.wav")) if directory.is_dir() else []
+        for wav_path in wav_paths:
+            try:
+                self.enroll(load_wav(wav_path, self.sample_rate))
+            except Exception as e:
+                print(f"[WakeWord] Skipping template {wav_path.name}: {e}")
+
+        if self.templates:
+            print(f"[WakeWord] Loaded {len(self.templates)} wake word templates")
+        else:
+            print(f"[WakeWord] No wake word templates in {templates_dir}: keyword spotting is off and "
+                  f"every voiced window goes to Whisper. Record some with "
+                  f"'python -m core.audio.wake_word --enroll {DEFAULT_ENROLL_SAMPLES} --templates {templates_dir}'")
+        return len(self.templates)
+
+    def enroll(self, audio: np.ndarray):
+        """Add one recording of the wake word as a template"""
+        self.templates.append(self.features(self._trim(audio)))
+
+    def _trim(self, audio: np.ndarray) -> np.ndarray:
+        """Cut leading/trailing silence from a template using the energy gate"""
+        hop = max(1, self.sample_rate // 100)
+        n = audio.size // hop
+        if n == 0:
+            return audio
+        energy = self._level_db(audio[:n * hop].reshape(n, hop))
+        voiced = np.flatnonzero(energy > self.energy_threshold_db)
+        if voiced.size == 0:
+            return audio
+        return audio[voiced[0] * hop:(voiced[-1] + 1) * hop]
+
+    @staticmethod
+    def _level_db(frames: np.ndarray) -> np.ndarray:
+        """RMS level in dBFS along the last axis"""
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=-1))
+        return 20 * np.log10(rms + 1e-10)
+
+    def passes_energy_gate(self, window: np.ndarray, speech_flags: Optional[np.ndarray] = None) -> bool:
+        """
+        Cheap first stage: a fixed energy threshold, then the streaming VAD's
+        per-frame speech flags for the window when a VAD is attached.
+        """
+        if float(self._level_db(window)) <= self.energy_threshold_db:
+            return False
+        return speech_flags is None or bool(speech_flags.any())
+
+    def score(self, window: np.ndarray) -> float:
+        """Similarity in [0, 1] between the window and the closest template"""
+        if not self.templates:
+            # Nothing enrolled: let every voiced window through to Whisper
+            return 1.0
+        features = self.features(window)
+        distance = min(dtw_distance(template, features, subsequence=True) for template in self.templates)
+        return float(np.exp(-distance / self.distance_scale))
+
+    def process(self, audio: np.ndarray) -> bool:
+        """
+        Feed new audio and score every complete window.
+        Returns True as soon as one window passes the threshold.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        self._history = np.concatenate((self._history, audio))[-self.confirm_length:]
+        self._pending = np.concatenate((self._pending, audio))
+        if self.vad is not None:
+            self._pending_flags = np.concatenate((self._pending_flags, self.vad.process(audio)))
+
+        triggered = False
+        while self._pending.size >= self.window_length:
+            window = self._pending[:self.window_length]
+            window_flags = None
+            if self.vad is not None:
+                # Hops aren't a whole number of VAD frames, so pick the frames
+                # by sample position: every frame that lies inside the window
+                frame_length = self.vad.frame_length
+                first = -(-self._position // frame_length) - self._first_frame
+                last = (self._position + self.window_length) // frame_length - self._first_frame
+                window_flags = self._pending_flags[first:last]
+            self._advance(self.hop_length)
+
+            if self._process_window(window, window_flags):
+                # Skip past this audio so overlapping windows don't re-fire
+                self._advance(self._pending.size)
+                triggered = True
+                break
+        return triggered
+
+    def _advance(self, samples: int):
+        """Drop audio from the front of the buffer, with the flags of frames that start before it"""
+        self._pending = self._pending[samples:]
+        self._position += samples
+        if self.vad is not None:
+            # A frame still partly in the VAD's buffer is dropped once it arrives
+            drop = min(-(-self._position // self.vad.frame_length) - self._first_frame, self._pending_flags.size)
+            if drop > 0:
+                self._pending_flags = self._pending_flags[drop:]
+                self._first_frame += drop
+
+    def _process_window(self, window: np.ndarray, speech_flags: Optional[np.ndarray] = None) -> bool:
+        started = time.thread_time()
+        try:
+            self.stats.windows += 1
+            if not self.passes_energy_gate(window, speech_flags):
+                self.stats.gated_windows += 1
+                self.last_score = 0.0
+                return False
+
+            self.last_score = self.score(window)
+            if self.last_score >= self.score_threshold:
+                self.stats.spotted_windows += 1
+                return True
+            return False
+        finally:
+            self.stats.cpu_seconds += time.thread_time() - started
+
+    def candidate_audio(self) -> np.ndarray:
+        """Recent audio to hand to Whisper for confirmation"""
+        return self._history.copy()
+
+    def reset(self):
+        """Forget buffered audio, e.g. after a confirmed detection"""
+        self._advance(self._pending.size)
+        self._history = np.zeros(0, dtype=np.float32)
+
+    def detect(self, audio: np.ndarray) -> bool:
+        """Score a whole clip from a clean state"""
+        self.reset()
+        if self.vad is not None:
+            self.vad.reset()
+            self._position = self._first_frame = 0
+        triggered = self.process(audio)
+        if not triggered and 0 < self._pending.size and audio.size < self.window_length:
+            # Clip shorter than one window: score it as-is
+            triggered = self._process_window(self._pending)
+        self.reset()
+        return triggered
+
+
+def evaluate_wake_word(detector: WakeWordDetector, folder: str,
+                       confirm: Optional[Callable[[np.ndarray], bool]] = None) -> Dict[str, float]:
+    """
+    Measure a detector against labelled WAV files.
+
+    `folder` must contain `positive/` (wake word present) and `negative/`
+    subfolders. If `confirm` is given it is applied to spotted clips, the
+    same way the agent runs Whisper.
+    """
+    root = Path(folder)
+    report = {
+        'positives': 0, 'negatives': 0,
+        'false_accepts': 0, 'false_rejects': 0,
+        'confirm_calls': 0
+    }
+    detector.stats = WakeWordStats()
+
+    for label in ('positive', 'negative'):
+        for wav_path in sorted((root / label).glob("*.wav")):
+            audio = load_wav(wav_path, detector.sample_rate)
+            accepted = detector.detect(audio)
+            if accepted and confirm is not None:
+                report['confirm_calls'] += 1
+                accepted = confirm(audio)
+
+            if label == 'positive':
+                report['positives'] += 1
+                if not accepted:
+                    report['false_rejects'] += 1
+            else:
+                report['negatives'] += 1
+                if accepted:
+                    report['false_accepts'] += 1
+
+    report['false_accept_rate'] = report['false_accepts'] / report['negatives'] if report['negatives'] else 0.0
+    report['false_reject_rate'] = report['false_rejects'] / report['positives'] if report['positives'] else 0.0
+    report.update(detector.stats.as_dict())
+    return report
+
+
+def enroll_wake_word(detector: WakeWordDetector, templates_dir: str,
+                     record: Callable[[float], Optional[np.ndarray]], samples: int = DEFAULT_ENROLL_SAMPLES,
+                     seconds: float = DEFAULT_ENROLL_SECONDS,
+                     prompt: Callable[[str], None] = print) -> List[Path]:
+    """
+    Record the wake word `samples` times and save each take as a template.
+
+    `record(seconds)` returns float32 audio at the detector's sample rate
+    (or None if recording failed). Takes without speech are asked for again,
+    up to twice as many attempts as samples. Templates are trimmed to the
+    spoken word, saved after any already in `templates_dir`, and enrolled in
+    `detector` straight away. Returns the paths written.
+    """
+    directory = Path(templates_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    saved: List[Path] = []
+    index = len(list(directory.glob("*.wav")))
+    attempts = 0
+    while len(saved) < samples and attempts < samples * 2:
+        attempts += 1
+        prompt(f"🎙️ Say the wake word ({len(saved) + 1}/{samples})...")
+        audio = record(seconds)
+        if audio is None:
+            prompt("❌ Recording failed")
+            continue
+        audio = detector._trim(audio)
+        if float(detector._level_db(audio)) <= detector.energy_threshold_db:
+            prompt("⚠️ Didn't hear anything, try again a little louder")
+            continue
+
+        while (directory / f"wake_word_{index:02d}.wav").exists():
+            index += 1
+        path = directory / f"wake_word_{index:02d}.wav"
+        save_wav(path, audio, detector.sample_rate)
+        detector.enroll(audio)
+        saved.append(path)
+    return saved
+
+
+def _enroll_from_microphone(args) -> int:
+    """Record templates from the default microphone"""
+    from core.audio.audio_capture import AudioCapture
+
+    capture = AudioCapture()
+    capture.start()
+    detector = WakeWordDetector(sample_rate=capture.sample_rate)
+
+    def record(seconds):
+        capture.skip_to_live()  # Start from the prompt, not from audio buffered while it printed
+        return capture.read(seconds).astype(np.float32) / 32768.0
+
+    try:
+        saved = enroll_wake_word(detector, args.templates, record, args.enroll, args.seconds)
+    finally:
+        capture.stop()
+    print(f"✅ Saved {len(saved)} wake word templates to {args.templates}")
+    return 0 if len(saved) == args.enroll else 1
+
+
+def main(argv=None):
+    """Record wake word templates, or evaluate the wake word stage against labelled WAV files"""
+    parser = argparse.ArgumentParser(description="Enroll or evaluate Gaia's wake word detector")
+    parser.add_argument("folder", nargs="?", help="Folder with positive/ and negative/ WAV subfolders")
+    parser.add_argument("--templates", default="wake_word_templates", help="Folder of wake word recordings")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Keyword score threshold")
+    parser.add_argument("--enroll", type=int, metavar="N",
+                        help="Record N takes of the wake word from the microphone into --templates")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_ENROLL_SECONDS,
+                        help="Seconds recorded for each take when enrolling")
+    args = parser.parse_args(argv)
+
+    if args.enroll:
+        return _enroll_from_microphone(args)
+    if not args.folder:
+        parser.error("give a folder to evaluate, or --enroll N to record templates")
+    if not os.path.isdir(args.folder):
+        print(f"❌ Folder not found: {args.folder}")
+        return 1
+
+    detector = WakeWordDetector(templates_dir=args.templates, score_threshold=args.threshold)
+    report = evaluate_wake_word(detector, args.folder)
+
+    print("\n🎙️ WAKE WORD EVALUATION")
+    print("=" * 40)
+    for key, value in report.items():
+        print(f"  {key}: {value:.3f}" if isinstance(value, float) else f"  {key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+"""
+Action Executor for Gaia
+Runs slow automation actions (Outlook COM, Office file I/O, launching
+programs) on a worker pool so the voice loop never waits on them.
+
+Actions are looked up by name in an ActionRegistry. The default registry
+wraps app_control, which is Windows-only and imported on first use; tests
+register local stand-ins under the same names instead.
+"""
+
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_TIMEOUT = 30.0
+
+
+@dataclass(frozen=True)
+class ActionSpec:
+    name: str
+    func: Callable[..., Any]
+    acknowledgement: Optional[str] = None  # Spoken straight away, e.g. "Checking your inbox."
+    description: str = ""                  # For messages, e.g. "checking your email"
+    timeout: float = DEFAULT_TIMEOUT
+    background: bool = False               # Long job (mail sync) kept off the voice workers
+
+
+@dataclass
+class ActionResult:
+    name: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    timed_out: bool = False
+    seconds: float = 0.0
+    description: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+    def speech(self) -> List[str]:
+        """What to tell the user once the action is done"""
+        what = self.description or self.name.replace("_", " ")
+        if self.timed_out:
+            return [f"Sorry, {what} is taking too long. I'll stop waiting for it."]
+        if self.error is not None:
+            return [f"Sorry, {what} failed: {self.error}"]
+        if isinstance(self.value, list):
+            return [str(item) for item in self.value] or [f"Finished {what}, nothing to report."]
+        if self.value is None:
+            return [f"Finished {what}."]
+        return [str(self.value)]
+
+
+class ActionRegistry:
+    """Name -> ActionSpec"""
+
+    def __init__(self):
+        self._actions: Dict[str, ActionSpec] = {}
+
+    def register(self, name: str, func: Callable[..., Any], acknowledgement: Optional[str] = None,
+                 description: str = "", timeout: float = DEFAULT_TIMEOUT,
+                 background: bool = False) -> ActionSpec:
+        """Add or replace an action"""
+        spec = ActionSpec(name, func, acknowledgement, description, timeout, background)
+        self._actions[name] = spec
+        return spec
+
+    def get(self, name: str) -> ActionSpec:
+        try:
+            return self._actions[name]
+        except KeyError:
+            raise KeyError(f"No action registered as '{name}'") from None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._actions
+
+    def names(self) -> List[str]:
+        return sorted(self._actions)
+
+
+def _app_control():
+    # Imported lazily: needs pywin32, openpyxl and python-docx
+    from core.automation import app_control
+    return app_control
+
+
+def _open_outlook_and_check_emails(check_inbox):
+    """Open Outlook and read out the latest emails"""
+    app_result = _app_control().open_app("outlook.exe")
+    email_result = check_inbox()
+    if isinstance(email_result, list) and email_result:
+        return [app_result, "Here are your recent emails:"] + email_result
+    return [app_result, "Outlook opened, but couldn't retrieve emails at this time."]
+
+
+def default_registry(inbox=None) -> ActionRegistry:
+    """
+    The automation actions the command parser can trigger.
+    With an Inbox (core.mail.index), emails are read from the local index
+    instead of walking Outlook on every request.
+    """
+    check_inbox = inbox.check if inbox is not None else lambda: _app_control().check_outlook_inbox()
+    registry = ActionRegistry()
+    registry.register("check_email", check_inbox,
+                      "Checking your inbox.", "checking your email", timeout=20)
+    registry.register("open_outlook", lambda: _open_outlook_and_check_emails(check_inbox),
+                      "Opening Outlook.", "opening Outlook", timeout=30)
+    registry.register("create_excel", lambda path="ai_created.xlsx": _app_control().create_excel(path),
+                      "Creating a spreadsheet.", "creating the spreadsheet", timeout=15)
+    registry.register("create_word", lambda path="ai_created.docx": _app_control().create_word_doc(path),
+                      "Creating a document.", "creating the document", timeout=15)
+    registry.register("open_app", lambda app_name="notepad.exe": _app_control().open_app(app_name),
+                      None, "opening the program", timeout=10)
+    if inbox is not None:
+        registry.register("sync_email", inbox.sync, None, "syncing your email", timeout=300,
+                          background=True)
+    return registry
+
+
+def _init_worker():
+    """COM needs initialising on every thread that uses it"""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pass
+
+
+class PendingAction:
+    """
+    Handle for a submitted action.
+
+    Resolves to an ActionResult exactly once: when the action finishes or
+    when its timeout passes, whichever comes first. The timeout counts from
+    when a worker starts the action, not from when it was queued. A
+    timed-out action keeps its worker until it returns, but its result is
+    discarded.
+    """
+
+    def __init__(self, spec: ActionSpec, timeout: float):
+        self.spec = spec
+        self.timeout = timeout
+        self.future: Future = Future()
+        self.future.set_running_or_notify_cancel()
+        self._started: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    @property
+    def acknowledgement(self) -> Optional[str]:
+        return self.spec.acknowledgement
+
+    def _resolve(self, **fields) -> bool:
+        with self._lock:
+            if self.future.done():
+                return False
+            seconds = time.perf_counter() - self._started if self._started is not None else 0.0
+            self.future.set_result(ActionResult(self.spec.name, seconds=seconds,
+                                                description=self.spec.description, **fields))
+            if self._timer is not None:
+                self._timer.cancel()
+            return True
+
+    def _run(self, *args, **kwargs):
+        """Call the action on a worker thread, starting its timeout clock"""
+        with self._lock:
+            self._started = time.perf_counter()
+            self._timer = threading.Timer(self.timeout, lambda: self._resolve(timed_out=True))
+            self._timer.daemon = True
+            self._timer.start()
+        return self.spec.func(*args, **kwargs)
+
+    def add_done_callback(self, callback: Callable[[ActionResult], None]):
+        """callback(result); runs on the worker or timer thread"""
+        self.future.add_done_callback(lambda future: callback(future.result()))
+
+    def result(self, timeout: Optional[float] = None) -> ActionResult:
+        return self.future.result(timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+
+class ActionExecutor:
+    """
+    Worker pool with per-action timeouts. Background actions get a single
+    worker of their own, so a long mail sync never holds up a voice command.
+    """
+
+    def __init__(self, registry: Optional[ActionRegistry] = None, max_workers: int = 2):
+        self.registry = registry or default_registry()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="GaiaAction",
+                                        initializer=_init_worker)
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="GaiaBackground",
+                                              initializer=_init_worker)
+
+    def submit(self, name: str, *args, timeout: Optional[float] = None, **kwargs) -> PendingAction:
+        """Start an action and return at once"""
+        spec = self.registry.get(name)
+        pending = PendingAction(spec, timeout if timeout is not None else spec.timeout)
+        pool = self._background if spec.background else self._pool
+        inner = pool.submit(pending._run, *args, **kwargs)
+
+        def finished(future: Future):
+            # Still queued at shutdown: never ran, so no timer is running either
+            error = CancelledError() if future.cancelled() else future.exception()
+            if error is not None:
+                pending._resolve(error=error)
+            else:
+                pending._resolve(value=future.result())
+
+        inner.add_done_callback(finished)
+        return pending
+
+    def run(self, name: str, *args, timeout: Optional[float] = None, **kwargs) -> ActionResult:
+        """Run an action and wait for its result (or its timeout)"""
+        return self.submit(name, *args, timeout=timeout, **kwargs).result()
+
+    def shutdown(self, wait: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        self._background.shutdown(wait=wait, cancel_futures=True)
@@ -4,6 +4,9 @@ Core hotel operations and email processing
 """
 
 from .hotel_manager import HotelManager, HotelRoom, EmailSummary, RoomStatus, GuestStatus
+from .reservations import Reservation, ReservationBook, ReservationConflict
+from .storage import HotelStore, JsonHotelStore, SQLiteHotelStore
+from .summary import HotelEvent, HotelSummary
 from .email_classifier import HotelEmailClassifier, EmailClassification, EmailCategory, EmailPriority
 
 __all__ = [
@@ -12,6 +15,14 @@ __all__ = [
     'EmailSummary',
     'RoomStatus',
     'GuestStatus',
+    'Reservation',
+    'ReservationBook',
+    'ReservationConflict',
+    'HotelStore',
+    'JsonHotelStore',
+    'SQLiteHotelStore',
+    'HotelEvent',
+    'HotelSummary',
     'HotelEmailClassifier',
     'EmailClassification',
     'EmailCategory',
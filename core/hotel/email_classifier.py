@@ -4,9 +4,14 @@ AI-powered email classification for hotel business operations
 """
 
 import re
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from enum import Enum
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
+
+from core.utils.aho_corasick import AhoCorasick
 
 
 class EmailCategory(Enum):
@@ -38,14 +43,67 @@ class EmailClassification:
     booking_reference: Optional[str] = None
     guest_name: Optional[str] = None
     recommended_action: str = ""
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, enums as their values"""
+        return {
+            'category': self.category.value,
+            'priority': self.priority.value,
+            'confidence': self.confidence,
+            'booking_reference': self.booking_reference,
+            'guest_name': self.guest_name,
+            'recommended_action': self.recommended_action
+        }
+
+
+# (literal the pattern needs in the lowered text, pattern); the cheap
+# substring test skips regex scans that cannot match
+BOOKING_REFERENCE_PATTERNS = [
+    (literal, re.compile(pattern, re.IGNORECASE)) for literal, pattern in (
+        ('booking', r'booking\s*(?:ref|reference|number|#)?\s*:?\s*([A-Z0-9]{6,12})'),
+        ('confirmation', r'confirmation\s*(?:number|#)?\s*:?\s*([A-Z0-9]{6,12})'),
+        ('reference', r'reference\s*(?:number|#)?\s*:?\s*([A-Z0-9]{6,12})'),
+        ('#', r'#([A-Z0-9]{6,12})')
+    )
+]
+
+GUEST_NAME_PATTERNS = [
+    (literal, re.compile(pattern, re.IGNORECASE)) for literal, pattern in (
+        ('dear', r'dear\s+([A-Z][a-z]+\s+[A-Z][a-z]+)'),
+        ('mr', r'mr\.?\s+([A-Z][a-z]+)'),
+        ('mrs', r'mrs\.?\s+([A-Z][a-z]+)'),
+        ('ms', r'ms\.?\s+([A-Z][a-z]+)'),
+        ('guest', r'guest:?\s*([A-Z][a-z]+\s+[A-Z][a-z]+)')
+    )
+]
+
+# Distinct words remembered with the keywords they contain
+TOKEN_CACHE_SIZE = 50000
+
+# Extra words the priority rules look for
+PRIORITY_WORDS = ['overdue', 'urgent', 'confirm', 'today', 'tomorrow']
+
+# Emails sent to a worker process at a time by classify_batch
+BATCH_CHUNK_SIZE = 500
+
+# Probability at which a learned model's category replaces the keyword rules'
+MODEL_THRESHOLD = 0.8
 
 
 class HotelEmailClassifier:
     """
     Intelligent email classifier for hotel operations
+    
+    Categories come from keyword rules. Given a learned model (an
+    EmailModel, or anything with predict_proba and classes), the model's
+    category is used instead wherever its probability reaches
+    model_threshold.
     """
     
-    def __init__(self):
+    def __init__(self, model=None, model_threshold: float = MODEL_THRESHOLD):
+        self.model = model
+        self.model_threshold = model_threshold
+        
         self.booking_keywords = [
             'booking', 'reservation', 'confirm', 'check-in', 'check-out',
             'arrival', 'departure', 'stay', 'guest', 'room', 'nights'
@@ -70,13 +128,165 @@ class HotelEmailClassifier:
             'urgent', 'emergency', 'asap', 'immediate', 'critical',
             'important', 'rush', 'priority', 'leak', 'fire', 'security'
         ]
+        
+        self.spam_indicators = [
+            'viagra', 'casino', 'lottery', 'winner', 'congratulations',
+            'free money', 'click here', 'limited time', 'act now',
+            'make money fast', 'weight loss', 'debt free'
+        ]
+        
+        self.marketing_indicators = [
+            'unsubscribe', 'newsletter', 'promotion', 'sale', 'discount',
+            'offer', 'deal', 'special price', 'limited offer', 'subscribe'
+        ]
+        
+        self.compile()
+    
+    def compile(self):
+        """
+        Index every keyword list so an email is scored in one pass instead
+        of one substring scan per keyword. Call again after changing the lists.
+        """
+        self._keyword_sets = {
+            'booking': self.booking_keywords,
+            'invoice': self.invoice_keywords,
+            'complaint': self.complaint_keywords,
+            'supplier': self.supplier_keywords,
+            'urgent': self.urgent_keywords,
+            'spam': self.spam_indicators,
+            'marketing': self.marketing_indicators,
+            'priority': PRIORITY_WORDS,
+        }
+        # A keyword without spaces can only occur inside one whitespace
+        # separated word, so the automaton runs once per distinct word and
+        # the answer is cached. Phrases ("bad service") are checked against
+        # the whole text.
+        automaton: AhoCorasick = AhoCorasick(word_boundaries=False)
+        self._phrases: List[Tuple[str, str]] = []
+        for group, keywords in self._keyword_sets.items():
+            for keyword in keywords:
+                if keyword.split() == [keyword]:
+                    automaton.add(keyword, (group, keyword))
+                else:
+                    self._phrases.append((group, keyword))
+        self._automaton = automaton.build()
+        self._token_hits: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        self._plain_tokens: Set[str] = set()
+    
+    def _scan_token(self, token: str) -> Tuple[Tuple[str, str], ...]:
+        """(group, keyword) pairs contained in a word, remembered for next time"""
+        if len(self._token_hits) + len(self._plain_tokens) >= TOKEN_CACHE_SIZE:
+            self._token_hits.clear()
+            self._plain_tokens.clear()
+        found = tuple({match.value for match in self._automaton.iter_matches(token)})
+        if found:
+            self._token_hits[token] = found
+        else:
+            self._plain_tokens.add(token)
+        return found
+    
+    def _keyword_hits(self, text: str) -> Dict[str, Set[str]]:
+        """Distinct keywords found per list, with the same substring semantics as `keyword in text`"""
+        hits: Dict[str, Set[str]] = {group: set() for group in self._keyword_sets}
+        token_hits = self._token_hits
+        # Words already known to hold no keyword drop out in one set operation
+        for token in set(text.split()) - self._plain_tokens:
+            found = token_hits.get(token)
+            if found is None:
+                found = self._scan_token(token)
+            for group, keyword in found:
+                hits[group].add(keyword)
+        for group, keyword in self._phrases:
+            if keyword in text:
+                hits[group].add(keyword)
+        return hits
+    
+    def __getstate__(self):
+        # Sent to worker processes; the word caches are rebuilt there
+        state = self.__dict__.copy()
+        state['_token_hits'] = {}
+        state['_plain_tokens'] = set()
+        return state
+    
+    def classify_batch(self, emails: Iterable[Dict[str, Any]], processes: int = 0, ordered: bool = True,
+                       chunk_size: int = BATCH_CHUNK_SIZE) -> Iterator[Tuple[Dict[str, Any], EmailClassification]]:
+        """
+        Classify email dicts (subject, content, sender) as they are read,
+        yielding (email, classification) pairs.
+        
+        With processes > 1 the emails are classified in chunks on a process
+        pool, each worker holding a copy of this classifier. Results come
+        back in input order, or as chunks finish when ordered is False. At
+        most two chunks per worker are in flight, so any size of input
+        streams through in bounded memory.
+        """
+        emails = iter(emails)
+        if processes <= 1:
+            # Chunked so a learned model scores many emails per call
+            for chunk in iter(lambda: list(islice(emails, chunk_size)), []):
+                yield from zip(chunk, self.classify_many([_email_fields(email_data) for email_data in chunk]))
+            return
+        
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(self,)) as pool:
+            pending = deque()
+            
+            def submit_next() -> bool:
+                chunk = list(islice(emails, chunk_size))
+                if not chunk:
+                    return False
+                future = pool.submit(_classify_chunk, [_email_fields(email_data) for email_data in chunk])
+                pending.append((future, chunk))
+                return True
+            
+            try:
+                while len(pending) < processes * 2 and submit_next():
+                    pass
+                while pending:
+                    if ordered:
+                        future, chunk = pending.popleft()
+                    else:
+                        wait([future for future, _ in pending], return_when=FIRST_COMPLETED)
+                        index = next(i for i, (future, _) in enumerate(pending) if future.done())
+                        future, chunk = pending[index]
+                        del pending[index]
+                    results = future.result()
+                    submit_next()
+                    yield from zip(chunk, results)
+            finally:
+                # Stopped early: don't classify chunks nobody will read
+                for future, _ in pending:
+                    future.cancel()
     
     def classify_email(self, subject: str, content: str, sender: str = "") -> EmailClassification:
         """
         Classify an email based on subject, content, and sender
         """
+        return self.classify_many([(subject, content, sender)])[0]
+    
+    def classify_many(self, emails: List[Tuple[str, str, str]]) -> List[EmailClassification]:
+        """Classify (subject, content, sender) tuples, scoring them with the model in one call"""
+        guesses = self._model_guesses(emails)
+        return [self._classify(*fields, guess) for fields, guess in zip(emails, guesses)]
+    
+    def _model_guesses(self, emails: List[Tuple[str, str, str]]) -> List[Optional[Tuple[EmailCategory, float]]]:
+        """The model's category and probability per email, None where it is below the threshold"""
+        if self.model is None or not emails:
+            return [None] * len(emails)
+        probabilities = self.model.predict_proba(
+            [{'subject': subject, 'content': content, 'sender': sender} for subject, content, sender in emails])
+        guesses = []
+        for row in probabilities:
+            index = int(row.argmax())
+            probability = float(row[index])
+            guesses.append((self.model.classes[index], probability) if probability >= self.model_threshold else None)
+        return guesses
+    
+    def _classify(self, subject: str, content: str, sender: str,
+                  model_guess: Optional[Tuple[EmailCategory, float]] = None) -> EmailClassification:
         # Combine all text for analysis
         full_text = f"{subject} {content} {sender}".lower()
+        hits = self._keyword_hits(full_text)
         
         # Extract potential booking reference
         booking_ref = self._extract_booking_reference(full_text)
@@ -84,11 +294,11 @@ class HotelEmailClassifier:
         # Extract guest name
         guest_name = self._extract_guest_name(subject, content)
         
-        # Determine category and confidence
-        category, confidence = self._categorize_email(full_text)
+        # Determine category and confidence; a confident model overrides the rules
+        category, confidence = model_guess or self._categorize_email(hits)
         
         # Determine priority
-        priority = self._determine_priority(full_text, category)
+        priority = self._determine_priority(hits, category)
         
         # Generate recommended action
         action = self._generate_action(category, priority, subject)
@@ -102,63 +312,63 @@ class HotelEmailClassifier:
             recommended_action=action
         )
     
-    def _categorize_email(self, text: str) -> tuple[EmailCategory, float]:
+    def _categorize_email(self, hits: Dict[str, Set[str]]) -> Tuple[EmailCategory, float]:
         """Categorize email based on content analysis"""
         
         # Check for booking-related content
-        booking_score = self._calculate_keyword_score(text, self.booking_keywords)
+        booking_score = self._calculate_keyword_score(hits['booking'], self.booking_keywords)
         if booking_score > 0.3:
             return EmailCategory.BOOKING, booking_score
         
         # Check for invoice-related content
-        invoice_score = self._calculate_keyword_score(text, self.invoice_keywords)
+        invoice_score = self._calculate_keyword_score(hits['invoice'], self.invoice_keywords)
         if invoice_score > 0.4:
             return EmailCategory.INVOICE, invoice_score
         
         # Check for complaint-related content
-        complaint_score = self._calculate_keyword_score(text, self.complaint_keywords)
+        complaint_score = self._calculate_keyword_score(hits['complaint'], self.complaint_keywords)
         if complaint_score > 0.2:
             return EmailCategory.COMPLAINT, complaint_score
         
         # Check for supplier-related content
-        supplier_score = self._calculate_keyword_score(text, self.supplier_keywords)
+        supplier_score = self._calculate_keyword_score(hits['supplier'], self.supplier_keywords)
         if supplier_score > 0.3:
             return EmailCategory.SUPPLIER, supplier_score
         
         # Check for spam indicators
-        if self._is_likely_spam(text):
+        if len(hits['spam']) >= 2:
             return EmailCategory.SPAM, 0.8
         
         # Check for marketing
-        if self._is_marketing_email(text):
+        if len(hits['marketing']) >= 2:
             return EmailCategory.MARKETING, 0.7
         
         # Default to inquiry
         return EmailCategory.INQUIRY, 0.5
     
-    def _calculate_keyword_score(self, text: str, keywords: List[str]) -> float:
+    def _calculate_keyword_score(self, matched: Set[str], keywords: List[str]) -> float:
         """Calculate keyword matching score"""
-        matches = sum(1 for keyword in keywords if keyword in text)
-        return min(matches / len(keywords) * 2, 1.0)
+        return min(len(matched) / len(keywords) * 2, 1.0)
     
-    def _determine_priority(self, text: str, category: EmailCategory) -> EmailPriority:
+    def _determine_priority(self, hits: Dict[str, Set[str]], category: EmailCategory) -> EmailPriority:
         """Determine email priority based on content and category"""
         
         # Check for urgent keywords
-        if any(urgent in text for urgent in self.urgent_keywords):
+        if hits['urgent']:
             return EmailPriority.CRITICAL
         
         # Category-based priority rules
         if category == EmailCategory.COMPLAINT:
             return EmailPriority.CRITICAL
         
+        words = hits['priority']
         if category == EmailCategory.INVOICE:
-            if 'overdue' in text or 'urgent' in text:
+            if 'overdue' in words or 'urgent' in words:
                 return EmailPriority.CRITICAL
             return EmailPriority.HIGH
         
         if category == EmailCategory.BOOKING:
-            if 'confirm' in text or 'today' in text or 'tomorrow' in text:
+            if 'confirm' in words or 'today' in words or 'tomorrow' in words:
                 return EmailPriority.HIGH
             return EmailPriority.MEDIUM
         
@@ -173,15 +383,11 @@ class HotelEmailClassifier:
     
     def _extract_booking_reference(self, text: str) -> Optional[str]:
         """Extract booking reference numbers from email text"""
-        patterns = [
-            r'booking\s*(?:ref|reference|number|#)?\s*:?\s*([A-Z0-9]{6,12})',
-            r'confirmation\s*(?:number|#)?\s*:?\s*([A-Z0-9]{6,12})',
-            r'reference\s*(?:number|#)?\s*:?\s*([A-Z0-9]{6,12})',
-            r'#([A-Z0-9]{6,12})'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        lowered = text.lower()
+        for literal, pattern in BOOKING_REFERENCE_PATTERNS:
+            if literal not in lowered:
+                continue
+            match = pattern.search(text)
             if match:
                 return match.group(1)
         
@@ -190,43 +396,17 @@ class HotelEmailClassifier:
     def _extract_guest_name(self, subject: str, content: str) -> Optional[str]:
         """Extract guest name from email"""
         # Look for common name patterns
-        patterns = [
-            r'dear\s+([A-Z][a-z]+\s+[A-Z][a-z]+)',
-            r'mr\.?\s+([A-Z][a-z]+)',
-            r'mrs\.?\s+([A-Z][a-z]+)',
-            r'ms\.?\s+([A-Z][a-z]+)',
-            r'guest:?\s*([A-Z][a-z]+\s+[A-Z][a-z]+)'
-        ]
-        
         full_text = f"{subject} {content}"
-        for pattern in patterns:
-            match = re.search(pattern, full_text, re.IGNORECASE)
+        lowered = full_text.lower()
+        for literal, pattern in GUEST_NAME_PATTERNS:
+            if literal not in lowered:
+                continue
+            match = pattern.search(full_text)
             if match:
                 return match.group(1)
         
         return None
     
-    def _is_likely_spam(self, text: str) -> bool:
-        """Check if email is likely spam"""
-        spam_indicators = [
-            'viagra', 'casino', 'lottery', 'winner', 'congratulations',
-            'free money', 'click here', 'limited time', 'act now',
-            'make money fast', 'weight loss', 'debt free'
-        ]
-        
-        spam_count = sum(1 for indicator in spam_indicators if indicator in text)
-        return spam_count >= 2
-    
-    def _is_marketing_email(self, text: str) -> bool:
-        """Check if email is marketing/promotional"""
-        marketing_indicators = [
-            'unsubscribe', 'newsletter', 'promotion', 'sale', 'discount',
-            'offer', 'deal', 'special price', 'limited offer', 'subscribe'
-        ]
-        
-        marketing_count = sum(1 for indicator in marketing_indicators if indicator in text)
-        return marketing_count >= 2
-    
     def _generate_action(self, category: EmailCategory, priority: EmailPriority, subject: str) -> str:
         """Generate recommended action based on classification"""
         subject_snippet = subject[:30]
@@ -265,4 +445,24 @@ class HotelEmailClassifier:
         elif category == EmailCategory.SUPPLIER:
             return f"MEDIUM: Review supplier communication - {subject_snippet}"
         else:
-            return f"MEDIUM: Review email when convenient - {subject_snippet}"
\ No newline at end of file
+            return f"MEDIUM: Review email when convenient - {subject_snippet}"
+
+
+def _email_fields(email_data: Dict[str, Any]) -> Tuple[str, str, str]:
+    """classify_email arguments from an email dict"""
+    return (email_data.get('subject', '') or '', email_data.get('content', '') or '',
+            email_data.get('sender', '') or '')
+
+
+# Classifier held by each classify_batch worker process
+_worker_classifier: Optional[HotelEmailClassifier] = None
+
+
+def _init_worker(classifier: HotelEmailClassifier):
+    global _worker_classifier
+    _worker_classifier = classifier
+
+
+def _classify_chunk(chunk: List[Tuple[str, str, str]]) -> List[EmailClassification]:
+    return _worker_classifier.classify_many(chunk)
+
@@ -0,0 +1,314 @@
+"""
+Learned Email Classifier
+Multinomial naive Bayes over hashed word and word-pair features, trained
+from labelled emails across the EmailCategory values, so the hotel's own
+mail can teach it what the fixed keyword rules miss.
+
+A saved model is a directory holding meta.json, weights.npy (per-feature
+log probabilities, loaded memory-mapped for inference) and counts.npy
+(the raw counts partial_fit keeps adding to).
+"""
+
+import json
+import os
+import random
+import re
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.hotel.email_classifier import EmailCategory, HotelEmailClassifier
+from core.mail.ingest import iter_records
+
+DEFAULT_MODEL_PATH = Path.home() / ".cache" / "gaia" / "email_model"
+DEFAULT_TRAINING_PATH = Path.home() / ".cache" / "gaia" / "email_training.jsonl"
+
+# Hashed feature space; collisions are rare at this size for a hotel inbox
+DEFAULT_FEATURES = 1 << 18
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Distinct words remembered with their hashed feature id
+TOKEN_CACHE_SIZE = 200000
+
+# Mixes two word ids into a word-pair feature id
+_PAIR_MULTIPLIER = 0x9E3779B1
+
+Label = Union[EmailCategory, str]
+
+
+def parse_category(value: Label) -> EmailCategory:
+    """EmailCategory from an enum, a value ("booking") or a name ("BOOKING")"""
+    if isinstance(value, EmailCategory):
+        return value
+    text = str(value).strip().lower()
+    for category in EmailCategory:
+        if text == category.value:
+            return category
+    raise ValueError(f"Unknown email category '{value}'; expected one of "
+                     f"{', '.join(category.value for category in EmailCategory)}")
+
+
+def _email_text(email_data: Dict[str, Any]) -> str:
+    return (f"{email_data.get('subject', '') or ''} {email_data.get('content', '') or ''} "
+            f"{email_data.get('sender', '') or ''}").lower()
+
+
+class EmailModel:
+    """
+    Naive Bayes email classifier over hashed features.
+    Emails are dicts with subject, content and sender, as everywhere else.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES, alpha: float = 1.0,
+                 classes: Sequence[EmailCategory] = tuple(EmailCategory)):
+        self.n_features = n_features
+        self.alpha = alpha
+        self.classes = list(classes)
+        self.class_counts = np.zeros(len(self.classes), dtype=np.int64)
+        self.feature_counts = np.zeros((len(self.classes), n_features), dtype=np.float32)
+        self.trained_at: Optional[str] = None
+        self.metrics: Dict[str, Any] = {}  # Last evaluation, kept with the saved model
+        self._class_index = {category: index for index, category in enumerate(self.classes)}
+        self._weights: Optional[np.ndarray] = None
+        self._token_ids: Dict[str, int] = {}
+
+    @property
+    def examples(self) -> int:
+        return int(self.class_counts.sum())
+
+    # ----- features ---------------------------------------------------------
+
+    def _token_id(self, token: str) -> int:
+        # crc32 rather than hash(): ids must not change between runs
+        if len(self._token_ids) >= TOKEN_CACHE_SIZE:
+            self._token_ids.clear()
+        index = self._token_ids[token] = zlib.crc32(token.encode('utf-8')) % self.n_features
+        return index
+
+    def features(self, emails: Iterable[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Hashed features of a batch as parallel (row, feature id) arrays, one
+        entry per occurrence, plus the number of emails. Each email yields
+        its words and each pair of neighbouring words.
+        """
+        token_ids = self._token_ids
+        ids: List[int] = []
+        lengths: List[int] = []
+        for email_data in emails:
+            tokens = TOKEN_PATTERN.findall(_email_text(email_data))
+            for token in tokens:
+                index = token_ids.get(token)
+                ids.append(index if index is not None else self._token_id(token))
+            lengths.append(len(tokens))
+
+        count = len(lengths)
+        words = np.array(ids, dtype=np.int64)
+        rows = np.repeat(np.arange(count), lengths)
+        same_email = rows[1:] == rows[:-1]
+        pairs = (words[:-1][same_email] * _PAIR_MULTIPLIER + words[1:][same_email] + 1) % self.n_features
+        return np.concatenate([rows, rows[1:][same_email]]), np.concatenate([words, pairs]), count
+
+    # ----- training ---------------------------------------------------------
+
+    def partial_fit(self, emails: Iterable[Dict[str, Any]], labels: Iterable[Label]) -> "EmailModel":
+        """Add labelled emails to the counts; can be called any number of times"""
+        labels = np.array([self._class_index[parse_category(label)] for label in labels], dtype=np.int64)
+        rows, ids, count = self.features(emails)
+        if count != len(labels):
+            raise ValueError(f"Got {count} emails but {len(labels)} labels")
+        if not self.feature_counts.flags.writeable:
+            # Loaded memory-mapped: take a private copy before updating
+            self.feature_counts = np.array(self.feature_counts)
+        np.add.at(self.feature_counts, (labels[rows], ids), 1)
+        self.class_counts += np.bincount(labels, minlength=len(self.classes))
+        self.trained_at = datetime.now().isoformat(timespec='seconds')
+        self._weights = None
+        return self
+
+    def fit(self, emails: Iterable[Dict[str, Any]], labels: Iterable[Label]) -> "EmailModel":
+        """Train from scratch"""
+        self.class_counts[:] = 0
+        self.feature_counts = np.zeros((len(self.classes), self.n_features), dtype=np.float32)
+        self.metrics = {}
+        return self.partial_fit(emails, labels)
+
+    @property
+    def weights(self) -> np.ndarray:
+        """log P(feature | class), laid out (feature, class) so a batch gathers whole rows"""
+        if self._weights is None:
+            smoothed = self.feature_counts.astype(np.float64) + self.alpha
+            log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+            self._weights = np.ascontiguousarray(log_prob.T, dtype=np.float32)
+        return self._weights
+
+    def _log_prior(self) -> np.ndarray:
+        if not self.examples:
+            raise RuntimeError("Email model has not been trained")
+        with np.errstate(divide='ignore'):
+            # Classes never seen in training can't be predicted
+            return np.log(self.class_counts / self.examples)
+
+    # ----- inference --------------------------------------------------------
+
+    def decision_function(self, emails: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """Joint log likelihood per email and class, shape (emails, classes)"""
+        log_prior = self._log_prior()
+        rows, ids, count = self.features(emails)
+        contributions = self.weights[ids]
+        scores = np.empty((count, len(self.classes)))
+        for column in range(len(self.classes)):
+            scores[:, column] = np.bincount(rows, weights=contributions[:, column], minlength=count)
+        return scores + log_prior
+
+    def predict_proba(self, emails: Iterable[Dict[str, Any]]) -> np.ndarray:
+        scores = self.decision_function(emails)
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, emails: Iterable[Dict[str, Any]]) -> List[EmailCategory]:
+        return [self.classes[index] for index in self.decision_function(emails).argmax(axis=1)]
+
+    def classify(self, email_data: Dict[str, Any]) -> Tuple[EmailCategory, float]:
+        """Category and its probability for one email"""
+        probabilities = self.predict_proba([email_data])[0]
+        index = int(probabilities.argmax())
+        return self.classes[index], float(probabilities[index])
+
+    def score(self, emails: Sequence[Dict[str, Any]], labels: Sequence[Label]) -> float:
+        """Accuracy on labelled emails"""
+        predicted = self.predict(emails)
+        return sum(p == parse_category(l) for p, l in zip(predicted, labels)) / max(len(predicted), 1)
+
+    # ----- persistence ------------------------------------------------------
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        # Replace files rather than overwrite them: a loaded model may still map the old ones
+        for name, array in (('weights.npy', self.weights), ('counts.npy', self.feature_counts)):
+            temp_path = path / f"{name}.tmp"
+            with open(temp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(temp_path, path / name)
+        meta = {
+            'classes': [category.value for category in self.classes],
+            'n_features': self.n_features,
+            'alpha': self.alpha,
+            'class_counts': self.class_counts.tolist(),
+            'trained_at': self.trained_at,
+            'metrics': self.metrics
+        }
+        (path / 'meta.json').write_text(json.dumps(meta, indent=2), encoding='utf-8')
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH, mmap: bool = True) -> "EmailModel":
+        """Saved model; with mmap the arrays are paged in from disk as inference touches them"""
+        path = Path(path)
+        meta = json.loads((path / 'meta.json').read_text(encoding='utf-8'))
+        model = cls(meta['n_features'], meta['alpha'], [EmailCategory(value) for value in meta['classes']])
+        mmap_mode = 'r' if mmap else None
+        model._weights = np.load(path / 'weights.npy', mmap_mode=mmap_mode)
+        model.feature_counts = np.load(path / 'counts.npy', mmap_mode=mmap_mode)
+        model.class_counts = np.array(meta['class_counts'], dtype=np.int64)
+        model.trained_at = meta.get('trained_at')
+        model.metrics = meta.get('metrics', {})
+        return model
+
+    @staticmethod
+    def exists(path=DEFAULT_MODEL_PATH) -> bool:
+        return (Path(path) / 'meta.json').exists()
+
+
+def saved_model(path=DEFAULT_MODEL_PATH) -> Optional[EmailModel]:
+    """The model saved at path, memory-mapped, or None if none has been trained"""
+    return EmailModel.load(path) if EmailModel.exists(path) else None
+
+
+# ----- training data --------------------------------------------------------
+
+def load_examples(path=DEFAULT_TRAINING_PATH) -> Tuple[List[Dict[str, Any]], List[EmailCategory], int]:
+    """
+    Labelled emails from a JSON, JSONL or CSV file with a "category" (or
+    "label") field. Returns emails, labels and how many rows were skipped
+    for a missing or unknown category.
+    """
+    emails: List[Dict[str, Any]] = []
+    labels: List[EmailCategory] = []
+    skipped = 0
+    if not Path(path).exists():
+        return emails, labels, skipped
+    for record in iter_records(path):
+        try:
+            label = parse_category(record.get('category') or record.get('label') or '')
+        except ValueError:
+            skipped += 1
+            continue
+        emails.append({
+            'subject': record.get('subject', '') or '',
+            'content': record.get('content', record.get('body', '')) or '',
+            'sender': record.get('sender', record.get('from', '')) or ''
+        })
+        labels.append(label)
+    return emails, labels, skipped
+
+
+def append_examples(emails: Iterable[Dict[str, Any]], labels: Iterable[Label],
+                    path=DEFAULT_TRAINING_PATH) -> int:
+    """Add labelled emails to the training file (JSONL); returns how many were written"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(path, 'a', encoding='utf-8') as f:
+        for email_data, label in zip(emails, labels):
+            record = {
+                'subject': email_data.get('subject', '') or '',
+                'content': email_data.get('content', '') or '',
+                'sender': email_data.get('sender', '') or '',
+                'category': parse_category(label).value
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            written += 1
+    return written
+
+
+def split_examples(emails: Sequence[Dict[str, Any]], labels: Sequence[Label], test_fraction: float = 0.2,
+                   seed: int = 0) -> Tuple[List, List, List, List]:
+    """Shuffled (train emails, train labels, test emails, test labels)"""
+    order = list(range(len(emails)))
+    random.Random(seed).shuffle(order)
+    cut = len(order) - int(len(order) * test_fraction)
+    train, test = order[:cut], order[cut:]
+    return ([emails[i] for i in train], [labels[i] for i in train],
+            [emails[i] for i in test], [labels[i] for i in test])
+
+
+def compare_with_rules(model: EmailModel, emails: Sequence[Dict[str, Any]], labels: Sequence[Label],
+                       rules: Optional[HotelEmailClassifier] = None) -> Dict[str, Any]:
+    """Accuracy and emails/s of the model and of the keyword rules on the same labelled emails"""
+    rules = rules or HotelEmailClassifier()
+    expected = [parse_category(label) for label in labels]
+
+    start = time.perf_counter()
+    rule_predictions = [classification.category for _, classification in rules.classify_batch(emails)]
+    rule_seconds = time.perf_counter() - start
+
+    model.weights  # Derived from the counts once after training; not part of per-batch cost
+    start = time.perf_counter()
+    model_predictions = model.predict(emails)
+    model_seconds = time.perf_counter() - start
+
+    count = max(len(expected), 1)
+    return {
+        'examples': len(expected),
+        'model_accuracy': sum(p == e for p, e in zip(model_predictions, expected)) / count,
+        'rules_accuracy': sum(p == e for p, e in zip(rule_predictions, expected)) / count,
+        'model_emails_per_second': len(expected) / model_seconds if model_seconds else 0.0,
+        'rules_emails_per_second': len(expected) / rule_seconds if rule_seconds else 0.0,
+        'evaluated_at': datetime.now().isoformat(timespec='seconds')
+    }
@@ -1,48 +1,17 @@
 """
 Hotel Management System
-Comprehensive hotel operations management for 8-bedroom boutique hotel
+Comprehensive hotel operations management for boutique hotels
 """
 
-import json
-import os
-from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Any, Optional
-from enum import Enum
+from datetime import date, datetime, timedelta
+from dataclasses import dataclass
+from typing import List, Dict, Any, Callable, Iterable, Optional
 
-
-class RoomStatus(Enum):
-    """Room status enumeration"""
-    AVAILABLE = "available"
-    OCCUPIED = "occupied"
-    CLEANING = "cleaning"
-    MAINTENANCE = "maintenance"
-    OUT_OF_ORDER = "out_of_order"
-
-
-class GuestStatus(Enum):
-    """Guest status enumeration"""
-    CHECKED_IN = "checked_in"
-    CHECKED_OUT = "checked_out"
-    EXPECTED = "expected"
-    NO_SHOW = "no_show"
-
-
-@dataclass
-class HotelRoom:
-    """Hotel room data structure"""
-    room_number: str
-    room_type: str
-    status: RoomStatus
-    guest_name: str = ""
-    check_in_date: Optional[str] = None
-    check_out_date: Optional[str] = None
-    rate_per_night: float = 0.0
-    special_requests: Optional[List[str]] = None
-    
-    def __post_init__(self):
-        if self.special_requests is None:
-            self.special_requests = []
+from .journal import DEFAULT_COMPACT_EVERY, write_snapshot
+from .reservations import Reservation, ReservationBook, parse_date
+from .rooms import GuestStatus, HotelRoom, RoomStatus, default_rooms
+from .storage import HotelStore, JsonHotelStore, snapshot_data
+from .summary import HotelEvent, HotelSummary
 
 
 @dataclass
@@ -65,228 +34,304 @@ class HotelManager:
     Comprehensive hotel management system for boutique hotel operations
     """
     
-    def __init__(self, hotel_name: str = "Boutique Hotel", total_rooms: int = 8):
+    def __init__(self, hotel_name: str = "Boutique Hotel", total_rooms: int = 8,
+                 data_file: str = "hotel_data.json", journal: bool = True,
+                 compact_every: int = DEFAULT_COMPACT_EVERY, store: Optional[HotelStore] = None):
         self.hotel_name = hotel_name
-        self.total_rooms = total_rooms
-        self.rooms: Dict[str, HotelRoom] = {}
-        self.data_file = "hotel_data.json"
+        self.total_rooms = total_rooms  # Rooms created for a new hotel
+        self.email_settings: Dict[str, Any] = {}
+        self.email_classifier = None  # Built on first process_emails call unless one is assigned
+        self.reservations = ReservationBook()
+        # Occupancy, status counts and revenue, updated on every room change
+        self.summary = HotelSummary()
+        
+        # Rooms live in hotel_data.json (with its journal) unless another store
+        # is given, e.g. SQLiteHotelStore for larger or multi-property setups
+        self.store = store or JsonHotelStore(data_file, journal=journal, compact_every=compact_every)
+        self.data_file = self.store.path
         
         # Initialize hotel data
         self.load_hotel_data()
     
+    @property
+    def rooms(self) -> Dict[str, HotelRoom]:
+        """All rooms by number"""
+        return self.store.all_rooms()
+    
+    @property
+    def journal(self):
+        """The JSON store's change journal, if there is one"""
+        return getattr(self.store, 'journal', None)
+    
     def load_hotel_data(self):
-        """Load hotel data from JSON file with refactored helper methods"""
-        try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Load hotel settings
-                self._load_hotel_settings(data)
-                
-                # Load room data
-                self._load_room_data(data)
-                
-                # Load email data if available
-                self._load_email_data(data)
-                
-            else:
-                self._initialize_default_rooms()
-                self.save_hotel_data()
-                
-        except Exception as e:
-            print(f"Error loading hotel data: {e}")
-            self._initialize_default_rooms()
-    
-    def _load_hotel_settings(self, data: Dict[str, Any]):
-        """Load hotel settings from data"""
-        self.hotel_name = data.get('hotel_name', self.hotel_name)
-        self.total_rooms = data.get('total_rooms', self.total_rooms)
-    
-    def _load_room_data(self, data: Dict[str, Any]):
-        """Load room data from JSON"""
-        rooms_data = data.get('rooms', {})
-        for room_num, room_data in rooms_data.items():
-            self._update_room_from_data(room_num, room_data)
-    
-    def _update_room_from_data(self, room_num: str, room_data: Dict[str, Any]):
-        """Update a single room from JSON data"""
-        self.rooms[room_num] = HotelRoom(
-            room_number=room_num,
-            room_type=room_data.get('room_type', 'Standard'),
-            status=RoomStatus(room_data.get('status', 'available')),
-            guest_name=room_data.get('guest_name', ''),
-            check_in_date=room_data.get('check_in_date'),
-            check_out_date=room_data.get('check_out_date'),
-            rate_per_night=room_data.get('rate_per_night', 100.0),
-            special_requests=room_data.get('special_requests', [])
-        )
-    
-    def _load_email_data(self, data: Dict[str, Any]):
-        """Load email-related data if available"""
-        email_data = data.get('email_settings', {})
-        # Store email settings for future use
-        self.email_settings = email_data
-    
-    def _initialize_default_rooms(self):
-        """Initialize default room configuration"""
-        room_types = [
-            "Standard Double", "Standard Double", "Deluxe Queen", 
-            "Deluxe Queen", "Junior Suite", "Junior Suite", 
-            "Executive Suite", "Presidential Suite"
-        ]
-        
-        base_rates = [80, 80, 120, 120, 180, 180, 250, 400]
+        """Load hotel settings and rooms from the store, creating a new hotel if it's empty"""
+        settings = self.store.load()
+        if settings is None:
+            settings = self._settings()
+            self.store.create(settings, default_rooms(self.total_rooms))
+        self._apply_settings(settings)
+        self._load_reservations()
+    
+    def _load_reservations(self):
+        """Index reservations that haven't ended; guests checked in without one get one"""
+        self.reservations = ReservationBook()
+        for reservation in self.store.load_reservations(since=date.today()):
+            try:
+                self.reservations.add(reservation)
+            except ValueError as e:
+                print(f"Error loading reservation {reservation.reservation_id}: {e}")
         
-        for i in range(1, self.total_rooms + 1):
-            room_number = f"{100 + i}"
-            self.rooms[room_number] = HotelRoom(
-                room_number=room_number,
-                room_type=room_types[i-1],
-                status=RoomStatus.AVAILABLE,
-                rate_per_night=base_rates[i-1]
-            )
+        today = date.today()
+        for room in self.get_occupied_rooms():
+            if not self.reservations.conflicts(room.room_number, today, today + timedelta(days=1)):
+                self._book_stay(room.room_number, room.guest_name, today, room.check_out_date,
+                                room.special_requests)
+    
+    def _settings(self) -> Dict[str, Any]:
+        return {'hotel_name': self.hotel_name, 'email_settings': self.email_settings}
+    
+    def _apply_settings(self, settings: Dict[str, Any]):
+        self.hotel_name = settings.get('hotel_name') or self.hotel_name
+        self.email_settings = settings.get('email_settings', {})
+        self.refresh_summary()
     
     def save_hotel_data(self):
-        """Save hotel data to JSON file"""
-        try:
-            data = {
-                'hotel_name': self.hotel_name,
-                'total_rooms': self.total_rooms,
-                'last_updated': datetime.now().isoformat(),
-                'rooms': {},
-                'email_settings': getattr(self, 'email_settings', {})
-            }
-            
-            # Convert rooms to JSON-serializable format
-            for room_num, room in self.rooms.items():
-                room_dict = asdict(room)
-                room_dict['status'] = room.status.value  # Convert enum to string
-                data['rooms'][room_num] = room_dict
-            
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            print(f"Error saving hotel data: {e}")
+        """Save hotel settings; for the JSON store this writes a full snapshot"""
+        self.store.save_settings(self._settings())
+    
+    def add_rooms(self, rooms: Iterable[HotelRoom]):
+        """Add rooms to the hotel, replacing any with the same number"""
+        self.store.add_rooms(rooms)
+        self.refresh_summary()
+    
+    def export_json(self, path) -> int:
+        """Write the hotel and all its reservations in hotel_data.json format; returns the number of rooms"""
+        rooms = self.rooms
+        write_snapshot(path, snapshot_data(self._settings(), rooms.values(), self.store.load_reservations()))
+        return len(rooms)
+    
+    def import_json(self, path) -> int:
+        """
+        Replace all rooms and settings with a hotel_data.json file (and its
+        journal, if there is one); returns the number of rooms
+        """
+        source = JsonHotelStore(path)
+        settings = source.load()
+        if settings is None:
+            raise ValueError(f"No hotel data in {path}")
+        settings['hotel_name'] = settings.get('hotel_name') or self.hotel_name
+        self.store.replace(settings, source.rooms.values(), source.load_reservations())
+        self._apply_settings(settings)
+        self._load_reservations()
+        return len(source.rooms)
+    
+    def refresh_summary(self):
+        """
+        Recount the summary from the store. Changes made through this manager
+        keep it current; call this after another process has changed a
+        shared SQLite store.
+        """
+        self.summary.reset(self.rooms.values())
+        self.total_rooms = self.summary.total_rooms
+        self.summary.publish("rooms")
+    
+    def subscribe(self, callback: Callable[[HotelEvent], None]) -> Callable[[], None]:
+        """
+        Have `callback` called with a HotelEvent after each check-in,
+        check-out, status change, booking or cancellation, instead of polling
+        get_hotel_summary. Returns a function that unsubscribes.
+        """
+        return self.summary.subscribe(callback)
+    
+    def close(self):
+        """Flush pending changes and release the store"""
+        self.store.close()
     
     def get_available_rooms(self) -> List[HotelRoom]:
         """Get list of available rooms"""
-        return [room for room in self.rooms.values() 
-                if room.status == RoomStatus.AVAILABLE]
+        return self.store.rooms_with_status(RoomStatus.AVAILABLE)
     
     def get_occupied_rooms(self) -> List[HotelRoom]:
         """Get list of occupied rooms"""
-        return [room for room in self.rooms.values() 
-                if room.status == RoomStatus.OCCUPIED]
+        return self.store.rooms_with_status(RoomStatus.OCCUPIED)
+    
+    def get_rooms_by_status(self, status: RoomStatus) -> List[HotelRoom]:
+        """Get list of rooms with a given status"""
+        return self.store.rooms_with_status(status)
+    
+    def find_guest(self, guest_name: str) -> List[HotelRoom]:
+        """Rooms occupied by a guest; an exact name (any case) wins over partial matches"""
+        return self.store.find_guest(guest_name)
+    
+    def get_stays_between(self, start, end) -> List[HotelRoom]:
+        """Occupied rooms whose stay overlaps the dates [start, end)"""
+        return self.store.stays_between(start, end)
+    
+    @staticmethod
+    def _stay_end(check_out_date, check_in: date) -> date:
+        """The guest's check-out date, but at least one night after check-in"""
+        try:
+            check_out = parse_date(check_out_date)
+        except (TypeError, ValueError):
+            check_out = check_in
+        return max(check_out, check_in + timedelta(days=1))
+    
+    def _book_stay(self, room_number: str, guest_name: str, check_in: date, check_out_date,
+                   special_requests: Optional[List[str]] = None) -> Optional[Reservation]:
+        try:
+            reservation = self.reservations.book(room_number, guest_name, check_in,
+                                                 self._stay_end(check_out_date, check_in), special_requests)
+        except ValueError as e:
+            print(f"Error booking room {room_number}: {e}")
+            return None
+        self.store.save_reservation(reservation)
+        self.summary.publish("booked", room_number, guest_name=guest_name)
+        return reservation
+    
+    def _cancel(self, reservation: Reservation):
+        self.reservations.cancel(reservation.reservation_id)
+        self.store.delete_reservation(reservation.reservation_id)
+        self.summary.publish("cancelled", reservation.room_number, guest_name=reservation.guest_name)
+    
+    def book_room(self, room_number: str, guest_name: str, check_in, check_out,
+                  special_requests: Optional[List[str]] = None) -> Optional[Reservation]:
+        """
+        Reserve a room for the nights check_in up to check_out (dates or ISO
+        strings). Returns None if the room doesn't exist, the dates are
+        invalid or another reservation overlaps; see reservations.conflicts.
+        """
+        if self.store.get_room(room_number) is None:
+            return None
+        try:
+            reservation = self.reservations.book(room_number, guest_name, check_in, check_out, special_requests)
+        except ValueError:  # Includes ReservationConflict
+            return None
+        self.store.save_reservation(reservation)
+        self.summary.publish("booked", room_number, guest_name=guest_name)
+        return reservation
+    
+    def cancel_reservation(self, reservation_id: str) -> bool:
+        """Cancel a reservation by id"""
+        reservation = self.reservations.get(reservation_id)
+        if reservation is None:
+            return False
+        self._cancel(reservation)
+        return True
+    
+    def find_free_rooms(self, check_in=None, check_out=None) -> List[HotelRoom]:
+        """
+        Rooms with no reservation for any night from check_in (default
+        today) up to check_out (default one night later). For stays
+        starting today, rooms that are occupied or out of service now are
+        left out too.
+        """
+        start = parse_date(check_in) if check_in is not None else date.today()
+        end = parse_date(check_out) if check_out is not None else start + timedelta(days=1)
+        rooms = self.rooms
+        free = [rooms[number] for number in self.reservations.free_rooms(rooms, start, end)]
+        if start <= date.today():
+            free = [room for room in free if room.status in (RoomStatus.AVAILABLE, RoomStatus.CLEANING)]
+        return free
+    
+    def get_occupancy_forecast(self, days: int = 30, start=None) -> List[Dict[str, Any]]:
+        """Booked rooms, occupancy rate and room revenue for each night of the horizon"""
+        start = parse_date(start) if start is not None else date.today()
+        rates = {number: room.rate_per_night for number, room in self.rooms.items()}
+        nights = self.reservations.forecast(start, days, rates)
+        for night in nights:
+            night['occupancy_rate'] = (round(night['booked_rooms'] / self.total_rooms * 100, 1)
+                                       if self.total_rooms else 0.0)
+        return nights
     
     def check_in_guest(self, room_number: str, guest_name: str, 
                       check_out_date: str, special_requests: Optional[List[str]] = None) -> bool:
-        """Check in a guest to a room"""
-        if room_number not in self.rooms:
+        """
+        Check in a guest to an available room, unless someone else has it
+        reserved for any night before check-out. The guest's own reservation
+        for those nights becomes the stay.
+        """
+        today = date.today()
+        booked = self.reservations.conflicts(room_number, today, self._stay_end(check_out_date, today))
+        if any(reservation.guest_name.lower() != guest_name.lower() for reservation in booked):
             return False
-        
-        room = self.rooms[room_number]
-        if room.status != RoomStatus.AVAILABLE:
+        special_requests = special_requests or (booked[0].special_requests if booked else [])
+        if not self.store.check_in(room_number, guest_name, datetime.now().isoformat(),
+                                   check_out_date, special_requests):
             return False
+        old_status = self.summary.transition(room_number, RoomStatus.OCCUPIED, guest_name)
+        self.summary.publish("check_in", room_number, old_status, RoomStatus.OCCUPIED, guest_name)
         
-        # Update room information
-        room.status = RoomStatus.OCCUPIED
-        room.guest_name = guest_name
-        room.check_in_date = datetime.now().isoformat()
-        room.check_out_date = check_out_date
-        room.special_requests = special_requests or []
-        
-        self.save_hotel_data()
+        for reservation in booked:
+            self._cancel(reservation)
+        self._book_stay(room_number, guest_name, today, check_out_date, special_requests)
         return True
     
     def check_out_guest(self, room_number: str) -> bool:
-        """Check out a guest from a room"""
-        if room_number not in self.rooms:
+        """Check out a guest from an occupied room; the room goes to cleaning and later nights are freed"""
+        room = self.store.get_room(room_number)
+        if room is None:
             return False
-        
-        room = self.rooms[room_number]
-        if room.status != RoomStatus.OCCUPIED:
+        guest_name = room.guest_name
+        if not self.store.check_out(room_number):
             return False
+        old_status = self.summary.transition(room_number, RoomStatus.CLEANING, "")
+        self.summary.publish("check_out", room_number, old_status, RoomStatus.CLEANING, guest_name)
         
-        # Clear room information
-        room.status = RoomStatus.CLEANING
-        room.guest_name = ""
-        room.check_in_date = None
-        room.check_out_date = None
-        room.special_requests = []
-        
-        self.save_hotel_data()
+        today = date.today()
+        for reservation in self.reservations.conflicts(room_number, today, today + timedelta(days=1)):
+            if reservation.guest_name.lower() != guest_name.lower():
+                continue  # The next guest's booking
+            if reservation.check_in < today:
+                self.reservations.shorten(reservation, today)
+                self.store.save_reservation(reservation)
+            else:
+                self._cancel(reservation)
         return True
     
     def update_room_status(self, room_number: str, status: RoomStatus) -> bool:
         """Update room status"""
-        if room_number not in self.rooms:
+        if not self.store.set_status(room_number, status):
             return False
-        
-        self.rooms[room_number].status = status
-        self.save_hotel_data()
+        old_status = self.summary.transition(room_number, status)
+        self.summary.publish("status", room_number, old_status, status)
         return True
     
     def get_hotel_summary(self) -> Dict[str, Any]:
-        """Get comprehensive hotel status summary"""
-        available_rooms = self.get_available_rooms()
-        occupied_rooms = self.get_occupied_rooms()
-        
-        # Calculate occupancy statistics
-        occupancy_rate = (len(occupied_rooms) / self.total_rooms) * 100
-        
-        # Get revenue information
-        today_revenue = sum(room.rate_per_night for room in occupied_rooms)
-        
-        return {
-            'hotel_name': self.hotel_name,
-            'total_rooms': self.total_rooms,
-            'available_rooms': len(available_rooms),
-            'occupied_rooms': len(occupied_rooms),
-            'occupancy_rate': round(occupancy_rate, 1),
-            'rooms_cleaning': len([r for r in self.rooms.values() if r.status == RoomStatus.CLEANING]),
-            'rooms_maintenance': len([r for r in self.rooms.values() if r.status == RoomStatus.MAINTENANCE]),
-            'daily_revenue': today_revenue,
-            'available_room_list': [r.room_number for r in available_rooms],
-            'occupied_room_list': [(r.room_number, r.guest_name) for r in occupied_rooms]
-        }
-    
-    def process_emails(self, emails: List[Dict[str, Any]]) -> EmailSummary:
         """
-        Process emails using the hotel email classifier
+        Get comprehensive hotel status summary. Read from counters kept up to
+        date by each change, so polling it costs nothing; see subscribe().
+        """
+        return self.summary.snapshot(self.hotel_name)
+    
+    def process_emails(self, emails: Iterable[Dict[str, Any]], processes: int = 0) -> EmailSummary:
+        """
+        Process emails using the hotel email classifier.
+        Emails stream through one shared classifier (assign email_classifier
+        to use one with a learned model); pass processes > 1 to classify a
+        large batch on a process pool.
         """
         summary = EmailSummary()
-        summary.total_emails = len(emails)
         
         try:
-            from .email_classifier import HotelEmailClassifier
-            classifier = HotelEmailClassifier()
+            from .email_classifier import EmailCategory, EmailPriority, HotelEmailClassifier
+            if self.email_classifier is None:
+                self.email_classifier = HotelEmailClassifier()
             
-            for email_data in emails:
-                # Classify each email
-                classification = classifier.classify_email(
-                    email_data.get('subject', ''),
-                    email_data.get('content', ''),
-                    email_data.get('sender', '')
-                )
+            for email_data, classification in self.email_classifier.classify_batch(emails, processes):
+                summary.total_emails += 1
                 
                 # Update summary counts
-                if classification.priority.value == 'CRITICAL':
+                if classification.priority == EmailPriority.CRITICAL:
                     summary.critical_count += 1
-                elif classification.priority.value == 'HIGH':
+                elif classification.priority == EmailPriority.HIGH:
                     summary.high_priority_count += 1
                 
-                if classification.category.value == 'BOOKING':
+                if classification.category == EmailCategory.BOOKING:
                     summary.booking_count += 1
-                elif classification.category.value == 'INVOICE':
+                elif classification.category == EmailCategory.INVOICE:
                     summary.invoice_count += 1
                 
-                # Add recommended actions (ensure list is initialized)
-                if summary.recommended_actions is None:
-                    summary.recommended_actions = []
-                
-                if classification.priority.value in ['CRITICAL', 'HIGH']:
+                if classification.priority in (EmailPriority.CRITICAL, EmailPriority.HIGH):
                     action = f"Review {classification.category.value.lower()} email: {email_data.get('subject', '')[:50]}"
                     summary.recommended_actions.append(action)
             
@@ -295,7 +340,5 @@ class HotelManager:
         except ImportError as e:
             # Fallback if email classifier not available
             print(f"Email classifier not available: {e}")
-            if summary.recommended_actions is None:
-                summary.recommended_actions = []
             summary.recommended_actions.append("Email classifier not available - manual review required")
-            return summary
\ No newline at end of file
+            return summary
@@ -0,0 +1,136 @@
+"""
+Hotel Data Journal
+Write-ahead log for HotelManager. Each room change is one small fsync'd
+JSON line holding the room's new state; the full JSON snapshot is only
+rewritten (atomically) when the journal is compacted.
+
+On load the snapshot is read first and journal entries newer than its
+sequence number are replayed on top. Entries are whole-room images, so
+replaying one twice is harmless; a line torn by a crash mid-append is
+dropped and cut off the file.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Journal entries before HotelManager folds them into the snapshot
+DEFAULT_COMPACT_EVERY = 1000
+
+
+def _fsync_directory(directory: Path):
+    """Make a rename durable (POSIX); Windows can't open directories and doesn't need it"""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(path, data: Dict[str, Any], fsync: bool = True):
+    """
+    Replace a JSON file atomically: write a temporary file, flush it to disk,
+    then rename it over the old one. A crash leaves either file, never half.
+    """
+    path = Path(path)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if fsync:
+        _fsync_directory(path.parent.resolve())
+
+
+class HotelJournal:
+    """Append-only JSON-lines journal with sequence numbers"""
+
+    def __init__(self, path, fsync: bool = True, compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self.seq = 0       # Last sequence number written or replayed
+        self.pending = 0   # Entries in the file, i.e. not yet in the snapshot
+        self._file = None
+        self._lock = threading.Lock()
+
+    def replay(self, after_seq: int = 0) -> List[Dict[str, Any]]:
+        """
+        Entries newer than the snapshot's sequence number, oldest first.
+        Anything after the first unreadable line is discarded.
+        """
+        entries: List[Dict[str, Any]] = []
+        self.seq = after_seq
+        self.pending = 0
+        if not self.path.exists():
+            return entries
+
+        good_end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn final append
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                good_end += len(line)
+                self.pending += 1
+                seq = entry.get("seq", 0)
+                if seq > after_seq:
+                    entries.append(entry)
+                self.seq = max(self.seq, seq)
+
+        if good_end < self.path.stat().st_size:
+            print(f"Hotel journal: discarding {self.path.stat().st_size - good_end} unreadable bytes "
+                  f"after entry {self.seq}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+        return entries
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Write one entry and (with fsync) wait until it is on disk; returns its sequence number"""
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "ab")
+            self.seq += 1
+            line = json.dumps({"seq": self.seq, **entry}, ensure_ascii=False, separators=(",", ":"))
+            self._file.write(line.encode("utf-8") + b"\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.pending += 1
+            return self.seq
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self.pending >= self.compact_every
+
+    def reset(self):
+        """Empty the journal once its entries are safely in a snapshot"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self.path.exists():
+                with open(self.path, "r+b") as f:
+                    f.truncate(0)
+                    if self.fsync:
+                        os.fsync(f.fileno())
+            self.pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
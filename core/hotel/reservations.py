@@ -0,0 +1,223 @@
+"""
+Hotel Reservations
+Date-range bookings with a sorted-interval index per room.
+
+Stays are half-open [check_in, check_out): a guest leaving on the 5th
+doesn't block one arriving on the 5th. A room's reservations never
+overlap, so sorted by check-in they are sorted by check-out too, and one
+bisect finds the only reservation that could clash with a new stay.
+Checking a room is O(log n) in its reservations; finding free rooms is
+that per room, and a forecast only touches reservations inside its horizon.
+"""
+
+import bisect
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class ReservationConflict(ValueError):
+    """A booking overlaps reservations already made for the room"""
+
+    def __init__(self, room_number: str, conflicts: List["Reservation"]):
+        self.room_number = room_number
+        self.conflicts = conflicts
+        booked = ", ".join(f"{r.guest_name} {r.check_in}–{r.check_out}" for r in conflicts)
+        super().__init__(f"Room {room_number} is already booked: {booked}")
+
+
+def parse_date(value) -> date:
+    """A date from a date, datetime or ISO string ("2024-05-01" or a full timestamp)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+@dataclass(slots=True)
+class Reservation:
+    """One guest's stay in one room, nights check_in up to (not including) check_out"""
+    room_number: str
+    guest_name: str
+    check_in: date
+    check_out: date
+    special_requests: List[str] = field(default_factory=list)
+    reservation_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+    @property
+    def nights(self) -> int:
+        return (self.check_out - self.check_in).days
+
+    def overlaps(self, start: date, end: date) -> bool:
+        return self.check_in < end and start < self.check_out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'reservation_id': self.reservation_id,
+            'room_number': self.room_number,
+            'guest_name': self.guest_name,
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+            'special_requests': list(self.special_requests)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Reservation":
+        return cls(
+            room_number=data['room_number'],
+            guest_name=data.get('guest_name', ''),
+            check_in=parse_date(data['check_in']),
+            check_out=parse_date(data['check_out']),
+            special_requests=data.get('special_requests', []),
+            reservation_id=data['reservation_id']
+        )
+
+
+class RoomSchedule:
+    """One room's reservations, sorted by check-in, with the check-ins kept alongside for bisect"""
+
+    __slots__ = ("starts", "reservations")
+
+    def __init__(self):
+        self.starts: List[date] = []
+        self.reservations: List[Reservation] = []
+
+    def __len__(self) -> int:
+        return len(self.reservations)
+
+    def _first_ending_after(self, day: date) -> int:
+        """Index of the first reservation with check_out > day"""
+        i = bisect.bisect_right(self.starts, day)
+        # Only the reservation starting at or before `day` can still be running
+        if i and self.reservations[i - 1].check_out > day:
+            return i - 1
+        return i
+
+    def overlapping(self, start: date, end: date) -> List[Reservation]:
+        i = self._first_ending_after(start)
+        j = bisect.bisect_left(self.starts, end, lo=i)
+        return self.reservations[i:j]
+
+    def is_free(self, start: date, end: date) -> bool:
+        i = bisect.bisect_left(self.starts, end)
+        return i == 0 or self.reservations[i - 1].check_out <= start
+
+    def add(self, reservation: Reservation):
+        i = bisect.bisect_left(self.starts, reservation.check_in)
+        self.starts.insert(i, reservation.check_in)
+        self.reservations.insert(i, reservation)
+
+    def remove(self, reservation: Reservation):
+        # Check-ins are unique within a room, since stays are non-empty and disjoint
+        i = bisect.bisect_left(self.starts, reservation.check_in)
+        if i < len(self.reservations) and self.reservations[i] is reservation:
+            del self.starts[i]
+            del self.reservations[i]
+
+
+class ReservationBook:
+    """
+    Every reservation of a hotel, indexed per room. In-memory only; the
+    HotelManager persists changes through its store.
+    """
+
+    def __init__(self, reservations: Iterable[Reservation] = ()):
+        self.schedules: Dict[str, RoomSchedule] = {}
+        self.by_id: Dict[str, Reservation] = {}
+        for reservation in reservations:
+            self.add(reservation)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, reservation_id: str) -> bool:
+        return reservation_id in self.by_id
+
+    def get(self, reservation_id: str) -> Optional[Reservation]:
+        return self.by_id.get(reservation_id)
+
+    def add(self, reservation: Reservation) -> Reservation:
+        """Index a reservation; raises ReservationConflict if the room is taken for any of its nights"""
+        if reservation.check_out <= reservation.check_in:
+            raise ValueError(f"Check-out {reservation.check_out} must be after check-in {reservation.check_in}")
+        conflicts = self.conflicts(reservation.room_number, reservation.check_in, reservation.check_out)
+        if conflicts:
+            raise ReservationConflict(reservation.room_number, conflicts)
+        self.schedules.setdefault(reservation.room_number, RoomSchedule()).add(reservation)
+        self.by_id[reservation.reservation_id] = reservation
+        return reservation
+
+    def book(self, room_number: str, guest_name: str, check_in, check_out,
+             special_requests: Optional[List[str]] = None) -> Reservation:
+        return self.add(Reservation(room_number, guest_name, parse_date(check_in), parse_date(check_out),
+                                    special_requests or []))
+
+    def cancel(self, reservation_id: str) -> Optional[Reservation]:
+        reservation = self.by_id.pop(reservation_id, None)
+        if reservation is not None:
+            self.schedules[reservation.room_number].remove(reservation)
+        return reservation
+
+    def shorten(self, reservation: Reservation, check_out: date):
+        """End a stay early; shrinking keeps the schedule's order, so it is changed in place"""
+        if not reservation.check_in < check_out <= reservation.check_out:
+            raise ValueError(f"Can't move check-out of {reservation.reservation_id} to {check_out}")
+        reservation.check_out = check_out
+
+    def for_room(self, room_number: str) -> List[Reservation]:
+        schedule = self.schedules.get(room_number)
+        return list(schedule.reservations) if schedule else []
+
+    def conflicts(self, room_number: str, start, end) -> List[Reservation]:
+        """Reservations for the room that overlap [start, end)"""
+        schedule = self.schedules.get(room_number)
+        return schedule.overlapping(parse_date(start), parse_date(end)) if schedule else []
+
+    def is_free(self, room_number: str, start, end) -> bool:
+        schedule = self.schedules.get(room_number)
+        return schedule is None or schedule.is_free(parse_date(start), parse_date(end))
+
+    def free_rooms(self, room_numbers: Iterable[str], start, end) -> List[str]:
+        """The given rooms with no reservation overlapping [start, end)"""
+        start, end = parse_date(start), parse_date(end)
+        schedules = self.schedules
+        free = []
+        for room_number in room_numbers:
+            schedule = schedules.get(room_number)
+            if schedule is None or schedule.is_free(start, end):
+                free.append(room_number)
+        return free
+
+    def forecast(self, start, days: int, rates: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        Booked rooms (and, with nightly rates, room revenue) for each night
+        from `start`, via a difference array over the horizon.
+        """
+        start = parse_date(start)
+        end = start + timedelta(days=days)
+        rooms_delta = [0] * (days + 1)
+        revenue_delta = [0.0] * (days + 1)
+        for room_number, schedule in self.schedules.items():
+            rate = rates.get(room_number, 0.0) if rates else 0.0
+            reservations = schedule.reservations
+            i = schedule._first_ending_after(start)
+            while i < len(reservations) and reservations[i].check_in < end:
+                reservation = reservations[i]
+                first = max((reservation.check_in - start).days, 0)
+                last = min((reservation.check_out - start).days, days)
+                rooms_delta[first] += 1
+                rooms_delta[last] -= 1
+                revenue_delta[first] += rate
+                revenue_delta[last] -= rate
+                i += 1
+
+        nights = []
+        booked, revenue = 0, 0.0
+        for offset in range(days):
+            booked += rooms_delta[offset]
+            revenue += revenue_delta[offset]
+            nights.append({'date': (start + timedelta(days=offset)).isoformat(),
+                           'booked_rooms': booked, 'revenue': round(revenue, 2)})
+        return nights
@@ -0,0 +1,383 @@
+"""
+Room State Table
+Columnar room state for many rooms across properties: status codes,
+nightly rates and stay dates live in NumPy arrays, so occupancy and
+revenue across properties and dates are array operations instead of
+loops over HotelRoom objects.
+
+Rows are addressed by index. RoomRecord is a slotted view of one row for
+code that wants attribute access; it holds no data of its own. Dates are
+day numbers (days since 1970-01-01, numpy's datetime64[D]), NO_DATE
+where a room has none. Rates are whole cents, like HotelSummary's.
+Stays are half-open [check_in, check_out), as in reservations.py.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .reservations import Reservation
+from .rooms import HotelRoom, RoomStatus
+
+NO_DATE = np.iinfo(np.int32).min
+
+# Status codes are positions in this tuple
+STATUSES: Tuple[RoomStatus, ...] = tuple(RoomStatus)
+STATUS_CODES: Dict[Any, int] = {**{status: code for code, status in enumerate(STATUSES)},
+                                **{status.value: code for code, status in enumerate(STATUSES)}}
+OCCUPIED = STATUS_CODES[RoomStatus.OCCUPIED]
+
+ROOM_COLUMNS = {'property': np.int16, 'room_type': np.int16, 'status': np.int8, 'rate_cents': np.int64,
+                'check_in': np.int32, 'check_out': np.int32}
+STAY_COLUMNS = {'row': np.int32, 'check_in': np.int32, 'check_out': np.int32}
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _iso_day(value) -> str:
+    if not value:
+        return 'NaT'
+    if isinstance(value, date):  # Includes datetime
+        return value.isoformat()[:10]
+    return str(value).strip()[:10]
+
+
+def day_numbers(values: Iterable[Any]) -> np.ndarray:
+    """
+    Day numbers of dates, datetimes or ISO strings (only the date part
+    counts); NO_DATE for empty or unreadable values
+    """
+    days = [_iso_day(value) for value in values]
+    try:
+        parsed = np.array(days, dtype='datetime64[D]')
+    except ValueError:
+        # Hand-typed check-out dates; parse one at a time so one bad value doesn't spoil the rest
+        parsed = np.empty(len(days), dtype='datetime64[D]')
+        for i, day in enumerate(days):
+            try:
+                parsed[i] = np.datetime64(day, 'D')
+            except ValueError:
+                parsed[i] = np.datetime64('NaT')
+    numbers = parsed.astype(np.int64)
+    numbers[np.isnat(parsed)] = NO_DATE
+    return numbers.astype(np.int32)
+
+
+def day_number(value) -> int:
+    return int(day_numbers([value])[0])
+
+
+def from_day_number(number: int) -> Optional[date]:
+    return None if number == NO_DATE else _EPOCH + timedelta(days=int(number))
+
+
+class _Columns:
+    """Equal-length NumPy arrays with amortised appends"""
+
+    __slots__ = ("size", "arrays")
+
+    def __init__(self, dtypes: Dict[str, Any]):
+        self.size = 0
+        self.arrays = {name: np.empty(16, dtype) for name, dtype in dtypes.items()}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """The live part of a column; a view, so writes go to the table"""
+        return self.arrays[name][:self.size]
+
+    def extend(self, **columns: np.ndarray) -> range:
+        """Append rows; returns their indexes"""
+        count = len(next(iter(columns.values())))
+        needed = self.size + count
+        capacity = len(next(iter(self.arrays.values())))
+        if needed > capacity:
+            capacity = max(needed, capacity * 2)
+            for name, array in self.arrays.items():
+                grown = np.empty(capacity, array.dtype)
+                grown[:self.size] = array[:self.size]
+                self.arrays[name] = grown
+        for name, values in columns.items():
+            self.arrays[name][self.size:needed] = values
+        added = range(self.size, needed)
+        self.size = needed
+        return added
+
+
+class RoomRecord:
+    """One row of a RoomStateTable, read through to its columns"""
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: "RoomStateTable", row: int):
+        self.table = table
+        self.row = row
+
+    def __repr__(self) -> str:
+        return f"RoomRecord({self.property_name!r}, {self.room_number!r}, {self.status.value})"
+
+    @property
+    def property_name(self) -> str:
+        return self.table.properties[self.table.rooms['property'][self.row]]
+
+    @property
+    def room_number(self) -> str:
+        return self.table.room_numbers[self.row]
+
+    @property
+    def room_type(self) -> str:
+        return self.table.room_types[self.table.rooms['room_type'][self.row]]
+
+    @property
+    def status(self) -> RoomStatus:
+        return STATUSES[self.table.rooms['status'][self.row]]
+
+    @property
+    def guest_name(self) -> str:
+        return self.table.guest_names[self.row]
+
+    @property
+    def rate_per_night(self) -> float:
+        return int(self.table.rooms['rate_cents'][self.row]) / 100
+
+    @property
+    def check_in(self) -> Optional[date]:
+        return from_day_number(self.table.rooms['check_in'][self.row])
+
+    @property
+    def check_out(self) -> Optional[date]:
+        return from_day_number(self.table.rooms['check_out'][self.row])
+
+    def to_room(self) -> HotelRoom:
+        """A HotelRoom copy; dates come back as ISO dates and special requests are not kept"""
+        check_in, check_out = self.check_in, self.check_out
+        return HotelRoom(self.room_number, self.room_type, self.status, self.guest_name,
+                         check_in.isoformat() if check_in else None, check_out.isoformat() if check_out else None,
+                         self.rate_per_night)
+
+
+class RoomStateTable:
+    """
+    Rooms and reservations of any number of properties as columns. Loads
+    from HotelManagers or straight from a SQLite database, takes O(1)
+    status changes, and answers counts, occupancy and revenue with
+    vectorized queries.
+    """
+
+    def __init__(self):
+        self.properties: List[str] = []
+        self.room_types: List[str] = []
+        self.room_numbers: List[str] = []
+        self.guest_names: List[str] = []
+        self.rooms = _Columns(ROOM_COLUMNS)
+        self.stays = _Columns(STAY_COLUMNS)
+        self._property_codes: Dict[str, int] = {}
+        self._type_codes: Dict[str, int] = {}
+        self._rows: List[Dict[str, int]] = []  # Per property code: room number -> row
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    @classmethod
+    def from_managers(cls, managers: Dict[str, Any]) -> "RoomStateTable":
+        """A table of HotelManagers by property name, with their rooms and reservations"""
+        table = cls()
+        for name, manager in managers.items():
+            table.add_property(name, manager.rooms.values(), manager.reservations.by_id.values())
+        return table
+
+    @classmethod
+    def from_sqlite(cls, store, all_properties: bool = True) -> "RoomStateTable":
+        """A table of every property in a SQLiteHotelStore's database (or just its own), read as plain rows"""
+        table = cls()
+        rows = store.room_rows(all_properties)
+        if rows:
+            properties, numbers, types, statuses, guests, check_ins, check_outs, rates = zip(*rows)
+            table._add_rooms(properties, numbers, types, [STATUS_CODES[status] for status in statuses],
+                             guests, check_ins, check_outs, rates)
+        stays = store.reservation_rows(all_properties)
+        if stays:
+            properties, numbers, check_ins, check_outs = zip(*stays)
+            table._add_stays(properties, numbers, check_ins, check_outs)
+        return table
+
+    # ----- loading ----------------------------------------------------------
+
+    @staticmethod
+    def _code(codes: Dict[str, int], names: List[str], name: str) -> int:
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def _add_rooms(self, properties: Sequence[str], numbers: Sequence[str], types: Sequence[str],
+                   status_codes: Sequence[int], guests: Sequence[str], check_ins, check_outs, rates):
+        property_codes = [self._code(self._property_codes, self.properties, name) for name in properties]
+        added = self.rooms.extend(
+            property=property_codes,
+            room_type=[self._code(self._type_codes, self.room_types, name) for name in types],
+            status=status_codes,
+            rate_cents=np.round(np.asarray(rates, dtype=np.float64) * 100),
+            check_in=day_numbers(check_ins),
+            check_out=day_numbers(check_outs))
+        self.room_numbers.extend(numbers)
+        self.guest_names.extend(guest or "" for guest in guests)
+        while len(self._rows) < len(self.properties):
+            self._rows.append({})
+        for row, code, number in zip(added, property_codes, numbers):
+            self._rows[code][number] = row
+
+    def _add_stays(self, properties: Sequence[str], numbers: Sequence[str], check_ins, check_outs):
+        rows = [self.row(name, number) for name, number in zip(properties, numbers)]
+        rows = [-1 if row is None else row for row in rows]
+        self.stays.extend(row=rows, check_in=day_numbers(check_ins), check_out=day_numbers(check_outs))
+
+    def add_property(self, name: str, rooms: Iterable[HotelRoom], reservations: Iterable[Reservation] = ()):
+        """Add a property's rooms (replacing none; room numbers are per property) and reservations"""
+        rooms = list(rooms)
+        self._add_rooms([name] * len(rooms), [room.room_number for room in rooms],
+                        [room.room_type for room in rooms], [STATUS_CODES[room.status] for room in rooms],
+                        [room.guest_name for room in rooms], [room.check_in_date for room in rooms],
+                        [room.check_out_date for room in rooms], [room.rate_per_night for room in rooms])
+        self.add_reservations(name, reservations)
+
+    def add_reservations(self, property_name: str, reservations: Iterable[Reservation]):
+        reservations = list(reservations)
+        if reservations:
+            self._add_stays([property_name] * len(reservations), [r.room_number for r in reservations],
+                            [r.check_in for r in reservations], [r.check_out for r in reservations])
+
+    # ----- rows -------------------------------------------------------------
+
+    def row(self, property_name: str, room_number: str) -> Optional[int]:
+        code = self._property_codes.get(property_name)
+        return None if code is None else self._rows[code].get(room_number)
+
+    def record(self, property_name: str, room_number: str) -> Optional[RoomRecord]:
+        row = self.row(property_name, room_number)
+        return None if row is None else RoomRecord(self, row)
+
+    def records(self, rows: Iterable[int]) -> List[RoomRecord]:
+        return [RoomRecord(self, int(row)) for row in rows]
+
+    def set_status(self, property_name: str, room_number: str, status: RoomStatus) -> bool:
+        row = self.row(property_name, room_number)
+        if row is None:
+            return False
+        self.rooms['status'][row] = STATUS_CODES[status]
+        return True
+
+    def check_in(self, property_name: str, room_number: str, guest_name: str, check_in, check_out) -> bool:
+        """Mark an available room occupied, as HotelStore.check_in does"""
+        row = self.row(property_name, room_number)
+        if row is None or self.rooms['status'][row] != STATUS_CODES[RoomStatus.AVAILABLE]:
+            return False
+        self.rooms['status'][row] = OCCUPIED
+        self.rooms['check_in'][row], self.rooms['check_out'][row] = day_numbers([check_in, check_out])
+        self.guest_names[row] = guest_name
+        return True
+
+    def check_out(self, property_name: str, room_number: str) -> bool:
+        """Send an occupied room to cleaning, as HotelStore.check_out does"""
+        row = self.row(property_name, room_number)
+        if row is None or self.rooms['status'][row] != OCCUPIED:
+            return False
+        self.rooms['status'][row] = STATUS_CODES[RoomStatus.CLEANING]
+        self.rooms['check_in'][row] = self.rooms['check_out'][row] = NO_DATE
+        self.guest_names[row] = ""
+        return True
+
+    # ----- vectorized queries -----------------------------------------------
+
+    def mask(self, property_name: Optional[str] = None, status: Optional[RoomStatus] = None) -> np.ndarray:
+        """Boolean mask of rows in a property and/or with a status"""
+        selected = np.ones(len(self.rooms), dtype=bool)
+        if property_name is not None:
+            selected &= self.rooms['property'] == self._property_codes.get(property_name, -1)
+        if status is not None:
+            selected &= self.rooms['status'] == STATUS_CODES[status]
+        return selected
+
+    def rooms_with_status(self, status: RoomStatus, property_name: Optional[str] = None) -> List[RoomRecord]:
+        return self.records(np.flatnonzero(self.mask(property_name, status)))
+
+    def status_counts(self, property_name: Optional[str] = None) -> Dict[RoomStatus, int]:
+        statuses = self.rooms['status']
+        if property_name is not None:
+            statuses = statuses[self.mask(property_name)]
+        counts = np.bincount(statuses, minlength=len(STATUSES))
+        return {status: int(counts[code]) for code, status in enumerate(STATUSES)}
+
+    def property_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Rooms, occupied rooms, occupancy and tonight's room revenue for each property"""
+        codes = self.rooms['property']
+        occupied = self.rooms['status'] == OCCUPIED
+        count = len(self.properties)
+        totals = np.bincount(codes, minlength=count)
+        occupied_counts = np.bincount(codes, weights=occupied, minlength=count)
+        revenue = np.bincount(codes, weights=np.where(occupied, self.rooms['rate_cents'], 0), minlength=count)
+        rates = np.round(np.divide(occupied_counts * 100, totals, out=np.zeros(count), where=totals > 0), 1)
+        return {name: {'total_rooms': int(totals[code]),
+                       'occupied_rooms': int(occupied_counts[code]),
+                       'occupancy_rate': float(rates[code]),
+                       'daily_revenue': int(revenue[code]) / 100}
+                for code, name in enumerate(self.properties)}
+
+    def nightly(self, start, days: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Booked rooms and room revenue in cents, as (properties, days)
+        arrays, for each night from `start`. One pass over the reservation
+        columns: clip each stay to the horizon, count its first and last
+        night into a flattened difference array, and take running sums.
+        """
+        first_day = day_number(start)
+        width = days + 1
+        rows = self.stays['row']
+        valid = rows >= 0
+        rows = rows[valid]
+        first = np.clip(self.stays['check_in'][valid].astype(np.int64) - first_day, 0, days)
+        last = np.clip(self.stays['check_out'][valid].astype(np.int64) - first_day, 0, days)
+        inside = first < last
+        rows, first, last = rows[inside], first[inside], last[inside]
+        base = self.rooms['property'][rows].astype(np.int64) * width
+        rates = self.rooms['rate_cents'][rows]
+
+        size = len(self.properties) * width
+        booked = np.bincount(base + first, minlength=size) - np.bincount(base + last, minlength=size)
+        revenue = (np.bincount(base + first, weights=rates, minlength=size)
+                   - np.bincount(base + last, weights=rates, minlength=size))
+        booked = np.cumsum(booked.reshape(-1, width), axis=1)[:, :days]
+        revenue = np.cumsum(revenue.reshape(-1, width), axis=1)[:, :days]
+        return booked, np.rint(revenue).astype(np.int64)
+
+    def forecast(self, start, days: int, property_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Booked rooms, occupancy rate and room revenue for each night, for
+        one property or all of them together; same keys as
+        HotelManager.get_occupancy_forecast
+        """
+        booked, revenue = self.nightly(start, days)
+        if property_name is None:
+            booked, revenue, rooms = booked.sum(axis=0), revenue.sum(axis=0), len(self.rooms)
+        else:
+            code = self._property_codes.get(property_name)
+            if code is None:
+                return []
+            booked, revenue, rooms = booked[code], revenue[code], int(self.mask(property_name).sum())
+        first = date.fromisoformat(_iso_day(start))
+        return [{'date': (first + timedelta(days=offset)).isoformat(),
+                 'booked_rooms': int(booked[offset]),
+                 'revenue': int(revenue[offset]) / 100,
+                 'occupancy_rate': round(booked[offset] / rooms * 100, 1) if rooms else 0.0}
+                for offset in range(days)]
+
+    def room_nights(self, start, end, property_name: Optional[str] = None) -> int:
+        """Reserved room-nights between the dates [start, end)"""
+        booked, _ = self.nightly(start, max((day_number(end) - day_number(start)), 0))
+        if property_name is not None:
+            code = self._property_codes.get(property_name)
+            return 0 if code is None else int(booked[code].sum())
+        return int(booked.sum())
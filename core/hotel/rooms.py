@@ -0,0 +1,83 @@
+"""
+Hotel Rooms
+Room records shared by HotelManager and its storage backends
+"""
+
+from dataclasses import dataclass, asdict
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+
+class RoomStatus(Enum):
+    """Room status enumeration"""
+    AVAILABLE = "available"
+    OCCUPIED = "occupied"
+    CLEANING = "cleaning"
+    MAINTENANCE = "maintenance"
+    OUT_OF_ORDER = "out_of_order"
+
+
+class GuestStatus(Enum):
+    """Guest status enumeration"""
+    CHECKED_IN = "checked_in"
+    CHECKED_OUT = "checked_out"
+    EXPECTED = "expected"
+    NO_SHOW = "no_show"
+
+
+@dataclass(slots=True)
+class HotelRoom:
+    """Hotel room data structure (slotted: large properties keep thousands in memory)"""
+    room_number: str
+    room_type: str
+    status: RoomStatus
+    guest_name: str = ""
+    check_in_date: Optional[str] = None
+    check_out_date: Optional[str] = None
+    rate_per_night: float = 0.0
+    special_requests: Optional[List[str]] = None
+
+    def __post_init__(self):
+        if self.special_requests is None:
+            self.special_requests = []
+
+
+# Room types and nightly rates of the original eight-room hotel; larger
+# hotels repeat the pattern
+DEFAULT_ROOM_LAYOUT = [
+    ("Standard Double", 80), ("Standard Double", 80),
+    ("Deluxe Queen", 120), ("Deluxe Queen", 120),
+    ("Junior Suite", 180), ("Junior Suite", 180),
+    ("Executive Suite", 250), ("Presidential Suite", 400),
+]
+
+
+def default_rooms(total_rooms: int) -> List[HotelRoom]:
+    """Rooms 101, 102, ... for a new hotel"""
+    rooms = []
+    for i in range(1, total_rooms + 1):
+        room_type, rate = DEFAULT_ROOM_LAYOUT[(i - 1) % len(DEFAULT_ROOM_LAYOUT)]
+        rooms.append(HotelRoom(room_number=f"{100 + i}", room_type=room_type,
+                               status=RoomStatus.AVAILABLE, rate_per_night=rate))
+    return rooms
+
+
+def room_to_dict(room: HotelRoom) -> Dict[str, Any]:
+    """The JSON form of a room, as stored in hotel_data.json"""
+    room_dict = asdict(room)
+    room_dict['status'] = room.status.value  # Convert enum to string
+    return room_dict
+
+
+def room_from_dict(room_number: str, room_data: Dict[str, Any]) -> HotelRoom:
+    """Build a room from its JSON form, filling in defaults for missing fields"""
+    return HotelRoom(
+        room_number=room_number,
+        room_type=room_data.get('room_type', 'Standard'),
+        status=RoomStatus(room_data.get('status', 'available')),
+        guest_name=room_data.get('guest_name', ''),
+        check_in_date=room_data.get('check_in_date'),
+        check_out_date=room_data.get('check_out_date'),
+        rate_per_night=room_data.get('rate_per_night', 100.0),
+        special_requests=room_data.get('special_requests', [])
+    )
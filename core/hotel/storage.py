@@ -0,0 +1,560 @@
+"""
+Hotel Storage
+Backends that keep a HotelManager's rooms and settings.
+
+JsonHotelStore is the original hotel_data.json file (plus its journal):
+every room lives in memory and queries are scans, which suits a small
+hotel. SQLiteHotelStore keeps any number of properties in one database
+with indexed lookups by status, guest name and stay dates, and makes each
+check-in/check-out a single conditional UPDATE, so two processes can't
+book the same room. The JSON format stays as import/export for both.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .journal import DEFAULT_COMPACT_EVERY, HotelJournal, write_snapshot
+from .reservations import Reservation
+from .rooms import HotelRoom, RoomStatus, room_from_dict, room_to_dict
+
+DEFAULT_SQLITE_PATH = "hotel_data.db"
+
+
+def _iso(value) -> str:
+    """Dates as ISO strings, so stay dates compare correctly as text"""
+    return value if isinstance(value, str) else value.isoformat()
+
+
+def snapshot_data(settings: Dict[str, Any], rooms: Iterable[HotelRoom],
+                  reservations: Iterable[Reservation] = ()) -> Dict[str, Any]:
+    """The hotel_data.json document for a property"""
+    room_dicts = {room.room_number: room_to_dict(room) for room in rooms}
+    return {
+        'hotel_name': settings.get('hotel_name'),
+        'total_rooms': len(room_dicts),
+        'last_updated': datetime.now().isoformat(),
+        'rooms': room_dicts,
+        'reservations': {reservation.reservation_id: reservation.to_dict() for reservation in reservations},
+        'email_settings': settings.get('email_settings', {})
+    }
+
+
+def read_snapshot(path):
+    """Settings and rooms from a hotel_data.json document"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    settings = {'hotel_name': data.get('hotel_name'), 'email_settings': data.get('email_settings', {})}
+    rooms = [room_from_dict(room_num, room_data) for room_num, room_data in data.get('rooms', {}).items()]
+    return settings, rooms, data
+
+
+class HotelStore:
+    """
+    Where one property's rooms and settings are kept. Settings are a dict
+    with 'hotel_name' and 'email_settings'. Mutations return False when
+    the room doesn't exist or isn't in the required state.
+    """
+
+    path = None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """The property's settings, or None if it has never been saved"""
+        raise NotImplementedError
+
+    def create(self, settings: Dict[str, Any], rooms: Iterable[HotelRoom]):
+        """Set up a property that load() didn't find"""
+        self.replace(settings, rooms)
+
+    def replace(self, settings: Dict[str, Any], rooms: Iterable[HotelRoom],
+                reservations: Iterable[Reservation] = ()):
+        """Overwrite the property's settings, rooms and reservations (JSON import)"""
+        raise NotImplementedError
+
+    def save_settings(self, settings: Dict[str, Any]):
+        raise NotImplementedError
+
+    def add_rooms(self, rooms: Iterable[HotelRoom]):
+        """Add rooms, replacing any with the same number"""
+        raise NotImplementedError
+
+    def all_rooms(self) -> Dict[str, HotelRoom]:
+        raise NotImplementedError
+
+    def get_room(self, room_number: str) -> Optional[HotelRoom]:
+        raise NotImplementedError
+
+    def rooms_with_status(self, status: RoomStatus) -> List[HotelRoom]:
+        raise NotImplementedError
+
+    def status_counts(self) -> Dict[RoomStatus, int]:
+        raise NotImplementedError
+
+    def find_guest(self, guest_name: str) -> List[HotelRoom]:
+        """Rooms of a guest: exact name ignoring case, else any name containing it"""
+        raise NotImplementedError
+
+    def stays_between(self, start, end) -> List[HotelRoom]:
+        """Occupied rooms whose stay overlaps [start, end); dates or ISO strings"""
+        raise NotImplementedError
+
+    def check_in(self, room_number: str, guest_name: str, check_in_date: str,
+                 check_out_date: str, special_requests: List[str]) -> bool:
+        raise NotImplementedError
+
+    def check_out(self, room_number: str) -> bool:
+        raise NotImplementedError
+
+    def set_status(self, room_number: str, status: RoomStatus) -> bool:
+        raise NotImplementedError
+
+    def load_reservations(self, since=None) -> List[Reservation]:
+        """Reservations still running after `since` (a date), or all of them"""
+        raise NotImplementedError
+
+    def save_reservation(self, reservation: Reservation):
+        """Add or update a reservation"""
+        raise NotImplementedError
+
+    def delete_reservation(self, reservation_id: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonHotelStore(HotelStore):
+    """
+    hotel_data.json snapshot plus a journal of room changes (see journal.py).
+    Without a journal every change rewrites the whole file.
+    """
+
+    def __init__(self, path="hotel_data.json", journal: bool = True,
+                 compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.path = str(path)
+        self.rooms: Dict[str, HotelRoom] = {}
+        self.reservations: Dict[str, Dict[str, Any]] = {}  # JSON form, by id
+        self.settings: Dict[str, Any] = {}
+        self.journal = (HotelJournal(Path(self.path).with_suffix('.journal'), compact_every=compact_every)
+                        if journal else None)
+        self._load_failed = False
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Read the snapshot, then replay the journal on top"""
+        try:
+            if not os.path.exists(self.path):
+                return None
+            settings, rooms, data = read_snapshot(self.path)
+        except Exception as e:
+            print(f"Error loading hotel data: {e}")
+            # Start from defaults but leave the damaged file alone until the next change
+            self._load_failed = True
+            return None
+        self.settings = settings
+        self.rooms = {room.room_number: room for room in rooms}
+        self.reservations = data.get('reservations', {})
+        self._replay_journal(data.get('journal_seq', 0))
+        return settings
+
+    def _replay_journal(self, snapshot_seq: int):
+        """Apply room changes made since the snapshot was written"""
+        if self.journal is None:
+            return
+        try:
+            for entry in self.journal.replay(snapshot_seq):
+                if 'room' in entry:
+                    self.rooms[entry['room']] = room_from_dict(entry['room'], entry['data'])
+                elif entry['data'] is None:
+                    self.reservations.pop(entry['reservation'], None)
+                else:
+                    self.reservations[entry['reservation']] = entry['data']
+        except Exception as e:
+            print(f"Error replaying hotel journal: {e}")
+
+    def create(self, settings: Dict[str, Any], rooms: Iterable[HotelRoom]):
+        self.settings = dict(settings)
+        self.rooms = {room.room_number: room for room in rooms}
+        # A journal without a snapshot still holds changes to these rooms
+        self._replay_journal(0)
+        if not self._load_failed:
+            self.save()
+
+    def replace(self, settings: Dict[str, Any], rooms: Iterable[HotelRoom],
+                reservations: Iterable[Reservation] = ()):
+        self.settings = dict(settings)
+        self.rooms = {room.room_number: room for room in rooms}
+        self.reservations = {reservation.reservation_id: reservation.to_dict() for reservation in reservations}
+        self.save()
+
+    def save(self):
+        """Write a full snapshot and empty the journal"""
+        try:
+            data = snapshot_data(self.settings, self.rooms.values())
+            data['reservations'] = self.reservations
+            data['journal_seq'] = self.journal.seq if self.journal else 0
+            write_snapshot(self.path, data)
+            if self.journal:
+                self.journal.reset()
+        except Exception as e:
+            print(f"Error saving hotel data: {e}")
+
+    def save_settings(self, settings: Dict[str, Any]):
+        self.settings = dict(settings)
+        self.save()
+
+    def add_rooms(self, rooms: Iterable[HotelRoom]):
+        for room in rooms:
+            self.rooms[room.room_number] = room
+        self.save()
+
+    def _save_room(self, room: HotelRoom):
+        self._save_change({'room': room.room_number, 'data': room_to_dict(room)})
+
+    def _save_change(self, entry: Dict[str, Any]):
+        """Persist one change: a journal append, or a full save without a journal"""
+        if self.journal is None:
+            self.save()
+            return
+        try:
+            self.journal.append(entry)
+        except Exception as e:
+            print(f"Error writing hotel journal: {e}")
+            self.save()
+            return
+        if self.journal.needs_compaction:
+            self.save()
+
+    def all_rooms(self) -> Dict[str, HotelRoom]:
+        return self.rooms
+
+    def get_room(self, room_number: str) -> Optional[HotelRoom]:
+        return self.rooms.get(room_number)
+
+    def rooms_with_status(self, status: RoomStatus) -> List[HotelRoom]:
+        return [room for room in self.rooms.values() if room.status == status]
+
+    def status_counts(self) -> Dict[RoomStatus, int]:
+        counts: Dict[RoomStatus, int] = {}
+        for room in self.rooms.values():
+            counts[room.status] = counts.get(room.status, 0) + 1
+        return counts
+
+    def find_guest(self, guest_name: str) -> List[HotelRoom]:
+        name = guest_name.strip().lower()
+        if not name:
+            return []
+        exact = [room for room in self.rooms.values() if room.guest_name.lower() == name]
+        return exact or [room for room in self.rooms.values() if name in room.guest_name.lower()]
+
+    def stays_between(self, start, end) -> List[HotelRoom]:
+        start, end = _iso(start), _iso(end)
+        return [room for room in self.rooms.values()
+                if room.status == RoomStatus.OCCUPIED and room.check_in_date and room.check_out_date
+                and room.check_in_date < end and room.check_out_date > start]
+
+    def check_in(self, room_number: str, guest_name: str, check_in_date: str,
+                 check_out_date: str, special_requests: List[str]) -> bool:
+        room = self.rooms.get(room_number)
+        if room is None or room.status != RoomStatus.AVAILABLE:
+            return False
+        room.status = RoomStatus.OCCUPIED
+        room.guest_name = guest_name
+        room.check_in_date = check_in_date
+        room.check_out_date = check_out_date
+        room.special_requests = special_requests
+        self._save_room(room)
+        return True
+
+    def check_out(self, room_number: str) -> bool:
+        room = self.rooms.get(room_number)
+        if room is None or room.status != RoomStatus.OCCUPIED:
+            return False
+        room.status = RoomStatus.CLEANING
+        room.guest_name = ""
+        room.check_in_date = None
+        room.check_out_date = None
+        room.special_requests = []
+        self._save_room(room)
+        return True
+
+    def set_status(self, room_number: str, status: RoomStatus) -> bool:
+        room = self.rooms.get(room_number)
+        if room is None:
+            return False
+        room.status = status
+        self._save_room(room)
+        return True
+
+    def load_reservations(self, since=None) -> List[Reservation]:
+        since = _iso(since) if since is not None else None
+        return [Reservation.from_dict(data) for data in self.reservations.values()
+                if since is None or data['check_out'] > since]
+
+    def save_reservation(self, reservation: Reservation):
+        data = reservation.to_dict()
+        self.reservations[reservation.reservation_id] = data
+        self._save_change({'reservation': reservation.reservation_id, 'data': data})
+
+    def delete_reservation(self, reservation_id: str):
+        if self.reservations.pop(reservation_id, None) is not None:
+            self._save_change({'reservation': reservation_id, 'data': None})
+
+    def close(self):
+        """Fold the journal into the snapshot and release the journal file"""
+        if self.journal:
+            if self.journal.pending:
+                self.save()
+            self.journal.close()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS properties (
+    name TEXT PRIMARY KEY,
+    hotel_name TEXT NOT NULL,
+    email_settings TEXT NOT NULL DEFAULT '{}',
+    last_updated TEXT
+);
+CREATE TABLE IF NOT EXISTS rooms (
+    property TEXT NOT NULL,
+    room_number TEXT NOT NULL,
+    room_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    guest_name TEXT NOT NULL DEFAULT '',
+    check_in_date TEXT,
+    check_out_date TEXT,
+    rate_per_night REAL NOT NULL DEFAULT 0,
+    special_requests TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (property, room_number)
+);
+CREATE INDEX IF NOT EXISTS rooms_status ON rooms (property, status);
+CREATE INDEX IF NOT EXISTS rooms_guest ON rooms (property, guest_name COLLATE NOCASE) WHERE guest_name != '';
+CREATE INDEX IF NOT EXISTS rooms_stay ON rooms (property, check_out_date) WHERE check_out_date IS NOT NULL;
+CREATE TABLE IF NOT EXISTS reservations (
+    property TEXT NOT NULL,
+    reservation_id TEXT NOT NULL,
+    room_number TEXT NOT NULL,
+    guest_name TEXT NOT NULL DEFAULT '',
+    check_in TEXT NOT NULL,
+    check_out TEXT NOT NULL,
+    special_requests TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (property, reservation_id)
+);
+CREATE INDEX IF NOT EXISTS reservations_check_out ON reservations (property, check_out);
+"""
+
+_STATUSES = {status.value: status for status in RoomStatus}
+
+ROOM_COLUMNS = ("room_number, room_type, status, guest_name, check_in_date, check_out_date, "
+                "rate_per_night, special_requests")
+
+
+class SQLiteHotelStore(HotelStore):
+    """
+    One property in a SQLite database that can hold several; open one
+    store per property. Safe to share between threads; use ":memory:"
+    for a throwaway database.
+    """
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, property_name: str = "main"):
+        self.path = str(path)
+        self.property_name = property_name
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def properties(self) -> List[str]:
+        """Every property in the database"""
+        with self._lock:
+            return [row["name"] for row in self._conn.execute("SELECT name FROM properties ORDER BY name")]
+
+    def _property_filter(self, all_properties: bool):
+        return ("", ()) if all_properties else ("WHERE property = ?", (self.property_name,))
+
+    def room_rows(self, all_properties: bool = False) -> List[tuple]:
+        """
+        Plain (property, room_number, room_type, status, guest_name,
+        check_in_date, check_out_date, rate_per_night) tuples, for bulk
+        loaders such as RoomStateTable that don't want HotelRoom objects
+        """
+        where, params = self._property_filter(all_properties)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(f"SELECT property, room_number, room_type, status, guest_name, check_in_date, "
+                                  f"check_out_date, rate_per_night FROM rooms {where} ORDER BY property, rowid",
+                                  params).fetchall()
+
+    def reservation_rows(self, all_properties: bool = False) -> List[tuple]:
+        """Plain (property, room_number, check_in, check_out) tuples of every reservation"""
+        where, params = self._property_filter(all_properties)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(f"SELECT property, room_number, check_in, check_out FROM reservations {where}",
+                                  params).fetchall()
+
+    # ----- settings and rooms ---------------------------------------------
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT hotel_name, email_settings FROM properties WHERE name = ?",
+                                     (self.property_name,)).fetchone()
+        if row is None:
+            return None
+        return {'hotel_name': row["hotel_name"], 'email_settings': json.loads(row["email_settings"])}
+
+    def _write_settings(self, settings: Dict[str, Any]):
+        self._conn.execute(
+            "INSERT INTO properties (name, hotel_name, email_settings, last_updated) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET hotel_name = excluded.hotel_name, "
+            "email_settings = excluded.email_settings, last_updated = excluded.last_updated",
+            (self.property_name, settings.get('hotel_name') or self.property_name,
+             json.dumps(settings.get('email_settings', {})), datetime.now().isoformat()))
+
+    def _insert_rooms(self, rooms: Iterable[HotelRoom]):
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO rooms (property, {ROOM_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((self.property_name, room.room_number, room.room_type, room.status.value, room.guest_name,
+              room.check_in_date, room.check_out_date, room.rate_per_night,
+              json.dumps(room.special_requests or [])) for room in rooms))
+
+    def replace(self, settings: Dict[str, Any], rooms: Iterable[HotelRoom],
+                reservations: Iterable[Reservation] = ()):
+        with self._lock, self._conn:
+            self._write_settings(settings)
+            self._conn.execute("DELETE FROM rooms WHERE property = ?", (self.property_name,))
+            self._insert_rooms(rooms)
+            self._conn.execute("DELETE FROM reservations WHERE property = ?", (self.property_name,))
+            self._insert_reservations(reservations)
+
+    def save_settings(self, settings: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._write_settings(settings)
+
+    def add_rooms(self, rooms: Iterable[HotelRoom]):
+        with self._lock, self._conn:
+            self._insert_rooms(rooms)
+
+    # ----- queries ----------------------------------------------------------
+
+    @staticmethod
+    def _to_room(row) -> HotelRoom:
+        # Rows come back by the thousand for status queries, so skip the
+        # enum lookup and the JSON parse of the common empty list
+        (room_number, room_type, status, guest_name, check_in_date, check_out_date,
+         rate_per_night, special_requests) = row
+        return HotelRoom(room_number, room_type, _STATUSES[status], guest_name, check_in_date, check_out_date,
+                         rate_per_night, [] if special_requests == '[]' else json.loads(special_requests))
+
+    def _rooms(self, where: str = "", params: tuple = ()) -> List[HotelRoom]:
+        # rowid order is insertion order, like the JSON file's
+        query = f"SELECT {ROOM_COLUMNS} FROM rooms WHERE property = ? {where} ORDER BY rowid"
+        with self._lock:
+            rows = self._conn.execute(query, (self.property_name,) + params).fetchall()
+        return [self._to_room(row) for row in rows]
+
+    def all_rooms(self) -> Dict[str, HotelRoom]:
+        return {room.room_number: room for room in self._rooms()}
+
+    def get_room(self, room_number: str) -> Optional[HotelRoom]:
+        rooms = self._rooms("AND room_number = ?", (room_number,))
+        return rooms[0] if rooms else None
+
+    def rooms_with_status(self, status: RoomStatus) -> List[HotelRoom]:
+        return self._rooms("AND status = ?", (status.value,))
+
+    def status_counts(self) -> Dict[RoomStatus, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM rooms WHERE property = ? GROUP BY status",
+                                      (self.property_name,)).fetchall()
+        return {RoomStatus(status): count for status, count in rows}
+
+    def find_guest(self, guest_name: str) -> List[HotelRoom]:
+        name = guest_name.strip()
+        if not name:
+            return []
+        exact = self._rooms("AND guest_name != '' AND guest_name = ? COLLATE NOCASE", (name,))
+        if exact:
+            return exact
+        pattern = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return self._rooms("AND guest_name LIKE ? ESCAPE '\\'", (f"%{pattern}%",))
+
+    def stays_between(self, start, end) -> List[HotelRoom]:
+        return self._rooms("AND check_out_date IS NOT NULL AND check_out_date > ? AND status = ? "
+                           "AND check_in_date < ?", (_iso(start), RoomStatus.OCCUPIED.value, _iso(end)))
+
+    # ----- check-in/out -----------------------------------------------------
+
+    def _update(self, room_number: str, assignments: str, params: tuple, required_status=None) -> bool:
+        """One conditional UPDATE in its own transaction; False if no row matched"""
+        query = f"UPDATE rooms SET {assignments} WHERE property = ? AND room_number = ?"
+        params = params + (self.property_name, room_number)
+        if required_status is not None:
+            query += " AND status = ?"
+            params += (required_status.value,)
+        with self._lock, self._conn:
+            return self._conn.execute(query, params).rowcount == 1
+
+    def check_in(self, room_number: str, guest_name: str, check_in_date: str,
+                 check_out_date: str, special_requests: List[str]) -> bool:
+        return self._update(
+            room_number,
+            "status = ?, guest_name = ?, check_in_date = ?, check_out_date = ?, special_requests = ?",
+            (RoomStatus.OCCUPIED.value, guest_name, check_in_date, check_out_date,
+             json.dumps(special_requests or [])),
+            required_status=RoomStatus.AVAILABLE)
+
+    def check_out(self, room_number: str) -> bool:
+        return self._update(
+            room_number,
+            "status = ?, guest_name = '', check_in_date = NULL, check_out_date = NULL, special_requests = '[]'",
+            (RoomStatus.CLEANING.value,),
+            required_status=RoomStatus.OCCUPIED)
+
+    def set_status(self, room_number: str, status: RoomStatus) -> bool:
+        return self._update(room_number, "status = ?", (status.value,))
+
+    # ----- reservations -----------------------------------------------------
+
+    def _insert_reservations(self, reservations: Iterable[Reservation]):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO reservations (property, reservation_id, room_number, guest_name, "
+            "check_in, check_out, special_requests) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((self.property_name, r.reservation_id, r.room_number, r.guest_name, r.check_in.isoformat(),
+              r.check_out.isoformat(), json.dumps(r.special_requests)) for r in reservations))
+
+    def load_reservations(self, since=None) -> List[Reservation]:
+        query = ("SELECT reservation_id, room_number, guest_name, check_in, check_out, special_requests "
+                 "FROM reservations WHERE property = ?")
+        params: tuple = (self.property_name,)
+        if since is not None:
+            query += " AND check_out > ?"
+            params += (_iso(since),)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [Reservation(row["room_number"], row["guest_name"], date.fromisoformat(row["check_in"]),
+                            date.fromisoformat(row["check_out"]), json.loads(row["special_requests"]),
+                            row["reservation_id"]) for row in rows]
+
+    def save_reservation(self, reservation: Reservation):
+        with self._lock, self._conn:
+            self._insert_reservations([reservation])
+
+    def delete_reservation(self, reservation_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM reservations WHERE property = ? AND reservation_id = ?",
+                               (self.property_name, reservation_id))
+
@@ -0,0 +1,159 @@
+"""
+Hotel Summary
+Occupancy, status counts and room revenue kept up to date on every room
+transition, so a dashboard reading them never scans the rooms, plus a
+feed of change events it can subscribe to instead of polling.
+
+Revenue is kept in cents so adding and removing rates never drifts. The
+room lists in the summary are rebuilt at most once per change, on the
+first read after it.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .rooms import HotelRoom, RoomStatus
+
+
+@dataclass(frozen=True)
+class HotelEvent:
+    """One change, as delivered to subscribers"""
+    kind: str  # "check_in", "check_out", "status", "booked", "cancelled" or "rooms" (reloaded/added)
+    room_number: Optional[str] = None
+    old_status: Optional[RoomStatus] = None
+    new_status: Optional[RoomStatus] = None
+    guest_name: str = ""
+    version: int = 0  # Summary version after the change
+    timestamp: float = field(default_factory=time.time)
+
+
+def _cents(rate: float) -> int:
+    return int(round(rate * 100))
+
+
+class HotelSummary:
+    """Running counters for one hotel; safe to update and read from several threads"""
+
+    def __init__(self, rooms: Iterable[HotelRoom] = ()):
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[HotelEvent], None]] = []
+        self.version = 0
+        self.reset(rooms)
+
+    def reset(self, rooms: Iterable[HotelRoom]):
+        """Recount from scratch, e.g. after loading or importing rooms"""
+        with self._lock:
+            self.status_counts: Dict[RoomStatus, int] = {status: 0 for status in RoomStatus}
+            self._status: Dict[str, RoomStatus] = {}
+            self._rates: Dict[str, int] = {}
+            self._order: Dict[str, int] = {}
+            self._available: Dict[str, None] = {}
+            self._occupied: Dict[str, None] = {}
+            self._guests: Dict[str, str] = {}
+            self.revenue_cents = 0
+            for room in rooms:
+                self._order[room.room_number] = len(self._order)
+                self._rates[room.room_number] = _cents(room.rate_per_night)
+                self._status[room.room_number] = room.status
+                self._guests[room.room_number] = room.guest_name
+                self.status_counts[room.status] += 1
+                if room.status == RoomStatus.AVAILABLE:
+                    self._available[room.room_number] = None
+                elif room.status == RoomStatus.OCCUPIED:
+                    self._occupied[room.room_number] = None
+                    self.revenue_cents += self._rates[room.room_number]
+            self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._lists = None
+
+    @property
+    def total_rooms(self) -> int:
+        return len(self._status)
+
+    def transition(self, room_number: str, new_status: RoomStatus,
+                   guest_name: Optional[str] = None) -> Optional[RoomStatus]:
+        """
+        Record a room's new status (and guest, unless None keeps it) in
+        O(1); returns the old status, or None for an unknown room
+        """
+        with self._lock:
+            old_status = self._status.get(room_number)
+            if old_status is None:
+                return None
+            if guest_name is not None:
+                self._guests[room_number] = guest_name
+            self.status_counts[old_status] -= 1
+            self.status_counts[new_status] += 1
+            self._status[room_number] = new_status
+            if old_status == RoomStatus.AVAILABLE:
+                del self._available[room_number]
+            elif old_status == RoomStatus.OCCUPIED:
+                del self._occupied[room_number]
+                self.revenue_cents -= self._rates[room_number]
+            if new_status == RoomStatus.AVAILABLE:
+                self._available[room_number] = None
+            elif new_status == RoomStatus.OCCUPIED:
+                self._occupied[room_number] = None
+                self.revenue_cents += self._rates[room_number]
+            self._changed()
+            return old_status
+
+    def snapshot(self, hotel_name: str) -> Dict[str, Any]:
+        """
+        The get_hotel_summary dict. Counters are read directly; the room
+        lists are shared with later reads until the next change, so treat
+        them as read-only.
+        """
+        with self._lock:
+            if self._lists is None:
+                order = self._order.get
+                available = sorted(self._available, key=order)
+                occupied = [(number, self._guests[number]) for number in sorted(self._occupied, key=order)]
+                self._lists = (available, occupied)
+            available, occupied = self._lists
+            total = len(self._status)
+            occupied_count = self.status_counts[RoomStatus.OCCUPIED]
+            return {
+                'hotel_name': hotel_name,
+                'total_rooms': total,
+                'available_rooms': self.status_counts[RoomStatus.AVAILABLE],
+                'occupied_rooms': occupied_count,
+                'occupancy_rate': round(occupied_count / total * 100, 1) if total else 0.0,
+                'rooms_cleaning': self.status_counts[RoomStatus.CLEANING],
+                'rooms_maintenance': self.status_counts[RoomStatus.MAINTENANCE],
+                'daily_revenue': self.revenue_cents / 100,
+                'available_room_list': available,
+                'occupied_room_list': occupied
+            }
+
+    # ----- change events ----------------------------------------------------
+
+    def subscribe(self, callback: Callable[[HotelEvent], None]) -> Callable[[], None]:
+        """Call `callback` with every HotelEvent from now on; returns a function that unsubscribes"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def publish(self, kind: str, room_number: Optional[str] = None, old_status: Optional[RoomStatus] = None,
+                new_status: Optional[RoomStatus] = None, guest_name: str = ""):
+        """Deliver an event on the caller's thread; a failing subscriber doesn't stop the others"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            version = self.version
+        if not subscribers:
+            return
+        event = HotelEvent(kind, room_number, old_status, new_status, guest_name, version)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in hotel event subscriber: {e}")
@@ -0,0 +1 @@
+# Mail Sync Package
@@ -0,0 +1,223 @@
+"""
+Local Mail Index for Gaia
+SQLite store of synced messages with full-text search, so "check emails"
+and mail searches are answered locally instead of walking Outlook.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.mail.sources import EmailMessage, EmailSource
+
+DEFAULT_INDEX_PATH = Path.home() / ".cache" / "gaia" / "mail_index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    rowid INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    message_id TEXT NOT NULL,
+    sender TEXT NOT NULL DEFAULT '',
+    subject TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL DEFAULT '',
+    received REAL NOT NULL,
+    folder TEXT NOT NULL DEFAULT 'inbox',
+    UNIQUE (source, message_id)
+);
+CREATE INDEX IF NOT EXISTS messages_received ON messages (received DESC);
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT PRIMARY KEY,
+    watermark REAL,
+    last_sync REAL,
+    synced INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    subject, body, sender, content='messages', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, subject, body, sender)
+    VALUES (new.rowid, new.subject, new.body, new.sender);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, subject, body, sender)
+    VALUES ('delete', old.rowid, old.subject, old.body, old.sender);
+END;
+"""
+
+
+class MailIndex:
+    """
+    Messages from any number of sources, keyed by (source, message_id).
+    Safe to share between threads; use ":memory:" for a throwaway index.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, batch_size: int = 500):
+        self.path = str(path)
+        self.batch_size = batch_size
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.executescript(FTS_SCHEMA)
+                self.full_text = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: search falls back to LIKE
+                self.full_text = False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ----- sync -------------------------------------------------------------
+
+    def watermark(self, source: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT watermark FROM sync_state WHERE source = ?", (source,)).fetchone()
+        return row["watermark"] if row else None
+
+    def last_sync(self, source: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT last_sync FROM sync_state WHERE source = ?", (source,)).fetchone()
+        return row["last_sync"] if row else None
+
+    def _insert(self, source: str, messages: Iterable[EmailMessage]) -> int:
+        added = 0
+        for message in messages:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO messages (source, message_id, sender, subject, body, received, folder) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (source, message.message_id, message.sender, message.subject, message.body,
+                 message.received, message.folder))
+            added += cursor.rowcount
+        return added
+
+    def add(self, source: str, messages: Iterable[EmailMessage]) -> int:
+        """Store messages, skipping ones already indexed; returns how many were new"""
+        with self._lock, self._conn:
+            return self._insert(source, messages)
+
+    def sync(self, source: EmailSource) -> int:
+        """
+        Pull messages newer than the source's watermark. Messages come oldest
+        first and each batch is committed with the watermark reached so far,
+        so an interrupted sync resumes where it stopped. If a source yields
+        out of order, the watermark only moves once the whole fetch is done.
+        """
+        since = self.watermark(source.name)
+        watermark = since
+        in_order = True
+        added = 0
+        batch: List[EmailMessage] = []
+
+        def commit(mark):
+            nonlocal added
+            with self._lock, self._conn:
+                added += self._insert(source.name, batch)
+                self._conn.execute(
+                    "INSERT INTO sync_state (source, watermark, last_sync, synced) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(source) DO UPDATE SET watermark = excluded.watermark, "
+                    "last_sync = excluded.last_sync, synced = synced + excluded.synced",
+                    (source.name, mark, time.time(), len(batch)))
+            batch.clear()
+
+        for message in source.fetch(since):
+            batch.append(message)
+            if message.position is not None:
+                if watermark is not None and message.position < watermark:
+                    in_order = False
+                elif watermark is None or message.position > watermark:
+                    watermark = message.position
+            if len(batch) >= self.batch_size:
+                commit(watermark if in_order else since)
+        commit(watermark)
+        return added
+
+    # ----- queries ----------------------------------------------------------
+
+    @staticmethod
+    def _to_message(row) -> EmailMessage:
+        return EmailMessage(row["message_id"], row["sender"], row["subject"], row["body"],
+                            row["received"], row["folder"])
+
+    def recent(self, limit: int = 5, folder: Optional[str] = None) -> List[EmailMessage]:
+        query = "SELECT * FROM messages"
+        params: list = []
+        if folder:
+            query += " WHERE folder = ?"
+            params.append(folder)
+        query += " ORDER BY received DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [self._to_message(row) for row in self._conn.execute(query, params)]
+
+    def since(self, timestamp: float, limit: int = 100) -> List[EmailMessage]:
+        """Messages received at or after a time, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM messages WHERE received >= ? ORDER BY received DESC LIMIT ?",
+                (timestamp, limit)).fetchall()
+        return [self._to_message(row) for row in rows]
+
+    def search(self, query: str, limit: int = 10) -> List[EmailMessage]:
+        """Full-text search over subject, body and sender, best matches first"""
+        words = [word for word in query.replace('"', " ").split() if word]
+        if not words:
+            return []
+        with self._lock:
+            if self.full_text:
+                # Quote each word so punctuation can't be read as FTS syntax
+                match = " ".join(f'"{word}"' for word in words)
+                rows = self._conn.execute(
+                    "SELECT messages.* FROM messages_fts JOIN messages ON messages.rowid = messages_fts.rowid "
+                    "WHERE messages_fts MATCH ? ORDER BY bm25(messages_fts), messages.received DESC LIMIT ?",
+                    (match, limit)).fetchall()
+            else:
+                clause = " AND ".join("(subject || ' ' || body || ' ' || sender) LIKE ?" for _ in words)
+                rows = self._conn.execute(
+                    f"SELECT * FROM messages WHERE {clause} ORDER BY received DESC LIMIT ?",
+                    [f"%{word}%" for word in words] + [limit]).fetchall()
+        return [self._to_message(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            sources = {row["source"]: {"watermark": row["watermark"], "last_sync": row["last_sync"],
+                                       "synced": row["synced"]}
+                       for row in self._conn.execute("SELECT * FROM sync_state")}
+        return {"messages": self.count(), "full_text": self.full_text, "sources": sources}
+
+
+class Inbox:
+    """A source kept in sync with an index; what "check emails" talks to"""
+
+    def __init__(self, source: EmailSource, index: MailIndex, max_age: float = 60.0):
+        self.source = source
+        self.index = index
+        self.max_age = max_age
+
+    def sync(self) -> int:
+        return self.index.sync(self.source)
+
+    def check(self, limit: int = 5) -> List[str]:
+        """Latest messages as spoken lines, syncing first only if the index is stale"""
+        last_sync = self.index.last_sync(self.source.name)
+        if last_sync is None or time.time() - last_sync > self.max_age:
+            self.sync()
+        return [f"From: {message.sender}, Subject: {message.subject}" for message in self.index.recent(limit)]
+
+    def search(self, query: str, limit: int = 5) -> List[str]:
+        return [f"From: {message.sender}, Subject: {message.subject}"
+                for message in self.index.search(query, limit)]
@@ -0,0 +1,220 @@
+"""
+Email File Ingestion for Gaia
+Streams messages out of mail exports (JSON, JSONL, CSV, mbox and folders of
+.eml files) and classifies them as they are read, so a multi-gigabyte
+export never has to fit in memory.
+"""
+
+import csv
+import json
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from core.mail.sources import EmailMessage, iter_mbox, message_from_record, parse_rfc822
+
+FORMATS = ("json", "jsonl", "csv", "mbox", "eml")
+
+SUFFIX_FORMATS = {
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+    ".mbox": "mbox",
+    ".mbx": "mbox",
+    ".eml": "eml",
+}
+
+# Characters read from a JSON file at a time
+JSON_CHUNK_SIZE = 1 << 20
+
+# CSV exports put whole message bodies in one field
+CSV_FIELD_LIMIT = 64 * 1024 * 1024
+
+_JSON_SEPARATORS = re.compile(r'[\s,]*')
+
+
+def detect_format(path) -> str:
+    """Format from the file suffix, or by sniffing the first bytes"""
+    path = Path(path)
+    if path.is_dir():
+        return "eml"
+    fmt = SUFFIX_FORMATS.get(path.suffix.lower())
+    if fmt:
+        return fmt
+    with open(path, "rb") as f:
+        head = f.read(512).lstrip()
+    if head.startswith(b"From "):
+        return "mbox"
+    if head.startswith((b"[", b"{")):
+        return "jsonl" if head.startswith(b"{") and b"\n{" in head else "json"
+    raise ValueError(f"Can't tell the email format of {path}; expected one of {', '.join(FORMATS)}")
+
+
+def _iter_json_array(f, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+    """Items of a top-level JSON array, decoded one at a time"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    while True:
+        chunk = f.read(chunk_size)
+        buffer += chunk
+        pos = 0
+        while True:
+            pos = _JSON_SEPARATORS.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array of emails")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break  # Item continues in the next chunk
+            yield item
+        buffer = buffer[pos:]
+        if not chunk:
+            if started:
+                raise ValueError("JSON array of emails is not terminated")
+            return
+
+
+def _json_records(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        start = f.read(4096).lstrip()
+        f.seek(0)
+        if start.startswith("{"):
+            # {"emails": [...]} as written by the fixtures; small enough to load
+            data = json.load(f)
+            yield from data.get("emails", [])
+        else:
+            yield from _iter_json_array(f)
+
+
+def _jsonl_records(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _csv_records(path: Path) -> Iterator[Dict[str, Any]]:
+    csv.field_size_limit(max(csv.field_size_limit(), CSV_FIELD_LIMIT))
+    # utf-8-sig: spreadsheet exports start with a byte order mark
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {(key or "").strip().lower(): value for key, value in row.items()}
+
+
+def _eml_files(path: Path) -> Iterator[Path]:
+    if path.is_file():
+        yield path
+        return
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        for name in sorted(names):
+            if name.lower().endswith(".eml"):
+                yield Path(root) / name
+
+
+def _eml_messages(path: Path) -> Iterator[EmailMessage]:
+    for file_path in _eml_files(path):
+        with open(file_path, "rb") as f:
+            data = f.read()
+        yield parse_rfc822(data, file_path.stem, file_path.stat().st_mtime)
+
+
+RECORD_READERS = {"json": _json_records, "jsonl": _jsonl_records, "csv": _csv_records}
+
+
+def iter_email_file(path, fmt: Optional[str] = None) -> Iterator[EmailMessage]:
+    """Messages from a mail export, read lazily; fmt defaults to detect_format(path)"""
+    path = Path(path)
+    fmt = (fmt or detect_format(path)).lower()
+    if fmt == "mbox":
+        for data, end in iter_mbox(path):
+            yield parse_rfc822(data, f"{path.name}:{end}")
+    elif fmt == "eml":
+        yield from _eml_messages(path)
+    elif fmt in RECORD_READERS:
+        for index, record in enumerate(RECORD_READERS[fmt](path)):
+            yield message_from_record(record, f"{path.name}:{index}")
+    else:
+        raise ValueError(f"Unknown email format '{fmt}'; expected one of {', '.join(FORMATS)}")
+
+
+def iter_records(path, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Raw dicts from a JSON, JSONL or CSV file, e.g. labelled training emails"""
+    path = Path(path)
+    fmt = (fmt or detect_format(path)).lower()
+    if fmt not in RECORD_READERS:
+        raise ValueError(f"Expected a JSON, JSONL or CSV file, not {fmt}")
+    yield from RECORD_READERS[fmt](path)
+
+
+def default_output_path(path) -> Path:
+    """Where results go unless told otherwise: next to the input"""
+    path = Path(path)
+    return path.with_name(f"{path.name}.classified.jsonl")
+
+
+@dataclass
+class IngestStats:
+    messages: int = 0
+    seconds: float = 0.0
+    categories: Counter = field(default_factory=Counter)
+    priorities: Counter = field(default_factory=Counter)
+
+    @property
+    def rate(self) -> float:
+        """Emails per second"""
+        return self.messages / self.seconds if self.seconds else 0.0
+
+
+def ingest_file(path, classifier, output=None, fmt: Optional[str] = None, processes: int = 0,
+                progress: Optional[Callable[[IngestStats], None]] = None, progress_every: int = 1000,
+                on_result: Optional[Callable[[Dict[str, Any], Any], None]] = None) -> IngestStats:
+    """
+    Classify every message in a mail export with a HotelEmailClassifier.
+
+    Each result is appended to `output` as a JSON line (the email dict plus
+    its "classification") as soon as it is ready. `progress(stats)` is called
+    every `progress_every` emails and `on_result(email, classification)`
+    for each one.
+    """
+    stats = IngestStats()
+    started = time.perf_counter()
+    out = open(output, "w", encoding="utf-8") if output else None
+    try:
+        emails = (message.to_dict() for message in iter_email_file(path, fmt))
+        for email_data, classification in classifier.classify_batch(emails, processes):
+            stats.messages += 1
+            stats.categories[classification.category.value] += 1
+            stats.priorities[classification.priority.value] += 1
+            if out:
+                out.write(json.dumps({**email_data, "classification": classification.to_dict()},
+                                     ensure_ascii=False) + "\n")
+            if on_result:
+                on_result(email_data, classification)
+            if stats.messages % progress_every == 0:
+                stats.seconds = time.perf_counter() - started
+                if out:
+                    out.flush()
+                if progress:
+                    progress(stats)
+    finally:
+        if out:
+            out.close()
+    stats.seconds = time.perf_counter() - started
+    return stats
@@ -0,0 +1,354 @@
+"""
+Email Sources for Gaia
+Pluggable mailbox backends that yield messages newer than a watermark.
+
+Each source decides what its watermark means: Outlook and JSON fixtures use
+the received time, Maildir the file modification time and mbox the byte
+offset where the last read stopped. Sources yield messages oldest first, so
+the index can save the watermark part way through a sync. They may return a
+message again at the watermark boundary; the index ignores ones it already has.
+"""
+
+import email
+import email.errors
+import email.header
+import email.policy
+import email.utils
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Outlook's default Inbox folder id
+OUTLOOK_INBOX = 6
+
+
+@dataclass
+class EmailMessage:
+    message_id: str
+    sender: str
+    subject: str
+    body: str
+    received: float                 # Unix time
+    folder: str = "inbox"
+    position: Optional[float] = None  # Source watermark once this message is stored
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.received).strftime("%Y-%m-%d %H:%M")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The email dict shape HotelManager and the classifier use"""
+        return {
+            "id": self.message_id,
+            "sender": self.sender,
+            "subject": self.subject,
+            "content": self.body,
+            "timestamp": self.timestamp,
+        }
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Unix time from epoch numbers, ISO strings, "YYYY-MM-DD HH:MM" or RFC 2822 dates"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    try:
+        return email.utils.parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _header_text(value) -> str:
+    """Header with RFC 2047 encoded words decoded; raw 8-bit bytes read as UTF-8"""
+    if value is None:
+        return ""
+    if not isinstance(value, email.header.Header) and "=?" not in value:
+        return str(value)
+    try:
+        parts = email.header.decode_header(value)
+    except email.errors.HeaderParseError:
+        return str(value)
+    words = []
+    for part, charset in parts:
+        if isinstance(part, bytes):
+            if charset in (None, "unknown-8bit"):
+                charset = "utf-8"
+            try:
+                part = part.decode(charset, errors="replace")
+            except LookupError:  # Unknown charset name
+                part = part.decode("utf-8", errors="replace")
+        words.append(part)
+    return "".join(words)
+
+
+def _decode_payload(part) -> str:
+    payload = part.get_payload(decode=True)
+    if not isinstance(payload, bytes):
+        return ""
+    try:
+        return payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+    except LookupError:  # Unknown charset name
+        return payload.decode("utf-8", errors="replace")
+
+
+def _message_body(message) -> str:
+    """Plain text body of a parsed email (first text/plain part, else text/html)"""
+    html = None
+    for part in message.walk():
+        if part.is_multipart() or part.get_content_disposition() == "attachment":
+            continue
+        content_type = part.get_content_type()
+        if content_type == "text/plain":
+            return _decode_payload(part)
+        if content_type == "text/html" and html is None:
+            html = part
+    if html is not None:
+        return _decode_payload(html)
+    return "" if message.is_multipart() else _decode_payload(message)
+
+
+def parse_rfc822(data: bytes, fallback_id: str, fallback_time: Optional[float] = None,
+                 folder: str = "inbox") -> EmailMessage:
+    """
+    EmailMessage from raw RFC 822 bytes (.eml files, Maildir and mbox entries).
+    Parsed with the compat32 policy and decoded here: an order of magnitude
+    faster than email.policy.default on large exports.
+    """
+    message = email.message_from_bytes(data, policy=email.policy.compat32)
+    received = parse_timestamp(message.get("Date")) or fallback_time or 0.0
+    return EmailMessage(
+        message_id=_header_text(message.get("Message-ID")).strip() or fallback_id,
+        sender=_header_text(message.get("From")),
+        subject=_header_text(message.get("Subject")),
+        body=_message_body(message),
+        received=received,
+        folder=folder,
+    )
+
+
+def message_from_record(record: Dict[str, Any], fallback_id: str) -> EmailMessage:
+    """
+    EmailMessage from an email dict (JSON, JSONL or CSV row). Accepts the
+    classifier's field names (id, sender, subject, content, timestamp) and
+    the common alternatives (message_id, from, body, received, date).
+    """
+    def first(*keys, default=""):
+        for key in keys:
+            value = record.get(key)
+            if value not in (None, ""):
+                return value
+        return default
+
+    return EmailMessage(
+        message_id=str(first("id", "message_id", default=fallback_id)),
+        sender=str(first("sender", "from")),
+        subject=str(first("subject")),
+        body=str(first("content", "body")),
+        received=parse_timestamp(first("received", "timestamp", "date", default=None)) or 0.0,
+        folder=str(first("folder", default="inbox")),
+    )
+
+
+def iter_mbox(path, start: int = 0) -> Iterator[Tuple[bytes, int]]:
+    """
+    Raw messages from an mbox file with the offset just past each one.
+    Reads line by line from `start`, so huge exports are never held in memory.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        lines = []
+        offset = start
+        previous_blank = True
+        for line in f:
+            if line.startswith(b"From ") and previous_blank:
+                if lines:
+                    yield b"".join(lines), offset
+                lines = []
+            elif lines or not line.startswith(b"From "):
+                # mboxrd quoting: ">From " lines were escaped on export
+                lines.append(line[1:] if line.startswith(b">From ") else line)
+            offset += len(line)
+            previous_blank = line in (b"\n", b"\r\n")
+        if lines:
+            yield b"".join(lines), offset
+
+
+class EmailSource:
+    """A mailbox backend; `name` keys its sync state in the index"""
+
+    name = "source"
+
+    def fetch(self, since: Optional[float] = None) -> Iterator[EmailMessage]:
+        """Messages at or after the watermark, each with its `position` set, in position order"""
+        raise NotImplementedError
+
+
+class JsonFixtureSource(EmailSource):
+    """
+    JSON list (or JSONL) of email dicts: id, sender, subject, content/body,
+    timestamp/received. Mainly for tests and demos on machines without Outlook.
+    """
+
+    def __init__(self, path, name: Optional[str] = None):
+        self.path = Path(path)
+        self.name = name or f"json:{self.path}"
+
+    def _records(self):
+        with open(self.path, encoding="utf-8") as f:
+            if self.path.suffix == ".jsonl":
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                data = json.load(f)
+                yield from data.get("emails", []) if isinstance(data, dict) else data
+
+    def fetch(self, since: Optional[float] = None) -> Iterator[EmailMessage]:
+        messages = []
+        for index, record in enumerate(self._records()):
+            message = message_from_record(record, f"{self.path.name}:{index}")
+            if since is not None and message.received < since:
+                continue
+            message.position = message.received
+            messages.append(message)
+        messages.sort(key=lambda message: message.position)
+        yield from messages
+
+
+class MaildirSource(EmailSource):
+    """Maildir folder; only files modified since the last sync are parsed"""
+
+    def __init__(self, path, name: Optional[str] = None):
+        self.path = Path(path)
+        self.name = name or f"maildir:{self.path}"
+
+    def fetch(self, since: Optional[float] = None) -> Iterator[EmailMessage]:
+        # Directory order is arbitrary; stat everything first and parse oldest first
+        files = []
+        for subdir in ("new", "cur"):
+            directory = self.path / subdir
+            if not directory.is_dir():
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or entry.name.startswith("."):
+                        continue
+                    mtime = entry.stat().st_mtime
+                    if since is None or mtime >= since:
+                        files.append((mtime, entry.name, entry.path))
+
+        for mtime, name, path in sorted(files):
+            with open(path, "rb") as f:
+                data = f.read()
+            # The unique part of a Maildir name is everything before ":2,flags"
+            message = parse_rfc822(data, name.split(":", 1)[0], mtime)
+            message.position = mtime
+            yield message
+
+
+class MboxSource(EmailSource):
+    """mbox file; resumes reading at the byte offset where the last sync stopped"""
+
+    def __init__(self, path, name: Optional[str] = None):
+        self.path = Path(path)
+        self.name = name or f"mbox:{self.path}"
+
+    def fetch(self, since: Optional[float] = None) -> Iterator[EmailMessage]:
+        start = int(since or 0)
+        if start > self.path.stat().st_size:
+            start = 0  # File was replaced or truncated
+        for data, end in iter_mbox(self.path, start):
+            message = parse_rfc822(data, f"{self.path.name}:{end}")
+            message.position = float(end)
+            yield message
+
+
+class OutlookSource(EmailSource):
+    """
+    Outlook inbox over COM (Windows only).
+    Uses Items.Restrict on ReceivedTime so only new items cross the COM boundary.
+    The first sync reads the newest `initial_limit` items.
+    """
+
+    name = "outlook"
+
+    def __init__(self, folder_id: int = OUTLOOK_INBOX, initial_limit: int = 500):
+        self.folder_id = folder_id
+        self.initial_limit = initial_limit
+
+    def fetch(self, since: Optional[float] = None) -> Iterator[EmailMessage]:
+        import win32com.client
+
+        namespace = win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
+        items = namespace.GetDefaultFolder(self.folder_id).Items
+        if since is None:
+            # Newest first to find the latest items, then handed over oldest first
+            items.Sort("[ReceivedTime]", True)
+            latest = []
+            for item in items:
+                if len(latest) >= self.initial_limit:
+                    break
+                message = self._to_message(item)
+                if message is not None:
+                    latest.append(message)
+            yield from reversed(latest)
+            return
+
+        # Restrict has minute resolution; anything already indexed is skipped
+        cutoff = datetime.fromtimestamp(since).strftime("%m/%d/%Y %I:%M %p")
+        items = items.Restrict(f"[ReceivedTime] >= '{cutoff}'")
+        items.Sort("[ReceivedTime]", False)  # Oldest first
+        for item in items:
+            message = self._to_message(item)
+            if message is not None:
+                yield message
+
+    @staticmethod
+    def _to_message(item) -> Optional[EmailMessage]:
+        # Meeting requests, receipts etc. lack some mail properties
+        received = getattr(item, "ReceivedTime", None)
+        if received is None:
+            return None
+        received = datetime(received.year, received.month, received.day,
+                            received.hour, received.minute, received.second).timestamp()
+        return EmailMessage(
+            message_id=item.EntryID,
+            sender=getattr(item, "SenderName", "") or "",
+            subject=getattr(item, "Subject", "") or "",
+            body=getattr(item, "Body", "") or "",
+            received=received,
+            position=received,
+            extra={"sender_address": getattr(item, "SenderEmailAddress", "") or ""},
+        )
+
+
+def create_source(kind: str = "outlook", path: Optional[str] = None) -> EmailSource:
+    """Source from config: "outlook", "maildir", "mbox" or "json" (json/jsonl fixture)"""
+    kind = (kind or "outlook").lower()
+    if kind == "outlook":
+        return OutlookSource()
+    if not path:
+        raise ValueError(f"Mail source '{kind}' needs a path")
+    if kind == "maildir":
+        return MaildirSource(path)
+    if kind == "mbox":
+        return MboxSource(path)
+    if kind in ("json", "jsonl"):
+        return JsonFixtureSource(path)
+    raise ValueError(f"Unknown mail source '{kind}'")
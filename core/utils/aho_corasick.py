@@ -0,0 +1,118 @@
+"""
+Aho-Corasick keyword automaton
+Finds every occurrence of a fixed set of phrases in one left-to-right pass,
+however many phrases there are. Shared by the intent matcher and the email
+classifier, which both used to scan the text once per keyword.
+"""
+
+from collections import deque
+from typing import Dict, Generic, Hashable, Iterable, Iterator, List, NamedTuple, Tuple, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class Match(NamedTuple):
+    start: int
+    end: int        # Exclusive
+    phrase: str
+    value: object
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class AhoCorasick(Generic[T]):
+    """
+    Multi-phrase matcher.
+
+    Add phrases with add(), then build() once; matching is O(len(text) +
+    number of matches). With `word_boundaries`, a phrase only matches where
+    it isn't part of a longer word ("word" doesn't match "password"); edges
+    that are punctuation, like "?", match anywhere.
+    """
+
+    def __init__(self, word_boundaries: bool = True, case_sensitive: bool = False):
+        self.word_boundaries = word_boundaries
+        self.case_sensitive = case_sensitive
+        # Node 0 is the root; each node is a dict of char -> child node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Phrases ending at each node, including those reached via fail links
+        self._output: List[List[Tuple[str, T]]] = [[]]
+        self._built = False
+
+    def add(self, phrase: str, value: T):
+        """Register a phrase; the same phrase may carry several values"""
+        if self._built:
+            raise RuntimeError("Automaton already built")
+        if not phrase:
+            raise ValueError("Empty phrase")
+        if not self.case_sensitive:
+            phrase = phrase.lower()
+        node = 0
+        for char in phrase:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = child
+        self._output[node].append((phrase, value))
+
+    def add_all(self, phrases: Iterable[str], value: T):
+        for phrase in phrases:
+            self.add(phrase, value)
+
+    def build(self) -> "AhoCorasick[T]":
+        """Compute failure links (breadth first); call once after adding phrases"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        self._built = True
+        return self
+
+    def _at_boundary(self, text: str, start: int, end: int, phrase: str) -> bool:
+        if _is_word_char(phrase[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(phrase[-1]) and end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def iter_matches(self, text: str) -> Iterator[Match]:
+        """Every (possibly overlapping) match, in order of where it ends"""
+        if not self._built:
+            self.build()
+        if not self.case_sensitive:
+            text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for phrase, value in output[node]:
+                start = index + 1 - len(phrase)
+                if self.word_boundaries and not self._at_boundary(text, start, index + 1, phrase):
+                    continue
+                yield Match(start, index + 1, phrase, value)
+
+    def find_all(self, text: str) -> List[Match]:
+        return list(self.iter_matches(text))
+
+    def count(self, text: str) -> Dict[T, int]:
+        """Number of matches per value"""
+        counts: Dict[T, int] = {}
+        for match in self.iter_matches(text):
+            counts[match.value] = counts.get(match.value, 0) + 1
+        return counts
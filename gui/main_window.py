@@ -12,6 +12,8 @@ from gui.widgets.chat_widget import ChatWidget
 from gui.widgets.control_panel import ControlPanel
 from gui.widgets.status_bar import StatusBar
 from core.agent.gaia_agent import GaiaAgent
+from core.audio.model_registry import preload_whisper_model
+from core.utils.config_manager import ConfigManager
 
 
 class GaiaMainWindow(QMainWindow):
@@ -23,6 +25,15 @@ class GaiaMainWindow(QMainWindow):
         self.init_ui()
         self.setup_system_tray()
         self.connect_signals()
+        self.preload_models()
+        
+    def preload_models(self):
+        """Start loading the Whisper model off the UI thread so Start doesn't block on it"""
+        try:
+            model_size = ConfigManager().get("whisper_model", "base")
+        except Exception:
+            model_size = "base"
+        preload_whisper_model(model_size)
         
     def init_ui(self):
         """Initialize the user interface"""
@@ -425,7 +436,7 @@ class GaiaMainWindow(QMainWindow):
         else:
             # Proper cleanup when actually closing
             if hasattr(self, 'gaia_agent') and self.gaia_agent:
-                self.gaia_agent.stop()
+                self.gaia_agent.close()
             a0.accept()
             # Force exit the application
             app = QApplication.instance()
@@ -39,6 +39,9 @@ Examples:
   ask What is the weather like?
   hotel status
   hotel check-in 101 "John Doe" "2023-12-31"
+  hotel available 2024-05-01 2024-05-04
+  hotel book 101 2024-05-01 2024-05-04 John Doe
+  hotel export hotel_backup.json
   email summary
         """
         print(help_text)
@@ -91,9 +94,62 @@ Examples:
                 for room in available:
                     print(f"  Room {room.room_number} - {room.room_type} (${room.rate_per_night}/night)")
                     
+            elif cmd == 'available':
+                # hotel available [check_in [check_out]], default tonight
+                rooms = hotel.find_free_rooms(*command_parts[1:3])
+                print(f"\n🛏️ Free Rooms ({len(rooms)}):")
+                for room in rooms:
+                    print(f"  Room {room.room_number} - {room.room_type} (${room.rate_per_night}/night)")
+                    
+            elif cmd == 'book' and len(command_parts) > 4:
+                # hotel book <room> <check_in> <check_out> <guest name>
+                room_number, check_in, check_out = command_parts[1:4]
+                guest_name = ' '.join(command_parts[4:])
+                reservation = hotel.book_room(room_number, guest_name, check_in, check_out)
+                if reservation:
+                    print(f"✅ Booked room {room_number} for {guest_name}, {reservation.nights} night(s) "
+                          f"(reservation {reservation.reservation_id})")
+                else:
+                    print(f"❌ Room {room_number} can't be booked for {check_in} to {check_out}")
+                    for other in hotel.reservations.conflicts(room_number, check_in, check_out):
+                        print(f"  Already booked: {other.guest_name} {other.check_in} to {other.check_out}")
+                        
+            elif cmd == 'cancel' and len(command_parts) > 1:
+                if hotel.cancel_reservation(command_parts[1]):
+                    print(f"✅ Cancelled reservation {command_parts[1]}")
+                else:
+                    print(f"❌ No reservation {command_parts[1]}")
+                    
+            elif cmd == 'forecast':
+                days = int(command_parts[1]) if len(command_parts) > 1 else 14
+                print(f"\n📈 Occupancy Forecast ({days} nights):")
+                for night in hotel.get_occupancy_forecast(days):
+                    print(f"  {night['date']}: {night['booked_rooms']}/{hotel.total_rooms} rooms "
+                          f"({night['occupancy_rate']}%), ${night['revenue']:.2f}")
+                    
+            elif cmd == 'guest' and len(command_parts) > 1:
+                name = ' '.join(command_parts[1:])
+                rooms = hotel.find_guest(name)
+                if not rooms:
+                    print(f"❌ No guest named {name}")
+                for room in rooms:
+                    print(f"  Room {room.room_number}: {room.guest_name} (until {room.check_out_date})")
+                    
+            elif cmd == 'export' and len(command_parts) > 1:
+                count = hotel.export_json(command_parts[1])
+                print(f"✅ Exported {count} rooms to {command_parts[1]}")
+                
+            elif cmd == 'import' and len(command_parts) > 1:
+                count = hotel.import_json(command_parts[1])
+                print(f"✅ Imported {count} rooms from {command_parts[1]}")
+                    
             else:
                 print(f"❌ Unknown hotel command: {cmd}")
-                print("Available: status, rooms")
+                print("Available: status, rooms, available [check_in [check_out]], "
+                      "book <room> <check_in> <check_out> <guest>, cancel <id>, forecast [days], "
+                      "guest <name>, export <file>, import <file>")
+            
+            hotel.close()
                 
         except ImportError:
             print("❌ Hotel system not available")
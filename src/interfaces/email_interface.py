@@ -3,7 +3,9 @@ Email Interface - Email Processing and Classification System
 Specialized interface for email management and AI classification
 """
 
+import json
 import sys
+from collections import Counter
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -11,7 +13,8 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 try:
-    from core.hotel.email_classifier import HotelEmailClassifier
+    from core.hotel.email_classifier import EmailCategory, HotelEmailClassifier
+    from core.mail.ingest import default_output_path, ingest_file
     EMAIL_AVAILABLE = True
     HotelEmailClassifierClass = HotelEmailClassifier
 except ImportError as e:
@@ -19,6 +22,20 @@ except ImportError as e:
     HotelEmailClassifierClass = None
     print(f"Warning: Email classifier not available: {e}")
 
+try:
+    from core.hotel.email_model import (DEFAULT_MODEL_PATH, DEFAULT_TRAINING_PATH, EmailModel,
+                                        append_examples, compare_with_rules, load_examples,
+                                        parse_category, saved_model, split_examples)
+    MODEL_AVAILABLE = True
+except ImportError:
+    MODEL_AVAILABLE = False
+
+# Emails from a loaded file kept for the view and analytics menus
+MAX_KEPT_EMAILS = 1000
+
+# Fewest labelled emails worth training on
+MIN_TRAINING_EXAMPLES = 10
+
 
 class EmailInterface:
     """
@@ -31,7 +48,11 @@ class EmailInterface:
         
         try:
             self.email_classifier = HotelEmailClassifierClass()
+            self.email_model = None  # Learned classifier, loaded on first use
             self.processed_emails = []
+            # Classify with the learned model as well as the keyword rules once one is trained
+            self.use_model = MODEL_AVAILABLE
+            self._apply_model()
         except Exception as e:
             raise ImportError(f"Failed to initialize email classifier: {e}")
     
@@ -66,25 +87,47 @@ class EmailInterface:
             self.manual_email_entry()
     
     def load_emails_from_file(self):
-        """Load emails from a file"""
-        file_path = input("Enter email file path (JSON/CSV): ").strip()
+        """Classify every email in an export file or a folder of .eml files"""
+        file_path = input("Enter email file or folder (JSON/JSONL/CSV/mbox/.eml): ").strip().strip('"')
         
         if not file_path:
             print("❌ No file path provided")
             return
         
-        print(f"📂 Loading emails from: {file_path}")
-        # Simulated file loading
-        print("✅ Found 25 emails in file")
-        print("🔄 Processing emails...")
+        path = Path(file_path).expanduser()
+        if not path.exists():
+            print(f"❌ File not found: {path}")
+            return
+        
+        default_output = default_output_path(path)
+        output = input(f"Save results to (Enter for {default_output}): ").strip() or str(default_output)
         
-        # Simulate processing
-        categories = ["Critical", "Booking", "Complaint", "Marketing", "Invoice"]
-        for i in range(1, 6):
-            print(f"  Email {i}/5: Classified as {categories[i-1]}")
+        print(f"📂 Loading emails from: {path}")
+        
+        def show_progress(stats):
+            print(f"\r🔄 {stats.messages:,} emails classified ({stats.rate:,.0f} emails/s)", end="", flush=True)
+        
+        def keep(email_data, classification):
+            # Results are all in the output file; only the first few stay in memory for browsing
+            if len(self.processed_emails) < MAX_KEPT_EMAILS:
+                self.processed_emails.append({**email_data, "classification": classification})
+        
+        try:
+            stats = ingest_file(path, self.email_classifier, output, progress=show_progress, on_result=keep)
+        except Exception as e:
+            print(f"\n❌ Could not read emails: {e}")
+            return
         
-        print("✅ Email processing completed!")
-        print("📊 Results: 1 Critical, 1 Booking, 1 Complaint, 1 Marketing, 1 Invoice")
+        print(f"\r✅ Classified {stats.messages:,} emails in {stats.seconds:.1f}s "
+              f"({stats.rate:,.0f} emails/s)            ")
+        if not stats.messages:
+            return
+        print(f"💾 Results written to: {output}")
+        print("📊 Results: " + ", ".join(f"{count} {category.title()}"
+                                        for category, count in stats.categories.most_common()))
+        critical = stats.priorities.get("CRITICAL", 0)
+        if critical:
+            print(f"🚨 {critical} critical emails require immediate attention!")
     
     def process_sample_emails(self):
         """Process sample email data"""
@@ -377,7 +420,13 @@ class EmailInterface:
         print("\n⚙️ EMAIL SETTINGS")
         print("=" * 30)
         print("Current Configuration:")
-        print("  • Classification Model: Hotel Email Classifier")
+        if self.email_classifier.model is not None:
+            print(f"  • Classification Model: Learned model, keyword rules below "
+                  f"{self.email_classifier.model_threshold:.0%} model confidence")
+        elif self.use_model:
+            print("  • Classification Model: Keyword rules (no learned model trained yet)")
+        else:
+            print("  • Classification Model: Keyword rules (learned model switched off)")
         print("  • Confidence Threshold: 70%")
         print("  • Auto-Priority: Enabled")
         print("  • Keyword Extraction: Enabled")
@@ -388,9 +437,10 @@ class EmailInterface:
         print("2. 📂 Manage Categories")
         print("3. 🔑 Keyword Management")
         print("4. 💾 Export/Import Settings")
-        print("5. 🔙 Back")
+        print("5. 🧠 Use Learned Model: " + ("On" if self.use_model else "Off"))
+        print("6. 🔙 Back")
         
-        choice = input("Select option (1-5): ").strip()
+        choice = input("Select option (1-6): ").strip()
         
         if choice == '1':
             threshold = input("Enter confidence threshold (0-100): ").strip()
@@ -401,6 +451,27 @@ class EmailInterface:
             print("🔑 Keyword management interface")
         elif choice == '4':
             print("💾 Settings export/import interface")
+        elif choice == '5':
+            self.toggle_learned_model()
+    
+    def toggle_learned_model(self):
+        """Switch classification between keyword rules alone and rules plus the learned model"""
+        if not MODEL_AVAILABLE:
+            print("❌ Learned classifier not available (NumPy is required)")
+            return
+        self.use_model = not self.use_model
+        self._apply_model()
+        if not self.use_model:
+            print("✅ Classifying with keyword rules only")
+        elif self.email_classifier.model is None:
+            print("⚠️ No learned model trained yet; keyword rules stay in use until one is")
+        else:
+            print(f"✅ Learned model decides wherever it is at least "
+                  f"{self.email_classifier.model_threshold:.0%} confident")
+    
+    def _apply_model(self):
+        """Hand the saved model to the classifier, or take it away when switched off"""
+        self.email_classifier.model = self._load_email_model() if self.use_model else None
     
     def training_data_management(self):
         """Manage training data for email classification"""
@@ -415,27 +486,136 @@ class EmailInterface:
         
         choice = input("Select option (1-6): ").strip()
         
+        if not MODEL_AVAILABLE:
+            if choice in ('1', '2', '3', '4', '5'):
+                print("❌ Learned classifier not available (NumPy is required)")
+            return
+        
         if choice == '1':
-            print("\n📊 TRAINING STATISTICS")
-            print("  • Total Examples: 500")
-            print("  • Categories: 8")
-            print("  • Last Training: 2024-01-15")
-            print("  • Model Accuracy: 89.2%")
+            self.show_training_statistics()
         elif choice == '2':
-            print("➕ Adding training examples...")
-            category = input("Email category: ").strip()
-            example = input("Example text: ").strip()
-            if category and example:
-                print(f"✅ Training example added to '{category}' category")
+            self.add_training_example()
         elif choice == '3':
-            print("🔄 Retraining classifier with new data...")
-            print("✅ Classifier retrained successfully")
+            self.retrain_classifier()
         elif choice == '4':
-            print("📤 Training data exported to training_data.json")
+            self.export_training_data()
         elif choice == '5':
-            file_path = input("Enter training data file path: ").strip()
-            if file_path:
-                print(f"📥 Training data imported from {file_path}")
+            self.import_training_data()
+    
+    def _load_email_model(self):
+        """The saved learned model, loaded memory-mapped on first use"""
+        if self.email_model is None:
+            self.email_model = saved_model(DEFAULT_MODEL_PATH)
+        return self.email_model
+    
+    def show_training_statistics(self):
+        """Training examples per category and how the saved model performed"""
+        emails, labels, skipped = load_examples(DEFAULT_TRAINING_PATH)
+        counts = Counter(label.value for label in labels)
+        
+        print("\n📊 TRAINING STATISTICS")
+        print(f"  • Total Examples: {len(labels)}")
+        print(f"  • Categories: {len(counts)} of {len(EmailCategory)}")
+        for category, count in counts.most_common():
+            print(f"      {category}: {count}")
+        if skipped:
+            print(f"  • Skipped rows (unknown category): {skipped}")
+        
+        model = self._load_email_model()
+        if model is None:
+            print("  • Model: not trained yet")
+            return
+        print(f"  • Last Training: {model.trained_at}")
+        print(f"  • Examples Learned: {model.examples}")
+        metrics = model.metrics
+        if metrics:
+            print(f"  • Model Accuracy: {metrics['model_accuracy']:.1%} "
+                  f"(keyword rules {metrics['rules_accuracy']:.1%}, {metrics['examples']} held-out emails)")
+            print(f"  • Throughput: {metrics['model_emails_per_second']:,.0f} emails/s "
+                  f"(keyword rules {metrics['rules_emails_per_second']:,.0f})")
+    
+    def add_training_example(self):
+        """Label one email and teach it to the model straight away"""
+        print("➕ Adding training examples...")
+        print("Categories: " + ", ".join(category.value for category in EmailCategory))
+        category = input("Email category: ").strip()
+        subject = input("Subject: ").strip()
+        example = input("Example text: ").strip()
+        if not category or not (subject or example):
+            print("❌ Category and example text are required")
+            return
+        
+        try:
+            label = parse_category(category)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        
+        email_data = {"subject": subject, "content": example, "sender": ""}
+        append_examples([email_data], [label], DEFAULT_TRAINING_PATH)
+        print(f"✅ Training example added to '{label.value}' category")
+        
+        model = self._load_email_model()
+        if model is not None:
+            model.partial_fit([email_data], [label])
+            model.save(DEFAULT_MODEL_PATH)
+            print("🔄 Model updated with the new example")
+    
+    def retrain_classifier(self):
+        """Train on all examples, reporting held-out accuracy against the keyword rules"""
+        emails, labels, _ = load_examples(DEFAULT_TRAINING_PATH)
+        if len(emails) < MIN_TRAINING_EXAMPLES or len(set(labels)) < 2:
+            print(f"❌ Need at least {MIN_TRAINING_EXAMPLES} examples in two or more categories "
+                  f"(have {len(emails)})")
+            return
+        
+        print(f"🔄 Retraining classifier on {len(emails)} examples...")
+        train_emails, train_labels, test_emails, test_labels = split_examples(emails, labels)
+        model = EmailModel().fit(train_emails, train_labels)
+        metrics = compare_with_rules(model, test_emails, test_labels)
+        
+        model.fit(emails, labels)
+        model.metrics = metrics
+        model.save(DEFAULT_MODEL_PATH)
+        self.email_model = model
+        self._apply_model()
+        
+        print("✅ Classifier retrained successfully")
+        print(f"📊 Held-out accuracy: {metrics['model_accuracy']:.1%} "
+              f"(keyword rules {metrics['rules_accuracy']:.1%})")
+        print(f"⚡ Throughput: {metrics['model_emails_per_second']:,.0f} emails/s "
+              f"(keyword rules {metrics['rules_emails_per_second']:,.0f})")
+    
+    def export_training_data(self, file_path: str = "training_data.json"):
+        """Write the training examples to a JSON file"""
+        emails, labels, _ = load_examples(DEFAULT_TRAINING_PATH)
+        records = [{**email_data, "category": label.value} for email_data, label in zip(emails, labels)]
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        print(f"📤 {len(records)} training examples exported to {file_path}")
+    
+    def import_training_data(self):
+        """Add labelled emails from a JSON, JSONL or CSV file with a category column"""
+        file_path = input("Enter training data file path: ").strip().strip('"')
+        if not file_path:
+            return
+        
+        if not Path(file_path).exists():
+            print(f"❌ File not found: {file_path}")
+            return
+        
+        try:
+            emails, labels, skipped = load_examples(file_path)
+        except Exception as e:
+            print(f"❌ Could not read training data: {e}")
+            return
+        
+        added = append_examples(emails, labels, DEFAULT_TRAINING_PATH)
+        print(f"📥 {added} training examples imported from {file_path}")
+        if skipped:
+            print(f"⚠️  Skipped {skipped} rows without a known category")
+        if added:
+            print("💡 Choose 'Retrain Classifier' to learn from them")
     
     def show_processing_summary(self):
         """Show summary of recent processing"""
@@ -21,18 +21,31 @@ except ImportError:
     HotelManagerClass = None
     HotelEmailClassifierClass = None
 
+try:
+    from core.hotel.email_model import saved_model
+except ImportError:
+    saved_model = None  # NumPy missing: keyword rules only
+
 
 class HotelInterface:
     """
     Specialized hotel management interface
     """
     
-    def __init__(self):
+    def __init__(self, hotel_manager=None):
+        """
+        Pass the HotelManager already open on the hotel data file, if there
+        is one; otherwise the interface opens its own and closes it on exit.
+        """
         if not HOTEL_AVAILABLE or HotelManagerClass is None or HotelEmailClassifierClass is None:
             raise ImportError("Hotel system not available")
         
-        self.hotel_manager = HotelManagerClass()
-        self.email_classifier = HotelEmailClassifierClass()
+        self.owns_manager = hotel_manager is None
+        self.hotel_manager = hotel_manager or HotelManagerClass()
+        # The learned model, once trained from the email menu, overrides the keyword rules when confident
+        model = saved_model() if saved_model else None
+        self.email_classifier = HotelEmailClassifierClass(model=model)
+        self.hotel_manager.email_classifier = self.email_classifier
     
     def show_main_menu(self):
         """Show main hotel menu"""
@@ -256,5 +269,8 @@ class HotelInterface:
             print("\n👋 Hotel interface closed")
         except Exception as e:
             print(f"❌ Hotel interface error: {e}")
+        finally:
+            if self.owns_manager:
+                self.hotel_manager.close()
             
         return 0
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test background automation actions with local stand-ins for the COM calls
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.agent.command_parser import CommandParser
+from core.automation.action_executor import ActionExecutor, ActionRegistry, PendingAction
+
+
+def _registry(inbox_delay=0.0):
+    registry = ActionRegistry()
+    registry.register("check_email",
+                      lambda: time.sleep(inbox_delay) or ["From: Front desk, Subject: Late checkout"],
+                      "Checking your inbox.", "checking your email", timeout=2)
+    registry.register("create_excel", lambda: 1 / 0, "Creating a spreadsheet.", "creating the spreadsheet")
+    registry.register("open_app", lambda app_name: f"Opened {app_name}", None, "opening the program")
+    registry.register("hang", lambda: time.sleep(1), "Working on it.", "the slow job", timeout=0.1)
+    return registry
+
+
+def test_submit_returns_immediately():
+    executor = ActionExecutor(_registry(inbox_delay=0.3))
+    started = time.perf_counter()
+    pending = executor.submit("check_email")
+    submitted = time.perf_counter() - started
+
+    assert submitted < 0.1
+    assert not pending.done()
+    assert pending.acknowledgement == "Checking your inbox."
+    result = pending.result(timeout=2)
+    assert result.ok and result.seconds >= 0.3
+    assert result.speech() == ["From: Front desk, Subject: Late checkout"]
+    executor.shutdown()
+    print(f"✅ Submitted in {submitted * 1000:.1f} ms, result after {result.seconds:.2f}s")
+
+
+def test_timeouts_and_errors_become_messages():
+    executor = ActionExecutor(_registry())
+
+    slow = executor.run("hang")
+    assert slow.timed_out and not slow.ok
+    assert slow.speech() == ["Sorry, the slow job is taking too long. I'll stop waiting for it."]
+
+    failed = executor.run("create_excel")
+    assert isinstance(failed.error, ZeroDivisionError)
+    assert failed.speech()[0].startswith("Sorry, creating the spreadsheet failed")
+    executor.shutdown()
+    print("✅ Timeouts and failures reported instead of raised")
+
+
+def test_callbacks_fire_once_with_the_result():
+    executor = ActionExecutor(_registry(inbox_delay=0.05))
+    results = []
+    done = threading.Event()
+    pending = executor.submit("check_email")
+    pending.add_done_callback(lambda result: (results.append(result), done.set()))
+
+    assert done.wait(2)
+    time.sleep(0.1)
+    assert len(results) == 1 and results[0].name == "check_email"
+    executor.shutdown()
+    print("✅ Completion callback delivered once")
+
+
+def test_timeout_starts_when_a_worker_picks_the_action_up():
+    registry = _registry()
+    registry.register("sync_email", lambda: time.sleep(0.6) or 12, None, "syncing your email",
+                      timeout=5, background=True)
+    registry.register("report", lambda: time.sleep(0.3) or "Report ready", None, "the report", timeout=5)
+    executor = ActionExecutor(registry, max_workers=2)
+
+    # A long sync runs on its own worker, so it doesn't take a voice slot
+    sync = executor.submit("sync_email")
+    started = time.perf_counter()
+    assert executor.run("open_app", "notepad.exe", timeout=0.2).value == "Opened notepad.exe"
+    assert time.perf_counter() - started < 0.2
+
+    # Both voice workers busy: the next action waits its turn, then gets its full timeout
+    busy = [executor.submit("report"), executor.submit("report")]
+    queued = executor.run("open_app", "calculator", timeout=0.2)
+    assert queued.ok and queued.value == "Opened calculator"
+    assert time.perf_counter() - started >= 0.3
+    assert all(pending.result(timeout=2).ok for pending in busy)
+    assert sync.result(timeout=2).value == 12
+    executor.shutdown()
+    print("✅ Queued actions aren't timed out by a saturated pool")
+
+
+def test_parser_hands_actions_to_the_executor():
+    parser = CommandParser(executor=ActionExecutor(_registry()))
+
+    pending = parser.parse_and_execute("check my emails")
+    assert isinstance(pending, PendingAction)
+    assert pending.result(timeout=2).value == ["From: Front desk, Subject: Late checkout"]
+
+    opened = parser.parse_and_execute("open calculator")
+    assert opened.result(timeout=2).value == "Opened calculator"
+
+    # Instant answers stay synchronous
+    assert parser.parse_and_execute("what time is it").startswith("The current time is")
+    parser.executor.shutdown()
+    print("✅ CommandParser runs automation intents in the background")
+
+
+def main():
+    """Run action executor tests"""
+    test_submit_returns_immediately()
+    test_timeouts_and_errors_become_messages()
+    test_callbacks_fire_once_with_the_result()
+    test_timeout_starts_when_a_worker_picks_the_action_up()
+    test_parser_hands_actions_to_the_executor()
+    print("All action executor tests passed!")
+
+
+if __name__ == "__main__":
+    main()
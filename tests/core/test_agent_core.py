@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Test the asyncio agent core with a scripted microphone and stand-in models
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.agent.agent_core import AgentState, AsyncAgentCore, Response
+from core.audio.streaming_recognizer import StreamingRecognizer
+from core.audio.vad import VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+rng = np.random.default_rng(7)
+
+
+def _speech(seconds):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = 12000 * np.sin(2 * np.pi * 220 * t) * (1 + 0.3 * np.sin(2 * np.pi * 4 * t))
+    return audio.astype(np.int16)
+
+
+class FakeCapture:
+    """Endless quiet background; say() queues speech to be 'heard' next"""
+
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self, speed=4.0):
+        self.speed = speed
+        self.pending = np.zeros(0, dtype=np.int16)
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def say(self, audio):
+        with self.lock:
+            self.pending = np.concatenate((self.pending, audio))
+
+    def skip_to_live(self):
+        with self.lock:
+            self.pending = np.zeros(0, dtype=np.int16)
+
+    def read_samples(self, count, timeout=None):
+        if self.stopped.is_set():
+            return np.zeros(0, dtype=np.int16)
+        # Faster than real time, but still paced like a microphone
+        time.sleep(count / SAMPLE_RATE / self.speed)
+        with self.lock:
+            chunk, self.pending = self.pending[:count], self.pending[count:]
+        background = (100 * rng.normal(size=count - chunk.size)).astype(np.int16)
+        return np.concatenate((chunk, background))
+
+    def stop(self):
+        self.stopped.set()
+
+
+class FakeWhisper:
+    def __init__(self, text):
+        self.text = text
+
+    def transcribe(self, audio, **options):
+        return [SimpleNamespace(text=self.text)], None
+
+
+class FakeVoice:
+    def __init__(self, commands):
+        self.capture = FakeCapture()
+        self.commands = list(commands)
+
+    def start_capture(self):
+        self.capture.stopped.clear()
+        return self.capture
+
+    def skip_to_live(self):
+        self.capture.skip_to_live()
+
+    def to_float32(self, samples):
+        return samples.astype(np.float32) / 32768.0
+
+    def transcribe(self, audio):
+        return "Gaia"
+
+    def create_streaming_recognizer(self, on_partial=None, silence_duration=0.8, stop_when=None):
+        text = self.commands[0] if self.commands else ""
+        return _PoppingRecognizer(self, FakeWhisper(text), VoiceActivityDetector(end_silence_ms=400),
+                                  on_partial=on_partial, stop_when=stop_when)
+
+
+class _PoppingRecognizer(StreamingRecognizer):
+    """Moves on to the next scripted command once this one is final"""
+
+    def __init__(self, voice, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.voice = voice
+
+    def finalize(self):
+        text = super().finalize()
+        if text and self.voice.commands:
+            self.voice.commands.pop(0)
+        return text
+
+
+class FakeWakeWord:
+    """Fires on any loud chunk"""
+
+    def __init__(self):
+        self.resets = 0
+
+    def process(self, audio):
+        return float(np.sqrt(np.mean(audio ** 2))) > 0.1
+
+    def candidate_audio(self):
+        return np.zeros(SAMPLE_RATE, dtype=np.float32)
+
+    def reset(self):
+        self.resets += 1
+
+
+class Harness:
+    def __init__(self, respond, commands=("what time is it",), speak_seconds=0.0, **options):
+        self.voice = FakeVoice(commands)
+        self.spoken = []
+        self.conversation = []
+        self.logs = []
+        self.interrupted = threading.Event()
+        self.stops = 0
+        self.speak_seconds = speak_seconds
+        self.core = AsyncAgentCore(
+            self.voice, FakeWakeWord(),
+            on_wake=lambda text: Response(speech=["Yes, I'm listening."]),
+            respond=respond,
+            speak=self.speak,
+            stop_speaking=self.stop_speaking,
+            log=self.logs.append,
+            conversation_callback=lambda speaker, msg: self.conversation.append((speaker, msg)),
+            **options
+        )
+        self.thread = threading.Thread(target=lambda: asyncio.run(self.core.run()), daemon=True)
+
+    def restart(self):
+        """Stop the core and run it again on a new thread, like Stop then Start in the GUI"""
+        self.__exit__()
+        self.thread = threading.Thread(target=lambda: asyncio.run(self.core.run()), daemon=True)
+        return self.__enter__()
+
+    def speak(self, text):
+        self.interrupted.clear()
+        self.spoken.append(text)
+        self.interrupted.wait(self.speak_seconds)
+
+    def stop_speaking(self):
+        self.stops += 1
+        self.interrupted.set()
+
+    def __enter__(self):
+        self.thread.start()
+        assert self.core.wait_until_running(timeout=5)
+        return self
+
+    def __exit__(self, *exc):
+        self.core.stop()
+        self.thread.join(timeout=5)
+        assert not self.thread.is_alive()
+
+    def wait_for(self, condition, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def wake(self):
+        self.voice.capture.say(_speech(0.15))
+        assert self.wait_for(lambda: "Yes, I'm listening." in self.spoken)
+        assert self.wait_for(lambda: self.core.state == AgentState.LISTENING)
+
+
+def test_wake_then_command_is_answered():
+    commands = []
+
+    def respond(text):
+        commands.append(text)
+        return Response(speech=["It is noon."])
+
+    with Harness(respond) as harness:
+        harness.wake()
+        harness.voice.capture.say(_speech(1.0))
+        assert harness.wait_for(lambda: "It is noon." in harness.spoken)
+        assert harness.wait_for(lambda: harness.core.state == AgentState.LISTENING)
+
+    assert commands == ["what time is it"]
+    assert ("Luke", "gaia") in harness.conversation
+    assert ("Luke", "what time is it") in harness.conversation
+    assert ("Gaia", "It is noon.") in harness.conversation
+    assert "Gaia: It is noon." in harness.logs
+    print("✅ Wake word, command and answer flow through the stages")
+
+
+def test_token_stream_is_spoken_by_sentence():
+    completed = []
+
+    def respond(text):
+        tokens = iter(["Breakfast is at seven. ", "Dinner ", "is at eight."])
+        return Response(tokens=tokens, on_complete=completed.append)
+
+    with Harness(respond) as harness:
+        harness.wake()
+        harness.voice.capture.say(_speech(1.0))
+        assert harness.wait_for(lambda: len(completed) == 1)
+        assert harness.wait_for(lambda: ("Gaia", "Breakfast is at seven. Dinner is at eight.")
+                                in harness.conversation)
+
+    assert harness.spoken[-2:] == ["Breakfast is at seven.", "Dinner is at eight."]
+    assert completed == ["Breakfast is at seven. Dinner is at eight."]
+    print("✅ Generated sentences spoken as they complete")
+
+
+def test_barge_in_drops_the_rest_of_the_answer():
+    completed = []
+    commands = []
+
+    def respond(text):
+        commands.append(text)
+        if text == "stop":
+            return Response(speech=["Okay."])
+        sentences = [f"This is sentence number {i}. " for i in range(1, 6)]
+        return Response(tokens=iter(sentences), on_complete=completed.append)
+
+    with Harness(respond, commands=("tell me a story", "stop"), speak_seconds=1.0) as harness:
+        harness.wake()
+        harness.voice.capture.say(_speech(1.0))
+        assert harness.wait_for(lambda: "This is sentence number 1." in harness.spoken)
+        # Talk over Gaia
+        harness.voice.capture.say(_speech(1.0))
+        assert harness.wait_for(lambda: "Okay." in harness.spoken)
+
+    assert harness.core.barge_ins == 1
+    assert harness.stops == 1
+    assert commands == ["tell me a story", "stop"]
+    assert "This is sentence number 5." not in harness.spoken
+    print(f"✅ Barge-in stopped the answer after {len(harness.spoken) - 2} sentence(s)")
+
+
+def test_pause_ignores_speech_until_resumed():
+    with Harness(lambda text: Response(speech=["Sure."])) as harness:
+        harness.core.pause()
+        time.sleep(0.1)
+        harness.voice.capture.say(_speech(0.15))
+        time.sleep(0.5)
+        assert harness.spoken == []
+
+        harness.core.resume()
+        harness.core.say("Gaia is active again.")
+        assert harness.wait_for(lambda: harness.spoken == ["Gaia is active again."])
+        harness.wake()
+
+    assert harness.spoken == ["Gaia is active again.", "Yes, I'm listening."]
+    print("✅ Paused core ignores the microphone until resumed")
+
+
+def test_stop_then_start_answers_again():
+    commands = []
+
+    def respond(text):
+        commands.append(text)
+        return Response(speech=[f"Answer {len(commands)}."])
+
+    with Harness(respond, commands=("what time is it", "what day is it")) as harness:
+        harness.wake()
+        harness.voice.capture.say(_speech(1.0))
+        assert harness.wait_for(lambda: "Answer 1." in harness.spoken)
+
+        harness.restart()
+        time.sleep(0.3)
+        assert harness.thread.is_alive()  # Not ended by the earlier stop()
+        harness.voice.capture.say(_speech(1.0))
+        assert harness.wait_for(lambda: "Answer 2." in harness.spoken)
+
+    assert commands == ["what time is it", "what day is it"]
+    print("✅ The core answers again after stop and a new run()")
+
+
+def test_stop_waits_for_the_current_sentence():
+    with Harness(lambda text: Response(speech=["A long answer."]), speak_seconds=0.5) as harness:
+        harness.wake()
+        harness.voice.capture.say(_speech(1.0))
+        assert harness.wait_for(lambda: "A long answer." in harness.spoken)
+        started = time.monotonic()
+    # __exit__ returned once speak() did, not straight away
+    assert 0.2 < time.monotonic() - started < 2.0
+    print("✅ stop() lets the sentence being spoken finish")
+
+
+def main():
+    """Run agent core tests"""
+    test_wake_then_command_is_answered()
+    test_token_stream_is_spoken_by_sentence()
+    test_barge_in_drops_the_rest_of_the_answer()
+    test_pause_ignores_speech_until_resumed()
+    test_stop_then_start_answers_again()
+    test_stop_waits_for_the_current_sentence()
+    print("All agent core tests passed!")
+
+
+if __name__ == "__main__":
+    main()
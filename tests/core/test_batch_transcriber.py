@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test batch transcription to JSONL with a stand-in Whisper model
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.audio.batch_transcriber import BatchTranscriber, find_audio_files
+
+
+class FakeWhisper:
+    """Stand-in for WhisperModel: two segments per file, 'broken' files fail"""
+
+    def __init__(self):
+        self.paths = []
+        self._lock = threading.Lock()
+
+    def transcribe(self, path, **options):
+        with self._lock:
+            self.paths.append(Path(path).name)
+        if "broken" in path:
+            raise RuntimeError("could not decode")
+        segments = [
+            SimpleNamespace(start=0.0, end=1.5, text=" hello"),
+            SimpleNamespace(start=1.5, end=3.0, text=" world "),
+        ]
+        return iter(segments), SimpleNamespace(duration=3.0, language="en")
+
+
+def _make_archive(folder, names):
+    for name in names:
+        path = Path(folder) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"RIFF")
+
+
+def _transcriber(model):
+    return BatchTranscriber("base", workers=3, device="cpu", compute_type="int8",
+                            loader=lambda *args: model)
+
+
+def _read_jsonl(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_directory_is_transcribed_to_jsonl():
+    model = FakeWhisper()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _make_archive(tmp_dir, ["a.wav", "b.mp3", "notes/c.wav", "readme.txt"])
+        output = Path(tmp_dir) / "out.jsonl"
+
+        report = _transcriber(model).run([tmp_dir], output)
+        records = _read_jsonl(output)
+
+    assert report.transcribed == 3 and report.failed == 0
+    assert sorted(model.paths) == ["a.wav", "b.mp3", "c.wav"]
+    assert len(records) == 3
+    assert records[0]["text"] == "hello world"
+    assert records[0]["segments"][1] == {"start": 1.5, "end": 3.0, "text": "world"}
+    assert records[0]["duration"] == 3.0 and records[0]["rtf"] is not None
+    assert report.audio_seconds == 9.0 and report.rtf >= 0
+    print(f"✅ Batch transcribed 3 files (aggregate RTF {report.rtf:.4f})")
+
+
+def test_rerun_resumes_after_interruption():
+    """Completed files are skipped; a truncated last line and failures are redone"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _make_archive(tmp_dir, ["a.wav", "b.wav", "broken.wav"])
+        output = Path(tmp_dir) / "out.jsonl"
+
+        first = _transcriber(FakeWhisper()).run([tmp_dir], output)
+        assert first.transcribed == 2 and first.failed == 1
+
+        # Simulate a crash halfway through writing the record for b.wav
+        lines = [line for line in output.read_text().splitlines() if "b.wav" not in line]
+        output.write_text("\n".join(lines) + '\n{"path": "b.w')
+
+        model = FakeWhisper()
+        second = _transcriber(model).run([tmp_dir], output)
+
+    assert sorted(model.paths) == ["b.wav", "broken.wav"]
+    assert second.skipped == 1 and second.transcribed == 1 and second.failed == 1
+    print("✅ Rerun resumes where the last run stopped")
+
+
+def test_file_list_keeps_order_and_drops_duplicates():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _make_archive(tmp_dir, ["z.wav", "a.wav"])
+        z, a = Path(tmp_dir) / "z.wav", Path(tmp_dir) / "a.wav"
+
+        files = find_audio_files([z, a, z, Path(tmp_dir) / "missing.wav"])
+
+    assert files == [z, a]
+    print("✅ File lists are de-duplicated")
+
+
+def main():
+    """Run batch transcriber tests"""
+    test_directory_is_transcribed_to_jsonl()
+    test_rerun_resumes_after_interruption()
+    test_file_list_keeps_order_and_drops_duplicates()
+    print("All batch transcriber tests passed!")
+
+
+if __name__ == "__main__":
+    main()
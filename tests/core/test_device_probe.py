@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test the cached device capability probe
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.audio.device_probe import probe_device
+
+
+class FakeProbe:
+    """Probe stand-in that reports a fixed GPU count and counts its calls"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def _clear_visible_devices():
+    return os.environ.pop("CUDA_VISIBLE_DEVICES", None)
+
+
+def _restore_visible_devices(value):
+    if value is not None:
+        os.environ["CUDA_VISIBLE_DEVICES"] = value
+
+
+def test_probe_result_is_cached_on_disk():
+    """Second launch reads the cache instead of probing"""
+    saved = _clear_visible_devices()
+    try:
+        gpu_probe = FakeProbe((1, ["float32", "float16", "int8"]))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = Path(tmp_dir) / "probe.json"
+
+            first = probe_device(cache_path, probes=[("fake", gpu_probe)])
+            second = probe_device(cache_path, probes=[("fake", gpu_probe)])
+
+            assert gpu_probe.calls == 1
+            assert (first.device, first.compute_type, first.source) == ("cuda", "float16", "fake")
+            assert second.from_cache and not first.from_cache
+            assert (second.device, second.compute_type) == ("cuda", "float16")
+            assert json.loads(cache_path.read_text())["device"] == "cuda"
+    finally:
+        _restore_visible_devices(saved)
+    print("✅ Probe result cached across launches")
+
+
+def test_expired_cache_is_reprobed():
+    saved = _clear_visible_devices()
+    try:
+        cpu_probe = FakeProbe((0, []))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = Path(tmp_dir) / "probe.json"
+            probe_device(cache_path, probes=[("fake", cpu_probe)])
+
+            data = json.loads(cache_path.read_text())
+            data["probed_at"] = time.time() - 3600
+            cache_path.write_text(json.dumps(data))
+
+            result = probe_device(cache_path, ttl=60, probes=[("fake", cpu_probe)])
+
+            assert cpu_probe.calls == 2
+            assert (result.device, result.compute_type) == ("cpu", "int8")
+    finally:
+        _restore_visible_devices(saved)
+    print("✅ Expired cache triggers a new probe")
+
+
+def test_falls_back_through_probes_in_order():
+    """Probes that can't answer are skipped; the subprocess probe comes last"""
+    saved = _clear_visible_devices()
+    try:
+        unavailable = FakeProbe(None)
+        fallback = FakeProbe((0, []))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = probe_device(Path(tmp_dir) / "probe.json",
+                                  probes=[("in-process", unavailable), ("subprocess", fallback)])
+
+        assert unavailable.calls == 1 and fallback.calls == 1
+        assert result.source == "subprocess" and result.device == "cpu"
+    finally:
+        _restore_visible_devices(saved)
+    print("✅ Probe falls back in order")
+
+
+def test_hidden_gpus_force_cpu_without_probing():
+    saved = os.environ.get("CUDA_VISIBLE_DEVICES")
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    try:
+        gpu_probe = FakeProbe((1, ["float16"]))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = probe_device(Path(tmp_dir) / "probe.json", probes=[("fake", gpu_probe)])
+        assert gpu_probe.calls == 0
+        assert (result.device, result.source) == ("cpu", "env")
+    finally:
+        if saved is None:
+            os.environ.pop("CUDA_VISIBLE_DEVICES", None)
+        else:
+            os.environ["CUDA_VISIBLE_DEVICES"] = saved
+    print("✅ Empty CUDA_VISIBLE_DEVICES forces CPU")
+
+
+def main():
+    """Run device probe tests"""
+    test_probe_result_is_cached_on_disk()
+    test_expired_cache_is_reprobed()
+    test_falls_back_through_probes_in_order()
+    test_hidden_gpus_force_cpu_without_probing()
+    print("All device probe tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the keyword automaton and the declarative intent matcher
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.intent_matcher_benchmark import DEFAULT_CORPUS, load_corpus
+from core.agent.intent_matcher import IntentMatcher, IntentRule
+from core.utils.aho_corasick import AhoCorasick
+
+
+def test_automaton_finds_overlapping_phrases():
+    automaton = AhoCorasick(word_boundaries=False)
+    for phrase in ("he", "she", "his", "hers"):
+        automaton.add(phrase, phrase)
+    automaton.build()
+
+    found = [(m.start, m.phrase) for m in automaton.iter_matches("ushers")]
+    assert sorted(found) == [(1, "she"), (2, "he"), (2, "hers")]
+    assert automaton.count("She said he has his") == {"she": 1, "he": 2, "his": 1}
+    print("✅ All overlapping phrases found in one pass")
+
+
+def test_word_boundaries():
+    automaton = AhoCorasick()
+    automaton.add("word", "word")
+    automaton.add("?", "question")
+    automaton.build()
+
+    assert automaton.count("what's a good password") == {}
+    assert automaton.count("one word, two words") == {"word": 1}
+    assert automaton.count("open word?") == {"word": 1, "question": 1}
+    print("✅ Phrases inside longer words are ignored")
+
+
+def test_intents_and_slots():
+    matcher = IntentMatcher()
+
+    assert matcher.match("what time is it").intent == "time"
+    assert matcher.match("what is today's date").intent == "date"
+    assert matcher.match("open notepad").slots == {"app": "notepad"}
+    assert matcher.match("open the calculator please").slots == {"app": "the calculator please"}
+    assert matcher.match("create an excel file").intent == "create_excel"
+    # No longer swallowed by the date and Word handlers
+    assert matcher.match("what's the weather like today") is None
+    assert matcher.match("what's a good password") is None
+    assert matcher.match("can you open the window") is None
+    print("✅ Intents and slots resolved from the table")
+
+
+def test_priorities_and_ambiguity():
+    matcher = IntentMatcher()
+    match = matcher.match("open outlook")
+
+    assert match.intent == "open_outlook"
+    assert match.ambiguous and set(match.alternatives) == {"check_email", "open_app"}
+
+    custom = IntentMatcher([
+        IntentRule("lights_on", ("lights on", "turn on the lights"), priority=5),
+        IntentRule("lights", ("lights",), priority=1),
+    ])
+    assert custom.match("please turn on the lights").intent == "lights_on"
+    assert custom.match("dim the lights").intent == "lights"
+    print("✅ Priorities pick one intent and report the rest")
+
+
+def test_corpus_is_matched():
+    matcher = IntentMatcher()
+    for expected, text in load_corpus(DEFAULT_CORPUS):
+        match = matcher.match(text)
+        assert (match.intent if match else "") == expected, text
+    print("✅ Benchmark corpus labels all match")
+
+
+def main():
+    """Run intent matcher tests"""
+    test_automaton_finds_overlapping_phrases()
+    test_word_boundaries()
+    test_intents_and_slots()
+    test_priorities_and_ambiguity()
+    test_corpus_is_matched()
+    print("All intent matcher tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test incremental mail sync into the local SQLite index
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from email.message import EmailMessage as MimeMessage
+from email.utils import format_datetime
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.automation.action_executor import ActionExecutor, default_registry
+from core.mail.index import Inbox, MailIndex
+from core.mail.sources import JsonFixtureSource, MaildirSource, MboxSource, create_source
+
+START = datetime(2024, 1, 15, 8, 0)
+
+
+def _record(i, subject, content=""):
+    return {"id": f"E{i:03d}", "sender": f"guest{i}@example.com", "subject": subject,
+            "content": content, "timestamp": (START + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M")}
+
+
+def _raw_email(i, subject, body):
+    message = MimeMessage()
+    message["From"] = f"guest{i}@example.com"
+    message["Subject"] = subject
+    message["Message-ID"] = f"<m{i}@example.com>"
+    message["Date"] = format_datetime(START + timedelta(minutes=i))
+    message.set_content(body)
+    return message.as_bytes()
+
+
+class CountingSource(JsonFixtureSource):
+    def __init__(self, path):
+        super().__init__(path)
+        self.fetches = 0
+
+    def fetch(self, since=None):
+        self.fetches += 1
+        return super().fetch(since)
+
+
+class InterruptedSource(JsonFixtureSource):
+    """Fails after handing over `fail_after` messages, like a dropped Outlook connection"""
+
+    def __init__(self, path, fail_after=None, shuffle=False):
+        super().__init__(path, name="inbox")
+        self.fail_after = fail_after
+        self.shuffle = shuffle
+
+    def fetch(self, since=None):
+        messages = list(super().fetch(since))
+        if self.shuffle:
+            random.Random(5).shuffle(messages)
+        for count, message in enumerate(messages):
+            if count == self.fail_after:
+                raise ConnectionError("Source went away")
+            yield message
+
+
+def test_json_fixture_syncs_incrementally():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "inbox.json"
+        records = [_record(i, f"Booking request {i}") for i in range(3)]
+        path.write_text(json.dumps(records))
+        index = MailIndex(Path(tmp_dir) / "mail.db")
+        source = JsonFixtureSource(path)
+
+        assert index.sync(source) == 3
+        assert index.sync(source) == 0
+
+        records.append(_record(3, "Broken shower in room 12", "The shower is leaking"))
+        path.write_text(json.dumps(records))
+        assert index.sync(source) == 1
+        assert index.count() == 4
+        assert index.recent(1)[0].subject == "Broken shower in room 12"
+        index.close()
+
+        # State survives a restart
+        reopened = MailIndex(Path(tmp_dir) / "mail.db")
+        assert reopened.sync(source) == 0
+        assert reopened.count() == 4
+        reopened.close()
+    print("✅ Only new fixture messages are added on each sync")
+
+
+def test_full_text_search():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "inbox.jsonl"
+        path.write_text("\n".join(json.dumps(r) for r in [
+            _record(1, "Invoice #INV-2024-001", "Linen services overdue"),
+            _record(2, "Noise complaint", "Loud music from room 301"),
+            _record(3, "Reservation for Smith", "Two nights in March"),
+        ]))
+        index = MailIndex(":memory:")
+        index.sync(JsonFixtureSource(path))
+
+        assert [m.subject for m in index.search("linen overdue")] == ["Invoice #INV-2024-001"]
+        assert [m.subject for m in index.search("room 301")] == ["Noise complaint"]
+        assert index.search('"unbalanced AND (') == []
+    print("✅ Full-text search over subject, body and sender")
+
+
+def test_mbox_resumes_from_offset():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "export.mbox"
+
+        def append(i, subject, body):
+            with open(path, "ab") as f:
+                f.write(b"From guest@example.com Mon Jan 15 08:00:00 2024\n" + _raw_email(i, subject, body) + b"\n")
+
+        append(1, "First", "Hello\nFrom the lobby, with a From line inside\n")
+        append(2, "Second", "Late checkout please")
+        index = MailIndex(":memory:")
+        source = MboxSource(path)
+
+        assert index.sync(source) == 2
+        offset = index.watermark(source.name)
+        assert offset == path.stat().st_size
+
+        append(3, "Third", "Airport shuttle")
+        assert index.sync(source) == 1
+        assert [m.subject for m in index.recent(5)] == ["Third", "Second", "First"]
+        assert "From the lobby" in index.search("lobby")[0].body
+    print("✅ mbox sync reads only what was appended")
+
+
+def test_maildir_source():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        maildir = Path(tmp_dir) / "Maildir"
+        for sub in ("new", "cur", "tmp"):
+            (maildir / sub).mkdir(parents=True)
+        (maildir / "new" / "1700000000.1.host").write_bytes(_raw_email(1, "Welcome", "Hi"))
+        (maildir / "cur" / "1700000000.2.host:2,S").write_bytes(_raw_email(2, "Seen", "Read already"))
+        os.utime(maildir / "new" / "1700000000.1.host", (1700000200, 1700000200))
+        os.utime(maildir / "cur" / "1700000000.2.host:2,S", (1700000100, 1700000100))
+
+        index = MailIndex(":memory:")
+        source = create_source("maildir", str(maildir))
+        assert isinstance(source, MaildirSource)
+        # Oldest first across new/ and cur/
+        assert [message.subject for message in source.fetch()] == ["Seen", "Welcome"]
+        assert index.sync(source) == 2
+        assert index.watermark(source.name) == 1700000200
+        assert index.sync(source) == 0
+    print("✅ Maildir messages indexed once")
+
+
+def test_interrupted_sync_resumes_without_gaps():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "inbox.json"
+        records = [_record(i, f"Message {i}") for i in range(23)]
+        random.Random(1).shuffle(records)  # File order isn't received order
+        path.write_text(json.dumps(records))
+        received = sorted(JsonFixtureSource(path).fetch(), key=lambda message: message.received)
+
+        index = MailIndex(":memory:", batch_size=5)
+        try:
+            index.sync(InterruptedSource(path, fail_after=12))
+        except ConnectionError:
+            pass
+        # Two batches made it in, oldest first, with the watermark at the last of them
+        assert index.count() == 10
+        assert index.watermark("inbox") == received[9].received
+        assert index.sync(InterruptedSource(path)) == 13
+        assert index.count() == 23 and index.watermark("inbox") == received[-1].received
+
+        # A source that yields out of order keeps its batches but not the watermark
+        index = MailIndex(":memory:", batch_size=5)
+        try:
+            index.sync(InterruptedSource(path, fail_after=12, shuffle=True))
+        except ConnectionError:
+            pass
+        assert index.count() == 10 and index.watermark("inbox") is None
+        assert index.sync(InterruptedSource(path, shuffle=True)) == 13
+        assert index.count() == 23 and index.watermark("inbox") == received[-1].received
+    print("✅ An interrupted sync resumes without skipping older mail")
+
+
+def test_check_email_answers_from_the_index():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "inbox.json"
+        path.write_text(json.dumps([_record(i, f"Message {i}") for i in range(20)]))
+        source = CountingSource(path)
+        inbox = Inbox(source, MailIndex(":memory:"), max_age=60)
+        inbox.sync()
+
+        executor = ActionExecutor(default_registry(inbox))
+        started = time.perf_counter()
+        result = executor.run("check_email")
+        elapsed = time.perf_counter() - started
+        executor.shutdown()
+
+        assert result.ok
+        assert result.value[0] == "From: guest19@example.com, Subject: Message 19"
+        assert len(result.value) == 5
+        assert source.fetches == 1  # Fresh index, no second sync
+    print(f"✅ 'Check emails' answered from the index in {elapsed * 1000:.1f} ms")
+
+
+def main():
+    """Run mail index tests"""
+    test_json_fixture_syncs_incrementally()
+    test_full_text_search()
+    test_mbox_resumes_from_offset()
+    test_maildir_source()
+    test_interrupted_sync_resumes_without_gaps()
+    test_check_email_answers_from_the_index()
+    print("All mail index tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test streaming ingestion and classification of mail export files
+"""
+
+import csv
+import io
+import json
+import sys
+import tempfile
+from email.message import EmailMessage as MimeMessage
+from email.utils import format_datetime
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.email_classifier import HotelEmailClassifier
+from core.mail.ingest import _iter_json_array, default_output_path, detect_format, ingest_file, iter_email_file
+from core.mail.sources import parse_rfc822
+
+START = datetime(2024, 1, 15, 8, 0)
+
+EMAILS = [
+    ("guest@example.com", "Booking ref BC123456", "Please confirm arrival today for 2 nights"),
+    ("accounts@linen.com", "Invoice overdue", "The invoice amount is overdue, total balance outstanding"),
+    ("guest2@example.com", "Noise complaint", "Terrible noise, a real problem, very disappointed"),
+]
+
+
+def _records():
+    return [{"id": f"E{i}", "sender": sender, "subject": subject, "content": content,
+             "timestamp": (START + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M")}
+            for i, (sender, subject, content) in enumerate(EMAILS)]
+
+
+def _raw_email(i, sender, subject, body):
+    message = MimeMessage()
+    message["From"] = sender
+    message["Subject"] = subject
+    message["Message-ID"] = f"<m{i}@example.com>"
+    message["Date"] = format_datetime(START + timedelta(minutes=i))
+    message.set_content(body)
+    return message.as_bytes()
+
+
+def _write_exports(tmp_dir):
+    """The same three emails in every supported format"""
+    tmp = Path(tmp_dir)
+    records = _records()
+    (tmp / "inbox.json").write_text(json.dumps(records))
+    (tmp / "inbox.jsonl").write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    with open(tmp / "inbox.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "From", "Subject", "Body", "Date"])
+        for r in records:
+            writer.writerow([r["id"], r["sender"], r["subject"], r["content"], r["timestamp"]])
+    with open(tmp / "inbox.mbox", "wb") as f:
+        for i, email_fields in enumerate(EMAILS):
+            f.write(b"From sender@example.com Mon Jan 15 08:00:00 2024\n" + _raw_email(i, *email_fields) + b"\n")
+    eml_dir = tmp / "eml" / "2024"
+    eml_dir.mkdir(parents=True)
+    for i, email_fields in enumerate(EMAILS):
+        (eml_dir / f"message{i}.eml").write_bytes(_raw_email(i, *email_fields))
+    return tmp
+
+
+def test_every_format_reads_the_same_messages():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = _write_exports(tmp_dir)
+        expected = [(sender, subject) for sender, subject, _ in EMAILS]
+        for name, fmt in [("inbox.json", "json"), ("inbox.jsonl", "jsonl"), ("inbox.csv", "csv"),
+                          ("inbox.mbox", "mbox"), ("eml", "eml")]:
+            assert detect_format(tmp / name) == fmt
+            messages = list(iter_email_file(tmp / name))
+            assert [(m.sender, m.subject) for m in messages] == expected, fmt
+            assert messages[1].body.strip() == EMAILS[1][2], fmt
+            assert messages[2].timestamp == "2024-01-15 08:02", fmt
+    print("✅ JSON, JSONL, CSV, mbox and .eml folders read alike")
+
+
+def test_encoded_headers_and_bodies():
+    message = MimeMessage()
+    message["From"] = "José García <jose@example.com>"
+    message["Subject"] = "Réservation pour deux nuits"
+    message.set_content("Chambre avec vue, s'il vous plaît")
+    message.add_alternative("<p>Chambre avec vue</p>", subtype="html")
+    parsed = parse_rfc822(message.as_bytes(), "fallback")
+    assert parsed.sender == "José García <jose@example.com>"
+    assert parsed.subject == "Réservation pour deux nuits"
+    assert parsed.body.strip() == "Chambre avec vue, s'il vous plaît"
+
+    raw = b"From: \xc3\x89milie <e@example.com>\nSubject: Caf\xc3\xa9\nContent-Type: text/plain; charset=bogus\n\nMerci \xc3\xa9\n"
+    parsed = parse_rfc822(raw, "fallback")
+    assert (parsed.message_id, parsed.sender, parsed.subject) == ("fallback", "Émilie <e@example.com>", "Café")
+    assert parsed.body == "Merci é\n"
+    print("✅ Encoded and raw 8-bit headers decoded")
+
+
+def test_json_array_is_decoded_incrementally():
+    records = _records() * 20
+    text = json.dumps(records, indent=2)
+    items = list(_iter_json_array(io.StringIO(text), chunk_size=7))
+    assert items == records
+    assert list(_iter_json_array(io.StringIO("  [ ]"))) == []
+    try:
+        list(_iter_json_array(io.StringIO('[{"id": 1}, {"id"')))
+        assert False, "truncated array accepted"
+    except ValueError:
+        pass
+    print("✅ JSON arrays stream item by item across chunk boundaries")
+
+
+def test_ingest_writes_results_as_it_goes():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = _write_exports(tmp_dir)
+        output = default_output_path(tmp / "inbox.mbox")
+        progress = []
+        seen = []
+        stats = ingest_file(tmp / "inbox.mbox", HotelEmailClassifier(), output,
+                            progress=lambda s: progress.append(s.messages), progress_every=2,
+                            on_result=lambda email, result: seen.append(email["subject"]))
+
+        assert stats.messages == 3 and stats.rate > 0
+        assert progress == [2]
+        assert seen == [subject for _, subject, _ in EMAILS]
+        assert stats.categories == {"booking": 1, "invoice": 1, "complaint": 1}
+
+        lines = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+        assert [line["subject"] for line in lines] == seen
+        assert lines[0]["classification"]["category"] == "booking"
+        assert lines[0]["classification"]["booking_reference"] == "bc123456"
+        assert lines[1]["classification"]["priority"] == "CRITICAL"
+    print(f"✅ {stats.messages} emails classified and written at {stats.rate:,.0f} emails/s")
+
+
+def main():
+    """Run mail ingestion tests"""
+    test_every_format_reads_the_same_messages()
+    test_encoded_headers_and_bodies()
+    test_json_array_is_decoded_incrementally()
+    test_ingest_writes_results_as_it_goes()
+    print("All mail ingestion tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide Whisper model registry with a stand-in loader
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.audio.model_registry import WhisperModelRegistry
+
+
+class CountingLoader:
+    """Stand-in for WhisperModel construction that records each load"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.loads = []
+        self._lock = threading.Lock()
+
+    def __call__(self, model_size, device, compute_type):
+        time.sleep(self.delay)
+        with self._lock:
+            self.loads.append((model_size, device, compute_type))
+        return object()
+
+
+def test_concurrent_get_loads_once():
+    """Many threads asking for the same key share one load"""
+    loader = CountingLoader()
+    registry = WhisperModelRegistry(loader=loader)
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("base", "cpu", "int8")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.loads == [("base", "cpu", "int8")]
+    assert len(results) == 8 and all(model is results[0] for model in results)
+    print("✅ Concurrent requests share one model load")
+
+
+def test_keys_are_separate():
+    """Different sizes or compute types get their own model"""
+    loader = CountingLoader(delay=0)
+    registry = WhisperModelRegistry(loader=loader)
+
+    base = registry.get("base", "cpu", "int8")
+    tiny = registry.get("tiny", "cpu", "int8")
+    base_float = registry.get("base", "cpu", "float32")
+
+    assert base is not tiny and base is not base_float
+    assert registry.get("base", "cpu", "int8") is base
+    assert len(loader.loads) == 3
+    print("✅ Registry keys by size, device and compute type")
+
+
+def test_preload_runs_in_background():
+    """preload() returns immediately and reports the model through the callback"""
+    loader = CountingLoader(delay=0.1)
+    registry = WhisperModelRegistry(loader=loader)
+    done = threading.Event()
+    received = []
+
+    def on_loaded(model, error):
+        received.append((model, error))
+        done.set()
+
+    thread = registry.preload("base", "cpu", "int8", callback=on_loaded)
+    assert not registry.is_loaded("base", "cpu", "int8")
+    assert done.wait(timeout=2.0)
+    thread.join()
+
+    model, error = received[0]
+    assert error is None and model is registry.get("base", "cpu", "int8")
+    assert len(loader.loads) == 1
+    print("✅ Preload loads the model off the calling thread")
+
+
+def main():
+    """Run model registry tests"""
+    test_concurrent_get_loads_once()
+    test_keys_are_separate()
+    test_preload_runs_in_background()
+    print("All model registry tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test streaming transcription with partial results, using a stand-in model
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.audio.streaming_recognizer import StreamingRecognizer
+from core.audio.vad import VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+rng = np.random.default_rng(7)
+
+
+class FakeWhisper:
+    """Stand-in for WhisperModel: 'hears' one word per 0.5 s of audio"""
+
+    def __init__(self, words=("what", "time", "is", "it", "now")):
+        self.words = words
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append((audio.size, options))
+        count = min(len(self.words), max(1, int(audio.size / (SAMPLE_RATE * 0.5))))
+        return [SimpleNamespace(text=" ".join(self.words[:count]))], None
+
+
+def _utterance(speech_seconds=2.0):
+    """0.5 s background, loud 'speech', 1.5 s background, as int16"""
+    background = lambda seconds: 100 * rng.normal(size=int(seconds * SAMPLE_RATE))
+    t = np.arange(int(speech_seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    speech = 12000 * np.sin(2 * np.pi * 220 * t) * (1 + 0.3 * np.sin(2 * np.pi * 4 * t))
+    audio = np.concatenate((background(0.5), speech, background(1.5)))
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def _feed(recognizer, audio, chunk_size=1024):
+    for start in range(0, audio.size, chunk_size):
+        if recognizer.feed(audio[start:start + chunk_size]):
+            break
+    return recognizer.finalize()
+
+
+def test_partials_are_reported_while_speaking():
+    model = FakeWhisper()
+    partials = []
+    recognizer = StreamingRecognizer(model, VoiceActivityDetector(), on_partial=partials.append)
+
+    final = _feed(recognizer, _utterance())
+
+    assert len(partials) >= 2
+    assert partials[0] != final
+    assert final == "what time is it"
+    # Partials use the cheap greedy settings
+    assert all(options.get('beam_size') == 1 for _, options in model.calls)
+    print(f"✅ {len(partials)} partials before final '{final}'")
+
+
+def test_final_reuses_decode_made_during_pause():
+    """The decode started when the speaker paused becomes the final result"""
+    model = FakeWhisper()
+    recognizer = StreamingRecognizer(model, VoiceActivityDetector())
+
+    final = _feed(recognizer, _utterance())
+    calls_before_finalize = len(model.calls)
+
+    assert recognizer.finalize() == final
+    assert len(model.calls) == calls_before_finalize
+    print("✅ No extra decode after end of speech")
+
+
+def test_stop_when_ends_utterance_early():
+    """A partial accepted by stop_when finishes before the speaker stops"""
+    recognizer = StreamingRecognizer(
+        FakeWhisper(),
+        VoiceActivityDetector(),
+        stop_when=lambda text: "time" in text
+    )
+
+    audio = _utterance(speech_seconds=4.0)
+    final = _feed(recognizer, audio)
+
+    assert recognizer.stopped_early
+    assert recognizer.audio.size < audio.size
+    assert final == "what time"
+    print("✅ Early stop on matching partial")
+
+
+def test_pause_keeps_the_first_words():
+    """Speech before a mid-utterance pause stays in every later decode"""
+    background = lambda seconds: 100 * rng.normal(size=int(seconds * SAMPLE_RATE))
+    speech = lambda seconds: 12000 * np.sin(2 * np.pi * 220 * np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE)
+    audio = np.concatenate((background(0.5), speech(0.8), background(0.4), speech(0.6), background(1.5)))
+    audio = np.clip(audio, -32768, 32767).astype(np.int16)
+
+    model = FakeWhisper()
+    recognizer = StreamingRecognizer(model, VoiceActivityDetector(end_silence_ms=800))
+    final = _feed(recognizer, audio)
+
+    start, end = recognizer._speech_bounds()
+    assert start == int((0.5 - 0.15) * SAMPLE_RATE) and abs(end / SAMPLE_RATE - (2.3 + 0.15)) < 0.05
+    # Decodes after the second phrase began still start before the first one
+    later = [size for size, _ in model.calls if size > 1.8 * SAMPLE_RATE]
+    assert later and max(size for size, _ in model.calls) == end - start
+    assert final == "what time is it"
+    print(f"✅ Final decode covers both phrases ({(end - start) / SAMPLE_RATE:.2f} s)")
+
+
+def test_silence_gives_empty_result():
+    model = FakeWhisper()
+    recognizer = StreamingRecognizer(model, VoiceActivityDetector())
+
+    assert _feed(recognizer, (100 * rng.normal(size=SAMPLE_RATE)).astype(np.int16)) == ""
+    assert model.calls == []
+    print("✅ No decode without speech")
+
+
+def main():
+    """Run streaming recognizer tests"""
+    test_partials_are_reported_while_speaking()
+    test_final_reuses_decode_made_during_pause()
+    test_stop_when_ends_utterance_early()
+    test_pause_keeps_the_first_words()
+    test_silence_gives_empty_result()
+    print("All streaming recognizer tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test frame-based voice activity detection
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.audio.vad import VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+rng = np.random.default_rng(3)
+
+
+def _utterance():
+    """0.5 s background, 1 s of loud 'speech', 1.5 s background, as int16"""
+    background = lambda seconds: 100 * rng.normal(size=int(seconds * SAMPLE_RATE))
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    speech = 12000 * np.sin(2 * np.pi * 220 * t) * (1 + 0.3 * np.sin(2 * np.pi * 4 * t))
+    audio = np.concatenate((background(0.5), speech, background(1.5)))
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def test_detect_returns_speech_timestamps():
+    """Whole-clip detection finds one segment at the right place"""
+    vad = VoiceActivityDetector()
+    segments = vad.detect(_utterance())
+
+    assert len(segments) == 1
+    assert abs(segments[0].start - 0.5) < 0.05
+    # End includes the hangover
+    assert 1.45 < segments[0].end < 1.5 + vad.hangover_frames * vad.frame_ms / 1000 + 0.05
+    print(f"✅ Speech detected at {segments[0].start:.2f}-{segments[0].end:.2f}s")
+
+
+def test_loud_int16_audio_does_not_overflow():
+    """Full-scale int16 input gives finite, sensible energy"""
+    vad = VoiceActivityDetector()
+    energy_db, zcr = vad.frame_features(np.full(3200, 32767, dtype=np.int16))
+
+    assert np.all(np.isfinite(energy_db))
+    assert np.all(energy_db > -1.0)
+    assert np.all(zcr == 0)
+    print("✅ No int16 overflow in energy features")
+
+
+def test_trim_removes_leading_and_trailing_silence():
+    vad = VoiceActivityDetector()
+    trimmed = vad.trim(_utterance(), padding_ms=100)
+
+    assert 1.1 * SAMPLE_RATE < trimmed.size < 1.6 * SAMPLE_RATE
+    assert vad.trim(np.zeros(SAMPLE_RATE, dtype=np.int16)).size == 0
+    print("✅ Trim keeps only the speech")
+
+
+def test_streaming_reports_end_of_speech():
+    """Streaming VAD flags end of speech shortly after the speaker stops"""
+    vad = VoiceActivityDetector(end_silence_ms=500)
+    audio = _utterance()
+
+    end_sample = None
+    for offset in range(0, audio.size, 1024):
+        vad.process(audio[offset:offset + 1024])
+        if vad.end_of_speech:
+            end_sample = offset + 1024
+            break
+
+    assert vad.speech_detected
+    assert abs(vad.speech_start - 0.5) < 0.1
+    assert end_sample is not None
+    # Stops well before the end of the 3 s clip
+    assert end_sample / SAMPLE_RATE < 2.2
+    print(f"✅ End of speech detected at {end_sample / SAMPLE_RATE:.2f}s")
+
+
+def test_pause_keeps_utterance_start():
+    """A pause longer than the hangover but shorter than end_silence_ms doesn't move the start"""
+    background = lambda seconds: 100 * rng.normal(size=int(seconds * SAMPLE_RATE))
+    speech = lambda seconds: 12000 * np.sin(2 * np.pi * 220 * np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE)
+    audio = np.concatenate((background(0.5), speech(0.8), background(0.4), speech(0.6), background(1.5)))
+    audio = np.clip(audio, -32768, 32767).astype(np.int16)
+
+    vad = VoiceActivityDetector(end_silence_ms=800)
+    for offset in range(0, audio.size, 1024):
+        vad.process(audio[offset:offset + 1024])
+        if vad.end_of_speech:
+            break
+    fed = offset + 1024
+
+    assert abs(vad.speech_start - 0.5) < 0.05, vad.speech_start
+    assert abs(vad.speech_end - 2.3) < 0.05, vad.speech_end
+
+    # After end of speech, the next utterance gets its own start
+    for offset in range(0, audio.size, 1024):
+        vad.process(audio[offset:offset + 1024])
+    assert abs(vad.speech_start - (fed / SAMPLE_RATE + 0.5)) < 0.05, vad.speech_start
+    print("✅ A pause inside an utterance keeps its start at 0.5s")
+
+
+def main():
+    """Run VAD tests"""
+    test_detect_returns_speech_timestamps()
+    test_loud_int16_audio_does_not_overflow()
+    test_trim_removes_leading_and_trailing_silence()
+    test_streaming_reports_end_of_speech()
+    test_pause_keeps_utterance_start()
+    print("All VAD tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test VoiceManager recording and transcription end to end, fed from WAV
+files through WavFileCaptureBackend with a stand-in Whisper model
+"""
+
+import os
+import sys
+import tempfile
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.audio.audio_capture import WavFileCaptureBackend
+from core.audio.device_probe import DeviceCapabilities
+from core.audio.model_registry import WhisperModelRegistry
+from core.audio.voice_manager import SPEECH_PADDING_SECONDS, VoiceManager
+
+SAMPLE_RATE = 16000
+rng = np.random.default_rng(11)
+
+# One second of speech comes back with padding, plus up to the VAD's 0.2 s hangover and a frame
+TRIMMED_MAX_SECONDS = 1.0 + 0.2 + 2 * SPEECH_PADDING_SECONDS + 0.05
+
+
+class FakeWhisper:
+    """Stand-in for WhisperModel that records every array it is given"""
+
+    def __init__(self):
+        self.inputs = []
+
+    def transcribe(self, audio, **options):
+        self.inputs.append(audio)
+        return [SimpleNamespace(text=" hello"), SimpleNamespace(text="gaia ")], None
+
+
+def _background(seconds, rate=SAMPLE_RATE):
+    return 100 * rng.normal(size=int(seconds * rate))
+
+
+def _speech(seconds, rate=SAMPLE_RATE):
+    t = np.arange(int(seconds * rate)) / rate
+    return 12000 * np.sin(2 * np.pi * 220 * t) * (1 + 0.3 * np.sin(2 * np.pi * 4 * t))
+
+
+def _write_wav(path, parts, rate=SAMPLE_RATE):
+    samples = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+    return samples
+
+
+def _manager(wav_path, debug_audio_dir=None):
+    model = FakeWhisper()
+    registry = WhisperModelRegistry(loader=lambda *key: model,
+                                    capabilities=lambda: DeviceCapabilities("cpu", "int8", source="test"))
+    manager = VoiceManager(capture_backend=WavFileCaptureBackend(str(wav_path)),
+                           debug_audio_dir=debug_audio_dir, registry=registry)
+    return manager, model
+
+
+def test_record_array_length_and_resampling():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        samples = _write_wav(Path(tmp_dir) / "16k.wav", [_speech(3.0)])
+        manager, _ = _manager(Path(tmp_dir) / "16k.wav")
+        audio = manager.record_array(1.0)
+        manager.cleanup()
+        assert audio.dtype == np.float32 and audio.size == SAMPLE_RATE
+        assert np.allclose(audio, samples[:SAMPLE_RATE] / 32768.0)
+
+        _write_wav(Path(tmp_dir) / "8k.wav", [_speech(3.0, rate=8000)], rate=8000)
+        manager, _ = _manager(Path(tmp_dir) / "8k.wav")
+        audio = manager.record_array(1.0)
+        manager.cleanup()
+        # One second at 8 kHz comes out as one second at Whisper's 16 kHz
+        assert audio.size == SAMPLE_RATE
+    print("✅ record_array returns float32 at 16 kHz with the requested length")
+
+
+def test_listen_trims_silence_with_padding():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav_path = Path(tmp_dir) / "utterance.wav"
+        _write_wav(wav_path, [_background(0.5), _speech(1.0), _background(1.5)])
+        manager, model = _manager(wav_path)
+
+        assert manager.listen(duration=3) == "hello gaia"
+        manager.cleanup()
+        seconds = model.inputs[0].size / SAMPLE_RATE
+        assert 1.0 + 2 * SPEECH_PADDING_SECONDS <= seconds <= TRIMMED_MAX_SECONDS, seconds
+    print(f"✅ listen() transcribes {seconds:.2f} s of trimmed audio")
+
+
+def test_listen_smart_stops_on_silence():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav_path = Path(tmp_dir) / "utterance.wav"
+        samples = _write_wav(wav_path, [_background(0.5), _speech(1.0), _background(4.0)])
+        manager, model = _manager(wav_path)
+
+        assert manager.listen_smart(max_duration=10, silence_duration=0.5) == "hello gaia"
+        read_until = manager.capture._cursor
+        manager.cleanup()
+        # Stopped about half a second after the speaker did, not at the end of the file
+        assert read_until < 2.5 * SAMPLE_RATE < samples.size
+        seconds = model.inputs[0].size / SAMPLE_RATE
+        assert 1.0 + 2 * SPEECH_PADDING_SECONDS <= seconds <= TRIMMED_MAX_SECONDS, seconds
+    print(f"✅ listen_smart() stopped after {read_until / SAMPLE_RATE:.2f} s")
+
+
+def test_listen_smart_keeps_speech_before_a_pause():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav_path = Path(tmp_dir) / "paused.wav"
+        samples = _write_wav(wav_path, [_background(0.5), _speech(0.8), _background(0.4), _speech(0.6),
+                                        _background(3.0)])
+        manager, model = _manager(wav_path)
+
+        manager.listen_smart(max_duration=10, silence_duration=0.8)
+        manager.cleanup()
+        recorded = model.inputs[0]
+        # From 0.5 s to the end of the second phrase at 2.3 s, with padding and the hangover
+        seconds = recorded.size / SAMPLE_RATE
+        assert 1.8 + 2 * SPEECH_PADDING_SECONDS <= seconds <= 1.8 + 0.2 + 2 * SPEECH_PADDING_SECONDS + 0.05, seconds
+        start = int((0.5 - SPEECH_PADDING_SECONDS) * SAMPLE_RATE)
+        assert np.allclose(recorded[:SAMPLE_RATE], samples[start:start + SAMPLE_RATE] / 32768.0, atol=1e-6)
+    print(f"✅ listen_smart() keeps the words before a pause ({seconds:.2f} s recorded)")
+
+
+def test_listen_smart_keeps_speech_after_a_pause_at_max_duration():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav_path = Path(tmp_dir) / "long.wav"
+        samples = _write_wav(wav_path, [_background(0.5), _speech(1.0), _background(0.6), _speech(2.0),
+                                        _background(1.0)])
+        manager, model = _manager(wav_path)
+
+        # Still talking when max_duration runs out, after pausing once
+        manager.listen_smart(max_duration=3.5, silence_duration=0.8)
+        read_until = manager.capture._cursor
+        manager.cleanup()
+        assert read_until < int(4.1 * SAMPLE_RATE)
+        start = int((0.5 - SPEECH_PADDING_SECONDS) * SAMPLE_RATE)
+        recorded = model.inputs[0]
+        assert recorded.size == read_until - start, recorded.size / SAMPLE_RATE
+        assert np.allclose(recorded, samples[start:read_until] / 32768.0, atol=1e-6)
+    print(f"✅ listen_smart() keeps everything up to max_duration ({recorded.size / SAMPLE_RATE:.2f} s)")
+
+
+def test_transcribe_arrays():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav_path = Path(tmp_dir) / "speech.wav"
+        _write_wav(wav_path, [_speech(1.0)])
+        manager, model = _manager(wav_path)
+
+        assert manager.transcribe(None) == "" and manager.transcribe(np.zeros(0, dtype=np.float32)) == ""
+        assert model.inputs == []  # Nothing to decode, so the model isn't called
+        assert manager.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32)) == "hello gaia"
+        assert manager.transcribe(str(Path(tmp_dir) / "missing.wav")) == ""
+        assert len(model.inputs) == 1
+    print("✅ transcribe() takes arrays and skips empty input")
+
+
+def test_debug_audio_only_when_configured():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav_path = Path(tmp_dir) / "speech.wav"
+        samples = _write_wav(wav_path, [_speech(2.0)])
+        debug_dir = Path(tmp_dir) / "debug"
+
+        manager, _ = _manager(wav_path, debug_audio_dir=str(debug_dir))
+        manager.record_array(1.0)
+        manager.cleanup()
+        with wave.open(str(debug_dir / "input.wav"), 'rb') as wf:
+            saved = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        assert np.array_equal(saved, samples[:SAMPLE_RATE])
+
+        manager, _ = _manager(wav_path)
+        writes = []
+        manager._save_wav = lambda filename, data: writes.append(filename)
+        manager.record_array(1.0)
+        manager.cleanup()
+        assert writes == [] and sorted(os.listdir(tmp_dir)) == ["debug", "speech.wav"]
+        assert os.listdir(debug_dir) == ["input.wav"]
+    print("✅ Debug WAV written only when debug_audio_dir is set")
+
+
+def main():
+    """Run voice manager tests"""
+    test_record_array_length_and_resampling()
+    test_listen_trims_silence_with_padding()
+    test_listen_smart_stops_on_silence()
+    test_listen_smart_keeps_speech_before_a_pause()
+    test_listen_smart_keeps_speech_after_a_pause_at_max_duration()
+    test_transcribe_arrays()
+    test_debug_audio_only_when_configured()
+    print("All voice manager tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test the learned (naive Bayes) email classifier
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.email_classifier import EmailCategory, HotelEmailClassifier
+from core.hotel.email_model import (EmailModel, append_examples, compare_with_rules, load_examples,
+                                    parse_category, saved_model, split_examples)
+from core.mail.ingest import ingest_file
+
+EXAMPLES = [
+    ("Reservation for two nights", "We would like a double room from Friday", "booking"),
+    ("Change of dates", "Can we move our stay to next weekend?", "booking"),
+    ("Remittance advice", "Payment for invoice 1043 sent by bank transfer", "invoice"),
+    ("Statement of account", "The balance remains outstanding", "invoice"),
+    ("Noise all night", "We could not sleep, the party next door was awful", "complaint"),
+    ("Dirty room", "The sheets were stained and the bathroom smelled", "complaint"),
+    ("Do you allow dogs?", "We would like to bring our small dog", "inquiry"),
+    ("Parking", "Is there parking near the hotel?", "inquiry"),
+]
+
+
+def _emails(examples=EXAMPLES):
+    return ([{"subject": subject, "content": content, "sender": "someone@example.com"}
+             for subject, content, _ in examples],
+            [label for _, _, label in examples])
+
+
+def test_fit_and_predict():
+    emails, labels = _emails()
+    model = EmailModel(n_features=1 << 12).fit(emails, labels)
+
+    assert model.examples == len(emails)
+    assert model.predict(emails) == [parse_category(label) for label in labels]
+    assert model.score(emails, labels) == 1.0
+    category, probability = model.classify({"subject": "Is there parking for our dog?", "content": ""})
+    assert category == EmailCategory.INQUIRY and 0.5 < probability <= 1.0
+    probabilities = model.predict_proba(emails)
+    assert probabilities.shape == (len(emails), len(EmailCategory))
+    assert np.allclose(probabilities.sum(axis=1), 1.0)
+    # Categories without examples are never predicted
+    assert probabilities[:, list(EmailCategory).index(EmailCategory.SPAM)].max() == 0.0
+    print("✅ Model learns categories from labelled emails")
+
+
+def test_partial_fit_matches_full_fit():
+    emails, labels = _emails()
+    full = EmailModel(n_features=1 << 12).fit(emails, labels)
+    incremental = EmailModel(n_features=1 << 12)
+    for email_data, label in zip(emails, labels):
+        incremental.partial_fit([email_data], [label])
+
+    assert np.array_equal(full.feature_counts, incremental.feature_counts)
+    assert np.array_equal(full.class_counts, incremental.class_counts)
+    assert np.allclose(full.decision_function(emails), incremental.decision_function(emails))
+    try:
+        incremental.partial_fit(emails, labels[:2])
+        assert False, "mismatched labels accepted"
+    except ValueError:
+        pass
+    print("✅ partial_fit one email at a time equals one fit")
+
+
+def test_save_and_load_memory_mapped():
+    emails, labels = _emails()
+    model = EmailModel(n_features=1 << 12).fit(emails, labels)
+    model.metrics = {"model_accuracy": 1.0}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model.save(tmp_dir)
+        loaded = EmailModel.load(tmp_dir)
+
+        assert isinstance(loaded.weights, np.memmap)
+        assert loaded.predict(emails) == model.predict(emails)
+        assert loaded.metrics == {"model_accuracy": 1.0}
+
+        # Updating a mapped model copies the counts first; the file is untouched
+        loaded.partial_fit([{"subject": "You have won a prize", "content": "Click here"}], ["spam"])
+        assert not isinstance(loaded.feature_counts, np.memmap)
+        assert EmailModel.load(tmp_dir).examples == len(emails)
+        loaded.save(tmp_dir)
+        assert EmailModel.load(tmp_dir).examples == len(emails) + 1
+        del loaded
+    print("✅ Saved model loads memory-mapped and keeps learning")
+
+
+def test_training_files_and_rule_comparison():
+    emails, labels = _emails()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "training.jsonl"
+        assert append_examples(emails, labels, path) == len(emails)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"subject": "?", "content": "", "category": "gossip"}) + "\n")
+
+        loaded_emails, loaded_labels, skipped = load_examples(path)
+        assert loaded_emails == emails and skipped == 1
+        assert loaded_labels == [parse_category(label) for label in labels]
+
+    train_emails, _, test_emails, _ = split_examples(emails, labels, test_fraction=0.25)
+    assert (len(train_emails), len(test_emails)) == (6, 2)
+
+    model = EmailModel(n_features=1 << 12).fit(emails, labels)
+    metrics = compare_with_rules(model, emails, labels)
+    assert metrics["model_accuracy"] == 1.0
+    assert 0.0 <= metrics["rules_accuracy"] < 1.0
+    assert metrics["model_emails_per_second"] > 0
+    print(f"✅ Model {metrics['model_accuracy']:.0%} vs keyword rules {metrics['rules_accuracy']:.0%}")
+
+
+def test_classifier_uses_confident_model():
+    """A confident model overrides the keyword rules, everywhere the classifier is used"""
+    emails, labels = _emails()
+    expected = [parse_category(label) for label in labels]
+    model = EmailModel(n_features=1 << 12).fit(emails, labels)
+    rules = [c.category for _, c in HotelEmailClassifier().classify_batch(emails)]
+    assert rules != expected
+
+    classifier = HotelEmailClassifier(model=model)
+    assert [c.category for _, c in classifier.classify_batch(emails)] == expected
+    assert [c.category for _, c in classifier.classify_batch(emails, processes=2, chunk_size=3)] == expected
+    complaint = classifier.classify_email("Dirty room", "The sheets were stained and the bathroom smelled")
+    assert complaint.category == EmailCategory.COMPLAINT and complaint.confidence >= classifier.model_threshold
+    assert "complaint" in complaint.recommended_action.lower()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "inbox.jsonl"
+        path.write_text("".join(json.dumps(email_data) + "\n" for email_data in emails), encoding="utf-8")
+        stats = ingest_file(path, classifier)
+        assert stats.categories == {"booking": 2, "invoice": 2, "complaint": 2, "inquiry": 2}
+
+        assert saved_model(Path(tmp_dir) / "model") is None
+        model.save(Path(tmp_dir) / "model")
+        assert saved_model(Path(tmp_dir) / "model").predict(emails) == expected
+
+    # Below the threshold the keyword rules decide
+    unsure = HotelEmailClassifier(model=model, model_threshold=1.01)
+    assert [c.category for _, c in unsure.classify_batch(emails)] == rules
+    print("✅ Classifier defers to the learned model when it is confident")
+
+
+def main():
+    """Run email model tests"""
+    test_fit_and_predict()
+    test_partial_fit_matches_full_fit()
+    test_save_and_load_memory_mapped()
+    test_training_files_and_rule_comparison()
+    test_classifier_uses_confident_model()
+    print("All email model tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test hotel email classification
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.email_classifier import EmailCategory, EmailPriority, HotelEmailClassifier
+from core.hotel.hotel_manager import HotelManager
+
+SAMPLE_EMAILS = [
+    {"id": "1", "sender": "guest@example.com", "subject": "Booking confirmation",
+     "content": "Please confirm my reservation, arrival today for 2 nights"},
+    {"id": "2", "sender": "accounts@linen.com", "subject": "Invoice overdue",
+     "content": "The invoice amount is overdue, total balance outstanding"},
+    {"id": "3", "sender": "promo@deals.com", "subject": "Our newsletter",
+     "content": "Big discount this weekend, unsubscribe any time"},
+    {"id": "4", "sender": "visitor@example.com", "subject": "Question", "content": "Do you allow pets?"},
+]
+
+
+def test_categories_and_priorities():
+    classifier = HotelEmailClassifier()
+    cases = [
+        ("Booking confirmation", "Please confirm my reservation, arrival today for 2 nights",
+         EmailCategory.BOOKING, EmailPriority.HIGH),
+        ("Invoice overdue", "The invoice amount is overdue, total balance outstanding",
+         EmailCategory.INVOICE, EmailPriority.CRITICAL),
+        ("Very unhappy", "Terrible and awful, a real problem with bad service",
+         EmailCategory.COMPLAINT, EmailPriority.CRITICAL),
+        ("Linen delivery", "Your vendor will handle cleaning and linen supply",
+         EmailCategory.SUPPLIER, EmailPriority.MEDIUM),
+        ("Congratulations winner", "Claim your lottery prize, click here",
+         EmailCategory.SPAM, EmailPriority.LOW),
+        ("Our newsletter", "Big discount this weekend, unsubscribe any time",
+         EmailCategory.MARKETING, EmailPriority.LOW),
+        ("Question", "Do you allow pets?", EmailCategory.INQUIRY, EmailPriority.MEDIUM),
+    ]
+    for subject, content, category, priority in cases:
+        result = classifier.classify_email(subject, content)
+        assert (result.category, result.priority) == (category, priority), (subject, result)
+    print("✅ Categories and priorities as expected")
+
+
+def test_keywords_match_as_substrings():
+    classifier = HotelEmailClassifier()
+    text = "bookings for the rooming list; bad service! check-in at 3pm, stay."
+    hits = classifier._keyword_hits(text)
+    for group, keywords in classifier._keyword_sets.items():
+        assert hits[group] == {keyword for keyword in keywords if keyword in text}, group
+    # Second pass is answered from the word cache
+    assert classifier._keyword_hits(text) == hits
+    assert "bookings" in classifier._token_hits and "for" in classifier._plain_tokens
+    print("✅ Single-pass keyword hits equal per-keyword substring checks")
+
+
+def test_keyword_lists_can_be_changed():
+    classifier = HotelEmailClassifier()
+    classifier.spam_indicators.append("crypto")
+    classifier.compile()
+    result = classifier.classify_email("Crypto casino", "")
+    assert result.category == EmailCategory.SPAM
+    print("✅ compile() picks up edited keyword lists")
+
+
+def test_reference_and_guest_name():
+    classifier = HotelEmailClassifier()
+    result = classifier.classify_email("Booking ref: AB12CD34", "Dear John Smith, see you soon")
+    assert result.booking_reference == "ab12cd34"
+    assert result.guest_name == "John Smith"
+
+    result = classifier.classify_email("Hello", "Regards, Mrs. Brown")
+    assert result.booking_reference is None
+    assert result.guest_name == "Brown"
+    print("✅ Booking reference and guest name extracted")
+
+
+def test_classify_batch_streams_in_order():
+    classifier = HotelEmailClassifier()
+    emails = [dict(email, id=f"{email['id']}-{i}") for i in range(50) for email in SAMPLE_EMAILS]
+    expected = [classifier.classify_email(e["subject"], e["content"], e["sender"]) for e in emails]
+
+    serial = list(classifier.classify_batch(iter(emails)))
+    assert [email for email, _ in serial] == emails
+    assert [result for _, result in serial] == expected
+
+    pooled = list(classifier.classify_batch(emails, processes=2, chunk_size=16))
+    assert [email["id"] for email, _ in pooled] == [email["id"] for email in emails]
+    assert [result for _, result in pooled] == expected
+
+    unordered = classifier.classify_batch(emails, processes=2, ordered=False, chunk_size=16)
+    by_id = {email["id"]: result for email, result in unordered}
+    assert [by_id[email["id"]] for email in emails] == expected
+    print("✅ classify_batch gives the same results serially and on a process pool")
+
+
+def test_process_emails_reuses_one_classifier():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)  # HotelManager keeps its data file in the working directory
+        try:
+            manager = HotelManager()
+        finally:
+            os.chdir(cwd)
+    summary = manager.process_emails(iter(SAMPLE_EMAILS))
+    classifier = manager.email_classifier
+    manager.process_emails(SAMPLE_EMAILS)
+
+    assert manager.email_classifier is classifier
+    assert summary.total_emails == 4
+    assert (summary.booking_count, summary.invoice_count) == (1, 1)
+    assert (summary.critical_count, summary.high_priority_count) == (1, 1)
+    assert len(summary.recommended_actions) == 2
+    print("✅ process_emails streams through a shared classifier")
+
+
+def main():
+    """Run hotel email tests"""
+    test_categories_and_priorities()
+    test_keywords_match_as_substrings()
+    test_keyword_lists_can_be_changed()
+    test_reference_and_guest_name()
+    test_classify_batch_streams_in_order()
+    test_process_emails_reuses_one_classifier()
+    print("All hotel email tests passed!")
+
+
+if __name__ == "__main__":
+    main()
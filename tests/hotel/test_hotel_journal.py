@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test journaled hotel storage and crash recovery
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.hotel_manager import HotelManager, RoomStatus
+from core.hotel.journal import HotelJournal
+
+
+def _rooms(manager):
+    return {number: (room.status, room.guest_name, room.check_out_date) for number, room in manager.rooms.items()}
+
+
+def test_changes_append_to_the_journal():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = Path(tmp_dir) / "hotel_data.json"
+        manager = HotelManager(data_file=str(data_file))
+        snapshot = data_file.read_text()
+
+        assert manager.check_in_guest("101", "John Smith", "2024-01-20")
+        assert manager.check_out_guest("101")
+        assert manager.update_room_status("102", RoomStatus.MAINTENANCE)
+
+        assert data_file.read_text() == snapshot  # No full rewrite
+        entries = [json.loads(line) for line in data_file.with_suffix(".journal").read_text().splitlines()]
+        assert [entry["seq"] for entry in entries] == [1, 2, 3, 4, 5]
+        # Check-in books the stay and check-out releases it, one entry each after the room's
+        stay = entries[1]["reservation"]
+        assert [entry.get("room", entry.get("reservation")) for entry in entries] == ["101", stay, "101", stay, "102"]
+        assert entries[0]["data"]["guest_name"] == "John Smith"
+        assert entries[1]["data"]["guest_name"] == "John Smith" and entries[3]["data"] is None
+        manager.journal.close()
+    print("✅ Each change is one journal line; the snapshot is untouched")
+
+
+def test_reload_replays_the_journal():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = str(Path(tmp_dir) / "hotel_data.json")
+        manager = HotelManager(data_file=data_file)
+        manager.check_in_guest("103", "Anna Rossi", "2024-02-01", ["late arrival"])
+        manager.update_room_status("104", RoomStatus.CLEANING)
+        # No close(): as if the process died here
+
+        recovered = HotelManager(data_file=data_file)
+        assert _rooms(recovered) == _rooms(manager)
+        assert recovered.rooms["103"].special_requests == ["late arrival"]
+
+        assert len(recovered.reservations) == 1
+        assert recovered.journal.seq == 3  # Room 103 and its reservation, then room 104
+        recovered.check_out_guest("103")
+        assert recovered.journal.seq == 5
+        assert _rooms(HotelManager(data_file=data_file)) == _rooms(recovered)
+        manager.journal.close()
+        recovered.journal.close()
+    print("✅ State after a crash is rebuilt from snapshot plus journal")
+
+
+def test_torn_append_is_discarded():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = Path(tmp_dir) / "hotel_data.json"
+        manager = HotelManager(data_file=str(data_file))
+        manager.check_in_guest("105", "Peter Novak", "2024-03-03")
+        manager.journal.close()
+        journal_path = data_file.with_suffix(".journal")
+        with open(journal_path, "ab") as f:
+            f.write(b'{"seq":3,"room":"106","data":{"status":"occ')
+
+        recovered = HotelManager(data_file=str(data_file))
+        assert recovered.rooms["105"].guest_name == "Peter Novak"
+        assert recovered.rooms["106"].status == RoomStatus.AVAILABLE
+        assert journal_path.read_bytes().endswith(b"}\n")  # Torn line cut off
+
+        recovered.check_in_guest("106", "Sofia Garcia", "2024-03-04")
+        recovered.journal.close()
+        assert HotelManager(data_file=str(data_file)).rooms["106"].guest_name == "Sofia Garcia"
+    print("✅ A half-written entry is dropped and the journal stays usable")
+
+
+def test_compaction_folds_the_journal_into_the_snapshot():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = Path(tmp_dir) / "hotel_data.json"
+        manager = HotelManager(data_file=str(data_file), compact_every=3)
+        journal_path = data_file.with_suffix(".journal")
+        manager.check_in_guest("101", "John Smith", "2024-01-20")
+        manager.check_in_guest("102", "Anna Rossi", "2024-01-21")
+
+        # Each check-in writes the room, then its reservation: compaction ran after
+        # the third entry, so only Anna Rossi's reservation is left in the journal
+        snapshot = json.loads(data_file.read_text())
+        assert snapshot["journal_seq"] == 3
+        assert snapshot["rooms"]["102"]["guest_name"] == "Anna Rossi"
+        remaining = [json.loads(line) for line in journal_path.read_text().splitlines()]
+        assert [(entry["seq"], entry["data"]["guest_name"]) for entry in remaining] == [(4, "Anna Rossi")]
+        assert "reservation" in remaining[0]
+
+        manager.check_in_guest("103", "Peter Novak", "2024-01-22")
+        snapshot = json.loads(data_file.read_text())
+        assert snapshot["journal_seq"] == 6
+        assert snapshot["rooms"]["103"]["guest_name"] == "Peter Novak"
+        assert journal_path.read_bytes() == b""
+
+        manager.check_out_guest("101")
+        manager.close()
+        assert journal_path.read_bytes() == b""
+        assert _rooms(HotelManager(data_file=str(data_file))) == _rooms(manager)
+    print("✅ Compaction writes a snapshot and empties the journal")
+
+
+def test_entries_already_in_the_snapshot_are_skipped():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal = HotelJournal(Path(tmp_dir) / "hotel.journal", fsync=False)
+        for guest in ("A", "B", "C"):
+            journal.append({"room": "101", "data": {"guest_name": guest}})
+        journal.close()
+
+        # Crash after the snapshot (seq 2) was written but before the journal was emptied
+        reopened = HotelJournal(Path(tmp_dir) / "hotel.journal")
+        assert [entry["data"]["guest_name"] for entry in reopened.replay(after_seq=2)] == ["C"]
+        assert reopened.seq == 3 and reopened.pending == 3
+    print("✅ Replay starts after the snapshot's sequence number")
+
+
+def test_without_journal_every_change_rewrites_the_file():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = Path(tmp_dir) / "hotel_data.json"
+        manager = HotelManager(data_file=str(data_file), journal=False)
+        manager.check_in_guest("107", "James Brown", "2024-04-01")
+        assert json.loads(data_file.read_text())["rooms"]["107"]["guest_name"] == "James Brown"
+        assert not data_file.with_suffix(".journal").exists()
+    print("✅ journal=False keeps the full-rewrite behaviour")
+
+
+def main():
+    """Run hotel journal tests"""
+    test_changes_append_to_the_journal()
+    test_reload_replays_the_journal()
+    test_torn_append_is_discarded()
+    test_compaction_folds_the_journal_into_the_snapshot()
+    test_entries_already_in_the_snapshot_are_skipped()
+    test_without_journal_every_change_rewrites_the_file()
+    print("All hotel journal tests passed!")
+
+
+if __name__ == "__main__":
+    main()
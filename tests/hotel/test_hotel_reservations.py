@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test date-range reservations: the per-room interval index, forecasts and
+how check-in, check-out and the availability command use them
+"""
+
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.agent.command_parser import NO_HOTEL, CommandParser
+from core.automation.action_executor import ActionExecutor, ActionRegistry
+from core.hotel.hotel_manager import HotelManager, RoomStatus
+from core.hotel.reservations import ReservationBook, ReservationConflict
+from core.hotel.storage import SQLiteHotelStore
+
+TODAY = date.today()
+
+
+def _day(offset):
+    return TODAY + timedelta(days=offset)
+
+
+def test_overlaps_are_half_open():
+    book = ReservationBook()
+    first = book.book("101", "John Smith", _day(1), _day(4))
+    book.book("101", "Anna Rossi", _day(4), _day(6))  # Arrives the day John leaves
+
+    try:
+        book.book("101", "Peter Novak", _day(3), _day(5))
+        assert False, "overlap accepted"
+    except ReservationConflict as e:
+        assert [r.guest_name for r in e.conflicts] == ["John Smith", "Anna Rossi"]
+    try:
+        book.book("101", "Peter Novak", _day(2), _day(2))
+        assert False, "empty stay accepted"
+    except ValueError:
+        pass
+
+    assert book.is_free("101", _day(6), _day(9)) and book.is_free("102", _day(1), _day(4))
+    assert not book.is_free("101", _day(0), _day(2))
+    assert book.free_rooms(["101", "102"], _day(2), _day(3)) == ["102"]
+    book.shorten(first, _day(2))
+    assert book.free_rooms(["101", "102"], _day(2), _day(3)) == ["101", "102"]
+    assert book.cancel(first.reservation_id) is first and len(book) == 1
+    print("✅ Stays are half-open and overlaps are refused")
+
+
+def test_index_agrees_with_brute_force():
+    rng = random.Random(7)
+    book = ReservationBook()
+    for _ in range(3000):
+        start = _day(rng.randrange(365))
+        try:
+            book.book(str(100 + rng.randrange(20)), "Guest", start, start + timedelta(days=rng.randint(1, 10)))
+        except ReservationConflict:
+            pass
+    everything = list(book.by_id.values())
+    rooms = [str(100 + i) for i in range(21)]  # One room never booked
+
+    for _ in range(300):
+        start = _day(rng.randrange(-10, 380))
+        end = start + timedelta(days=rng.randint(1, 14))
+        busy = {r.room_number for r in everything if r.overlaps(start, end)}
+        assert book.free_rooms(rooms, start, end) == [room for room in rooms if room not in busy]
+        room = rng.choice(rooms)
+        expected = sorted((r for r in everything if r.room_number == room and r.overlaps(start, end)),
+                          key=lambda r: r.check_in)
+        assert book.conflicts(room, start, end) == expected
+
+    rates = {room: 100.0 + i for i, room in enumerate(rooms)}
+    for night in book.forecast(_day(-5), 60, rates):
+        day = date.fromisoformat(night['date'])
+        staying = [r for r in everything if r.check_in <= day < r.check_out]
+        assert night['booked_rooms'] == len(staying)
+        assert abs(night['revenue'] - sum(rates[r.room_number] for r in staying)) < 1e-6
+    print(f"✅ Index and forecast match a full scan over {len(book)} reservations")
+
+
+def test_check_in_respects_reservations():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = HotelManager(data_file=str(Path(tmp_dir) / "hotel_data.json"))
+        manager.book_room("101", "Anna Rossi", _day(2), _day(5))
+
+        # A walk-in staying past Anna's arrival can't have the room; a short stay can
+        assert not manager.check_in_guest("101", "John Smith", str(_day(3)))
+        assert manager.check_in_guest("101", "John Smith", str(_day(2)))
+        assert [r.guest_name for r in manager.reservations.for_room("101")] == ["John Smith", "Anna Rossi"]
+
+        # Anna arrives today instead: her booking becomes the stay
+        manager.book_room("102", "Anna Rossi", _day(0), _day(3), ["quiet room"])
+        assert manager.check_in_guest("102", "anna rossi", str(_day(3)))
+        assert manager.rooms["102"].special_requests == ["quiet room"]
+        assert len(manager.reservations.for_room("102")) == 1
+
+        # Leaving early frees the room, but not the next guest's booking
+        assert manager.check_out_guest("101")
+        assert [r.guest_name for r in manager.reservations.for_room("101")] == ["Anna Rossi"]
+        assert manager.book_room("999", "Nobody", _day(1), _day(2)) is None
+        assert manager.book_room("103", "Peter Novak", _day(3), _day(1)) is None
+        manager.close()
+    print("✅ Check-in refuses rooms reserved by someone else")
+
+
+def test_free_rooms_tonight_and_forecast():
+    manager = HotelManager(store=SQLiteHotelStore(":memory:"))
+    manager.check_in_guest("101", "John Smith", str(_day(2)))
+    manager.update_room_status("102", RoomStatus.MAINTENANCE)
+    manager.update_room_status("103", RoomStatus.CLEANING)
+    manager.book_room("104", "Anna Rossi", _day(0), _day(1))
+    manager.book_room("105", "Peter Novak", _day(1), _day(3))
+
+    tonight = [room.room_number for room in manager.find_free_rooms()]
+    assert tonight == ["103", "105", "106", "107", "108"]
+    tomorrow = [room.room_number for room in manager.find_free_rooms(_day(1), _day(2))]
+    assert tomorrow == ["102", "103", "104", "106", "107", "108"]
+
+    forecast = manager.get_occupancy_forecast(days=4)
+    assert [night['booked_rooms'] for night in forecast] == [2, 2, 1, 0]
+    assert forecast[0]['occupancy_rate'] == 25.0
+    assert forecast[1]['revenue'] == manager.rooms["101"].rate_per_night + manager.rooms["105"].rate_per_night
+    manager.close()
+    print("✅ Free rooms tonight and the occupancy forecast")
+
+
+def test_reservations_persist():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for make_store in (lambda: None, lambda: SQLiteHotelStore(Path(tmp_dir) / "hotel.db")):
+            data_file = str(Path(tmp_dir) / "hotel_data.json")
+            manager = HotelManager(data_file=data_file, store=make_store())
+            kept = manager.book_room("106", "Sofia Garcia", _day(10), _day(12))
+            cancelled = manager.book_room("107", "James Brown", _day(10), _day(12))
+            manager.cancel_reservation(cancelled.reservation_id)
+            manager.check_in_guest("108", "Peter Novak", str(_day(1)))
+
+            reopened = HotelManager(data_file=data_file, store=make_store())
+            assert set(reopened.reservations.by_id) == set(manager.reservations.by_id)
+            assert reopened.reservations.get(kept.reservation_id).guest_name == "Sofia Garcia"
+            assert kept.reservation_id in HotelManager(data_file=data_file, store=make_store()).reservations
+            manager.close()
+            reopened.close()
+
+        # Stays checked in before reservations existed get one on load
+        manager = HotelManager(store=SQLiteHotelStore(Path(tmp_dir) / "legacy.db"))
+        manager.store.check_in("103", "Old Guest", "2024-01-01T12:00:00", str(_day(2)), [])
+        reloaded = HotelManager(store=SQLiteHotelStore(Path(tmp_dir) / "legacy.db"))
+        assert [(r.check_in, r.check_out) for r in reloaded.reservations.for_room("103")] == [(_day(0), _day(2))]
+
+        export_path = Path(tmp_dir) / "export.json"
+        reloaded.export_json(export_path)
+        restored = HotelManager(data_file=str(Path(tmp_dir) / "restored.json"))
+        restored.import_json(export_path)
+        assert set(restored.reservations.by_id) == set(reloaded.reservations.by_id)
+        for hotel in (manager, reloaded, restored):
+            hotel.close()
+    print("✅ Reservations survive a restart in both stores and travel with JSON export")
+
+
+def test_availability_command():
+    manager = HotelManager(store=SQLiteHotelStore(":memory:"))
+    for number in manager.rooms:
+        if number != "104":
+            manager.book_room(number, "Group Booking", _day(0), _day(1))
+    parser = CommandParser(executor=ActionExecutor(ActionRegistry()), hotel=manager)
+
+    assert parser.parse_and_execute("Check room availability for tonight") == [
+        "We have 1 room available tonight:", "Room 104, Deluxe Queen, $120 a night"]
+    lines = parser.parse_and_execute("do we have any rooms available tomorrow")
+    assert lines[0] == "We have 8 rooms available tomorrow night:" and lines[-1] == "and 3 more."
+    manager.book_room("104", "Late Booking", _day(0), _day(1))
+    assert parser.parse_and_execute("any vacancies tonight?") == "Sorry, we're fully booked tonight."
+    parser.executor.shutdown()
+    manager.close()
+    print("✅ \"Check room availability for tonight\" answers from the reservation index")
+
+
+def test_commands_without_a_hotel_open_nothing():
+    """The parser never opens a HotelManager of its own on the working directory"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            parser = CommandParser(executor=ActionExecutor(ActionRegistry()))
+            assert parser.parse_and_execute("Check room availability for tonight") == NO_HOTEL
+            assert parser.parse_and_execute("Give me the daily hotel summary") == NO_HOTEL
+            assert parser.hotel is None and not os.listdir(tmp_dir)
+            parser.executor.shutdown()
+        finally:
+            os.chdir(cwd)
+    print("✅ Room commands without a hotel say so instead of opening one")
+
+
+def main():
+    """Run hotel reservation tests"""
+    test_overlaps_are_half_open()
+    test_index_agrees_with_brute_force()
+    test_check_in_respects_reservations()
+    test_free_rooms_tonight_and_forecast()
+    test_reservations_persist()
+    test_availability_command()
+    test_commands_without_a_hotel_open_nothing()
+    print("All hotel reservation tests passed!")
+
+
+if __name__ == "__main__":
+    main()
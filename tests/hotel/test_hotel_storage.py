@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test hotel storage backends: SQLite store, multiple properties, JSON import/export
+"""
+
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.hotel_manager import HotelManager, RoomStatus
+from core.hotel.storage import JsonHotelStore, SQLiteHotelStore
+
+
+def _rooms(manager):
+    return {number: (room.room_type, room.status, room.guest_name, room.check_out_date, room.rate_per_night)
+            for number, room in manager.rooms.items()}
+
+
+def test_sqlite_store_matches_json_store():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        managers = [HotelManager(data_file=str(Path(tmp_dir) / "hotel_data.json")),
+                    HotelManager(store=SQLiteHotelStore(Path(tmp_dir) / "hotel.db"))]
+        for manager in managers:
+            assert manager.check_in_guest("101", "John Smith", "2024-01-20", ["late arrival"])
+            assert not manager.check_in_guest("101", "Anna Rossi", "2024-01-21")  # Already occupied
+            assert manager.check_in_guest("103", "Anna Rossi", "2024-01-22")
+            assert manager.check_out_guest("103")
+            assert not manager.check_out_guest("103")
+            assert manager.update_room_status("104", RoomStatus.MAINTENANCE)
+            assert not manager.update_room_status("999", RoomStatus.MAINTENANCE)
+
+        json_manager, sqlite_manager = managers
+        assert _rooms(sqlite_manager) == _rooms(json_manager)
+        assert sqlite_manager.get_hotel_summary() == json_manager.get_hotel_summary()
+        assert sqlite_manager.rooms["101"].special_requests == ["late arrival"]
+        sqlite_manager.close()
+
+        reopened = HotelManager(store=SQLiteHotelStore(Path(tmp_dir) / "hotel.db"))
+        assert _rooms(reopened) == _rooms(json_manager)
+        reopened.close()
+    print("✅ SQLite store gives the same results as the JSON store and persists")
+
+
+def test_indexed_queries():
+    store = SQLiteHotelStore(":memory:")
+    manager = HotelManager(total_rooms=500, store=store)
+    assert manager.total_rooms == 500 and len(manager.get_available_rooms()) == 500
+    assert manager.rooms["108"].room_type == "Presidential Suite"
+    assert manager.rooms["109"].room_type == "Standard Double"  # Layout repeats past eight rooms
+
+    today = date.today()
+    manager.check_in_guest("250", "John Smith", str(today + timedelta(days=2)))
+    manager.check_in_guest("251", "Johnny Smithers", str(today + timedelta(days=5)))
+    manager.check_in_guest("252", "Anna Rossi", str(today + timedelta(days=20)))
+    for room in ("101", "102", "103"):
+        manager.update_room_status(room, RoomStatus.CLEANING)
+
+    assert [r.room_number for r in manager.get_occupied_rooms()] == ["250", "251", "252"]
+    assert [r.room_number for r in manager.get_rooms_by_status(RoomStatus.CLEANING)] == ["101", "102", "103"]
+    assert [r.room_number for r in manager.find_guest("john smith")] == ["250"]  # Exact name wins
+    assert [r.room_number for r in manager.find_guest("smith")] == ["250", "251"]
+    assert manager.find_guest("100%") == []
+    # Stays began today, so only their check-out dates decide the overlap
+    assert [r.room_number for r in manager.get_stays_between(today + timedelta(days=3),
+                                                              today + timedelta(days=10))] == ["251", "252"]
+    assert manager.get_stays_between(today + timedelta(days=30), today + timedelta(days=35)) == []
+    assert manager.get_stays_between(today - timedelta(days=9), today - timedelta(days=2)) == []
+
+    summary = manager.get_hotel_summary()
+    assert (summary['occupied_rooms'], summary['rooms_cleaning'], summary['available_rooms']) == (3, 3, 494)
+
+    plans = {}
+    for query, params in [("SELECT * FROM rooms WHERE property = ? AND status = ?", ("main", "occupied")),
+                          ("SELECT * FROM rooms WHERE property = ? AND guest_name != '' "
+                           "AND guest_name = ? COLLATE NOCASE", ("main", "john smith")),
+                          ("SELECT * FROM rooms WHERE property = ? AND check_out_date IS NOT NULL "
+                           "AND check_out_date > ?", ("main", str(today)))]:
+        plans[query] = " ".join(row[3] for row in store._conn.execute("EXPLAIN QUERY PLAN " + query, params))
+    assert all("USING INDEX" in plan for plan in plans.values()), plans
+    manager.close()
+    print("✅ Status, guest and date queries use the indexes")
+
+
+def test_properties_share_a_database():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "hotels.db"
+        town = HotelManager("Town House", total_rooms=8, store=SQLiteHotelStore(path, "town"))
+        annex = HotelManager("Seaside Annex", total_rooms=20, store=SQLiteHotelStore(path, "annex"))
+        town.check_in_guest("101", "John Smith", "2024-01-20")
+
+        assert annex.rooms["101"].status == RoomStatus.AVAILABLE
+        assert (town.total_rooms, annex.total_rooms) == (8, 20)
+        assert town.store.properties() == ["annex", "town"]
+
+        reopened = HotelManager(store=SQLiteHotelStore(path, "annex"))
+        assert reopened.hotel_name == "Seaside Annex" and reopened.total_rooms == 20
+        for manager in (town, annex, reopened):
+            manager.close()
+    print("✅ Several properties live side by side in one database")
+
+
+def test_concurrent_check_ins_book_a_room_once():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "hotel.db"
+        HotelManager(store=SQLiteHotelStore(path)).close()
+        # Separate connections, as separate processes would have
+        managers = [HotelManager(store=SQLiteHotelStore(path)) for _ in range(8)]
+        results = []
+        threads = [threading.Thread(target=lambda m=m, i=i: results.append(m.check_in_guest("105", f"Guest {i}",
+                                                                                          "2024-05-01")))
+                   for i, m in enumerate(managers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 1
+        for manager in managers:
+            manager.close()
+    print("✅ Racing check-ins to one room: exactly one succeeds")
+
+
+def test_json_import_and_export():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_manager = HotelManager("Town House", data_file=str(Path(tmp_dir) / "hotel_data.json"))
+        json_manager.check_in_guest("102", "Anna Rossi", "2024-02-01")
+        json_manager.update_room_status("107", RoomStatus.OUT_OF_ORDER)
+
+        sqlite_manager = HotelManager(store=SQLiteHotelStore(Path(tmp_dir) / "hotel.db"))
+        assert sqlite_manager.import_json(json_manager.data_file) == 8  # Journal not compacted yet
+        assert _rooms(sqlite_manager) == _rooms(json_manager)
+        assert sqlite_manager.hotel_name == "Town House"
+
+        sqlite_manager.check_out_guest("102")
+        export_path = Path(tmp_dir) / "export.json"
+        assert sqlite_manager.export_json(export_path) == 8
+        restored = HotelManager(store=JsonHotelStore(export_path))
+        assert _rooms(restored) == _rooms(sqlite_manager)
+        try:
+            sqlite_manager.import_json(Path(tmp_dir) / "missing.json")
+            assert False, "missing file imported"
+        except ValueError:
+            pass
+        for manager in (json_manager, sqlite_manager, restored):
+            manager.close()
+    print("✅ hotel_data.json imports into SQLite and exports back")
+
+
+def main():
+    """Run hotel storage tests"""
+    test_sqlite_store_matches_json_store()
+    test_indexed_queries()
+    test_properties_share_a_database()
+    test_concurrent_check_ins_book_a_room_once()
+    test_json_import_and_export()
+    print("All hotel storage tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test the incrementally maintained hotel summary and its change events
+"""
+
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.agent.command_parser import CommandParser
+from core.automation.action_executor import ActionExecutor, ActionRegistry
+from core.hotel.hotel_manager import HotelManager, HotelRoom, RoomStatus
+from core.hotel.storage import SQLiteHotelStore
+from core.hotel.summary import HotelSummary
+
+
+class CountingStore(SQLiteHotelStore):
+    """Counts the queries that read many rooms"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scans = 0
+
+    def all_rooms(self):
+        self.scans += 1
+        return super().all_rooms()
+
+    def rooms_with_status(self, status):
+        self.scans += 1
+        return super().rooms_with_status(status)
+
+    def status_counts(self):
+        self.scans += 1
+        return super().status_counts()
+
+
+def _recounted(manager):
+    """The summary as a fresh count of the store would give it"""
+    return HotelSummary(manager.rooms.values()).snapshot(manager.hotel_name)
+
+
+def test_summary_matches_a_recount():
+    rng = random.Random(3)
+    tomorrow = str(date.today() + timedelta(days=1))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for store in (None, SQLiteHotelStore(":memory:")):
+            manager = HotelManager(total_rooms=40, data_file=str(Path(tmp_dir) / "hotel_data.json"), store=store)
+            numbers = list(manager.rooms)
+            for i in range(600):
+                number = rng.choice(numbers + ["999"])
+                action = rng.randrange(3)
+                if action == 0:
+                    manager.check_in_guest(number, f"Guest {i}", tomorrow)
+                elif action == 1:
+                    manager.check_out_guest(number)
+                else:
+                    manager.update_room_status(number, rng.choice(list(RoomStatus)))
+                if i % 50 == 0:
+                    assert manager.get_hotel_summary() == _recounted(manager)
+            assert manager.get_hotel_summary() == _recounted(manager)
+
+            manager.add_rooms([HotelRoom("500", "Penthouse", RoomStatus.AVAILABLE, rate_per_night=999.99)])
+            assert manager.total_rooms == 41 and manager.get_hotel_summary() == _recounted(manager)
+            manager.close()
+    print("✅ Incremental summary matches a recount after 600 random changes")
+
+
+def test_revenue_does_not_drift():
+    summary = HotelSummary([HotelRoom("101", "Standard", RoomStatus.AVAILABLE, rate_per_night=0.1),
+                            HotelRoom("102", "Standard", RoomStatus.AVAILABLE, rate_per_night=0.2)])
+    for _ in range(1000):
+        summary.transition("101", RoomStatus.OCCUPIED, "A")
+        summary.transition("102", RoomStatus.OCCUPIED, "B")
+        summary.transition("101", RoomStatus.CLEANING, "")
+    assert summary.snapshot("Hotel")['daily_revenue'] == 0.2
+    assert summary.transition("999", RoomStatus.OCCUPIED) is None
+    print("✅ Revenue is kept in cents, so it doesn't drift")
+
+
+def test_summary_reads_do_not_scan():
+    store = CountingStore(":memory:")
+    manager = HotelManager(total_rooms=200, store=store)
+    manager.check_in_guest("150", "John Smith", str(date.today() + timedelta(days=2)))
+    manager.update_room_status("151", RoomStatus.MAINTENANCE)
+
+    scans = store.scans
+    for _ in range(100):
+        summary = manager.get_hotel_summary()
+    assert store.scans == scans
+    assert summary['occupied_room_list'] == [("150", "John Smith")]
+    assert summary['available_rooms'] == 198 and summary['rooms_maintenance'] == 1
+
+    # Another connection changes the database; a refresh picks it up
+    store.set_status("152", RoomStatus.CLEANING)
+    assert manager.get_hotel_summary()['rooms_cleaning'] == 0
+    manager.refresh_summary()
+    assert manager.get_hotel_summary()['rooms_cleaning'] == 1
+    manager.close()
+    print("✅ Reading the summary doesn't query the store")
+
+
+def test_subscribers_get_events():
+    manager = HotelManager(store=SQLiteHotelStore(":memory:"))
+    events, failures = [], []
+    unsubscribe = manager.subscribe(events.append)
+    manager.subscribe(lambda event: failures.append(1 / 0))  # A broken dashboard doesn't stop the others
+
+    tomorrow = date.today() + timedelta(days=1)
+    manager.check_in_guest("101", "John Smith", str(tomorrow))
+    assert not manager.check_in_guest("101", "Anna Rossi", str(tomorrow))
+    manager.check_out_guest("101")
+    manager.update_room_status("101", RoomStatus.AVAILABLE)
+    reservation = manager.book_room("102", "Anna Rossi", tomorrow, tomorrow + timedelta(days=2))
+    manager.cancel_reservation(reservation.reservation_id)
+
+    kinds = [event.kind for event in events]
+    # The stay's own reservation follows each check-in and check-out
+    assert kinds == ["check_in", "booked", "check_out", "cancelled", "status", "booked", "cancelled"], kinds
+    check_in, check_out, status = events[0], events[2], events[4]
+    assert (check_in.room_number, check_in.old_status, check_in.new_status, check_in.guest_name) == (
+        "101", RoomStatus.AVAILABLE, RoomStatus.OCCUPIED, "John Smith")
+    assert (check_out.old_status, check_out.new_status, check_out.guest_name) == (
+        RoomStatus.OCCUPIED, RoomStatus.CLEANING, "John Smith")
+    assert (status.old_status, status.new_status) == (RoomStatus.CLEANING, RoomStatus.AVAILABLE)
+    assert check_in.version < check_out.version < status.version
+
+    unsubscribe()
+    manager.update_room_status("103", RoomStatus.CLEANING)
+    assert len(events) == 7 and len(failures) == 0
+    manager.close()
+    print("✅ Subscribers get check-in, check-out, status and booking events")
+
+
+def test_summary_command():
+    manager = HotelManager("Town House", store=SQLiteHotelStore(":memory:"))
+    manager.check_in_guest("108", "John Smith", str(date.today() + timedelta(days=1)))
+    manager.update_room_status("101", RoomStatus.CLEANING)
+    parser = CommandParser(executor=ActionExecutor(ActionRegistry()), hotel=manager)
+
+    assert parser.parse_and_execute("Give me the daily hotel summary") == [
+        "Town House: 1 of 8 rooms occupied (12.5%), 6 available.",
+        f"Tonight's room revenue is ${manager.rooms['108'].rate_per_night:,.2f}.",
+        "1 being cleaned, 0 in maintenance."]
+    parser.executor.shutdown()
+    manager.close()
+    print("✅ \"Daily hotel summary\" reads the running counters")
+
+
+def main():
+    """Run hotel summary tests"""
+    test_summary_matches_a_recount()
+    test_revenue_does_not_drift()
+    test_summary_reads_do_not_scan()
+    test_subscribers_get_events()
+    test_summary_command()
+    print("All hotel summary tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the columnar room state table: loading, record views, O(1) updates
+and vectorized occupancy and revenue across properties
+"""
+
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.hotel.hotel_manager import HotelManager, HotelRoom, RoomStatus
+from core.hotel.reservations import Reservation
+from core.hotel.room_state import NO_DATE, RoomStateTable, day_numbers, from_day_number
+from core.hotel.storage import SQLiteHotelStore
+
+TODAY = date.today()
+
+
+def _day(offset):
+    return TODAY + timedelta(days=offset)
+
+
+def _busy_hotels(path):
+    """Two properties in one database with some stays, bookings and housekeeping"""
+    rng = random.Random(5)
+    managers = {"town": HotelManager("Town House", total_rooms=30, store=SQLiteHotelStore(path, "town")),
+                "annex": HotelManager("Seaside Annex", total_rooms=50, store=SQLiteHotelStore(path, "annex"))}
+    for manager in managers.values():
+        numbers = list(manager.rooms)
+        for i, number in enumerate(rng.sample(numbers, len(numbers) // 2)):
+            manager.check_in_guest(number, f"Guest {i}", str(_day(rng.randint(1, 6))))
+        for i in range(300):
+            start = _day(rng.randrange(60))
+            manager.book_room(rng.choice(numbers), f"Booking {i}", start,
+                              start + timedelta(days=rng.randint(1, 5)))
+        for number in rng.sample(numbers, 4):
+            manager.update_room_status(number, rng.choice([RoomStatus.CLEANING, RoomStatus.MAINTENANCE]))
+    return managers
+
+
+def test_matches_the_managers():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        managers = _busy_hotels(Path(tmp_dir) / "hotels.db")
+        table = RoomStateTable.from_managers(managers)
+        assert len(table) == 80 and table.properties == ["town", "annex"]
+
+        summaries = table.property_summary()
+        for name, manager in managers.items():
+            expected = manager.get_hotel_summary()
+            for key in ('total_rooms', 'occupied_rooms', 'occupancy_rate', 'daily_revenue'):
+                assert summaries[name][key] == expected[key], (name, key)
+            counts = table.status_counts(name)
+            assert counts[RoomStatus.CLEANING] == expected['rooms_cleaning']
+            assert counts[RoomStatus.AVAILABLE] == expected['available_rooms']
+            assert [r.room_number for r in table.rooms_with_status(RoomStatus.OCCUPIED, name)] == [
+                number for number, _ in expected['occupied_room_list']]
+            assert table.forecast(TODAY, 45, name) == manager.get_occupancy_forecast(45)
+
+        combined = table.forecast(_day(3), 20)
+        town, annex = table.forecast(_day(3), 20, "town"), table.forecast(_day(3), 20, "annex")
+        assert [night['booked_rooms'] for night in combined] == [
+            a['booked_rooms'] + b['booked_rooms'] for a, b in zip(town, annex)]
+        assert table.room_nights(_day(3), _day(23)) == sum(night['booked_rooms'] for night in combined)
+        assert table.room_nights(_day(3), _day(23), "town") == sum(night['booked_rooms'] for night in town)
+        assert table.forecast(TODAY, 5, "nowhere") == [] and table.room_nights(_day(5), _day(1)) == 0
+        for manager in managers.values():
+            manager.close()
+    print("✅ Vectorized counts, revenue and forecasts match each HotelManager")
+
+
+def test_loads_straight_from_sqlite():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        managers = _busy_hotels(Path(tmp_dir) / "hotels.db")
+        from_managers = RoomStateTable.from_managers(managers)
+        store = managers["town"].store
+        everything = RoomStateTable.from_sqlite(store)
+        only_town = RoomStateTable.from_sqlite(store, all_properties=False)
+
+        assert sorted(everything.properties) == ["annex", "town"] and only_town.properties == ["town"]
+        assert everything.property_summary() == {name: from_managers.property_summary()[name]
+                                                 for name in everything.properties}
+        # The database also holds reservations that have ended; the forecast only looks ahead
+        assert everything.forecast(TODAY, 30) == from_managers.forecast(TODAY, 30)
+        assert only_town.forecast(TODAY, 30) == from_managers.forecast(TODAY, 30, "town")
+        assert len(RoomStateTable.from_sqlite(SQLiteHotelStore(":memory:"))) == 0
+        for manager in managers.values():
+            manager.close()
+    print("✅ Tables load every property straight from SQLite rows")
+
+
+def test_records_and_updates():
+    table = RoomStateTable()
+    table.add_property("town", [HotelRoom("101", "Standard Double", RoomStatus.AVAILABLE, rate_per_night=80),
+                                HotelRoom("102", "Junior Suite", RoomStatus.OCCUPIED, "John Smith",
+                                          "2024-05-01T14:00:00", str(_day(2)), 180.5)],
+                       [Reservation("102", "John Smith", _day(-1), _day(2))])
+
+    record = table.record("town", "102")
+    assert (record.property_name, record.room_type, record.status, record.guest_name) == (
+        "town", "Junior Suite", RoomStatus.OCCUPIED, "John Smith")
+    assert (record.rate_per_night, record.check_in, record.check_out) == (180.5, date(2024, 5, 1), _day(2))
+    assert record.to_room().check_out_date == str(_day(2))
+    assert not hasattr(record, "__dict__") and not hasattr(HotelRoom("1", "x", RoomStatus.AVAILABLE), "__dict__")
+    assert table.record("town", "999") is None and table.record("annex", "101") is None
+
+    assert table.check_in("town", "101", "Anna Rossi", TODAY, _day(3))
+    assert not table.check_in("town", "101", "Peter Novak", TODAY, _day(3))
+    assert table.property_summary()["town"]['daily_revenue'] == 260.5
+    assert table.check_out("town", "102") and not table.check_out("town", "102")
+    assert table.record("town", "102").check_out is None and table.record("town", "102").guest_name == ""
+    assert table.set_status("town", "102", RoomStatus.MAINTENANCE)
+    assert not table.set_status("town", "9", RoomStatus.CLEANING)
+    assert table.status_counts()[RoomStatus.MAINTENANCE] == 1
+
+    # Appends past the initial capacity keep earlier rows
+    table.add_property("annex", [HotelRoom(str(i), "Standard", RoomStatus.AVAILABLE, rate_per_night=50)
+                                 for i in range(1000)])
+    assert len(table) == 1002 and table.record("town", "101").guest_name == "Anna Rossi"
+    assert table.property_summary()["annex"] == {'total_rooms': 1000, 'occupied_rooms': 0,
+                                                 'occupancy_rate': 0.0, 'daily_revenue': 0.0}
+    print("✅ Slotted record views read and update the columns")
+
+
+def test_day_numbers():
+    days = day_numbers([date(1970, 1, 2), "2024-02-29", "2024-02-29T23:59:00", None, "", "next week"])
+    assert list(days[:3]) == [1, 19782, 19782] and list(days[3:]) == [NO_DATE] * 3
+    assert from_day_number(days[1]) == date(2024, 2, 29) and from_day_number(NO_DATE) is None
+    print("✅ Dates become day numbers; missing or unreadable ones become NO_DATE")
+
+
+def main():
+    """Run room state table tests"""
+    test_matches_the_managers()
+    test_loads_straight_from_sqlite()
+    test_records_and_updates()
+    test_day_numbers()
+    print("All room state table tests passed!")
+
+
+if __name__ == "__main__":
+    main()
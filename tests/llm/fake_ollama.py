@@ -0,0 +1,110 @@
+"""
+Minimal stand-in for the Ollama HTTP API, used by the LLM tests.
+Speaks HTTP/1.1 so connection reuse can be observed.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data):
+        line = (json.dumps(data) + "\n").encode()
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+    def _record(self, body=None):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.path, body))
+            server.connections.add(self.client_address)
+
+    @staticmethod
+    def _prompt_tokens(body):
+        """Whitespace word count standing in for the tokenizer"""
+        return sum(len(message.get("content", "").split()) for message in body.get("messages", []))
+
+    def do_GET(self):
+        self._record()
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"model": name, "name": name} for name in self.server.models]})
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-fake"})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self._record(body)
+        model = body.get("model")
+        stamp = "2024-01-01T00:00:00Z"
+
+        if self.path == "/api/generate":
+            self._send_json({"model": model, "created_at": stamp, "response": "", "done": True})
+            return
+        if self.path != "/api/chat":
+            self.send_error(404)
+            return
+
+        tokens = self.server.tokens
+        if not body.get("stream", True):
+            self._send_json({"model": model, "created_at": stamp, "done": True,
+                             "prompt_eval_count": self._prompt_tokens(body), "eval_count": len(tokens),
+                             "message": {"role": "assistant", "content": "".join(tokens)}})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            self._send_chunk({"model": model, "created_at": stamp, "done": False,
+                              "message": {"role": "assistant", "content": token}})
+            time.sleep(self.server.token_delay)
+        self._send_chunk({"model": model, "created_at": stamp, "done": True,
+                          "prompt_eval_count": self._prompt_tokens(body), "eval_count": len(tokens),
+                          "message": {"role": "assistant", "content": ""}})
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """Serves /api/tags, /api/chat (streamed or not) and /api/generate on a free port"""
+
+    daemon_threads = True
+
+    def __init__(self, tokens=("Hello.",), models=("llama3:latest",), token_delay=0.0):
+        super().__init__(("127.0.0.1", 0), FakeOllamaHandler)
+        self.tokens = list(tokens)
+        self.models = list(models)
+        self.token_delay = token_delay
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test bounded conversation history and per-turn token accounting
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.ai.conversation import ConversationHistory, estimate_message_tokens
+from core.ai.llm_interface import LocalLLM
+from tests.llm.fake_ollama import FakeOllamaServer
+
+
+class RecordingSummarizer:
+    """Stand-in for the LLM summarizer that lists which turns it folded"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous_summary, turns):
+        self.calls.append([turn.content for turn in turns])
+        return (previous_summary + " " + " / ".join(turn.content[:10] for turn in turns)).strip()
+
+
+def _talk(history, exchanges, words=40):
+    for i in range(exchanges):
+        history.add_user(f"question {i} " + "word " * words)
+        history.add_assistant(f"answer {i} " + "word " * words)
+
+
+def test_messages_fit_the_budget():
+    """Even without compaction the prompt never exceeds the budget"""
+    history = ConversationHistory(system_prompt="You are Gaia.", max_context_tokens=600, reserve_tokens=100)
+    _talk(history, 20)
+    history.add_user("and what about breakfast?")
+
+    messages = history.messages()
+
+    assert estimate_message_tokens(messages) <= history.prompt_budget
+    assert messages[0]["role"] == "system"
+    assert messages[1]["role"] == "user"  # history never starts with a dangling reply
+    assert messages[-1]["content"] == "and what about breakfast?"
+    print(f"✅ {len(messages)} messages within a {history.prompt_budget} token budget")
+
+
+def test_old_turns_are_summarized_incrementally():
+    summarizer = RecordingSummarizer()
+    history = ConversationHistory(max_context_tokens=1000, reserve_tokens=200,
+                                  summarizer=summarizer, keep_recent=2)
+
+    _talk(history, 3)
+    assert not history.needs_compaction()
+    assert not history.compact()
+
+    _talk(history, 10)
+    assert history.compact()
+    first_fold = summarizer.calls[0]
+    assert first_fold[0].startswith("question 0") and first_fold[1].startswith("answer 0")
+    assert history.prompt_tokens() <= history.prompt_budget * history.low_water
+    assert "question 0" in history.summary
+    assert any("Summary of the earlier conversation" in m["content"] for m in history.messages())
+
+    # Nothing more to fold until the high-water mark is crossed again
+    assert not history.compact()
+    assert len(summarizer.calls) == 1
+    print("✅ Oldest turns folded into a running summary once past the high-water mark")
+
+
+def test_turns_are_dropped_without_summarizer():
+    history = ConversationHistory(max_context_tokens=800, reserve_tokens=100, keep_recent=2)
+    _talk(history, 12)
+
+    assert history.compact()
+    assert history.summary == ""
+    assert history.turns[-1].content.startswith("answer 11")
+    print("✅ Old turns dropped when no summarizer is set")
+
+
+def test_unanswered_question_is_rolled_back():
+    history = ConversationHistory(system_prompt="You are Gaia.")
+    history.add_user("When is breakfast?")
+    history.add_assistant("At seven.")
+    history.add_user("Where is the spa?")
+    history.discard_unanswered()  # The LLM call failed
+    assert [turn.content for turn in history.turns] == ["When is breakfast?", "At seven."]
+
+    # A question cut off before any reply is replaced by the next one
+    history.add_user("Is there a pool?")
+    history.add_user("Where is the gym?")
+    assert [m["role"] for m in history.messages()] == ["system", "user", "assistant", "user"]
+    assert history.messages()[-1]["content"] == "Where is the gym?"
+    print("✅ Failed questions don't leave two user turns in a row")
+
+
+def test_prompt_tokens_and_ttft_are_reported():
+    with FakeOllamaServer(["Breakfast ", "is at seven."]) as server:
+        llm = LocalLLM(host=server.url)
+        history = ConversationHistory(system_prompt="You are Gaia.")
+        history.add_user("When is breakfast?")
+
+        reply = "".join(llm.chat_stream(history.messages()))
+        history.add_assistant(reply)
+        history.add_user("And dinner?")
+        follow_up_messages = history.messages()
+        llm.ask("And dinner?")
+        stats = llm.last_stats
+
+        sent = server.requests[-1][2]["messages"]
+
+    assert reply == "Breakfast is at seven."
+    assert [m["role"] for m in follow_up_messages] == ["system", "user", "assistant", "user"]
+    assert stats.prompt_tokens == 2 and stats.completion_tokens == 2
+    assert sent == [{"role": "user", "content": "And dinner?"}]
+    print("✅ Prompt token counts recorded per call")
+
+
+def test_stream_records_time_to_first_token():
+    with FakeOllamaServer(["One.", " Two."], token_delay=0.05) as server:
+        llm = LocalLLM(host=server.url)
+        list(llm.chat_stream([{"role": "user", "content": "count"}]))
+
+    stats = llm.last_stats
+    assert stats.time_to_first_token is not None
+    assert stats.time_to_first_token < stats.total_seconds
+    assert stats.prompt_tokens == 1
+    print(f"✅ TTFT {stats.time_to_first_token * 1000:.0f} ms of {stats.total_seconds * 1000:.0f} ms")
+
+
+def main():
+    """Run conversation history tests"""
+    test_messages_fit_the_budget()
+    test_old_turns_are_summarized_incrementally()
+    test_turns_are_dropped_without_summarizer()
+    test_unanswered_question_is_rolled_back()
+    test_prompt_tokens_and_ttft_are_reported()
+    test_stream_records_time_to_first_token()
+    print("All conversation tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test LocalLLM's pooled Ollama client against a fake Ollama server
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.ai.llm_interface import LocalLLM
+from tests.llm.fake_ollama import FakeOllamaServer
+
+
+def test_requests_reuse_one_connection():
+    """Health check and consecutive turns share a kept-alive connection"""
+    with FakeOllamaServer(["Paris."]) as server:
+        llm = LocalLLM(host=server.url)
+        first = llm.ask("Capital of France?")
+        second = "".join(llm.ask_stream("And again?"))
+        llm.close()
+
+    assert llm.available
+    assert first == "Paris." and second == "Paris."
+    assert [path for _, path, _ in server.requests] == ["/api/tags", "/api/chat", "/api/chat"]
+    assert len(server.connections) == 1
+    print("✅ One HTTP connection for health check and two turns")
+
+
+def test_keep_alive_is_sent_with_every_request():
+    with FakeOllamaServer() as server:
+        llm = LocalLLM(host=server.url, keep_alive="1h")
+        llm.ask("hi")
+        llm.warm_up().join()
+
+    posted = [(path, body) for method, path, body in server.requests if method == "POST"]
+    assert [path for path, _ in posted] == ["/api/chat", "/api/generate"]
+    assert all(body["keep_alive"] == "1h" for _, body in posted)
+    print("✅ keep_alive passed on chat and warm-up")
+
+
+def test_unreachable_server_does_not_exit():
+    """A missing server is reported, not fatal"""
+    llm = LocalLLM(host="http://127.0.0.1:9")
+
+    assert not llm.available
+    assert llm.ask("hi").startswith("[Local LLM Error]")
+    print("✅ Unreachable Ollama reported without exiting")
+
+
+def test_missing_model_is_reported():
+    with FakeOllamaServer(models=["mistral:latest"]) as server:
+        assert not LocalLLM(model="llama3", host=server.url).available
+        assert LocalLLM(model="mistral", host=server.url).available
+    print("✅ Health check verifies the model is pulled")
+
+
+def main():
+    """Run LLM client tests"""
+    test_requests_reuse_one_connection()
+    test_keep_alive_is_sent_with_every_request()
+    test_unreachable_server_does_not_exit()
+    test_missing_model_is_reported()
+    print("All LLM client tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test the LLM response cache tiers, bounds and persistence
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.ai.llm_interface import LocalLLM
+from core.ai.response_cache import ResponseCache, is_standalone
+from tests.llm.fake_ollama import FakeOllamaServer
+
+
+def _bag_of_words_embedder(vocabulary):
+    """Deterministic stand-in for an embedding model"""
+    def embed(text):
+        words = text.lower().replace("?", "").split()
+        return np.array([words.count(word) for word in vocabulary], dtype=np.float32)
+    return embed
+
+
+def test_exact_and_normalized_hits():
+    cache = ResponseCache()
+    cache.put("What is the wifi password?", "It's on the key card.", generation_seconds=2.0)
+
+    assert cache.get("What is the wifi password?") == "It's on the key card."
+    assert cache.get("  what is the WiFi password ") == "It's on the key card."
+    assert cache.get("Hey Gaia, what is the wifi password please") == "It's on the key card."
+    assert cache.get("What is the pool password?") is None
+
+    stats = cache.get_stats()
+    assert (stats["hits_exact"], stats["hits_normalized"], stats["misses"]) == (1, 2, 1)
+    assert 5.9 < stats["saved_seconds"] <= 6.0
+    print("✅ Exact and normalized lookups hit")
+
+
+def test_semantic_tier_matches_paraphrases():
+    vocabulary = ["breakfast", "served", "when", "is", "what", "time", "pool", "open", "morning", "meal"]
+    cache = ResponseCache(embedder=_bag_of_words_embedder(vocabulary), similarity_threshold=0.8,
+                          time_sensitive_patterns=[])
+    cache.put("when is breakfast served", "From 7 to 10.")
+
+    assert cache.get("breakfast is served when") == "From 7 to 10."
+    assert cache.get("when is the pool open") is None
+    assert cache.stats.hits_semantic == 1
+    print("✅ Embedding tier matches reworded questions")
+
+
+def test_time_sensitive_prompts_are_not_cached():
+    cache = ResponseCache()
+    cache.put("What's the weather today?", "Sunny.")
+    cache.put("Which rooms are available tonight?", "Rooms 3 and 5.")
+
+    assert len(cache) == 0
+    assert cache.get("What's the weather today?") is None
+    assert cache.stats.uncacheable == 1
+    print("✅ Time-sensitive prompts bypass the cache")
+
+
+def test_ttl_and_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.put("first question", "one")
+    cache.put("second question", "two")
+    cache.get("first question")           # first is now most recently used
+    cache.put("third question", "three")  # evicts second
+
+    assert cache.get("second question") is None
+    assert cache.get("first question") == "one"
+    assert cache.stats.evictions == 1
+
+    cache.put("short lived", "gone soon", ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get("short lived") is None
+    assert cache.stats.expirations >= 1
+
+    small = ResponseCache(max_bytes=40)
+    small.put("a question", "x" * 20)
+    small.put("another question", "y" * 20)
+    assert len(small) == 1 and small.get("another question") == "y" * 20
+    print("✅ TTL expiry and LRU/size eviction")
+
+
+def test_entries_survive_restart():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "cache.json"
+        ResponseCache(path).put("Where is the gym?", "Second floor.", generation_seconds=1.5)
+
+        reloaded = ResponseCache(path)
+        assert reloaded.get("where is the gym") == "Second floor."
+        assert reloaded.stats.saved_seconds > 1.4
+    print("✅ Cache persisted to disk")
+
+
+def test_local_llm_skips_generation_on_hit():
+    with FakeOllamaServer(["Second floor."]) as server:
+        llm = LocalLLM(host=server.url, cache=ResponseCache())
+        first = llm.ask("Where is the gym?")
+        second = "".join(llm.ask_stream("where is the gym"))
+        chats = [path for _, path, _ in server.requests].count("/api/chat")
+
+    assert first == second == "Second floor."
+    assert chats == 1
+    print("✅ LocalLLM answers repeat questions from the cache")
+
+
+def test_standalone_questions_hit_mid_conversation():
+    persona = {"role": "system", "content": "You are Gaia, a helpful and friendly voice assistant."}
+    embedded = []
+
+    def embed(text):
+        embedded.append(text)
+        return _bag_of_words_embedder(["where", "gym", "spa", "pool", "is", "the"])(text)
+
+    with FakeOllamaServer(["Second floor."]) as server:
+        llm = LocalLLM(host=server.url, cache=ResponseCache(embedder=embed))
+        assert llm.chat([persona, {"role": "user", "content": "Where is the gym?"}]) == "Second floor."
+
+        earlier = [persona, {"role": "user", "content": "Do you have a spa?"},
+                   {"role": "assistant", "content": "Yes, on the roof."}]
+        # A question that stands on its own is answered from the cache mid-conversation...
+        assert llm.chat(earlier + [{"role": "user", "content": "where is the gym"}]) == "Second floor."
+        # ...but a follow-up and another persona go to the model
+        llm.chat(earlier + [{"role": "user", "content": "Is it open late?"}])
+        llm.chat([{"role": "system", "content": "You are a pirate."}, {"role": "user", "content": "Where is the gym?"}])
+        chats = [path for _, path, _ in server.requests].count("/api/chat")
+
+    assert chats == 3
+    # Only the question is embedded, never the system prompt
+    assert embedded and all(not text.startswith("You are") for text in embedded)
+    assert is_standalone("Where is the nearest pharmacy?")
+    assert not is_standalone("And the pool?") and not is_standalone("why is that") and not is_standalone("thanks")
+    print("✅ Standalone questions hit mid-conversation; follow-ups and other personas don't")
+
+
+def main():
+    """Run response cache tests"""
+    test_exact_and_normalized_hits()
+    test_semantic_tier_matches_paraphrases()
+    test_time_sensitive_prompts_are_not_cached()
+    test_ttl_and_lru_eviction()
+    test_entries_survive_restart()
+    test_local_llm_skips_generation_on_hit()
+    test_standalone_questions_hit_mid_conversation()
+    print("All response cache tests passed!")
+
+
+if __name__ == "__main__":
+    main()
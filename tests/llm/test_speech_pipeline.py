@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test streamed LLM -> sentence -> TTS pipeline against a fake Ollama server
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.ai.llm_interface import LocalLLM
+from core.ai.sentence_segmenter import SentenceSegmenter
+from core.audio.speech_pipeline import SpeechPipeline
+from tests.llm.fake_ollama import FakeOllamaServer
+
+RESPONSE_TOKENS = ["Hello", " Luke", ", nice", " to see", " you.", " Dr.", " Smith",
+                   " checked", " in at", " 3.30", " today!", " Anything", " else?"]
+TOKEN_DELAY = 0.05
+
+
+class RecordingTTS:
+    """Stand-in for AzureTTS/TTSManager that records when each sentence was spoken"""
+
+    def __init__(self, duration=0.01):
+        self.duration = duration
+        self.spoken = []
+
+    def speak(self, text):
+        self.spoken.append((time.perf_counter(), text))
+        time.sleep(self.duration)
+        return True
+
+
+def test_segmenter_splits_streamed_tokens():
+    segmenter = SentenceSegmenter(min_chars=5)
+    sentences = list(segmenter.segment(RESPONSE_TOKENS))
+
+    assert sentences == [
+        "Hello Luke, nice to see you.",
+        "Dr. Smith checked in at 3.30 today!",
+        "Anything else?",
+    ]
+    print("✅ Tokens grouped into sentences (abbreviations and decimals kept)")
+
+
+def test_segmenter_holds_back_fragments_and_strips_markdown():
+    segmenter = SentenceSegmenter(min_chars=12)
+    sentences = list(segmenter.segment(["Sure. ", "**Room 4** is ", "free.\n\n", "- Breakfast ", "is at 7"]))
+
+    assert sentences == ["Sure. Room 4 is free.", "Breakfast is at 7"]
+    print("✅ Short fragments merged and markdown stripped")
+
+
+def test_first_sentence_spoken_before_generation_finishes():
+    with FakeOllamaServer(RESPONSE_TOKENS, token_delay=TOKEN_DELAY) as server:
+        llm = LocalLLM(host=server.url)
+        tts = RecordingTTS()
+        pipeline = SpeechPipeline(tts.speak)
+
+        started = time.perf_counter()
+        response = pipeline.speak_stream(llm.ask_stream("hi"))
+        generation_done = started + pipeline.stats.generation_done
+
+    assert response == "Hello Luke, nice to see you. Dr. Smith checked in at 3.30 today! Anything else?"
+    assert [text for _, text in tts.spoken][0] == "Hello Luke, nice to see you."
+    assert tts.spoken[0][0] < generation_done - 4 * TOKEN_DELAY
+    assert pipeline.stats.first_sentence < pipeline.stats.generation_done
+    print(f"✅ First sentence after {pipeline.stats.first_sentence:.2f}s, "
+          f"generation done after {pipeline.stats.generation_done:.2f}s")
+
+
+def test_llm_errors_are_spoken_like_ask():
+    llm = LocalLLM(host="http://127.0.0.1:9")
+    tts = RecordingTTS(duration=0)
+
+    response = SpeechPipeline(tts.speak).speak_stream(llm.ask_stream("hi"))
+
+    assert response.startswith("[Local LLM Error]")
+    print("✅ Connection errors reported the same way as ask()")
+
+
+def main():
+    """Run speech pipeline tests"""
+    test_segmenter_splits_streamed_tokens()
+    test_segmenter_holds_back_fragments_and_strips_markdown()
+    test_first_sentence_spoken_before_generation_finishes()
+    test_llm_errors_are_spoken_like_ask()
+    print("All speech pipeline tests passed!")
+
+
+if __name__ == "__main__":
+    main()